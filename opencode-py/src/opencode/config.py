@@ -1,5 +1,6 @@
 """User configuration management."""
 
+import json
 import os
 from dataclasses import dataclass, field
 from pathlib import Path
@@ -46,6 +47,12 @@ def _default_safe_commands() -> list[str]:
     return commands
 
 
+def _toml_value(value) -> str:
+    """Render a string, number, bool or list of those as a TOML value."""
+    # JSON literals of these types are valid TOML
+    return json.dumps(value)
+
+
 @dataclass
 class ConfigSource:
     """Track where a config value came from."""
@@ -76,6 +83,13 @@ class Config:
     api_key: str = ""
     base_url: str = ""  # For custom OpenAI-compatible endpoints
     stream: bool = True  # Enable streaming responses (set to False if streaming doesn't work)
+    prompt_caching: bool = True  # Mark system prompt, tools and history as cacheable (Anthropic)
+    context_tokens: int = 150000  # Request size at which old tool output is compacted (0 = off)
+    max_retries: int = 3  # Retries of rate-limited, overloaded or dropped requests
+    metrics_log: bool = False  # Append per-call token/latency metrics to .opencode/metrics/
+    router_backends: list[dict] = field(default_factory=list)  # [[router.backends]] (empty = single provider)
+    llm_cache: str = "off"  # "record" or "replay" responses in .opencode/llm_cache/
+    llm_cache_ttl: int = 7 * 24 * 3600  # Seconds a recorded response is reused in record mode (0 = forever)
 
     # SSL/TLS settings (for enterprise environments)
     ssl_cert_path: str = ""  # Path to CA bundle or certificate file
@@ -92,6 +106,10 @@ class Config:
     # Tool settings
     tool_timeout: int = 30
     checkpoint_enabled: bool = True
+    search_workers: int = 0  # Processes for parallel search (0 = one per CPU, 1 = off)
+    tool_cache_size: int = 256  # Cached read-only tool results (0 = off)
+    tool_workers: int = 8  # Threads for read-only tool calls from one response (1 = serial)
+    speculative_tools: bool = False  # Start read-only tool calls while the response streams
 
     # Debug settings
     debug: bool = False
@@ -376,6 +394,24 @@ Setting up {provider.upper()} API Key
                     self.base_url = llm["base_url"]
                 if "stream" in llm:
                     self.stream = bool(llm["stream"])
+                if "prompt_caching" in llm:
+                    self.prompt_caching = bool(llm["prompt_caching"])
+                if "context_tokens" in llm:
+                    self.context_tokens = int(llm["context_tokens"])
+                if "max_retries" in llm:
+                    self.max_retries = int(llm["max_retries"])
+                if "metrics_log" in llm:
+                    self.metrics_log = bool(llm["metrics_log"])
+                if "cache" in llm and llm["cache"]:
+                    self.llm_cache = str(llm["cache"]).lower()
+                if "cache_ttl" in llm:
+                    self.llm_cache_ttl = int(llm["cache_ttl"])
+
+            # Router backends (several providers, routed by task)
+            if "router" in data:
+                router = data["router"]
+                if "backends" in router:
+                    self.router_backends = [dict(b) for b in router["backends"]]
 
             # SSL/TLS settings
             if "ssl" in data:
@@ -404,6 +440,14 @@ Setting up {provider.upper()} API Key
                     self.tool_timeout = int(exe["tool_timeout"])
                 if "checkpoint_enabled" in exe:
                     self.checkpoint_enabled = bool(exe["checkpoint_enabled"])
+                if "search_workers" in exe:
+                    self.search_workers = int(exe["search_workers"])
+                if "tool_cache_size" in exe:
+                    self.tool_cache_size = int(exe["tool_cache_size"])
+                if "tool_workers" in exe:
+                    self.tool_workers = int(exe["tool_workers"])
+                if "speculative_tools" in exe:
+                    self.speculative_tools = bool(exe["speculative_tools"])
 
             # Debug settings
             if "debug" in data:
@@ -439,6 +483,9 @@ Setting up {provider.upper()} API Key
         if stream := os.environ.get("OPENCODE_STREAM"):
             self.stream = stream.lower() in ("1", "true", "yes", "on")
             overrides.append("OPENCODE_STREAM")
+        if llm_cache := os.environ.get("OPENCODE_LLM_CACHE"):
+            self.llm_cache = llm_cache.lower()
+            overrides.append("OPENCODE_LLM_CACHE")
 
         # Generic API key (highest priority)
         if key := os.environ.get("OPENCODE_API_KEY"):
@@ -658,6 +705,32 @@ verify = {str(self.ssl_verify).lower()}
 # [ssl]
 # cert_path = "/path/to/ca-bundle.crt"
 # verify = true
+'''
+
+        # Router section
+        if self.router_backends:
+            router_section = "".join(
+                "\n[[router.backends]]\n" + "".join(
+                    f"{key} = {_toml_value(value)}\n" for key, value in backend.items()
+                )
+                for backend in self.router_backends
+            )
+        else:
+            router_section = '''
+# [[router.backends]]
+# name = "local"
+# provider = "custom"
+# model = "llama3"
+# base_url = "http://localhost:11434/v1"
+# tasks = ["simple", "review"]
+#
+# [[router.backends]]
+# provider = "anthropic"
+# model = "claude-sonnet-4-20250514"
+#
+# [[router.backends]]
+# provider = "openai"
+# model = "gpt-4o"
 '''
 
         content = f'''# OpenCode-Py Configuration
@@ -693,6 +766,28 @@ model = "{self.llm_model}"
 # Streaming - Set to false if you experience issues with streaming responses
 {stream_line}
 
+# Prompt caching - Reuse the system prompt, tools and earlier turns between
+# requests (Anthropic only; cuts cost and latency of tool-loop continuations)
+prompt_caching = {str(self.prompt_caching).lower()}
+
+# Context budget - Estimated request size (tokens) at which stale tool output
+# (superseded file reads/writes, then old results) is compacted. 0 = off
+context_tokens = {self.context_tokens}
+
+# Retries - Rate-limited (429), overloaded (5xx/529) and dropped requests are
+# retried this many times with jittered exponential backoff
+max_retries = {self.max_retries}
+
+# Metrics log - Append tokens, latency and retries of every LLM call to
+# .opencode/metrics/<date>.jsonl (see /stats for the session summary)
+metrics_log = {str(self.metrics_log).lower()}
+
+# Response cache - "record" reuses identical completions (same model, system
+# prompt, tools and messages) stored in .opencode/llm_cache/ for cache_ttl
+# seconds (0 = forever); "replay" answers only from that cache, offline
+cache = "{self.llm_cache}"
+cache_ttl = {self.llm_cache_ttl}
+
 # -----------------------------------------------------------------------------
 # PROVIDER EXAMPLES
 # -----------------------------------------------------------------------------
@@ -728,6 +823,16 @@ model = "{self.llm_model}"
 #   model = "your-model"
 #   base_url = "https://your-api-endpoint.com/v1"
 
+# =============================================================================
+# ROUTER (optional)
+# =============================================================================
+#
+# Spread requests over several providers instead of the single one above.
+# Backends are tried in order; one that is slow (p95 latency) or failing is
+# skipped, and rate-limited or dropped requests fail over to the next one.
+# tasks limits a backend to task classes: "simple" (low complexity chats),
+# "complex" (everything else) and "review" (REVIEW mode). Omit for all.
+{router_section}
 # =============================================================================
 # SSL/TLS SETTINGS
 # =============================================================================
@@ -777,6 +882,19 @@ tool_timeout = {self.tool_timeout}
 # Create git checkpoints before destructive operations
 checkpoint_enabled = {str(self.checkpoint_enabled).lower()}
 
+# Worker processes for searching large trees (0 = one per CPU, 1 = single process)
+search_workers = {self.search_workers}
+
+# Results of read-only tools (grep, glob, read, ...) kept for repeated calls (0 = off)
+tool_cache_size = {self.tool_cache_size}
+
+# Threads for running the read-only tool calls of one response together (1 = one at a time)
+tool_workers = {self.tool_workers}
+
+# Start read-only tool calls as soon as they are parsed, while the rest of a
+# streamed response is still arriving (Anthropic)
+speculative_tools = {str(self.speculative_tools).lower()}
+
 # Custom safe commands (in addition to defaults)
 # safe_commands = ["npm test", "cargo build", "make"]
 
@@ -794,6 +912,7 @@ checkpoint_enabled = {str(self.checkpoint_enabled).lower()}
 #   OPENCODE_LLM_MODEL     - Override model name
 #   OPENCODE_BASE_URL      - Override base URL
 #   OPENCODE_STREAM        - Enable/disable streaming (true/false)
+#   OPENCODE_LLM_CACHE     - Response cache mode (off/record/replay)
 #
 # SSL settings:
 #   OPENCODE_SSL_CERT_PATH - Path to CA certificate bundle
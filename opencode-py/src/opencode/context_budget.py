@@ -0,0 +1,295 @@
+"""Context budget - keep a conversation within the model's context window.
+
+Tool output is by far the largest part of a long agent loop: every file
+read and every file written stays in the request for the rest of the
+turn. The budget estimates tokens per message and per tool round and,
+once a request grows past the limit, compacts it in three passes, each
+stopping as soon as the request fits:
+
+1. Superseded file states: a `read` of a file that was rewritten or read
+   again later (in full, or the same window of it), and the contents sent
+   by a `write`/`edit` that a later full read or write replaced.
+2. Old tool output: results outside the most recent rounds are cut down
+   to their first lines.
+3. Old history messages: likewise cut down to their first lines.
+
+Compaction replaces messages and rounds with new objects rather than
+modifying them (see llm.base.ConversationBuffer), and goes down to a
+lower target than the trigger, so the prompt-cache prefix is broken only
+once in a while rather than on every request.
+"""
+
+import dataclasses
+import json
+import os
+from typing import Optional
+
+from opencode.llm.base import Message, ToolResult
+
+
+# Default token budget for a single request (leaves room for the response)
+DEFAULT_MAX_TOKENS = 150_000
+
+# Compaction goes down to this fraction of the budget
+TARGET_RATIO = 0.75
+
+# The latest rounds and messages are never compacted
+KEEP_RECENT_ROUNDS = 2
+KEEP_RECENT_MESSAGES = 4
+
+# Kept at the top of compacted output (whichever is shorter)
+HEAD_LINES = 10
+HEAD_CHARS = 1000
+
+# Per-message overhead of roles, ids and block structure
+MESSAGE_OVERHEAD = 4
+
+ELIDED_PREFIX = "[Elided to save context"
+
+# Tools whose output or arguments are file states
+_READ_TOOLS = {"read"}
+_WRITE_TOOLS = {"write", "edit"}
+_WRITE_ARGUMENTS = ("content", "old_string", "new_string")
+
+# Read arguments that limit the output to part of a file
+_WINDOW_ARGUMENTS = ("lines", "tail", "rows", "sample", "columns", "max_rows", "sheet")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count of a string (about four characters per token)."""
+    return (len(text) + 3) // 4
+
+
+class ContextBudget:
+    """Token budget for the messages, tool rounds and prompts of one request.
+
+    Args:
+        max_tokens: Estimated tokens a request may use before it is
+            compacted (0 disables compaction).
+    """
+
+    def __init__(self, max_tokens: int = DEFAULT_MAX_TOKENS):
+        self.max_tokens = max_tokens
+        self.compactions = 0
+        self.tokens_saved = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_tokens > 0
+
+    def estimate(
+        self,
+        messages: list[Message],
+        tool_rounds: list[dict] = (),
+        system: Optional[str] = None,
+        tools: Optional[list[dict]] = None,
+    ) -> int:
+        """Estimate the tokens a request would use."""
+        total = estimate_tokens(system or "")
+        if tools:
+            total += estimate_tokens(json.dumps(tools))
+        total += sum(message_tokens(msg) for msg in messages)
+        total += sum(round_tokens(rnd) for rnd in tool_rounds)
+        return total
+
+    def fit(
+        self,
+        messages: list[Message],
+        tool_rounds: Optional[list[dict]] = None,
+        system: Optional[str] = None,
+        tools: Optional[list[dict]] = None,
+    ) -> bool:
+        """Compact a request in place if it is over budget.
+
+        Args:
+            messages: Conversation history (entries may be replaced).
+            tool_rounds: Tool rounds of the current turn (entries may be replaced).
+            system: System prompt.
+            tools: Tool schemas.
+
+        Returns:
+            True if the request is within budget (after any compaction).
+        """
+        if not self.enabled:
+            return True
+        if tool_rounds is None:
+            tool_rounds = []
+
+        total = self.estimate(messages, tool_rounds, system, tools)
+        if total <= self.max_tokens:
+            return True
+
+        target = int(self.max_tokens * TARGET_RATIO)
+        before = total
+        for compact in (_elide_superseded, _trim_old_results, _trim_old_messages):
+            total -= compact(messages, tool_rounds, total - target)
+            if total <= target:
+                break
+
+        self.compactions += 1
+        self.tokens_saved += before - total
+        return total <= self.max_tokens
+
+
+def message_tokens(msg: Message) -> int:
+    """Estimate the tokens of a history message."""
+    return estimate_tokens(msg.content or "") + MESSAGE_OVERHEAD
+
+
+def round_tokens(rnd: dict) -> int:
+    """Estimate the tokens of a tool round (calls and their results)."""
+    total = estimate_tokens(rnd.get("content") or "") + 2 * MESSAGE_OVERHEAD
+    for tc in rnd.get("tool_calls", []):
+        total += estimate_tokens(tc.name) + MESSAGE_OVERHEAD
+        total += sum(estimate_tokens(str(v)) for v in tc.arguments.values())
+    for result in rnd.get("results", []):
+        total += estimate_tokens(result.content) + MESSAGE_OVERHEAD
+    return total
+
+
+# =============================================================================
+# Compaction passes - each returns the estimated tokens it freed
+# =============================================================================
+
+def _elide_superseded(messages: list[Message], tool_rounds: list[dict], needed: int) -> int:
+    """Drop file contents that a later read or write of the same file replaced."""
+    # Walk backwards remembering files (and windows of files) whose state a
+    # later call shows
+    latest_state: set[str] = set()
+    latest_windows: set[tuple[str, tuple]] = set()
+    stale: list[tuple[int, int]] = []  # (round index, call index), newest first
+    for r in range(len(tool_rounds) - 1, -1, -1):
+        calls = tool_rounds[r].get("tool_calls", [])
+        for c in range(len(calls) - 1, -1, -1):
+            tc = calls[c]
+            if tc.name not in _READ_TOOLS and tc.name not in _WRITE_TOOLS:
+                continue
+            path = _call_path(tc)
+            if path is None:
+                continue
+            window = _read_window(tc) if tc.name in _READ_TOOLS else ()
+            if path in latest_state or (window and (path, window) in latest_windows):
+                stale.append((r, c))
+            # A window shows part of a file, and an edit changes part of
+            # one, so neither makes other earlier calls out of date
+            if window:
+                latest_windows.add((path, window))
+            elif tc.name in _READ_TOOLS or tc.name == "write":
+                latest_state.add(path)
+
+    freed = 0
+    for r, c in reversed(stale):  # Oldest first
+        if freed >= needed:
+            break
+        freed += _replace_call(tool_rounds, r, c, _superseded_note)
+    return freed
+
+
+def _trim_old_results(messages: list[Message], tool_rounds: list[dict], needed: int) -> int:
+    """Cut the output of older tool calls down to its first lines."""
+    freed = 0
+    for r in range(len(tool_rounds) - KEEP_RECENT_ROUNDS):
+        for c in range(len(tool_rounds[r].get("tool_calls", []))):
+            if freed >= needed:
+                return freed
+            freed += _replace_call(tool_rounds, r, c, _head_note)
+    return freed
+
+
+def _trim_old_messages(messages: list[Message], tool_rounds: list[dict], needed: int) -> int:
+    """Cut older history messages down to their first lines."""
+    freed = 0
+    for i in range(len(messages) - KEEP_RECENT_MESSAGES):
+        if freed >= needed:
+            break
+        msg = messages[i]
+        trimmed = _head(msg.content or "", "")
+        if trimmed is None:
+            continue
+        messages[i] = dataclasses.replace(msg, content=trimmed)
+        freed += message_tokens(msg) - message_tokens(messages[i])
+    return freed
+
+
+def _replace_call(tool_rounds: list[dict], r: int, c: int, compact) -> int:
+    """Swap one call (and its result) of a round for compacted copies.
+
+    `compact(tool_call, result)` returns the new (arguments, result content),
+    or None to leave the call alone.
+    """
+    rnd = tool_rounds[r]
+    tc = rnd["tool_calls"][c]
+    results = rnd.get("results", [])
+    index = next((i for i, res in enumerate(results) if res.tool_id == tc.id), None)
+    result = results[index] if index is not None else None
+
+    compacted = compact(tc, result)
+    if compacted is None:
+        return 0
+    arguments, content = compacted
+
+    tool_calls = list(rnd["tool_calls"])
+    tool_calls[c] = dataclasses.replace(tc, arguments=arguments)
+    results = list(results)
+    if result is not None:
+        results[index] = dataclasses.replace(result, content=content)
+    new_round = {**rnd, "tool_calls": tool_calls, "results": results}
+    tool_rounds[r] = new_round
+    return round_tokens(rnd) - round_tokens(new_round)
+
+
+def _superseded_note(tc, result: Optional[ToolResult]) -> Optional[tuple[dict, str]]:
+    """Compacted form of a call whose file state is out of date."""
+    path = _call_path(tc)
+    note = f"{ELIDED_PREFIX}: {path} was read or written again later]"
+    arguments = tc.arguments
+    content = result.content if result else ""
+
+    if tc.name in _READ_TOOLS:
+        if result is None or result.is_error or content.startswith(ELIDED_PREFIX):
+            return None
+        content = note
+    else:
+        if not any(k in arguments and not str(arguments[k]).startswith(ELIDED_PREFIX)
+                   for k in _WRITE_ARGUMENTS):
+            return None
+        arguments = {
+            k: (note if k in _WRITE_ARGUMENTS else v) for k, v in arguments.items()
+        }
+    return arguments, content
+
+
+def _head_note(tc, result: Optional[ToolResult]) -> Optional[tuple[dict, str]]:
+    """Compacted form of an old call: the first lines of its output."""
+    if result is None or result.is_error:
+        return None
+    trimmed = _head(result.content, "; run the tool again if needed")
+    if trimmed is None:
+        return None
+    return tc.arguments, trimmed
+
+
+def _head(text: str, hint: str) -> Optional[str]:
+    """Start of a long text plus an elision note, or None if not worth cutting."""
+    if text.startswith(ELIDED_PREFIX):
+        return None
+    head = "\n".join(text.split("\n", HEAD_LINES)[:HEAD_LINES])[:HEAD_CHARS]
+    if len(head) * 2 > len(text):
+        return None
+    return f"{head}\n{ELIDED_PREFIX}: {len(text) - len(head)} more characters{hint}]"
+
+
+def _call_path(tc) -> Optional[str]:
+    """Normalized file path a read/write/edit call works on."""
+    path = tc.arguments.get("path")
+    if not isinstance(path, str) or not path:
+        return None
+    return os.path.normpath(path)
+
+
+def _read_window(tc) -> tuple:
+    """The part of a file a read call shows, or () for the whole file."""
+    return tuple(
+        (key, str(tc.arguments[key])) for key in _WINDOW_ARGUMENTS
+        if tc.arguments.get(key) not in (None, "")
+    )
@@ -67,7 +67,8 @@ class ExplorationGuard:
 
     # Exploration tools (read-only, understanding-focused)
     EXPLORATION_TOOLS = frozenset({"read", "glob", "grep", "tree", "outline",
-                                    "find_definition", "find_references", "find_symbols"})
+                                    "find_definition", "find_references", "find_symbols",
+                                    "profile_data"})
 
     # Modification tools (require prior exploration)
     MODIFICATION_TOOLS = frozenset({"write", "edit", "rename_symbol"})
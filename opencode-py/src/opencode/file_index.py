@@ -0,0 +1,559 @@
+"""Workspace file index - one shared listing of files for all search tools.
+
+The index walks the tree once, then keeps itself current by re-statting
+directories: only directories whose mtime changed are re-listed. Paths
+excluded by .gitignore/.ignore files (see opencode.ignore) are pruned
+during the walk, so ignored directories are never listed. Mutating
+tools report the files they touch via update()/remove(), and invalidate()
+forces a full re-stat when something outside our control (e.g. a shell
+command) may have edited files in place.
+"""
+
+import bisect
+import os
+import re
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from opencode.ignore import IGNORE_FILES, IgnoreFile, IgnoreRules
+
+
+# Directories never worth indexing (dependencies, caches, build output)
+SKIP_DIRS = {
+    "node_modules", ".git", "__pycache__", ".venv", "venv",
+    "dist", "build", ".tox", "target",
+}
+
+# Generated subdirectories of a directory, by parent name: the workspace's
+# trigram index, recorded LLM responses and metrics. Pruned so searches
+# don't return them and writing them doesn't count as a change to the tree.
+GENERATED_DIRS = {
+    ".opencode": {"index", "llm_cache", "metrics"},
+}
+
+# Language detection by extension (lowercase suffix -> language)
+EXTENSION_LANGUAGES = {
+    ".py": "python",
+    ".js": "javascript",
+    ".jsx": "javascript",
+    ".mjs": "javascript",
+    ".ts": "typescript",
+    ".tsx": "typescript",
+    ".rs": "rust",
+    ".go": "go",
+    ".java": "java",
+    ".c": "c",
+    ".h": "c",
+    ".cpp": "cpp",
+    ".hpp": "cpp",
+    ".cc": "cpp",
+    ".hh": "cpp",
+    ".cxx": "cpp",
+    ".rb": "ruby",
+    ".php": "php",
+}
+
+
+def detect_language(path: str) -> Optional[str]:
+    """Detect a file's language from its extension."""
+    return EXTENSION_LANGUAGES.get(os.path.splitext(path)[1].lower())
+
+
+def compile_glob(pattern: str) -> re.Pattern:
+    """Compile a pathlib-style glob into a regex over '/'-separated paths.
+
+    Supports '**' (any number of directories), '*', '?' and '[...]' classes.
+    Like Path.glob, a pattern without '**' only matches at its own depth.
+    """
+    pattern = pattern.replace("\\", "/").lstrip("/")
+    while pattern.startswith("./"):
+        pattern = pattern[2:]
+
+    i, n = 0, len(pattern)
+    out = []
+    while i < n:
+        c = pattern[i]
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif c == "*":
+            out.append("[^/]*")
+            i += 1
+        elif c == "?":
+            out.append("[^/]")
+            i += 1
+        elif c == "[":
+            j = pattern.find("]", i + 2)
+            if j == -1:
+                out.append(re.escape(c))
+                i += 1
+            else:
+                body = pattern[i + 1:j]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                out.append(f"[{body}]")
+                i = j + 1
+        else:
+            out.append(re.escape(c))
+            i += 1
+
+    flags = re.IGNORECASE if os.name == "nt" else 0
+    return re.compile("".join(out) + r"\Z", flags)
+
+
+def _literal_dir_prefix(pattern: str) -> str:
+    """Get the directories a glob names literally before any wildcard.
+
+    e.g. 'src/app/**/*.ts' -> 'src/app/', '*.py' -> ''.
+    """
+    pattern = pattern.replace("\\", "/").lstrip("/")
+    while pattern.startswith("./"):
+        pattern = pattern[2:]
+    end = len(pattern)
+    for i, c in enumerate(pattern):
+        if c in "*?[":
+            end = i
+            break
+    return pattern[:pattern.rfind("/", 0, end) + 1]
+
+
+@dataclass
+class FileEntry:
+    """A file in the index."""
+    path: Path
+    rel_path: str  # '/'-separated, relative to the index root
+    size: int
+    mtime: float
+    language: Optional[str] = None
+
+    @property
+    def suffix(self) -> str:
+        """Lowercase file extension."""
+        return os.path.splitext(self.rel_path)[1].lower()
+
+    @property
+    def hidden(self) -> bool:
+        """True if the file or any parent directory is hidden."""
+        return any(part.startswith(".") for part in self.rel_path.split("/"))
+
+
+class FileIndex:
+    """In-memory index of every file under a root directory."""
+
+    def __init__(
+        self,
+        root: Path,
+        skip_dirs: Optional[set[str]] = None,
+        use_ignore_files: bool = True,
+    ):
+        """Initialize the index (nothing is scanned until first use).
+
+        Args:
+            root: Directory to index.
+            skip_dirs: Directory names to prune (default: SKIP_DIRS).
+            use_ignore_files: Leave out paths excluded by .gitignore/.ignore.
+        """
+        self.root = Path(root).resolve()
+        self.skip_dirs = set(SKIP_DIRS if skip_dirs is None else skip_dirs)
+        self.use_ignore_files = use_ignore_files
+        self.generation = 0  # Bumped whenever the file set or any entry changes
+
+        self._files: dict[str, FileEntry] = {}
+        # rel dir ("" for root) -> (mtime_ns, file names, subdir names)
+        self._dirs: dict[str, tuple[int, set[str], set[str]]] = {}
+        # rel dir -> rules for its entries, and (name, mtime_ns, size) of its ignore files
+        self._rules: dict[str, IgnoreRules] = {}
+        self._ignore_stats: dict[str, tuple] = {}
+        self._base_rules = IgnoreRules()
+        self._built = False
+        self._restat_files = False
+        self._sorted: Optional[list[FileEntry]] = None
+        self._sorted_keys: list[str] = []
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        self.refresh()
+        return len(self._files)
+
+    # -------------------------------------------------------------------------
+    # Building and refreshing
+    # -------------------------------------------------------------------------
+
+    def refresh(self) -> None:
+        """Bring the index up to date.
+
+        The first call walks the whole tree. Later calls only re-list
+        directories whose mtime changed since they were last scanned.
+        """
+        with self._lock:
+            if not self._built:
+                if self.use_ignore_files:
+                    self._base_rules = IgnoreRules.for_root(self.root)
+                self._scan_tree("")
+                self._built = True
+                self._changed()
+                return
+
+            changed = False
+            for rel_dir in list(self._dirs):
+                if rel_dir not in self._dirs:
+                    continue  # Dropped along with a removed parent
+                try:
+                    mtime_ns = os.stat(self._abs(rel_dir)).st_mtime_ns
+                except OSError:
+                    self._drop_dir(rel_dir)
+                    changed = True
+                    continue
+                if mtime_ns != self._dirs[rel_dir][0] or (
+                    rel_dir in self._ignore_stats
+                    and self._stat_ignore_files(rel_dir) != self._ignore_stats[rel_dir]
+                ):
+                    self._rescan_dir(rel_dir)
+                    changed = True
+
+            if self._restat_files:
+                self._restat_files = False
+                for rel_path in list(self._files):
+                    if self._restat(rel_path):
+                        changed = True
+
+            if changed:
+                self._changed()
+
+    def invalidate(self) -> None:
+        """Force the next refresh to re-stat every file.
+
+        Use after operations that may edit files in place without touching
+        their directories (e.g. shell commands).
+        """
+        with self._lock:
+            self._restat_files = True
+
+    def update(self, path: Path) -> None:
+        """Record that a file was created or modified."""
+        rel_path = self._rel(path)
+        if rel_path is None:
+            return
+        with self._lock:
+            if not self._built:
+                return
+            parent = rel_path.rpartition("/")[0]
+            if parent not in self._dirs:
+                return  # Directory not indexed (or ignored) - next refresh handles it
+            if self._rules[parent].ignored(rel_path, is_dir=False):
+                return
+            if self._restat(rel_path):
+                self._changed()
+
+    def remove(self, path: Path) -> None:
+        """Record that a file was deleted."""
+        rel_path = self._rel(path)
+        with self._lock:
+            if rel_path is not None and self._files.pop(rel_path, None) is not None:
+                self._changed()
+
+    def refresh_entry(self, entry: FileEntry) -> Optional[FileEntry]:
+        """Re-stat a single entry and return its current state.
+
+        Returns:
+            The up-to-date entry, or None if the file no longer exists.
+        """
+        with self._lock:
+            if self._restat(entry.rel_path):
+                self._changed()
+            return self._files.get(entry.rel_path)
+
+    def _scan_tree(self, rel_dir: str) -> None:
+        """Recursively scan a directory and everything beneath it."""
+        stack = [rel_dir]
+        while stack:
+            current = stack.pop()
+            stack.extend(self._scan_dir(current))
+
+    def _scan_dir(self, rel_dir: str) -> list[str]:
+        """Scan one directory, returning the relative paths of its subdirectories."""
+        abs_dir = self._abs(rel_dir)
+        prefix = f"{rel_dir}/" if rel_dir else ""
+        file_names = set()
+        subdirs = set()
+
+        try:
+            mtime_ns = os.stat(abs_dir).st_mtime_ns
+            with os.scandir(abs_dir) as it:
+                dir_entries = list(it)
+        except OSError:
+            self._dirs.pop(rel_dir, None)
+            return []
+
+        rules = self._load_rules(rel_dir, dir_entries)
+        generated = GENERATED_DIRS.get(rel_dir.rpartition("/")[2], ())
+        for entry in dir_entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    name = entry.name
+                    if name in generated:
+                        continue
+                    if name not in self.skip_dirs and not rules.ignored(prefix + name, True):
+                        subdirs.add(name)
+                elif entry.is_file():
+                    rel_path = prefix + entry.name
+                    if rules.ignored(rel_path, False):
+                        continue
+                    st = entry.stat()
+                    self._files[rel_path] = FileEntry(
+                        path=Path(entry.path),
+                        rel_path=rel_path,
+                        size=st.st_size,
+                        mtime=st.st_mtime,
+                        language=detect_language(entry.name),
+                    )
+                    file_names.add(entry.name)
+            except OSError:
+                continue
+
+        self._dirs[rel_dir] = (mtime_ns, file_names, subdirs)
+        return [prefix + name for name in subdirs]
+
+    def _load_rules(self, rel_dir: str, dir_entries: list[os.DirEntry]) -> IgnoreRules:
+        """Work out the ignore rules for a directory's entries.
+
+        Combines the parent directory's rules with the directory's own
+        ignore files (found in the listing, so no extra stat is needed).
+        """
+        found = {}
+        if self.use_ignore_files:
+            found = {e.name: e for e in dir_entries if e.name in IGNORE_FILES}
+        stats = []
+        for name in IGNORE_FILES:
+            if name in found:
+                try:
+                    st = found[name].stat()
+                except OSError:
+                    continue
+                stats.append((name, st.st_mtime_ns, st.st_size))
+        stats = tuple(stats) if stats else None
+
+        # Unchanged ignore files keep their rules (a parent's change drops the subtree)
+        if rel_dir in self._rules and self._ignore_stats.get(rel_dir) == stats:
+            return self._rules[rel_dir]
+
+        parent = self._base_rules if not rel_dir else self._rules.get(
+            rel_dir.rpartition("/")[0], self._base_rules
+        )
+        rules = parent
+        if stats:
+            self._ignore_stats[rel_dir] = stats
+            rules = parent.child(rel_dir, IgnoreFile.load(found[name].path for name, _, _ in stats))
+        else:
+            self._ignore_stats.pop(rel_dir, None)
+
+        self._rules[rel_dir] = rules
+        return rules
+
+    def _stat_ignore_files(self, rel_dir: str) -> tuple:
+        """Current (name, mtime_ns, size) of a directory's ignore files."""
+        abs_dir = self._abs(rel_dir)
+        stats = []
+        for name in IGNORE_FILES:
+            try:
+                st = os.stat(abs_dir / name)
+            except OSError:
+                continue
+            stats.append((name, st.st_mtime_ns, st.st_size))
+        return tuple(stats)
+
+    def _rescan_dir(self, rel_dir: str) -> None:
+        """Re-list a directory whose mtime changed."""
+        _, old_files, old_subdirs = self._dirs[rel_dir]
+        old_rules = self._rules.get(rel_dir)
+        prefix = f"{rel_dir}/" if rel_dir else ""
+
+        for name in old_files:
+            self._files.pop(prefix + name, None)
+        new_subdirs = self._scan_dir(rel_dir)
+
+        if rel_dir not in self._dirs:
+            self._drop_dir(rel_dir)
+            return
+
+        current = self._dirs[rel_dir][2]
+        for name in old_subdirs - current:
+            self._drop_dir(prefix + name)
+
+        # Changed ignore rules apply to the whole subtree
+        rules_changed = self._rules.get(rel_dir) is not old_rules
+        for sub in new_subdirs:
+            if rules_changed:
+                self._drop_dir(sub)
+                self._scan_tree(sub)
+            elif sub.rpartition("/")[2] not in old_subdirs:
+                self._scan_tree(sub)
+
+    def _drop_dir(self, rel_dir: str) -> None:
+        """Forget a directory and everything beneath it."""
+        prefix = f"{rel_dir}/" if rel_dir else ""
+        for d in [d for d in self._dirs if d == rel_dir or d.startswith(prefix)]:
+            del self._dirs[d]
+            self._rules.pop(d, None)
+            self._ignore_stats.pop(d, None)
+        for f in [f for f in self._files if f.startswith(prefix)]:
+            del self._files[f]
+
+    def _restat(self, rel_path: str) -> bool:
+        """Re-stat one file. Returns True if the index changed."""
+        old = self._files.get(rel_path)
+        try:
+            st = os.stat(self._abs(rel_path))
+        except OSError:
+            return self._files.pop(rel_path, None) is not None
+
+        if old and old.size == st.st_size and old.mtime == st.st_mtime:
+            return False
+
+        self._files[rel_path] = FileEntry(
+            path=self._abs(rel_path),
+            rel_path=rel_path,
+            size=st.st_size,
+            mtime=st.st_mtime,
+            language=detect_language(rel_path),
+        )
+        return True
+
+    def _changed(self) -> None:
+        self.generation += 1
+        self._sorted = None
+
+    def _abs(self, rel_path: str) -> Path:
+        return self.root / rel_path if rel_path else self.root
+
+    def _rel(self, path: Path) -> Optional[str]:
+        """Get the index-relative path of a file, or None if outside the root."""
+        try:
+            rel = Path(path).resolve().relative_to(self.root)
+        except ValueError:
+            return None
+        return rel.as_posix()
+
+    # -------------------------------------------------------------------------
+    # Queries
+    # -------------------------------------------------------------------------
+
+    def files(
+        self,
+        under: Optional[Path] = None,
+        extensions: Optional[Iterable[str]] = None,
+        pattern: Optional[str] = None,
+    ) -> list[FileEntry]:
+        """List indexed files in path order.
+
+        Args:
+            under: Only include files beneath this directory.
+            extensions: Only include files with one of these suffixes.
+            pattern: Only include files matching this glob, relative to `under`
+                (or to the root if `under` is not given).
+
+        Returns:
+            Matching FileEntry objects sorted by relative path.
+        """
+        return list(self.iter_files(under, extensions, pattern))
+
+    def iter_files(
+        self,
+        under: Optional[Path] = None,
+        extensions: Optional[Iterable[str]] = None,
+        pattern: Optional[str] = None,
+    ) -> Iterator[FileEntry]:
+        """Lazily yield indexed files in path order (see files()).
+
+        Only the slice of the sorted listing that can match is visited: the
+        `under` directory and any literal directory prefix of the pattern
+        (e.g. 'src/app/' in 'src/app/**/*.ts') are located by binary search.
+        """
+        self.refresh()
+        with self._lock:
+            if self._sorted is None:
+                self._sorted = sorted(self._files.values(), key=lambda e: e.rel_path)
+                self._sorted_keys = [e.rel_path for e in self._sorted]
+            entries = self._sorted
+            keys = self._sorted_keys
+
+        prefix = ""
+        if under is not None:
+            rel_under = self._rel(under)
+            if rel_under is None:
+                return
+            prefix = "" if rel_under == "." else rel_under + "/"
+
+        regex = None
+        scan_prefix = prefix
+        if pattern:
+            regex = compile_glob(pattern)
+            if not regex.flags & re.IGNORECASE:
+                scan_prefix += _literal_dir_prefix(pattern)
+
+        exts = {ext.lower() for ext in extensions} if extensions is not None else None
+        start = len(prefix)
+        for i in range(bisect.bisect_left(keys, scan_prefix), len(keys)):
+            entry = entries[i]
+            if not entry.rel_path.startswith(scan_prefix):
+                return
+            if exts is not None and entry.suffix not in exts:
+                continue
+            if regex is not None and not regex.match(entry.rel_path, start):
+                continue
+            yield entry
+
+    def unindexed_dir(self, under: Path, pattern: str) -> Optional[Path]:
+        """The directory a glob names literally, if it exists but isn't indexed.
+
+        e.g. dist/ for 'dist/*.js', since SKIP_DIRS and ignore files prune
+        it. Callers can list such a directory themselves.
+        """
+        directory = Path(under) / _literal_dir_prefix(pattern)
+        rel_dir = self._rel(directory)
+        if rel_dir is None or not directory.is_dir():
+            return None
+        if rel_dir == ".":
+            rel_dir = ""
+        self.refresh()
+        with self._lock:
+            return None if rel_dir in self._dirs else directory
+
+    def get(self, path: Path) -> Optional[FileEntry]:
+        """Look up a single file."""
+        self.refresh()
+        rel_path = self._rel(path)
+        return self._files.get(rel_path) if rel_path is not None else None
+
+
+_shared_indexes: dict[Path, FileIndex] = {}
+_shared_lock = threading.Lock()
+
+# Ad-hoc indexes (for roots outside any workspace) kept around at once
+MAX_SHARED_INDEXES = 8
+
+
+def shared_index(root: Path) -> FileIndex:
+    """Get a process-wide FileIndex for a root outside any workspace."""
+    root = Path(root).resolve()
+    with _shared_lock:
+        index = _shared_indexes.pop(root, None)
+        if index is None:
+            index = FileIndex(root)
+        _shared_indexes[root] = index  # Re-insert as most recently used
+        while len(_shared_indexes) > MAX_SHARED_INDEXES:
+            del _shared_indexes[next(iter(_shared_indexes))]
+        return index
+
+
+def file_changed(path: Path) -> None:
+    """Report a created or modified file to every shared index covering it."""
+    with _shared_lock:
+        indexes = list(_shared_indexes.values())
+    for index in indexes:
+        index.update(path)
@@ -0,0 +1,160 @@
+"""File transactions - replace the contents of several files all-or-none.
+
+New contents are first staged into temp files next to their targets, so
+nothing in the tree changes while edits are being computed. commit() then
+moves every staged file into place. A failure part-way (or an interrupt)
+rolls the already-replaced files back from hard-linked backups, so the tree
+ends up either fully updated or exactly as it was.
+"""
+
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+
+class TransactionError(Exception):
+    """A transaction could not be committed; no file was changed."""
+
+
+class FileTransaction:
+    """A set of staged file replacements, committed together.
+
+    Usage:
+        with FileTransaction() as txn:
+            txn.stage(path, new_bytes)
+            txn.commit()
+
+    Leaving the block without commit() discards everything staged.
+    """
+
+    def __init__(self):
+        # target -> (staged temp file, expected (mtime_ns, size) or None)
+        self._staged: dict[Path, tuple[Path, Optional[tuple[int, int]]]] = {}
+        self.committed = False
+
+    def __enter__(self) -> "FileTransaction":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.discard()
+
+    def __len__(self) -> int:
+        return len(self._staged)
+
+    def stage(self, path: Path, data: bytes, expected: Optional[tuple[int, int]] = None) -> float:
+        """Write new contents for a file to a temp file beside it.
+
+        Args:
+            path: File to replace.
+            data: Its new contents.
+            expected: (st_mtime_ns, st_size) the file had when `data` was
+                computed. If it differs at commit time, the commit fails.
+
+        Returns:
+            Seconds spent staging.
+        """
+        start = time.perf_counter()
+        path = Path(path)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            try:
+                shutil.copymode(path, tmp)
+            except OSError:
+                pass
+        except BaseException:
+            _unlink(Path(tmp))
+            raise
+
+        previous = self._staged.get(path)
+        if previous:
+            _unlink(previous[0])
+        self._staged[path] = (Path(tmp), expected)
+        return time.perf_counter() - start
+
+    def commit(self) -> dict[Path, float]:
+        """Move every staged file into place, or none of them.
+
+        Returns:
+            Seconds spent replacing each file.
+
+        Raises:
+            TransactionError: If a file changed since it was staged or could
+                not be replaced. The tree is left as it was.
+        """
+        for path, (_, expected) in self._staged.items():
+            if expected is None:
+                continue
+            try:
+                st = os.stat(path)
+            except OSError:
+                raise TransactionError(f"File disappeared: {path}")
+            if (st.st_mtime_ns, st.st_size) != expected:
+                raise TransactionError(f"File changed while editing: {path}")
+
+        backups: dict[Path, Path] = {}
+        replaced: list[Path] = []
+        timings: dict[Path, float] = {}
+        try:
+            for path in self._staged:
+                if path.exists():
+                    backups[path] = _backup(path)
+
+            for path, (tmp, _) in self._staged.items():
+                start = time.perf_counter()
+                os.replace(tmp, path)
+                replaced.append(path)
+                timings[path] = time.perf_counter() - start
+        except BaseException as e:
+            # Roll back: restore originals, remove files that didn't exist
+            for path in reversed(replaced):
+                if path in backups:
+                    try:
+                        os.replace(backups[path], path)
+                    except OSError:
+                        pass
+                else:
+                    _unlink(path)
+            for backup in backups.values():
+                _unlink(backup)
+            if isinstance(e, OSError):
+                raise TransactionError(
+                    f"Could not replace {e.filename or 'file'}: {e.strerror or e}"
+                ) from e
+            raise
+
+        for backup in backups.values():
+            _unlink(backup)
+        self._staged.clear()
+        self.committed = True
+        return timings
+
+    def discard(self) -> None:
+        """Delete every staged file that was not committed."""
+        for tmp, _ in self._staged.values():
+            _unlink(tmp)
+        self._staged.clear()
+
+
+def _backup(path: Path) -> Path:
+    """Keep the current version of a file reachable under a temp name."""
+    fd, backup = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".bak")
+    os.close(fd)
+    backup = Path(backup)
+    try:
+        os.unlink(backup)
+        os.link(path, backup)  # Cheap: the original inode stays untouched
+    except OSError:
+        shutil.copy2(path, backup)
+    return backup
+
+
+def _unlink(path: Path) -> None:
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
@@ -0,0 +1,225 @@
+"""Ignore files - .gitignore/.ignore rules for directory walkers.
+
+Rules follow gitignore semantics: a pattern without a slash matches a name
+at any depth below its file's directory, a pattern with one is anchored to
+that directory, a trailing slash matches only directories, '!' re-includes,
+and the last matching pattern wins. Files deeper in the tree override their
+parents. `.ignore` files use the same syntax and take precedence over a
+`.gitignore` in the same directory.
+
+Walkers evaluate rules on every entry before descending, so an ignored
+directory is never listed at all.
+"""
+
+import os
+import re
+from pathlib import Path
+from typing import Iterable, Optional
+
+
+# Ignore files read in every directory, lowest precedence first
+IGNORE_FILES = (".gitignore", ".ignore")
+
+
+def _translate(pattern: str) -> str:
+    """Translate one gitignore glob into a regex over '/'-separated paths."""
+    i, n = 0, len(pattern)
+    out = []
+    while i < n:
+        c = pattern[i]
+        at_segment_start = i == 0 or pattern[i - 1] == "/"
+        if at_segment_start and pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif at_segment_start and pattern.startswith("**", i) and i + 2 == n:
+            out.append(".*")
+            i += 2
+        elif c == "*":
+            out.append("[^/]*")
+            while i < n and pattern[i] == "*":
+                i += 1
+        elif c == "?":
+            out.append("[^/]")
+            i += 1
+        elif c == "[":
+            j = pattern.find("]", i + 2)
+            if j == -1:
+                out.append(re.escape(c))
+                i += 1
+            else:
+                body = pattern[i + 1:j].replace("\\", "\\\\")
+                if body[:1] in ("!", "^"):
+                    body = "^" + body[1:]
+                out.append(f"[{body}]")
+                i = j + 1
+        elif c == "\\" and i + 1 < n:
+            out.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            out.append(re.escape(c))
+            i += 1
+    return "".join(out)
+
+
+class IgnoreFile:
+    """The patterns of one directory's ignore files."""
+
+    def __init__(self, lines: Iterable[str]):
+        """Parse ignore file lines.
+
+        Args:
+            lines: Lines in gitignore syntax.
+        """
+        flags = re.IGNORECASE if os.name == "nt" else 0
+        # (regex, negated, directories only), in file order
+        self.rules: list[tuple[re.Pattern, bool, bool]] = []
+        for line in lines:
+            rule = self._parse(line)
+            if rule is not None:
+                self.rules.append((re.compile(rule[0], flags), rule[1], rule[2]))
+
+        # One pass rejects paths no rule can match
+        self._any = re.compile(
+            "|".join(f"(?:{regex.pattern})" for regex, _, _ in self.rules), flags
+        ) if self.rules else None
+
+    def __bool__(self) -> bool:
+        return bool(self.rules)
+
+    @staticmethod
+    def _parse(line: str) -> Optional[tuple[str, bool, bool]]:
+        """Parse one line into (regex source, negated, directories only)."""
+        line = line.rstrip("\r\n")
+        if not line or line.startswith("#"):
+            return None
+
+        # Trailing spaces are dropped unless escaped
+        stripped = line.rstrip(" ")
+        if stripped.endswith("\\") and len(stripped) < len(line):
+            stripped += " "
+
+        negated = stripped.startswith("!")
+        if negated:
+            stripped = stripped[1:]
+
+        dir_only = stripped.endswith("/") and not stripped.endswith("\\/")
+        if dir_only:
+            stripped = stripped[:-1]
+        if not stripped:
+            return None
+
+        anchored = "/" in stripped
+        regex = _translate(stripped.lstrip("/"))
+        if not anchored:
+            regex = "(?:.*/)?" + regex
+        return regex + r"\Z", negated, dir_only
+
+    @classmethod
+    def load(cls, paths: Iterable[Path]) -> Optional["IgnoreFile"]:
+        """Read and combine ignore files (later files take precedence).
+
+        Returns:
+            The combined rules, or None if no file exists or none has rules.
+        """
+        lines: list[str] = []
+        for path in paths:
+            try:
+                lines.extend(Path(path).read_text(encoding="utf-8", errors="ignore").splitlines())
+            except OSError:
+                continue
+        ignore_file = cls(lines)
+        return ignore_file if ignore_file else None
+
+    def match(self, rel_path: str, is_dir: bool) -> Optional[bool]:
+        """Match a path relative to this file's directory.
+
+        Returns:
+            True if ignored, False if explicitly re-included, None if no
+            pattern applies.
+        """
+        if self._any is None or not self._any.match(rel_path):
+            return None
+        for regex, negated, dir_only in reversed(self.rules):
+            if dir_only and not is_dir:
+                continue
+            if regex.match(rel_path):
+                return not negated
+        return None
+
+
+class IgnoreRules:
+    """The ignore files in effect for one directory of a walk.
+
+    Rules are immutable; descending into a directory with its own ignore
+    file creates a new IgnoreRules via child().
+    """
+
+    def __init__(self, files: tuple = (), prefix: str = ""):
+        """Initialize the rules.
+
+        Args:
+            files: (base, IgnoreFile) pairs, outermost first. `base` is the
+                file's directory relative to the repository top, with a
+                trailing '/' ('' for the top itself).
+            prefix: The walk root relative to the repository top, with a
+                trailing '/' ('' if the walk starts at the top).
+        """
+        self._files = files
+        self._prefix = prefix
+
+    @classmethod
+    def for_root(cls, root: Path) -> "IgnoreRules":
+        """Get the rules inherited by a walk root from the directories above it.
+
+        Inside a git repository these are .git/info/exclude and the ignore
+        files of every directory from the repository top down to the root's
+        parent. The root's own ignore files are not included.
+        """
+        root = Path(root).resolve()
+        top = root
+        while not (top / ".git").exists():
+            if top.parent == top:
+                return cls()
+            top = top.parent
+
+        files = []
+        exclude = IgnoreFile.load([top / ".git" / "info" / "exclude"])
+        if exclude:
+            files.append(("", exclude))
+
+        rel_root = root.relative_to(top).as_posix()
+        prefix = "" if rel_root == "." else rel_root + "/"
+        if prefix:
+            base = ""
+            directory = top
+            for part in rel_root.split("/"):
+                ignore_file = IgnoreFile.load(directory / name for name in IGNORE_FILES)
+                if ignore_file:
+                    files.append((base, ignore_file))
+                base += part + "/"
+                directory = directory / part
+
+        return cls(tuple(files), prefix)
+
+    def child(self, rel_dir: str, ignore_file: Optional[IgnoreFile]) -> "IgnoreRules":
+        """Get the rules for a subdirectory with the given ignore file.
+
+        Args:
+            rel_dir: The subdirectory, relative to the walk root ('' for the root).
+            ignore_file: Its ignore file, if any.
+        """
+        if not ignore_file:
+            return self
+        base = self._prefix + (rel_dir + "/" if rel_dir else "")
+        return IgnoreRules(self._files + ((base, ignore_file),), self._prefix)
+
+    def ignored(self, rel_path: str, is_dir: bool) -> bool:
+        """Check whether a path (relative to the walk root) is ignored."""
+        if not self._files:
+            return False
+        path = self._prefix + rel_path
+        for base, ignore_file in reversed(self._files):
+            result = ignore_file.match(path[len(base):], is_dir)
+            if result is not None:
+                return result
+        return False
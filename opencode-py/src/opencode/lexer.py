@@ -0,0 +1,172 @@
+"""Lexer - find where a name is used as code rather than inside comments or strings.
+
+find_references and rename_symbol need identifier occurrences only. Python
+source is tokenized with the standard `tokenize` module (names inside
+f-string replacement fields count as code). Everything else goes through a
+small regex state machine per language: one compiled alternation that
+consumes comments and string literals whole, so a match of the name itself
+can only ever start in code.
+"""
+
+import io
+import re
+import tokenize
+from functools import lru_cache
+from typing import Iterator, Optional
+
+
+# Regions that are not code, per language
+_SLASH_COMMENTS = (r"//[^\n]*", r"/\*[\s\S]*?(?:\*/|\Z)")
+_LINE_STRINGS = (r'"(?:\\[\s\S]|[^"\\\n])*"?', r"'(?:\\[\s\S]|[^'\\\n])*'?")
+_MULTILINE_STRINGS = (r'"(?:\\[\s\S]|[^"\\])*"?', r"'(?:\\[\s\S]|[^'\\])*'?")
+_PYTHON_STRINGS = (
+    r'(?i:[rbuf]{0,2})"""[\s\S]*?(?:"""|\Z)',
+    r"(?i:[rbuf]{0,2})'''[\s\S]*?(?:'''|\Z)",
+) + _LINE_STRINGS
+
+_SKIP_PATTERNS = {
+    "python": (r"#[^\n]*",) + _PYTHON_STRINGS,
+    "c": _SLASH_COMMENTS + _LINE_STRINGS,
+    "cpp": _SLASH_COMMENTS + (
+        r'R"(?P<raw_delim>[^(\s]*)\([\s\S]*?\)(?P=raw_delim)"',
+    ) + _LINE_STRINGS,
+    "java": _SLASH_COMMENTS + (r'"""[\s\S]*?(?:"""|\Z)',) + _LINE_STRINGS,
+    "javascript": _SLASH_COMMENTS + _LINE_STRINGS,
+    "typescript": _SLASH_COMMENTS + _LINE_STRINGS,
+    "go": _SLASH_COMMENTS + (r"`[^`]*`?",) + _LINE_STRINGS,
+    # Only one-character literals are chars; any other quote starts a lifetime
+    "rust": _SLASH_COMMENTS + (
+        r'r(?P<hashes>#*)"[\s\S]*?(?:"(?P=hashes)|\Z)',
+        r'"(?:\\[\s\S]|[^"\\])*"?',
+        r"'(?:\\(?:u\{[0-9a-fA-F]+\}|x[0-9a-fA-F]{2}|.)|[^'\\\n])'",
+    ),
+    "ruby": (r"#[^\n]*", r"^=begin\b[\s\S]*?(?:^=end\b[^\n]*|\Z)") + _MULTILINE_STRINGS,
+    "php": _SLASH_COMMENTS + (r"#[^\n]*",) + _MULTILINE_STRINGS,
+}
+
+# Template literals are strings, except for the code in their ${...} fields
+_TEMPLATE_LANGUAGES = {"javascript", "typescript"}
+_TEMPLATE = r"`(?:\\[\s\S]|\$\{[^}]*\}?|[^`\\])*`?"
+_TEMPLATE_FIELD = re.compile(r"\$\{([^}]*)\}?")
+
+
+def supports(language: Optional[str]) -> bool:
+    """Check whether a language has a lexer."""
+    return language in _SKIP_PATTERNS
+
+
+def code_occurrences(content: str, name: str, language: Optional[str]) -> Optional[list[int]]:
+    """Find where a name appears as code.
+
+    Args:
+        content: Source text.
+        name: The symbol to look for (matched as a whole word).
+        language: Language of the source (see file_index.detect_language).
+
+    Returns:
+        Sorted start offsets of every occurrence outside comments and string
+        literals, or None if the language has no lexer.
+    """
+    if language not in _SKIP_PATTERNS:
+        return None
+    if language == "python" and name.isidentifier():
+        try:
+            return _python_occurrences(content, name)
+        except (tokenize.TokenError, SyntaxError):
+            pass  # Incomplete source - fall back to the regex lexer
+
+    offsets = []
+    for m in _scanner(language, name).finditer(content):
+        if m.lastgroup == "hit":
+            offsets.append(m.start())
+        elif m.lastgroup == "template":
+            for field in _TEMPLATE_FIELD.finditer(m.group()):
+                base = m.start() + field.start(1)
+                offsets.extend(base + hit.start() for hit in _word(name).finditer(field.group(1)))
+    return offsets
+
+
+def group_by_line(content: str, offsets: list[int]) -> Iterator[tuple[int, int, int, list[int]]]:
+    """Group sorted offsets by the line they fall on.
+
+    Lines are separated by '\\n' only (a trailing '\\r' is left out of the line).
+
+    Yields:
+        (line number, line start, line end, offsets on that line).
+    """
+    line_num = 1
+    pos = 0
+    i = 0
+    while i < len(offsets):
+        offset = offsets[i]
+        line_num += content.count("\n", pos, offset)
+        start = content.rfind("\n", 0, offset) + 1
+        end = content.find("\n", offset)
+        if end == -1:
+            end = len(content)
+        on_line = []
+        while i < len(offsets) and offsets[i] < end:
+            on_line.append(offsets[i])
+            i += 1
+        yield line_num, start, end - (content[end - 1:end] == "\r"), on_line
+        pos = start
+
+
+@lru_cache(maxsize=64)
+def _word(name: str) -> re.Pattern:
+    return re.compile(r"\b" + re.escape(name) + r"\b")
+
+
+@lru_cache(maxsize=64)
+def _scanner(language: str, name: str) -> re.Pattern:
+    """Compile the lexer for one language and name."""
+    parts = [f"(?P<skip>{'|'.join(_SKIP_PATTERNS[language])})"]
+    if language in _TEMPLATE_LANGUAGES:
+        parts.append(f"(?P<template>{_TEMPLATE})")
+    parts.append(r"(?P<hit>\b" + re.escape(name) + r"\b)")
+    return re.compile("|".join(parts), re.MULTILINE)
+
+
+def _python_occurrences(content: str, name: str) -> list[int]:
+    """Find a name among Python NAME tokens (and f-string fields)."""
+    line_starts = [0]
+    pos = content.find("\n")
+    while pos != -1:
+        line_starts.append(pos + 1)
+        pos = content.find("\n", pos + 1)
+
+    offsets = []
+    for tok in tokenize.generate_tokens(io.StringIO(content).readline):
+        if tok.type == tokenize.NAME:
+            if tok.string == name:
+                offsets.append(line_starts[tok.start[0] - 1] + tok.start[1])
+        elif tok.type == tokenize.STRING and name in tok.string:
+            # Before Python 3.12, f-strings are a single STRING token
+            prefix = tok.string[:len(tok.string) - len(tok.string.lstrip("rRbBuUfF"))]
+            if "f" in prefix.lower():
+                base = line_starts[tok.start[0] - 1] + tok.start[1]
+                offsets.extend(base + i for i in _fstring_fields(tok.string, name))
+    offsets.sort()
+    return offsets
+
+
+def _fstring_fields(literal: str, name: str) -> Iterator[int]:
+    """Offsets of a name inside the {...} replacement fields of an f-string."""
+    depth = 0
+    field_start = 0
+    i = 0
+    while i < len(literal):
+        c = literal[i]
+        if c in "{}" and depth == 0 and literal[i + 1:i + 2] == c:
+            i += 2  # '{{' / '}}' escapes
+            continue
+        if c == "{":
+            if depth == 0:
+                field_start = i + 1
+            depth += 1
+        elif c == "}" and depth:
+            depth -= 1
+            if depth == 0:
+                for hit in _word(name).finditer(literal, field_start, i):
+                    yield hit.start()
+        i += 1
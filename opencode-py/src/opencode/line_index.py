@@ -0,0 +1,200 @@
+"""Line-offset index - windows of large text files without reading them whole.
+
+ReadTool serves line ranges, previews and tails of big files (logs,
+generated code, data dumps) through this module. One pass over an mmap
+of the file counts the newlines of each BLOCK_SIZE block and records
+where the first line after the block starts; reading lines START-END
+then seeks to the nearest recorded line before START and scans forward
+less than one block. Only the requested window is decoded.
+
+Indexes are cached by (path, mtime, size), so repeat reads of a file
+only stat it; changed files are re-indexed transparently.
+"""
+
+import mmap
+import os
+import threading
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+
+# Bytes counted per checkpoint (a window read scans at most this far)
+BLOCK_SIZE = 64 * 1024
+
+MAX_CACHED_INDEXES = 64
+
+
+@dataclass
+class LineIndex:
+    """Line count and line-start checkpoints of one file version."""
+    mtime_ns: int
+    size: int
+    line_count: int
+    lines: array  # Line numbers (0-based) with a recorded start ...
+    offsets: array  # ... and the byte offsets where they start
+
+    def seek(self, data, line: int) -> int:
+        """Byte offset where a line (0-based) starts in the file's data."""
+        i = bisect_right(self.lines, line) - 1
+        pos = self.offsets[i]
+        for _ in range(line - self.lines[i]):
+            newline = data.find(b"\n", pos)
+            if newline < 0:
+                return len(data)  # Past an unterminated last line
+            pos = newline + 1
+        return pos
+
+
+def _open(path: Path):
+    """(mmap or b"" for empty files, stat) of a file; the caller closes the mmap."""
+    with open(path, "rb") as f:
+        st = os.fstat(f.fileno())
+        if st.st_size == 0:
+            return b"", st
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ), st
+
+
+def _close(data) -> None:
+    if isinstance(data, mmap.mmap):
+        data.close()
+
+
+def build_index(data, mtime_ns: int = 0) -> LineIndex:
+    """Index the lines of a file's data (bytes or mmap)."""
+    size = len(data)
+    lines, offsets = array("q", [0]), array("q", [0])
+    newlines = 0
+    for start in range(0, size, BLOCK_SIZE):
+        block = data[start:start + BLOCK_SIZE]
+        count = block.count(b"\n")
+        if count:
+            newlines += count
+            lines.append(newlines)
+            offsets.append(start + block.rfind(b"\n") + 1)
+    # A last line without a trailing newline still counts
+    unterminated = size > 0 and data[size - 1:size] != b"\n"
+    return LineIndex(mtime_ns, size, newlines + unterminated, lines, offsets)
+
+
+def _decode(data: bytes) -> list[str]:
+    """Split raw lines (without the final newline) into text lines."""
+    text = data.decode("utf-8", errors="replace")
+    return [line[:-1] if line.endswith("\r") else line for line in text.split("\n")]
+
+
+class LineIndexCache:
+    """Cache of line indexes keyed by (path, mtime, size)."""
+
+    def __init__(self, max_files: int = MAX_CACHED_INDEXES):
+        self.max_files = max_files
+        self._files: OrderedDict[str, LineIndex] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    def _cached(self, key: str, st: os.stat_result) -> Optional[LineIndex]:
+        with self._lock:
+            index = self._files.get(key)
+            if index and index.mtime_ns == st.st_mtime_ns and index.size == st.st_size:
+                self._files.move_to_end(key)
+                return index
+        return None
+
+    def _index(self, path: Path, data, st: os.stat_result) -> LineIndex:
+        """The file's index, built from its open data if new or changed."""
+        key = str(path)
+        index = self._cached(key, st)
+        if index is None:
+            index = build_index(data, st.st_mtime_ns)
+            with self._lock:
+                self._files[key] = index
+                self._files.move_to_end(key)
+                while len(self._files) > self.max_files:
+                    self._files.popitem(last=False)
+        return index
+
+    def get(self, path: Path) -> LineIndex:
+        """Get the index of a file, building it if new or changed.
+
+        Raises:
+            OSError: If the file can't be read.
+        """
+        data, st = _open(path)
+        try:
+            return self._index(path, data, st)
+        finally:
+            _close(data)
+
+    def read_lines(self, path: Path, start: int, end: int) -> tuple[list[str], int]:
+        """Read lines start..end-1 (0-based, clamped to the file).
+
+        Returns:
+            (lines, total line count of the file)
+
+        Raises:
+            OSError: If the file can't be read.
+        """
+        data, st = _open(path)
+        try:
+            index = self._index(path, data, st)
+            start, end = max(0, start), min(end, index.line_count)
+            if start >= end:
+                return [], index.line_count
+            first = index.seek(data, start)
+            last = index.seek(data, end)
+            window = data[first:last]
+            if window.endswith(b"\n"):
+                window = window[:-1]
+            return _decode(window), index.line_count
+        finally:
+            _close(data)
+
+    def tail(self, path: Path, count: int) -> tuple[list[str], Optional[int]]:
+        """Read the last `count` lines, scanning backwards from the end.
+
+        Only the tail is read. The total line count is known only if the
+        file's index is cached and current; no index is built, since files
+        read by their tail are usually logs that keep growing.
+
+        Returns:
+            (lines, total line count of the file or None if unknown)
+
+        Raises:
+            OSError: If the file can't be read.
+        """
+        data, st = _open(path)
+        try:
+            size = len(data)
+            if size == 0:
+                return [], 0
+            index = self._cached(str(path), st)
+            total = index.line_count if index else None
+            if count <= 0:
+                return [], total
+            end = size - 1 if data[size - 1:size] == b"\n" else size
+            pos = end
+            for _ in range(count):
+                pos = data.rfind(b"\n", 0, pos)
+                if pos < 0:
+                    break
+            return _decode(data[pos + 1:end]), total
+        finally:
+            _close(data)
+
+    def clear(self) -> None:
+        """Forget all cached indexes."""
+        with self._lock:
+            self._files.clear()
+
+
+_cache = LineIndexCache()
+
+
+def line_index() -> LineIndexCache:
+    """Get the process-wide line index cache."""
+    return _cache
@@ -3,6 +3,8 @@
 Provides:
 - LLMProvider base class
 - AnthropicProvider implementation
+- RouterProvider for spreading requests over several providers
+- CachingProvider for recording and replaying responses
 - MockLLMProvider for testing
 - PlanParser for extracting structured plans
 - LLMError classes for structured error handling
@@ -22,9 +24,13 @@ from opencode.llm.base import (
     ModelError,
     ContextLengthError,
     ResponseParseError,
+    ServerError,
+    CircuitOpenError,
 )
 from opencode.llm.anthropic import AnthropicProvider
 from opencode.llm.openai import OpenAIProvider, CustomLLMProvider
+from opencode.llm.router import RouterProvider
+from opencode.llm.cache import CachingProvider
 from opencode.llm.parser import PlanParser, format_plan_prompt
 
 __all__ = [
@@ -38,6 +44,8 @@ __all__ = [
     "AnthropicProvider",
     "OpenAIProvider",
     "CustomLLMProvider",
+    "RouterProvider",
+    "CachingProvider",
     # Errors
     "LLMError",
     "APIKeyError",
@@ -46,6 +54,8 @@ __all__ = [
     "ModelError",
     "ContextLengthError",
     "ResponseParseError",
+    "ServerError",
+    "CircuitOpenError",
     # Parser
     "PlanParser",
     "format_plan_prompt",
@@ -0,0 +1,115 @@
+"""Async support for LLM providers.
+
+All async requests run on one long-lived event loop in a background
+thread. Keeping a single loop alive is what makes connection reuse work:
+the SDKs' async clients sit on a shared httpx connection pool, and a pool
+(like every asyncio object) belongs to the loop that created it.
+
+run_cancellable() is the bridge for synchronous callers. It waits for a
+coroutine on that loop and, on Ctrl+C, cancels the task. Cancelling closes
+the HTTP response, which stops the request (and its billing) on the server
+side, and no worker thread is left behind still waiting on the network.
+"""
+
+import asyncio
+import concurrent.futures
+import threading
+import weakref
+from typing import Any, Callable, Coroutine
+
+
+# Connection pool limits for the shared async HTTP client
+MAX_CONNECTIONS = 100
+MAX_KEEPALIVE_CONNECTIONS = 20
+KEEPALIVE_SECONDS = 120.0
+
+# How long a cancelled request gets to unwind (close its connection)
+CANCEL_TIMEOUT = 2.0
+
+# How often a waiting caller wakes up to notice Ctrl+C
+POLL_INTERVAL = 0.1
+
+
+class EventLoopThread:
+    """An asyncio event loop running forever in a daemon thread."""
+
+    def __init__(self):
+        self._loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """The loop, started on first use."""
+        with self._lock:
+            if self._loop is None or self._loop.is_closed() or not self._thread.is_alive():
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever, name="opencode-llm-loop", daemon=True
+                )
+                self._thread.start()
+            return self._loop
+
+    def submit(self, coro: Coroutine) -> concurrent.futures.Future:
+        """Schedule a coroutine on the loop."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+
+_loop_thread = EventLoopThread()
+
+# Shared HTTP clients: event loop -> {SSL setting: httpx.AsyncClient}
+_http_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict]" = weakref.WeakKeyDictionary()
+
+
+def shared_http_client(verify: bool | str = True):
+    """Keep-alive HTTP connection pool for the running event loop.
+
+    One pool per loop and SSL setting, shared by every provider instance,
+    so concurrent sessions in one process reuse connections.
+
+    Args:
+        verify: SSL verification (True, False, or path to CA bundle).
+    """
+    import httpx
+
+    loop = asyncio.get_running_loop()
+    clients = _http_clients.setdefault(loop, {})
+    client = clients.get(verify)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            verify=verify,
+            limits=httpx.Limits(
+                max_connections=MAX_CONNECTIONS,
+                max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=KEEPALIVE_SECONDS,
+            ),
+        )
+        clients[verify] = client
+    return client
+
+
+def run_cancellable(fn: Callable[..., Coroutine], *args, **kwargs) -> Any:
+    """Run a coroutine function on the shared loop and wait for its result.
+
+    Raises:
+        KeyboardInterrupt: On Ctrl+C, after cancelling the coroutine (and
+            giving it CANCEL_TIMEOUT seconds to close its request).
+    """
+    finished = threading.Event()
+
+    async def guarded():
+        try:
+            return await fn(*args, **kwargs)
+        finally:
+            finished.set()
+
+    future = _loop_thread.submit(guarded())
+    while True:
+        try:
+            return future.result(timeout=POLL_INTERVAL)
+        except concurrent.futures.TimeoutError:
+            continue
+        except KeyboardInterrupt:
+            future.cancel()
+            finished.wait(CANCEL_TIMEOUT)
+            raise
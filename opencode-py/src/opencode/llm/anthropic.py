@@ -1,35 +1,42 @@
 """Anthropic Claude implementation."""
 
+import asyncio
+import importlib.util
 import json
 import sys
+import weakref
 from typing import Optional, Generator
 
+from opencode.llm.aio import shared_http_client
 from opencode.llm.base import (
-    LLMProvider, LLMResponse, Message, ToolCall, ToolResult,
-    LLMError, APIKeyError, ConnectionError, RateLimitError,
+    LLMProvider, LLMResponse, Message, ToolCall, ToolResult, ConversationBuffer,
+    measured, mark_first_token,
+    LLMError, APIKeyError, ConnectionError, RateLimitError, ServerError,
     ModelError, ContextLengthError, ResponseParseError
 )
+from opencode.llm.resilience import is_transport_error, retry_after_seconds
 
-try:
-    import anthropic
-    HAS_ANTHROPIC = True
-except ImportError:
-    HAS_ANTHROPIC = False
+# The SDK takes a large share of startup time to import, so it is only
+# imported by the code that uses it
+HAS_ANTHROPIC = importlib.util.find_spec("anthropic") is not None
 
 
 def _parse_anthropic_error(e: Exception, model: str = "") -> LLMError:
     """Convert Anthropic exceptions to structured LLMError."""
     error_str = str(e).lower()
 
+    # SDK errors can only come from an SDK that was imported
+    anthropic = sys.modules.get("anthropic")
+    if anthropic is None:
+        if is_transport_error(e):
+            return ConnectionError("Anthropic", str(e))
+        return LLMError(str(e), "Anthropic")
+
     if isinstance(e, anthropic.AuthenticationError):
         return APIKeyError("Anthropic")
 
     if isinstance(e, anthropic.RateLimitError):
-        # Try to extract retry-after
-        retry_after = 0
-        if hasattr(e, 'response') and e.response:
-            retry_after = int(e.response.headers.get('retry-after', 0))
-        return RateLimitError("Anthropic", retry_after)
+        return RateLimitError("Anthropic", retry_after_seconds(getattr(e, "response", None)))
 
     if isinstance(e, anthropic.NotFoundError):
         return ModelError("Anthropic", model)
@@ -42,21 +49,210 @@ def _parse_anthropic_error(e: Exception, model: str = "") -> LLMError:
     if isinstance(e, anthropic.APIConnectionError):
         return ConnectionError("Anthropic", str(e))
 
+    if isinstance(e, anthropic.APIStatusError):
+        # 5xx and 529 overloaded; an error event in a stream arrives on a 200 response
+        if e.status_code >= 500 or "overloaded" in error_str:
+            return ServerError("Anthropic", str(e), retry_after_seconds(getattr(e, "response", None)))
+
     if isinstance(e, anthropic.APIError):
         return LLMError(str(e), "Anthropic")
 
+    if is_transport_error(e):
+        return ConnectionError("Anthropic", str(e))
+
     return LLMError(str(e), "Anthropic")
 
 
+def _anthropic_message(msg: Message) -> list[dict]:
+    """Convert a history message to Anthropic format."""
+    if msg.role == "system":
+        return []  # System messages go in the system parameter
+    return [{"role": msg.role, "content": msg.content}]
+
+
+def _anthropic_round(rnd: dict) -> list[dict]:
+    """Convert a tool round to an assistant tool_use turn and a user tool_result turn."""
+    assistant_content_blocks = []
+    if rnd.get("content", ""):
+        assistant_content_blocks.append({
+            "type": "text",
+            "text": rnd["content"]
+        })
+    for tc in rnd.get("tool_calls", []):
+        assistant_content_blocks.append({
+            "type": "tool_use",
+            "id": tc.id,
+            "name": tc.name,
+            "input": tc.arguments
+        })
+
+    tool_result_content = []
+    for result in rnd.get("results", []):
+        tool_result_content.append({
+            "type": "tool_result",
+            "tool_use_id": result.tool_id,
+            "content": result.content,
+            "is_error": result.is_error
+        })
+    return [
+        {"role": "assistant", "content": assistant_content_blocks},
+        {"role": "user", "content": tool_result_content},
+    ]
+
+
+# Prompt caching. A request may carry at most 4 cache_control breakpoints:
+# one on the tool definitions, one on the system prompt and the rest on
+# the conversation history.
+CACHE_CONTROL = {"type": "ephemeral"}
+HISTORY_BREAKPOINTS = 2
+
+
+def _with_history_breakpoints(messages: list[dict]) -> list[dict]:
+    """Mark the last block of the latest user turns as cache breakpoints.
+
+    The newest user turn caches the whole conversation for the next
+    request; the one before it is where the previous request ended, so
+    its prefix is read back from the cache. Only the marked messages are
+    copied - the caller's messages and content blocks are left untouched.
+    """
+    marked = list(messages)
+    remaining = HISTORY_BREAKPOINTS
+    for i in range(len(marked) - 1, -1, -1):
+        if remaining == 0:
+            break
+        msg = marked[i]
+        if msg.get("role") != "user":
+            continue
+
+        content = msg.get("content")
+        if isinstance(content, str):
+            if not content:
+                continue
+            blocks = [{"type": "text", "text": content}]
+        elif isinstance(content, list) and content and isinstance(content[-1], dict):
+            blocks = list(content)
+        else:
+            continue
+        blocks[-1] = {**blocks[-1], "cache_control": CACHE_CONTROL}
+        marked[i] = {**msg, "content": blocks}
+        remaining -= 1
+    return marked
+
+
+def _token_usage(usage) -> dict:
+    """Token counts from an Anthropic usage block (LLMResponse fields)."""
+    counts = {}
+    for field, attr in (
+        ("input_tokens", "input_tokens"),
+        ("output_tokens", "output_tokens"),
+        ("cache_read_tokens", "cache_read_input_tokens"),
+        ("cache_write_tokens", "cache_creation_input_tokens"),
+    ):
+        value = getattr(usage, attr, None)
+        counts[field] = value if isinstance(value, int) else 0
+    return counts
+
+
+class _StreamCollector:
+    """Builds an LLMResponse from streamed message events.
+
+    Text is echoed to stdout as it arrives, and each tool call is reported
+    to the provider's tool_call_listener as soon as its block ends.
+    """
+
+    def __init__(self, provider: LLMProvider):
+        self.provider = provider
+        self.content = []
+        self.tool_calls = []
+        self._tool_id = None
+        self._tool_name = None
+        self._tool_input = ""
+
+    def feed(self, event) -> None:
+        """Process one stream event."""
+        if event.type in ("content_block_start", "content_block_delta"):
+            mark_first_token()
+
+        if event.type == "content_block_start":
+            if getattr(event.content_block, "type", None) == "tool_use":
+                self._tool_id = event.content_block.id
+                self._tool_name = event.content_block.name
+                self._tool_input = ""
+
+        elif event.type == "content_block_delta":
+            if hasattr(event.delta, "text"):
+                # Text content - print immediately
+                sys.stdout.write(event.delta.text)
+                sys.stdout.flush()
+                self.content.append(event.delta.text)
+            elif hasattr(event.delta, "partial_json"):
+                # Tool input JSON accumulating
+                self._tool_input += event.delta.partial_json
+
+        elif event.type == "content_block_stop":
+            if self._tool_id:
+                try:
+                    args = json.loads(self._tool_input) if self._tool_input else {}
+                except json.JSONDecodeError:
+                    args = {}
+                self.tool_calls.append(ToolCall(
+                    id=self._tool_id,
+                    name=self._tool_name,
+                    arguments=args
+                ))
+                self.provider._notify_tool_call(self.tool_calls[-1], len(self.tool_calls) - 1)
+                self._tool_id = None
+                self._tool_name = None
+                self._tool_input = ""
+
+    def resume_kwargs(self, kwargs: dict) -> dict:
+        """Request arguments for the next attempt after a stream dropped.
+
+        Text received so far goes back as the start of the assistant turn
+        and the model continues after it. A response that already had tool
+        calls can't be continued that way and is requested from the start.
+        """
+        if self.tool_calls or self._tool_id:
+            print("\n[Connection lost - restarting response]")
+            self.content = []
+            self.tool_calls = []
+            self._tool_id = None
+            self._tool_name = None
+            self._tool_input = ""
+            return kwargs
+
+        # Prefilled assistant content must not end with whitespace
+        partial = "".join(self.content).rstrip()
+        if not partial:
+            return kwargs
+        return {**kwargs, "messages": [*kwargs["messages"], {"role": "assistant", "content": partial}]}
+
+    def response(self, final_message) -> LLMResponse:
+        """The complete response, once the stream has ended."""
+        # Print newline after streaming content
+        if self.content:
+            print()
+        return LLMResponse(
+            content="".join(self.content),
+            tool_calls=self.tool_calls,
+            stop_reason=final_message.stop_reason or "end_turn",
+            **_token_usage(getattr(final_message, "usage", None))
+        )
+
+
 class AnthropicProvider(LLMProvider):
     """Anthropic Claude LLM provider."""
 
+    native_async = True
+    provider_name = "Anthropic"
+
     def __init__(
         self,
         api_key: str,
         model: str = "claude-sonnet-4-20250514",
         debug: bool = False,
         ssl_verify: bool | str = True,
+        prompt_caching: bool = True,
     ):
         """Initialize the Anthropic provider.
 
@@ -65,17 +261,23 @@ class AnthropicProvider(LLMProvider):
             model: Model to use (default: claude-sonnet-4-20250514).
             debug: Enable debug logging.
             ssl_verify: SSL verification (True, False, or path to CA bundle).
+            prompt_caching: Add cache breakpoints to the system prompt, tools
+                and history so repeated prefixes are read from the cache.
         """
         self.api_key = api_key
         self.model = model
         self.debug = debug
         self.ssl_verify = ssl_verify
+        self.prompt_caching = prompt_caching
         self._client = None
+        self._async_clients = weakref.WeakKeyDictionary()  # Event loop -> client
+        self._conversation = ConversationBuffer(_anthropic_message, _anthropic_round)
 
     @property
     def client(self):
         """Lazy-load the Anthropic client."""
         if self._client is None and HAS_ANTHROPIC and self.api_key:
+            import anthropic
             import httpx
 
             # Configure SSL
@@ -86,19 +288,80 @@ class AnthropicProvider(LLMProvider):
             else:
                 http_client = None  # Use default
 
+            # Retries are done by _retry_with_backoff, not the SDK
             if http_client:
                 self._client = anthropic.Anthropic(
                     api_key=self.api_key,
-                    http_client=http_client
+                    http_client=http_client,
+                    max_retries=0
                 )
             else:
-                self._client = anthropic.Anthropic(api_key=self.api_key)
+                self._client = anthropic.Anthropic(api_key=self.api_key, max_retries=0)
         return self._client
 
+    @property
+    def async_client(self):
+        """Async client for the running event loop, on its shared connection pool."""
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            import anthropic
+
+            client = anthropic.AsyncAnthropic(
+                api_key=self.api_key,
+                http_client=shared_http_client(self.ssl_verify),
+                max_retries=0
+            )
+            self._async_clients[loop] = client
+        return client
+
     def is_available(self) -> bool:
         """Check if Anthropic is available."""
         return HAS_ANTHROPIC and bool(self.api_key)
 
+    def _convert_error(self, e: Exception) -> LLMError:
+        """Map Anthropic SDK errors for the retry loop."""
+        if isinstance(e, LLMError):
+            return e
+        return _parse_anthropic_error(e, self.model)
+
+    def _request_kwargs(
+        self,
+        anthropic_messages: list[dict],
+        tools: list[dict] = None,
+        system: str = None,
+    ) -> dict:
+        """Build the messages.create/stream arguments.
+
+        With prompt caching on, the last tool definition, the system prompt
+        and the latest user turns become cache breakpoints. Tools are
+        rendered before the system prompt, so in a tool loop every
+        continuation reads tools, system prompt and all earlier rounds from
+        the cache and only pays full price for the newest round.
+        """
+        kwargs = {
+            "model": self.model,
+            "max_tokens": 4096,
+            "messages": anthropic_messages,
+        }
+
+        if system:
+            kwargs["system"] = system
+
+        if tools:
+            kwargs["tools"] = tools
+
+        if not self.prompt_caching:
+            return kwargs
+
+        if tools:
+            kwargs["tools"] = tools[:-1] + [{**tools[-1], "cache_control": CACHE_CONTROL}]
+        if system:
+            kwargs["system"] = [{"type": "text", "text": system, "cache_control": CACHE_CONTROL}]
+        kwargs["messages"] = _with_history_breakpoints(anthropic_messages)
+        return kwargs
+
+    @measured
     def chat(
         self,
         messages: list[Message],
@@ -121,29 +384,9 @@ class AnthropicProvider(LLMProvider):
                 stop_reason="error"
             )
 
-        # Convert messages to Anthropic format
-        anthropic_messages = []
-        for msg in messages:
-            if msg.role == "system":
-                # System messages go in the system parameter
-                continue
-            anthropic_messages.append({
-                "role": msg.role,
-                "content": msg.content
-            })
-
-        # Build request kwargs
-        kwargs = {
-            "model": self.model,
-            "max_tokens": 4096,
-            "messages": anthropic_messages,
-        }
+        anthropic_messages = self._conversation.build(messages)
 
-        if system:
-            kwargs["system"] = system
-
-        if tools:
-            kwargs["tools"] = tools
+        kwargs = self._request_kwargs(anthropic_messages, tools, system)
 
         # Debug logging
         self._log_debug("REQUEST", {
@@ -154,27 +397,30 @@ class AnthropicProvider(LLMProvider):
         })
 
         try:
-            response = self.client.messages.create(**kwargs)
+            response = self._retry_with_backoff(self.client.messages.create, **kwargs)
             result = self._parse_response(response)
 
             self._log_debug("RESPONSE", {
                 "content_length": len(result.content),
                 "tool_calls": len(result.tool_calls),
-                "stop_reason": result.stop_reason
+                "stop_reason": result.stop_reason,
+                "cache_read_tokens": result.cache_read_tokens,
+                "cache_write_tokens": result.cache_write_tokens,
             })
 
             return result
 
-        except anthropic.APIError as e:
-            error = _parse_anthropic_error(e, self.model)
+        except LLMError as e:
             return LLMResponse(
-                content=f"[Error] {error.format_message()}",
-                stop_reason="error"
+                content=f"[Error] {e.format_message()}",
+                stop_reason="error",
+                error=e
             )
         except Exception as e:
             return LLMResponse(
                 content=f"[Error] Unexpected: {str(e)}",
-                stop_reason="error"
+                stop_reason="error",
+                error=e
             )
 
     def _parse_response(self, response) -> LLMResponse:
@@ -195,9 +441,24 @@ class AnthropicProvider(LLMProvider):
         return LLMResponse(
             content="\n".join(content_parts),
             tool_calls=tool_calls,
-            stop_reason=response.stop_reason or "end_turn"
+            stop_reason=response.stop_reason or "end_turn",
+            **_token_usage(getattr(response, "usage", None))
         )
 
+    def _stream(self, kwargs: dict) -> LLMResponse:
+        """Stream a request, picking up where it left off if the connection drops."""
+        collector = _StreamCollector(self)
+
+        def attempt():
+            with self.client.messages.stream(**collector.resume_kwargs(kwargs)) as stream:
+                for event in stream:
+                    collector.feed(event)
+                return stream.get_final_message()
+
+        final_message = self._retry_with_backoff(attempt)
+        return collector.response(final_message)
+
+    @measured
     def chat_stream(
         self,
         messages: list[Message],
@@ -214,95 +475,27 @@ class AnthropicProvider(LLMProvider):
                 stop_reason="error"
             )
 
-        # Convert messages to Anthropic format
-        anthropic_messages = []
-        for msg in messages:
-            if msg.role == "system":
-                continue
-            anthropic_messages.append({
-                "role": msg.role,
-                "content": msg.content
-            })
+        anthropic_messages = self._conversation.build(messages)
 
-        kwargs = {
-            "model": self.model,
-            "max_tokens": 4096,
-            "messages": anthropic_messages,
-        }
-
-        if system:
-            kwargs["system"] = system
-
-        if tools:
-            kwargs["tools"] = tools
+        kwargs = self._request_kwargs(anthropic_messages, tools, system)
 
         try:
-            collected_content = []
-            tool_calls = []
-            current_tool_id = None
-            current_tool_name = None
-            current_tool_input = ""
-
-            with self.client.messages.stream(**kwargs) as stream:
-                for event in stream:
-                    if event.type == "content_block_start":
-                        if hasattr(event.content_block, 'type'):
-                            if event.content_block.type == "tool_use":
-                                current_tool_id = event.content_block.id
-                                current_tool_name = event.content_block.name
-                                current_tool_input = ""
-
-                    elif event.type == "content_block_delta":
-                        if hasattr(event.delta, 'text'):
-                            # Text content - print immediately
-                            text = event.delta.text
-                            sys.stdout.write(text)
-                            sys.stdout.flush()
-                            collected_content.append(text)
-                        elif hasattr(event.delta, 'partial_json'):
-                            # Tool input JSON accumulating
-                            current_tool_input += event.delta.partial_json
-
-                    elif event.type == "content_block_stop":
-                        if current_tool_id:
-                            # Parse accumulated tool input
-                            try:
-                                args = json.loads(current_tool_input) if current_tool_input else {}
-                            except json.JSONDecodeError:
-                                args = {}
-                            tool_calls.append(ToolCall(
-                                id=current_tool_id,
-                                name=current_tool_name,
-                                arguments=args
-                            ))
-                            current_tool_id = None
-                            current_tool_name = None
-                            current_tool_input = ""
-
-                # Print newline after streaming content
-                if collected_content:
-                    print()
-
-                final_message = stream.get_final_message()
-                stop_reason = final_message.stop_reason or "end_turn"
+            return self._stream(kwargs)
 
+        except LLMError as e:
             return LLMResponse(
-                content="".join(collected_content),
-                tool_calls=tool_calls,
-                stop_reason=stop_reason
-            )
-
-        except anthropic.APIError as e:
-            return LLMResponse(
-                content=f"[API Error] {str(e)}",
-                stop_reason="error"
+                content=f"[API Error] {e.format_message()}",
+                stop_reason="error",
+                error=e
             )
         except Exception as e:
             return LLMResponse(
                 content=f"[Error] {str(e)}",
-                stop_reason="error"
+                stop_reason="error",
+                error=e
             )
 
+    @measured
     def continue_with_tool_results(
         self,
         messages: list[Message],
@@ -327,77 +520,23 @@ class AnthropicProvider(LLMProvider):
                 stop_reason="error"
             )
 
-        # Convert messages to Anthropic format
-        anthropic_messages = []
-        for msg in messages:
-            if msg.role == "system":
-                continue
-            anthropic_messages.append({
-                "role": msg.role,
-                "content": msg.content
-            })
-
-        # Add ALL tool rounds (accumulated history)
-        for rnd in tool_rounds:
-            assistant_content = rnd.get("content", "")
-            tool_calls = rnd.get("tool_calls", [])
-            tool_results = rnd.get("results", [])
-
-            # Add assistant message with tool_use blocks
-            assistant_content_blocks = []
-            if assistant_content:
-                assistant_content_blocks.append({
-                    "type": "text",
-                    "text": assistant_content
-                })
-            for tc in tool_calls:
-                assistant_content_blocks.append({
-                    "type": "tool_use",
-                    "id": tc.id,
-                    "name": tc.name,
-                    "input": tc.arguments
-                })
-            anthropic_messages.append({
-                "role": "assistant",
-                "content": assistant_content_blocks
-            })
-
-            # Add tool results as a user message with tool_result blocks
-            tool_result_content = []
-            for result in tool_results:
-                tool_result_content.append({
-                    "type": "tool_result",
-                    "tool_use_id": result.tool_id,
-                    "content": result.content,
-                    "is_error": result.is_error
-                })
-            anthropic_messages.append({
-                "role": "user",
-                "content": tool_result_content
-            })
-
-        kwargs = {
-            "model": self.model,
-            "max_tokens": 4096,
-            "messages": anthropic_messages,
-        }
-
-        if system:
-            kwargs["system"] = system
+        # Only rounds added since the previous call are serialized
+        anthropic_messages = self._conversation.build(messages, tool_rounds)
 
-        if tools:
-            kwargs["tools"] = tools
+        kwargs = self._request_kwargs(anthropic_messages, tools, system)
 
         try:
-            response = self.client.messages.create(**kwargs)
+            response = self._retry_with_backoff(self.client.messages.create, **kwargs)
             return self._parse_response(response)
 
         except Exception as e:
             return LLMResponse(
                 content=f"[Error] {str(e)}",
-                stop_reason="error"
+                stop_reason="error",
+                error=e
             )
 
+    @measured
     def continue_with_tool_results_stream(
         self,
         messages: list[Message],
@@ -412,121 +551,155 @@ class AnthropicProvider(LLMProvider):
                 stop_reason="error"
             )
 
-        # Convert messages to Anthropic format
-        anthropic_messages = []
-        for msg in messages:
-            if msg.role == "system":
-                continue
-            anthropic_messages.append({
-                "role": msg.role,
-                "content": msg.content
-            })
+        # Only rounds added since the previous call are serialized
+        anthropic_messages = self._conversation.build(messages, tool_rounds)
 
-        # Add ALL tool rounds (accumulated history)
-        for rnd in tool_rounds:
-            assistant_content = rnd.get("content", "")
-            tool_calls_list = rnd.get("tool_calls", [])
-            tool_results = rnd.get("results", [])
-
-            # Add assistant message with tool_use blocks
-            assistant_content_blocks = []
-            if assistant_content:
-                assistant_content_blocks.append({
-                    "type": "text",
-                    "text": assistant_content
-                })
-            for tc in tool_calls_list:
-                assistant_content_blocks.append({
-                    "type": "tool_use",
-                    "id": tc.id,
-                    "name": tc.name,
-                    "input": tc.arguments
-                })
-            anthropic_messages.append({
-                "role": "assistant",
-                "content": assistant_content_blocks
-            })
+        kwargs = self._request_kwargs(anthropic_messages, tools, system)
 
-            # Add tool results as a user message with tool_result blocks
-            tool_result_content = []
-            for result in tool_results:
-                tool_result_content.append({
-                    "type": "tool_result",
-                    "tool_use_id": result.tool_id,
-                    "content": result.content,
-                    "is_error": result.is_error
-                })
-            anthropic_messages.append({
-                "role": "user",
-                "content": tool_result_content
-            })
+        try:
+            return self._stream(kwargs)
 
-        kwargs = {
-            "model": self.model,
-            "max_tokens": 4096,
-            "messages": anthropic_messages,
-        }
+        except Exception as e:
+            return LLMResponse(
+                content=f"[Error] {str(e)}",
+                stop_reason="error",
+                error=e
+            )
 
-        if system:
-            kwargs["system"] = system
+    # =========================================================================
+    # Async API - same requests on the async client. Cancelling the task
+    # closes the connection, which stops generation on the server.
+    # =========================================================================
 
-        if tools:
-            kwargs["tools"] = tools
+    @measured
+    async def achat(
+        self,
+        messages: list[Message],
+        tools: list[dict] = None,
+        system: str = None,
+    ) -> LLMResponse:
+        """Async version of chat()."""
+        if not self.is_available():
+            return LLMResponse(
+                content="[Error] Anthropic API not available. Set ANTHROPIC_API_KEY.",
+                stop_reason="error"
+            )
+
+        kwargs = self._request_kwargs(self._conversation.build(messages), tools, system)
 
         try:
-            collected_content = []
-            tool_calls = []
-            current_tool_id = None
-            current_tool_name = None
-            current_tool_input = ""
+            response = await self._aretry_with_backoff(self.async_client.messages.create, **kwargs)
+            return self._parse_response(response)
 
-            with self.client.messages.stream(**kwargs) as stream:
-                for event in stream:
-                    if event.type == "content_block_start":
-                        if hasattr(event.content_block, 'type'):
-                            if event.content_block.type == "tool_use":
-                                current_tool_id = event.content_block.id
-                                current_tool_name = event.content_block.name
-                                current_tool_input = ""
-
-                    elif event.type == "content_block_delta":
-                        if hasattr(event.delta, 'text'):
-                            text = event.delta.text
-                            sys.stdout.write(text)
-                            sys.stdout.flush()
-                            collected_content.append(text)
-                        elif hasattr(event.delta, 'partial_json'):
-                            current_tool_input += event.delta.partial_json
-
-                    elif event.type == "content_block_stop":
-                        if current_tool_id:
-                            try:
-                                args = json.loads(current_tool_input) if current_tool_input else {}
-                            except json.JSONDecodeError:
-                                args = {}
-                            tool_calls.append(ToolCall(
-                                id=current_tool_id,
-                                name=current_tool_name,
-                                arguments=args
-                            ))
-                            current_tool_id = None
-                            current_tool_name = None
-                            current_tool_input = ""
-
-                if collected_content:
-                    print()
-
-                final_message = stream.get_final_message()
-                stop_reason = final_message.stop_reason or "end_turn"
+        except LLMError as e:
+            return LLMResponse(
+                content=f"[Error] {e.format_message()}",
+                stop_reason="error",
+                error=e
+            )
+        except Exception as e:
+            return LLMResponse(
+                content=f"[Error] Unexpected: {str(e)}",
+                stop_reason="error",
+                error=e
+            )
+
+    @measured
+    async def achat_stream(
+        self,
+        messages: list[Message],
+        tools: list[dict] = None,
+        system: str = None,
+    ) -> LLMResponse:
+        """Async version of chat_stream()."""
+        if not self.is_available():
+            return LLMResponse(
+                content="[Error] Anthropic API not available. Set ANTHROPIC_API_KEY.",
+                stop_reason="error"
+            )
+
+        kwargs = self._request_kwargs(self._conversation.build(messages), tools, system)
+
+        try:
+            return await self._astream(kwargs)
 
+        except LLMError as e:
             return LLMResponse(
-                content="".join(collected_content),
-                tool_calls=tool_calls,
-                stop_reason=stop_reason
+                content=f"[API Error] {e.format_message()}",
+                stop_reason="error",
+                error=e
+            )
+        except Exception as e:
+            return LLMResponse(
+                content=f"[Error] {str(e)}",
+                stop_reason="error",
+                error=e
             )
 
+    @measured
+    async def acontinue_with_tool_results(
+        self,
+        messages: list[Message],
+        tool_rounds: list[dict],
+        tools: list[dict] = None,
+        system: str = None,
+    ) -> LLMResponse:
+        """Async version of continue_with_tool_results()."""
+        if not self.is_available():
+            return LLMResponse(
+                content="[Error] Anthropic API not available.",
+                stop_reason="error"
+            )
+
+        kwargs = self._request_kwargs(self._conversation.build(messages, tool_rounds), tools, system)
+
+        try:
+            response = await self._aretry_with_backoff(self.async_client.messages.create, **kwargs)
+            return self._parse_response(response)
+
         except Exception as e:
             return LLMResponse(
                 content=f"[Error] {str(e)}",
+                stop_reason="error",
+                error=e
+            )
+
+    @measured
+    async def acontinue_with_tool_results_stream(
+        self,
+        messages: list[Message],
+        tool_rounds: list[dict],
+        tools: list[dict] = None,
+        system: str = None,
+    ) -> LLMResponse:
+        """Async version of continue_with_tool_results_stream()."""
+        if not self.is_available():
+            return LLMResponse(
+                content="[Error] Anthropic API not available.",
                 stop_reason="error"
             )
+
+        kwargs = self._request_kwargs(self._conversation.build(messages, tool_rounds), tools, system)
+
+        try:
+            return await self._astream(kwargs)
+
+        except Exception as e:
+            return LLMResponse(
+                content=f"[Error] {str(e)}",
+                stop_reason="error",
+                error=e
+            )
+
+    async def _astream(self, kwargs: dict) -> LLMResponse:
+        """Async version of _stream()."""
+        collector = _StreamCollector(self)
+
+        async def attempt():
+            async with self.async_client.messages.stream(**collector.resume_kwargs(kwargs)) as stream:
+                async for event in stream:
+                    collector.feed(event)
+                return await stream.get_final_message()
+
+        final_message = await self._aretry_with_backoff(attempt)
+        return collector.response(final_message)
@@ -1,12 +1,17 @@
 """Abstract LLM interface."""
 
+import asyncio
+import contextvars
+import functools
 import re
 import time
 import uuid
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional
+
+from opencode.llm.resilience import CircuitBreaker, backoff_delay, is_transport_error
 
 
 # =============================================================================
@@ -14,7 +19,15 @@ from typing import Optional
 # =============================================================================
 
 class LLMError(Exception):
-    """Base exception for LLM errors."""
+    """Base exception for LLM errors.
+
+    Attributes:
+        retryable: The request may succeed if sent again (transient failure).
+        retry_after: Seconds the server asked us to wait (0 if unknown).
+    """
+
+    retryable: bool = False
+    retry_after: float = 0
 
     def __init__(self, message: str, provider: str = "", suggestion: str = ""):
         self.message = message
@@ -43,6 +56,8 @@ class APIKeyError(LLMError):
 class ConnectionError(LLMError):
     """Failed to connect to the API."""
 
+    retryable = True
+
     def __init__(self, provider: str, details: str = ""):
         super().__init__(
             message=f"Connection failed: {details}" if details else "Connection failed",
@@ -54,10 +69,12 @@ class ConnectionError(LLMError):
 class RateLimitError(LLMError):
     """Rate limit exceeded."""
 
-    def __init__(self, provider: str, retry_after: int = 0):
+    retryable = True
+
+    def __init__(self, provider: str, retry_after: float = 0):
         msg = f"Rate limit exceeded"
         if retry_after:
-            msg += f" (retry after {retry_after}s)"
+            msg += f" (retry after {retry_after:g}s)"
         super().__init__(
             message=msg,
             provider=provider,
@@ -66,6 +83,31 @@ class RateLimitError(LLMError):
         self.retry_after = retry_after
 
 
+class ServerError(LLMError):
+    """The API is overloaded or failed on its side (5xx, 529)."""
+
+    retryable = True
+
+    def __init__(self, provider: str, details: str = "", retry_after: float = 0):
+        super().__init__(
+            message=f"Server error: {details}" if details else "Server error",
+            provider=provider,
+            suggestion="The service is busy or having problems - try again shortly"
+        )
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(LLMError):
+    """Requests are paused after repeated failures."""
+
+    def __init__(self, provider: str, retry_in: float = 0):
+        super().__init__(
+            message="Too many failed requests, pausing requests to this provider",
+            provider=provider,
+            suggestion=f"Try again in {retry_in:.0f}s" if retry_in else "Try again shortly"
+        )
+
+
 class ModelError(LLMError):
     """Model not found or not accessible."""
 
@@ -123,12 +165,28 @@ class LLMResponse:
     content: str
     tool_calls: list[ToolCall] = field(default_factory=list)
     stop_reason: str = "end_turn"
+    cache_read_tokens: int = 0  # Prompt tokens served from the provider's prompt cache
+    cache_write_tokens: int = 0  # Prompt tokens written to the prompt cache
+    input_tokens: int = 0  # Prompt tokens billed at the full rate
+    output_tokens: int = 0  # Generated tokens
+    ttft: float = 0.0  # Seconds until the first streamed token (0 if not streamed)
+    latency: float = 0.0  # Seconds from sending the request to the complete response
+    retries: int = 0  # Attempts that failed and were retried
+    error: Optional[Exception] = None  # Why the request failed (stop_reason "error")
 
     @property
     def has_tool_calls(self) -> bool:
         """Check if response contains tool calls."""
         return len(self.tool_calls) > 0
 
+    @property
+    def tokens_per_second(self) -> float:
+        """Output tokens per second of generation (after the first token, if streamed)."""
+        generating = self.latency - self.ttft
+        if self.output_tokens <= 0 or generating <= 0:
+            return 0.0
+        return self.output_tokens / generating
+
 
 @dataclass
 class ToolResult:
@@ -138,6 +196,141 @@ class ToolResult:
     is_error: bool = False
 
 
+class ConversationBuffer:
+    """A conversation in a provider's wire format, serialized incrementally.
+
+    During a tool loop, continue_with_tool_results is called with the same
+    history and a list of tool rounds that grows by one round per call.
+    Rebuilding the request messages from scratch each time is quadratic
+    over the loop; the buffer keeps what it already serialized and only
+    converts the messages and rounds appended since the previous call.
+
+    Sources are compared by identity, so history entries and rounds must
+    be replaced rather than modified in place. Any other change (different
+    history, a removed or replaced round, a message added after rounds)
+    serializes the conversation again from the start.
+
+    Args:
+        serialize_message: Converts a Message to wire messages.
+        serialize_round: Converts a tool round dict to wire messages.
+    """
+
+    def __init__(self, serialize_message, serialize_round):
+        self._serialize_message = serialize_message
+        self._serialize_round = serialize_round
+        self._messages: list[Message] = []
+        self._rounds: list[dict] = []
+        self._wire: list[dict] = []
+        self.rebuilds = 0
+
+    def build(self, messages: list[Message], tool_rounds: list[dict] = ()) -> list[dict]:
+        """Return the wire messages for a conversation.
+
+        The returned list is owned by the buffer and must not be modified;
+        copy it before adding per-request entries.
+        """
+        if not self._extends(messages, tool_rounds):
+            self.reset()
+            self.rebuilds += 1
+
+        for msg in messages[len(self._messages):]:
+            self._wire.extend(self._serialize_message(msg))
+            self._messages.append(msg)
+        for rnd in tool_rounds[len(self._rounds):]:
+            self._wire.extend(self._serialize_round(rnd))
+            self._rounds.append(rnd)
+        return self._wire
+
+    def reset(self) -> None:
+        """Forget everything serialized so far."""
+        self._messages = []
+        self._rounds = []
+        self._wire = []
+
+    def _extends(self, messages: list[Message], tool_rounds: list[dict]) -> bool:
+        """Check whether the conversation only grew since the last build."""
+        if self._rounds and len(messages) != len(self._messages):
+            return False  # Messages go before rounds on the wire
+        return _has_prefix(messages, self._messages) and _has_prefix(tool_rounds, self._rounds)
+
+
+def _has_prefix(items: list, prefix: list) -> bool:
+    """Check whether `items` starts with the same objects as `prefix`."""
+    if len(items) < len(prefix):
+        return False
+    return all(a is b for a, b in zip(items, prefix))
+
+
+@dataclass
+class _CallStats:
+    """Timing and retries of the provider call in progress."""
+    started: float = field(default_factory=time.perf_counter)
+    first_token: Optional[float] = None
+    retries: int = 0
+
+
+# The call being measured in this thread or task (see measured())
+_current_call: contextvars.ContextVar[Optional[_CallStats]] = contextvars.ContextVar(
+    "opencode_llm_call", default=None
+)
+
+
+def _count_retry() -> None:
+    stats = _current_call.get()
+    if stats is not None:
+        stats.retries += 1
+
+
+def mark_first_token() -> None:
+    """Note that the first token of the current call's response arrived."""
+    stats = _current_call.get()
+    if stats is not None and stats.first_token is None:
+        stats.first_token = time.perf_counter()
+
+
+def measured(method):
+    """Decorator for provider methods that return an LLMResponse.
+
+    Fills in the response's latency, time to first token and retry count,
+    then reports the call to the provider's metrics_listener. A call made
+    from inside another measured call (e.g. the default achat() running
+    chat() in a thread) counts as part of the outer one.
+    """
+    def finish(provider, stats: _CallStats, response: LLMResponse) -> LLMResponse:
+        if isinstance(response, LLMResponse):
+            response.latency = time.perf_counter() - stats.started
+            if stats.first_token is not None:
+                response.ttft = stats.first_token - stats.started
+            response.retries = stats.retries
+            provider._notify_metrics(method.__name__, response)
+        return response
+
+    if asyncio.iscoroutinefunction(method):
+        @functools.wraps(method)
+        async def async_wrapper(self, *args, **kwargs):
+            if _current_call.get() is not None:
+                return await method(self, *args, **kwargs)
+            stats = _CallStats()
+            token = _current_call.set(stats)
+            try:
+                return finish(self, stats, await method(self, *args, **kwargs))
+            finally:
+                _current_call.reset(token)
+        return async_wrapper
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if _current_call.get() is not None:
+            return method(self, *args, **kwargs)
+        stats = _CallStats()
+        token = _current_call.set(stats)
+        try:
+            return finish(self, stats, method(self, *args, **kwargs))
+        finally:
+            _current_call.reset(token)
+    return wrapper
+
+
 class LLMProvider(ABC):
     """Abstract base class for LLM providers.
 
@@ -145,11 +338,32 @@ class LLMProvider(ABC):
         debug: Enable debug logging of requests/responses.
         max_retries: Maximum retry attempts for transient failures.
         retry_delay: Base delay between retries (exponential backoff).
+        tool_call_listener: Called as listener(tool_call, position) as soon
+            as a streaming provider has parsed a complete tool call, while
+            the rest of the response may still be streaming. position is the
+            call's index in the response (0 means a new response began).
+        native_async: The async methods (achat, ...) use an async client,
+            so cancelling them stops the request.
+        provider_name: Name shown in error messages.
+        metrics_listener: Called as listener(provider, call, response) after
+            each measured call (call is the method name, e.g. "chat_stream").
     """
 
     debug: bool = False
     max_retries: int = 3
     retry_delay: float = 1.0
+    tool_call_listener: Optional[Callable[[ToolCall, int], None]] = None
+    native_async: bool = False
+    provider_name: str = "LLM"
+    metrics_listener: Optional[Callable[["LLMProvider", str, LLMResponse], None]] = None
+    _circuit: Optional[CircuitBreaker] = None
+
+    @property
+    def circuit(self) -> CircuitBreaker:
+        """This provider's circuit breaker (created on first use)."""
+        if self._circuit is None:
+            self._circuit = CircuitBreaker()
+        return self._circuit
 
     @abstractmethod
     def chat(
@@ -199,6 +413,58 @@ class LLMProvider(ABC):
         """Check if the provider is available (API key set, etc.)."""
         pass
 
+    # =========================================================================
+    # Async API. Providers built on an async client set native_async and
+    # override these; the defaults run the sync method in a worker thread,
+    # which cannot be stopped once the request is sent.
+    # =========================================================================
+
+    @measured
+    async def achat(
+        self,
+        messages: list[Message],
+        tools: list[dict] = None,
+        system: str = None,
+    ) -> LLMResponse:
+        """Async version of chat()."""
+        return await asyncio.to_thread(self.chat, messages, tools, system)
+
+    @measured
+    async def achat_stream(
+        self,
+        messages: list[Message],
+        tools: list[dict] = None,
+        system: str = None,
+    ) -> LLMResponse:
+        """Async version of chat_stream() (chat() if the provider can't stream)."""
+        chat = getattr(self, "chat_stream", self.chat)
+        return await asyncio.to_thread(chat, messages, tools, system)
+
+    @measured
+    async def acontinue_with_tool_results(
+        self,
+        messages: list[Message],
+        tool_rounds: list[dict],
+        tools: list[dict] = None,
+        system: str = None,
+    ) -> LLMResponse:
+        """Async version of continue_with_tool_results()."""
+        return await asyncio.to_thread(
+            self.continue_with_tool_results, messages, tool_rounds, tools, system
+        )
+
+    @measured
+    async def acontinue_with_tool_results_stream(
+        self,
+        messages: list[Message],
+        tool_rounds: list[dict],
+        tools: list[dict] = None,
+        system: str = None,
+    ) -> LLMResponse:
+        """Async version of continue_with_tool_results_stream()."""
+        continue_ = getattr(self, "continue_with_tool_results_stream", self.continue_with_tool_results)
+        return await asyncio.to_thread(continue_, messages, tool_rounds, tools, system)
+
     def test_connection(self) -> tuple[bool, str]:
         """Test if the API connection actually works.
 
@@ -232,8 +498,32 @@ class LLMProvider(ABC):
                 formatted = str(data)
             print(f"\033[90m[DEBUG {label}]\n{formatted}\033[0m")
 
+    def _notify_metrics(self, call: str, response: LLMResponse) -> None:
+        """Pass a finished call to the listener (a failing listener is ignored)."""
+        if self.metrics_listener is None:
+            return
+        try:
+            self.metrics_listener(self, call, response)
+        except Exception as e:
+            self._log_debug("METRICS LISTENER", str(e))
+
+    def _notify_tool_call(self, tool_call: ToolCall, position: int) -> None:
+        """Pass a parsed tool call to the listener (a failing listener is ignored)."""
+        if self.tool_call_listener is None:
+            return
+        try:
+            self.tool_call_listener(tool_call, position)
+        except Exception as e:
+            self._log_debug("TOOL CALL LISTENER", str(e))
+
     def _retry_with_backoff(self, func, *args, **kwargs):
-        """Execute function with exponential backoff retry.
+        """Call func, retrying transient failures with jittered exponential backoff.
+
+        Exceptions are converted to LLMError by _convert_error(). Retryable
+        errors (rate limits, overloaded servers, dropped connections) are
+        retried up to max_retries times, waiting at least as long as the
+        server's retry-after. While the circuit breaker is open, calls fail
+        right away.
 
         Args:
             func: Function to execute.
@@ -243,32 +533,85 @@ class LLMProvider(ABC):
             Function result.
 
         Raises:
-            Last exception if all retries fail.
+            LLMError: The error of the last attempt.
         """
-        last_error = None
-        for attempt in range(self.max_retries):
-            try:
-                return func(*args, **kwargs)
-            except RateLimitError as e:
-                last_error = e
-                wait_time = e.retry_after if e.retry_after else (self.retry_delay * (2 ** attempt))
-                if attempt < self.max_retries - 1:
-                    if self.debug:
-                        print(f"\033[33m[Retry] Rate limited, waiting {wait_time}s...\033[0m")
-                    time.sleep(wait_time)
-            except (ConnectionError,) as e:
-                last_error = e
-                wait_time = self.retry_delay * (2 ** attempt)
-                if attempt < self.max_retries - 1:
-                    if self.debug:
-                        print(f"\033[33m[Retry] Connection error, waiting {wait_time}s...\033[0m")
-                    time.sleep(wait_time)
-            except LLMError:
-                raise  # Don't retry other LLM errors
-            except Exception as e:
-                raise  # Don't retry unknown errors
-
-        raise last_error
+        trial = self._check_circuit()
+        attempt = 0
+        try:
+            while True:
+                try:
+                    result = func(*args, **kwargs)
+                except Exception as e:
+                    error = self._convert_error(e)
+                    wait = self._next_retry(error, attempt)
+                    if wait is None:
+                        raise error from e
+                    _count_retry()
+                    time.sleep(wait)
+                    attempt += 1
+                    continue
+                self.circuit.record_success()
+                return result
+        finally:
+            if trial:
+                self.circuit.release()  # No-op unless interrupted (Ctrl+C)
+
+    async def _aretry_with_backoff(self, func, *args, **kwargs):
+        """Async version of _retry_with_backoff() for a coroutine function."""
+        trial = self._check_circuit()
+        attempt = 0
+        try:
+            while True:
+                try:
+                    result = await func(*args, **kwargs)
+                except Exception as e:
+                    error = self._convert_error(e)
+                    wait = self._next_retry(error, attempt)
+                    if wait is None:
+                        raise error from e
+                    _count_retry()
+                    await asyncio.sleep(wait)
+                    attempt += 1
+                    continue
+                self.circuit.record_success()
+                return result
+        finally:
+            if trial:
+                self.circuit.release()  # No-op unless interrupted (cancelled)
+
+    def _convert_error(self, e: Exception) -> LLMError:
+        """Map a client exception to an LLMError (providers map their SDK's errors)."""
+        if isinstance(e, LLMError):
+            return e
+        if is_transport_error(e):
+            return ConnectionError(self.provider_name, str(e))
+        return LLMError(str(e), self.provider_name)
+
+    def _check_circuit(self) -> bool:
+        """Raise CircuitOpenError if requests are paused.
+
+        Returns:
+            True if this request is the circuit's half-open trial.
+        """
+        trial = self.circuit.admit()
+        if trial is None:
+            raise CircuitOpenError(self.provider_name, self.circuit.retry_in())
+        return trial
+
+    def _next_retry(self, error: LLMError, attempt: int) -> Optional[float]:
+        """Seconds to wait before retrying a failed attempt, or None to give up."""
+        if not error.retryable:
+            self.circuit.record_success()  # The service answered; the request was at fault
+            return None
+        if attempt >= self.max_retries:
+            self.circuit.record_failure()
+            return None
+
+        wait = backoff_delay(attempt, self.retry_delay, error.retry_after)
+        if self.debug:
+            print(f"\033[33m[Retry] {error.message}, waiting {wait:.1f}s "
+                  f"({attempt + 1}/{self.max_retries})...\033[0m")
+        return wait
 
 
 class MockLLMProvider(LLMProvider):
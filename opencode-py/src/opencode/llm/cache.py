@@ -0,0 +1,324 @@
+"""Response cache - record and replay LLM calls.
+
+CachingProvider sits in front of any LLMProvider. Each request is keyed
+by a hash of the model, system prompt, tool schemas, messages and tool
+rounds, and the response is stored as one JSON file under
+.opencode/llm_cache/.
+
+Modes:
+    record: Answer from the cache when an entry exists and is younger
+        than the TTL; otherwise call the provider and store the response.
+        Re-running /review all on an unchanged tree costs nothing.
+    replay: Answer only from the cache (the TTL is ignored) and never
+        call the provider; a request that was not recorded gets an error
+        response. Makes benchmark runs of the REPL loop offline and
+        deterministic - recorded tool call IDs come back unchanged, so the
+        follow-up requests hash to the recorded ones too.
+
+Error responses are never stored.
+"""
+
+import dataclasses
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+from opencode.llm.base import (
+    LLMProvider,
+    LLMResponse,
+    Message,
+    ToolCall,
+)
+
+
+MODE_OFF = "off"
+MODE_RECORD = "record"
+MODE_REPLAY = "replay"
+CACHE_MODES = (MODE_OFF, MODE_RECORD, MODE_REPLAY)
+
+# Age (seconds) after which a recorded response is requested again
+DEFAULT_TTL = 7 * 24 * 3600
+
+# Bump when the key or entry format changes
+CACHE_VERSION = 1
+
+
+def _encode(obj):
+    """JSON encoding for the dataclasses found in messages and tool rounds."""
+    if dataclasses.is_dataclass(obj):
+        return dataclasses.asdict(obj)
+    raise TypeError(f"Cannot hash {type(obj).__name__} in an LLM request")
+
+
+def request_key(
+    model: str,
+    messages: list[Message],
+    tool_rounds: Optional[list[dict]] = None,
+    tools: Optional[list[dict]] = None,
+    system: Optional[str] = None,
+) -> str:
+    """Hash identifying a request (hex SHA-256).
+
+    tool_rounds is None for chat() and a list for continue_with_tool_results(),
+    so the two never share an entry.
+    """
+    payload = json.dumps(
+        {
+            "version": CACHE_VERSION,
+            "model": model,
+            "system": system,
+            "tools": tools,
+            "messages": messages,
+            "tool_rounds": tool_rounds,
+        },
+        default=_encode,
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CachingProvider(LLMProvider):
+    """Serves repeated requests from an on-disk cache.
+
+    Args:
+        provider: Provider for requests not in the cache (may be None in
+            replay mode).
+        directory: Cache directory (created on first write).
+        mode: MODE_RECORD or MODE_REPLAY.
+        ttl: Seconds a recorded response stays valid in record mode (0 = forever).
+        model: Model name for the keys when there is no provider.
+    """
+
+    provider_name = "Cache"
+
+    def __init__(
+        self,
+        provider: Optional[LLMProvider],
+        directory: Path,
+        mode: str = MODE_RECORD,
+        ttl: float = DEFAULT_TTL,
+        model: str = "",
+    ):
+        if mode not in (MODE_RECORD, MODE_REPLAY):
+            raise ValueError(f"Unknown LLM cache mode: {mode!r}")
+        self.provider = provider
+        self.directory = Path(directory)
+        self.mode = mode
+        self.ttl = ttl
+        self._model = model
+        self.debug = getattr(provider, "debug", False)
+        self.hits = 0
+        self.misses = 0
+        self._settings: dict = {}  # Provider settings kept while there is no provider
+
+    # Settings that belong to the provider doing the requests
+
+    def _get(self, name: str, default=None):
+        if self.provider is None:
+            return self._settings.get(name, default)
+        return getattr(self.provider, name)
+
+    def _set(self, name: str, value) -> None:
+        if self.provider is None:
+            self._settings[name] = value
+        else:
+            setattr(self.provider, name, value)
+
+    @property
+    def max_retries(self) -> int:
+        return self._get("max_retries", 0)
+
+    @max_retries.setter
+    def max_retries(self, value: int) -> None:
+        self._set("max_retries", value)
+
+    @property
+    def metrics_listener(self) -> Optional[Callable[[LLMProvider, str, LLMResponse], None]]:
+        return self._get("metrics_listener")
+
+    @metrics_listener.setter
+    def metrics_listener(self, listener) -> None:
+        self._set("metrics_listener", listener)
+
+    @property
+    def tool_call_listener(self) -> Optional[Callable[[ToolCall, int], None]]:
+        return self._get("tool_call_listener")
+
+    @tool_call_listener.setter
+    def tool_call_listener(self, listener) -> None:
+        self._set("tool_call_listener", listener)
+
+    @property
+    def native_async(self) -> bool:
+        return self.provider is None or self.provider.native_async
+
+    @property
+    def model(self) -> str:
+        if self.provider is None:
+            return self._model
+        return getattr(self.provider, "model", "")
+
+    def is_available(self) -> bool:
+        return self.mode == MODE_REPLAY or (self.provider is not None and self.provider.is_available())
+
+    # =========================================================================
+    # Entries
+    # =========================================================================
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def lookup(self, key: str) -> Optional[LLMResponse]:
+        """The stored response for a key, if present and (in record mode) fresh."""
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                entry = json.load(f)
+            if self.mode == MODE_RECORD and self.ttl and time.time() - entry["created"] > self.ttl:
+                return None
+            stored = entry["response"]
+            return LLMResponse(
+                content=stored["content"],
+                tool_calls=[ToolCall(**call) for call in stored["tool_calls"]],
+                stop_reason=stored["stop_reason"],
+            )
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def store(self, key: str, response: LLMResponse) -> None:
+        """Save a response; a failed write is dropped rather than raised."""
+        if response.stop_reason == "error":
+            return
+        entry = {
+            "created": time.time(),
+            "model": self.model,
+            "response": {
+                "content": response.content,
+                "tool_calls": [dataclasses.asdict(call) for call in response.tool_calls],
+                "stop_reason": response.stop_reason,
+            },
+        }
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write then rename, so a concurrent reader never sees half a file
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(tmp, path)
+        except OSError:
+            pass
+
+    def _hit(self, key: str, stream: bool) -> Optional[LLMResponse]:
+        response = self.lookup(key)
+        if response is None:
+            self.misses += 1
+            self._log_debug("CACHE MISS", key)
+            return None
+        self.hits += 1
+        self._log_debug("CACHE HIT", key)
+        # Show the response as a streaming provider would have
+        if stream and response.content:
+            sys.stdout.write(response.content + "\n")
+            sys.stdout.flush()
+        for position, tool_call in enumerate(response.tool_calls):
+            self._notify_tool_call(tool_call, position)
+        return response
+
+    def _not_recorded(self, key: str) -> LLMResponse:
+        return LLMResponse(
+            content=f"[Error] No recorded response for this request (replay mode, key {key[:12]}).",
+            stop_reason="error",
+        )
+
+    def _method(self, call: str):
+        # Providers that can't stream answer the non-streaming call
+        return getattr(self.provider, call, None) or getattr(self.provider, call.removesuffix("_stream"))
+
+    def _call(self, call: str, messages, tool_rounds, tools, system) -> LLMResponse:
+        key = request_key(self.model, messages, tool_rounds, tools, system)
+        cached = self._hit(key, stream=call.endswith("_stream"))
+        if cached is not None:
+            return cached
+        if self.mode == MODE_REPLAY or self.provider is None:
+            return self._not_recorded(key)
+        args = (messages, tools, system) if tool_rounds is None else (messages, tool_rounds, tools, system)
+        response = self._method(call)(*args)
+        self.store(key, response)
+        return response
+
+    async def _acall(self, call: str, messages, tool_rounds, tools, system) -> LLMResponse:
+        key = request_key(self.model, messages, tool_rounds, tools, system)
+        cached = self._hit(key, stream=call.endswith("_stream"))
+        if cached is not None:
+            return cached
+        if self.mode == MODE_REPLAY or self.provider is None:
+            return self._not_recorded(key)
+        args = (messages, tools, system) if tool_rounds is None else (messages, tool_rounds, tools, system)
+        response = await getattr(self.provider, call)(*args)
+        self.store(key, response)
+        return response
+
+    # =========================================================================
+    # Provider API. Not @measured: only requests that reach the provider
+    # are measured (by the provider) and reported as calls.
+    # =========================================================================
+
+    def chat(self, messages: list[Message], tools: list[dict] = None, system: str = None) -> LLMResponse:
+        return self._call("chat", messages, None, tools, system)
+
+    def chat_stream(self, messages: list[Message], tools: list[dict] = None, system: str = None) -> LLMResponse:
+        return self._call("chat_stream", messages, None, tools, system)
+
+    def continue_with_tool_results(
+        self,
+        messages: list[Message],
+        tool_rounds: list[dict],
+        tools: list[dict] = None,
+        system: str = None,
+    ) -> LLMResponse:
+        return self._call("continue_with_tool_results", messages, tool_rounds, tools, system)
+
+    def continue_with_tool_results_stream(
+        self,
+        messages: list[Message],
+        tool_rounds: list[dict],
+        tools: list[dict] = None,
+        system: str = None,
+    ) -> LLMResponse:
+        return self._call("continue_with_tool_results_stream", messages, tool_rounds, tools, system)
+
+    async def achat(self, messages: list[Message], tools: list[dict] = None, system: str = None) -> LLMResponse:
+        return await self._acall("achat", messages, None, tools, system)
+
+    async def achat_stream(self, messages: list[Message], tools: list[dict] = None, system: str = None) -> LLMResponse:
+        return await self._acall("achat_stream", messages, None, tools, system)
+
+    async def acontinue_with_tool_results(
+        self,
+        messages: list[Message],
+        tool_rounds: list[dict],
+        tools: list[dict] = None,
+        system: str = None,
+    ) -> LLMResponse:
+        return await self._acall("acontinue_with_tool_results", messages, tool_rounds, tools, system)
+
+    async def acontinue_with_tool_results_stream(
+        self,
+        messages: list[Message],
+        tool_rounds: list[dict],
+        tools: list[dict] = None,
+        system: str = None,
+    ) -> LLMResponse:
+        return await self._acall("acontinue_with_tool_results_stream", messages, tool_rounds, tools, system)
+
+    def describe(self) -> str:
+        """Summary for /stats."""
+        lookups = self.hits + self.misses
+        rate = f" ({self.hits / lookups:.0%} hit rate)" if lookups else ""
+        return f"Response cache: {self.mode}, {self.hits} hits, {self.misses} misses{rate} ({self.directory})"
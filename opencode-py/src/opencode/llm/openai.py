@@ -1,47 +1,201 @@
 """OpenAI implementation with flexible model selection."""
 
+import asyncio
+import importlib.util
+import json
 import sys
+import weakref
 from typing import Optional
 
+from opencode.llm.aio import shared_http_client
 from opencode.llm.base import (
-    LLMProvider, LLMResponse, Message, ToolCall, ToolResult,
-    LLMError, APIKeyError, ConnectionError, RateLimitError,
+    LLMProvider, LLMResponse, Message, ToolCall, ToolResult, ConversationBuffer,
+    measured, mark_first_token,
+    LLMError, APIKeyError, ConnectionError, RateLimitError, ServerError,
     ModelError, ContextLengthError
 )
+from opencode.llm.resilience import is_transport_error, retry_after_seconds
 
-try:
-    import openai
-    HAS_OPENAI = True
-except ImportError:
-    HAS_OPENAI = False
+# The SDK takes a large share of startup time to import, so it is only
+# imported by the code that uses it
+HAS_OPENAI = importlib.util.find_spec("openai") is not None
 
 
-def _parse_openai_error(e: Exception, model: str = "") -> LLMError:
+def _parse_openai_error(e: Exception, model: str = "", provider: str = "OpenAI") -> LLMError:
     """Convert OpenAI exceptions to structured LLMError."""
     error_str = str(e).lower()
 
-    if HAS_OPENAI:
+    # SDK errors can only come from an SDK that was imported
+    openai = sys.modules.get("openai")
+    if openai is not None:
         if isinstance(e, openai.AuthenticationError):
-            return APIKeyError("OpenAI")
+            return APIKeyError(provider)
 
         if isinstance(e, openai.RateLimitError):
-            return RateLimitError("OpenAI")
+            return RateLimitError(provider, retry_after_seconds(getattr(e, "response", None)))
 
         if isinstance(e, openai.NotFoundError):
-            return ModelError("OpenAI", model)
+            return ModelError(provider, model)
 
         if isinstance(e, openai.BadRequestError):
             if "context_length" in error_str or "maximum context" in error_str:
-                return ContextLengthError("OpenAI")
-            return LLMError(str(e), "OpenAI", "Check your request format")
+                return ContextLengthError(provider)
+            return LLMError(str(e), provider, "Check your request format")
 
         if isinstance(e, openai.APIConnectionError):
-            return ConnectionError("OpenAI", str(e))
+            return ConnectionError(provider, str(e))
+
+        if isinstance(e, openai.APIStatusError) and e.status_code >= 500:
+            return ServerError(provider, str(e), retry_after_seconds(getattr(e, "response", None)))
 
         if isinstance(e, openai.APIError):
-            return LLMError(str(e), "OpenAI")
+            return LLMError(str(e), provider)
+
+    if is_transport_error(e):
+        return ConnectionError(provider, str(e))
+
+    return LLMError(str(e), provider)
+
+
+def _openai_message(msg: Message) -> list[dict]:
+    """Convert a history message to OpenAI format."""
+    if msg.role == "system":
+        return []  # The system prompt is passed separately
+    return [{"role": msg.role, "content": msg.content}]
+
+
+def _openai_round(rnd: dict) -> list[dict]:
+    """Convert a tool round to an assistant tool_calls message and tool messages."""
+    assistant_tool_calls = []
+    for tc in rnd.get("tool_calls", []):
+        assistant_tool_calls.append({
+            "id": tc.id,
+            "type": "function",
+            "function": {
+                "name": tc.name,
+                "arguments": json.dumps(tc.arguments)
+            }
+        })
+    wire = [{
+        "role": "assistant",
+        "content": rnd.get("content", "") or None,
+        "tool_calls": assistant_tool_calls
+    }]
+    for result in rnd.get("results", []):
+        wire.append({
+            "role": "tool",
+            "tool_call_id": result.tool_id,
+            "content": result.content
+        })
+    return wire
+
+
+def _with_system(wire: list[dict], system: Optional[str]) -> list[dict]:
+    """Put the system prompt in front of a conversation's wire messages."""
+    if system:
+        return [{"role": "system", "content": system}] + wire
+    return wire
+
+
+def _token_usage(usage) -> dict:
+    """Token counts from an OpenAI usage block (LLMResponse fields).
+
+    OpenAI includes cached prompt tokens in prompt_tokens; they are split
+    out so input_tokens means the same as for Anthropic.
+    """
+    prompt = getattr(usage, "prompt_tokens", None)
+    completion = getattr(usage, "completion_tokens", None)
+    cached = getattr(getattr(usage, "prompt_tokens_details", None), "cached_tokens", None)
+    prompt = prompt if isinstance(prompt, int) else 0
+    cached = cached if isinstance(cached, int) else 0
+    return {
+        "input_tokens": prompt - cached,
+        "output_tokens": completion if isinstance(completion, int) else 0,
+        "cache_read_tokens": cached,
+    }
+
+
+class _StreamCollector:
+    """Builds an LLMResponse from streamed chat completion chunks.
+
+    Text is echoed to stdout as it arrives; tool call fragments are
+    accumulated by index and parsed once the stream has ended.
+    """
+
+    def __init__(self):
+        self.content = []
+        self.tool_calls = {}  # index -> {id, name, arguments}
+        self.usage = None
+
+    def feed(self, chunk) -> None:
+        """Process one stream chunk."""
+        # With stream_options.include_usage, the last chunk has usage and no choices
+        if getattr(chunk, "usage", None) is not None:
+            self.usage = chunk.usage
+        if not chunk.choices:
+            return
+
+        delta = chunk.choices[0].delta
+        if delta.content or delta.tool_calls:
+            mark_first_token()
+
+        # Handle text content
+        if delta.content:
+            sys.stdout.write(delta.content)
+            sys.stdout.flush()
+            self.content.append(delta.content)
+
+        # Handle tool calls
+        if delta.tool_calls:
+            for tc in delta.tool_calls:
+                idx = tc.index
+                if idx not in self.tool_calls:
+                    self.tool_calls[idx] = {
+                        "id": tc.id or "",
+                        "name": tc.function.name if tc.function else "",
+                        "arguments": ""
+                    }
+                if tc.id:
+                    self.tool_calls[idx]["id"] = tc.id
+                if tc.function:
+                    if tc.function.name:
+                        self.tool_calls[idx]["name"] = tc.function.name
+                    if tc.function.arguments:
+                        self.tool_calls[idx]["arguments"] += tc.function.arguments
+
+    def restart(self) -> None:
+        """Forget a partial response before requesting it again."""
+        if self.content or self.tool_calls:
+            print("\n[Connection lost - restarting response]")
+        self.content = []
+        self.tool_calls = {}
+        self.usage = None
+
+    def response(self) -> LLMResponse:
+        """The complete response, once the stream has ended."""
+        # Print newline after content
+        if self.content:
+            print()
+
+        tool_calls = []
+        for idx in sorted(self.tool_calls.keys()):
+            tc_data = self.tool_calls[idx]
+            try:
+                args = json.loads(tc_data["arguments"]) if tc_data["arguments"] else {}
+            except json.JSONDecodeError:
+                args = {}
+            tool_calls.append(ToolCall(
+                id=tc_data["id"],
+                name=tc_data["name"],
+                arguments=args
+            ))
 
-    return LLMError(str(e), "OpenAI")
+        return LLMResponse(
+            content="".join(self.content),
+            tool_calls=tool_calls,
+            stop_reason="stop",
+            **_token_usage(self.usage)
+        )
 
 
 class OpenAIProvider(LLMProvider):
@@ -51,6 +205,9 @@ class OpenAIProvider(LLMProvider):
     Examples: gpt-4, gpt-4-turbo, gpt-4o, gpt-3.5-turbo, o1-preview, etc.
     """
 
+    native_async = True
+    provider_name = "OpenAI"
+
     def __init__(
         self,
         api_key: str,
@@ -74,14 +231,18 @@ class OpenAIProvider(LLMProvider):
         self.debug = debug
         self.ssl_verify = ssl_verify
         self._client = None
+        self._async_clients = weakref.WeakKeyDictionary()  # Event loop -> client
+        self._conversation = ConversationBuffer(_openai_message, _openai_round)
 
     @property
     def client(self):
         """Lazy-load the OpenAI client."""
         if self._client is None and HAS_OPENAI and self.api_key:
             import httpx
+            import openai
 
-            kwargs = {"api_key": self.api_key}
+            # Retries are done by _retry_with_backoff, not the SDK
+            kwargs = {"api_key": self.api_key, "max_retries": 0}
             if self.base_url:
                 kwargs["base_url"] = self.base_url
 
@@ -94,10 +255,36 @@ class OpenAIProvider(LLMProvider):
             self._client = openai.OpenAI(**kwargs)
         return self._client
 
+    @property
+    def async_client(self):
+        """Async client for the running event loop, on its shared connection pool."""
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            import openai
+
+            kwargs = {
+                "api_key": self.api_key,
+                "http_client": shared_http_client(self.ssl_verify),
+                "max_retries": 0,
+            }
+            if self.base_url:
+                kwargs["base_url"] = self.base_url
+            client = openai.AsyncOpenAI(**kwargs)
+            self._async_clients[loop] = client
+        return client
+
     def is_available(self) -> bool:
         """Check if OpenAI is available."""
         return HAS_OPENAI and bool(self.api_key)
 
+    def _convert_error(self, e: Exception) -> LLMError:
+        """Map OpenAI SDK errors for the retry loop."""
+        if isinstance(e, LLMError):
+            return e
+        return _parse_openai_error(e, self.model, self.provider_name)
+
+    @measured
     def chat(
         self,
         messages: list[Message],
@@ -120,23 +307,8 @@ class OpenAIProvider(LLMProvider):
                 stop_reason="error"
             )
 
-        # Build messages list
-        openai_messages = []
+        openai_messages = _with_system(self._conversation.build(messages), system)
 
-        # Add system message if provided
-        if system:
-            openai_messages.append({"role": "system", "content": system})
-
-        # Convert messages
-        for msg in messages:
-            if msg.role == "system":
-                continue  # Already handled
-            openai_messages.append({
-                "role": msg.role,
-                "content": msg.content
-            })
-
-        # Build request kwargs
         kwargs = {
             "model": self.model,
             "messages": openai_messages,
@@ -156,7 +328,7 @@ class OpenAIProvider(LLMProvider):
         })
 
         try:
-            response = self.client.chat.completions.create(**kwargs)
+            response = self._retry_with_backoff(self.client.chat.completions.create, **kwargs)
             result = self._parse_response(response)
 
             self._log_debug("RESPONSE", {
@@ -167,16 +339,17 @@ class OpenAIProvider(LLMProvider):
 
             return result
 
-        except openai.APIError as e:
-            error = _parse_openai_error(e, self.model)
+        except LLMError as e:
             return LLMResponse(
-                content=f"[Error] {error.format_message()}",
-                stop_reason="error"
+                content=f"[Error] {e.format_message()}",
+                stop_reason="error",
+                error=e
             )
         except Exception as e:
             return LLMResponse(
                 content=f"[Error] Unexpected: {str(e)}",
-                stop_reason="error"
+                stop_reason="error",
+                error=e
             )
 
     def _convert_tools(self, anthropic_tools: list[dict]) -> list[dict]:
@@ -222,9 +395,23 @@ class OpenAIProvider(LLMProvider):
         return LLMResponse(
             content=content,
             tool_calls=tool_calls,
-            stop_reason=stop_reason
+            stop_reason=stop_reason,
+            **_token_usage(getattr(response, "usage", None))
         )
 
+    def _stream(self, kwargs: dict) -> LLMResponse:
+        """Stream a request; if the connection drops, the response is requested again."""
+        collector = _StreamCollector()
+
+        def attempt():
+            collector.restart()
+            for chunk in self.client.chat.completions.create(**kwargs):
+                collector.feed(chunk)
+
+        self._retry_with_backoff(attempt)
+        return collector.response()
+
+    @measured
     def chat_stream(
         self,
         messages: list[Message],
@@ -238,24 +425,13 @@ class OpenAIProvider(LLMProvider):
                 stop_reason="error"
             )
 
-        import json
-
-        openai_messages = []
-        if system:
-            openai_messages.append({"role": "system", "content": system})
-
-        for msg in messages:
-            if msg.role == "system":
-                continue
-            openai_messages.append({
-                "role": msg.role,
-                "content": msg.content
-            })
+        openai_messages = _with_system(self._conversation.build(messages), system)
 
         kwargs = {
             "model": self.model,
             "messages": openai_messages,
             "stream": True,
+            "stream_options": {"include_usage": True},
         }
 
         if tools:
@@ -264,76 +440,22 @@ class OpenAIProvider(LLMProvider):
                 kwargs["tools"] = openai_tools
 
         try:
-            collected_content = []
-            tool_calls = []
-            current_tool_calls = {}  # id -> {name, arguments}
-
-            stream = self.client.chat.completions.create(**kwargs)
-
-            for chunk in stream:
-                if not chunk.choices:
-                    continue
-
-                delta = chunk.choices[0].delta
-
-                # Handle text content
-                if delta.content:
-                    sys.stdout.write(delta.content)
-                    sys.stdout.flush()
-                    collected_content.append(delta.content)
-
-                # Handle tool calls
-                if delta.tool_calls:
-                    for tc in delta.tool_calls:
-                        idx = tc.index
-                        if idx not in current_tool_calls:
-                            current_tool_calls[idx] = {
-                                "id": tc.id or "",
-                                "name": tc.function.name if tc.function else "",
-                                "arguments": ""
-                            }
-                        if tc.id:
-                            current_tool_calls[idx]["id"] = tc.id
-                        if tc.function:
-                            if tc.function.name:
-                                current_tool_calls[idx]["name"] = tc.function.name
-                            if tc.function.arguments:
-                                current_tool_calls[idx]["arguments"] += tc.function.arguments
-
-            # Print newline after content
-            if collected_content:
-                print()
-
-            # Parse tool calls
-            for idx in sorted(current_tool_calls.keys()):
-                tc_data = current_tool_calls[idx]
-                try:
-                    args = json.loads(tc_data["arguments"]) if tc_data["arguments"] else {}
-                except json.JSONDecodeError:
-                    args = {}
-                tool_calls.append(ToolCall(
-                    id=tc_data["id"],
-                    name=tc_data["name"],
-                    arguments=args
-                ))
-
-            return LLMResponse(
-                content="".join(collected_content),
-                tool_calls=tool_calls,
-                stop_reason="stop"
-            )
+            return self._stream(kwargs)
 
-        except openai.APIError as e:
+        except LLMError as e:
             return LLMResponse(
-                content=f"[API Error] {str(e)}",
-                stop_reason="error"
+                content=f"[API Error] {e.format_message()}",
+                stop_reason="error",
+                error=e
             )
         except Exception as e:
             return LLMResponse(
                 content=f"[Error] {str(e)}",
-                stop_reason="error"
+                stop_reason="error",
+                error=e
             )
 
+    @measured
     def continue_with_tool_results(
         self,
         messages: list[Message],
@@ -355,52 +477,8 @@ class OpenAIProvider(LLMProvider):
                 stop_reason="error"
             )
 
-        import json
-
-        # Build messages list
-        openai_messages = []
-
-        if system:
-            openai_messages.append({"role": "system", "content": system})
-
-        for msg in messages:
-            if msg.role == "system":
-                continue
-            openai_messages.append({
-                "role": msg.role,
-                "content": msg.content
-            })
-
-        # Add ALL tool rounds (accumulated history)
-        for rnd in tool_rounds:
-            assistant_content = rnd.get("content", "")
-            tool_calls = rnd.get("tool_calls", [])
-            tool_results = rnd.get("results", [])
-
-            # Add assistant message with tool calls
-            assistant_tool_calls = []
-            for tc in tool_calls:
-                assistant_tool_calls.append({
-                    "id": tc.id,
-                    "type": "function",
-                    "function": {
-                        "name": tc.name,
-                        "arguments": json.dumps(tc.arguments)
-                    }
-                })
-            openai_messages.append({
-                "role": "assistant",
-                "content": assistant_content or None,
-                "tool_calls": assistant_tool_calls
-            })
-
-            # Add tool result messages
-            for result in tool_results:
-                openai_messages.append({
-                    "role": "tool",
-                    "tool_call_id": result.tool_id,
-                    "content": result.content
-                })
+        # Only rounds added since the previous call are serialized
+        openai_messages = _with_system(self._conversation.build(messages, tool_rounds), system)
 
         kwargs = {
             "model": self.model,
@@ -413,15 +491,17 @@ class OpenAIProvider(LLMProvider):
                 kwargs["tools"] = openai_tools
 
         try:
-            response = self.client.chat.completions.create(**kwargs)
+            response = self._retry_with_backoff(self.client.chat.completions.create, **kwargs)
             return self._parse_response(response)
 
         except Exception as e:
             return LLMResponse(
                 content=f"[Error] {str(e)}",
-                stop_reason="error"
+                stop_reason="error",
+                error=e
             )
 
+    @measured
     def continue_with_tool_results_stream(
         self,
         messages: list[Message],
@@ -436,122 +516,189 @@ class OpenAIProvider(LLMProvider):
                 stop_reason="error"
             )
 
-        import json as json_module
+        # Only rounds added since the previous call are serialized
+        openai_messages = _with_system(self._conversation.build(messages, tool_rounds), system)
 
-        openai_messages = []
-        if system:
-            openai_messages.append({"role": "system", "content": system})
+        kwargs = {
+            "model": self.model,
+            "messages": openai_messages,
+            "stream": True,
+            "stream_options": {"include_usage": True},
+        }
 
-        for msg in messages:
-            if msg.role == "system":
-                continue
-            openai_messages.append({
-                "role": msg.role,
-                "content": msg.content
-            })
+        if tools:
+            openai_tools = self._convert_tools(tools)
+            if openai_tools:
+                kwargs["tools"] = openai_tools
 
-        # Add ALL tool rounds
-        for rnd in tool_rounds:
-            assistant_content = rnd.get("content", "")
-            tool_calls_list = rnd.get("tool_calls", [])
-            tool_results = rnd.get("results", [])
-
-            assistant_tool_calls = []
-            for tc in tool_calls_list:
-                assistant_tool_calls.append({
-                    "id": tc.id,
-                    "type": "function",
-                    "function": {
-                        "name": tc.name,
-                        "arguments": json_module.dumps(tc.arguments)
-                    }
-                })
-            openai_messages.append({
-                "role": "assistant",
-                "content": assistant_content or None,
-                "tool_calls": assistant_tool_calls
-            })
+        try:
+            return self._stream(kwargs)
+
+        except Exception as e:
+            return LLMResponse(
+                content=f"[Error] {str(e)}",
+                stop_reason="error",
+                error=e
+            )
 
-            for result in tool_results:
-                openai_messages.append({
-                    "role": "tool",
-                    "tool_call_id": result.tool_id,
-                    "content": result.content
-                })
+    # =========================================================================
+    # Async API - same requests on the async client. Cancelling the task
+    # closes the connection, which stops generation on the server.
+    # =========================================================================
 
+    def _request_kwargs(self, openai_messages: list[dict], tools: list[dict], stream: bool) -> dict:
+        """Build the chat.completions.create arguments."""
         kwargs = {
             "model": self.model,
             "messages": openai_messages,
-            "stream": True,
         }
-
+        if stream:
+            kwargs["stream"] = True
+            kwargs["stream_options"] = {"include_usage": True}
         if tools:
             openai_tools = self._convert_tools(tools)
             if openai_tools:
                 kwargs["tools"] = openai_tools
+        return kwargs
 
-        try:
-            collected_content = []
-            tool_calls = []
-            current_tool_calls = {}
+    @measured
+    async def achat(
+        self,
+        messages: list[Message],
+        tools: list[dict] = None,
+        system: str = None,
+    ) -> LLMResponse:
+        """Async version of chat()."""
+        if not self.is_available():
+            return LLMResponse(
+                content="[Error] OpenAI API not available. Install: pip install openai",
+                stop_reason="error"
+            )
 
-            stream = self.client.chat.completions.create(**kwargs)
+        openai_messages = _with_system(self._conversation.build(messages), system)
+        kwargs = self._request_kwargs(openai_messages, tools, stream=False)
 
-            for chunk in stream:
-                if not chunk.choices:
-                    continue
+        try:
+            response = await self._aretry_with_backoff(self.async_client.chat.completions.create, **kwargs)
+            return self._parse_response(response)
 
-                delta = chunk.choices[0].delta
+        except LLMError as e:
+            return LLMResponse(
+                content=f"[Error] {e.format_message()}",
+                stop_reason="error",
+                error=e
+            )
+        except Exception as e:
+            return LLMResponse(
+                content=f"[Error] Unexpected: {str(e)}",
+                stop_reason="error",
+                error=e
+            )
 
-                if delta.content:
-                    sys.stdout.write(delta.content)
-                    sys.stdout.flush()
-                    collected_content.append(delta.content)
+    @measured
+    async def achat_stream(
+        self,
+        messages: list[Message],
+        tools: list[dict] = None,
+        system: str = None,
+    ) -> LLMResponse:
+        """Async version of chat_stream()."""
+        if not self.is_available():
+            return LLMResponse(
+                content="[Error] OpenAI API not available.",
+                stop_reason="error"
+            )
 
-                if delta.tool_calls:
-                    for tc in delta.tool_calls:
-                        idx = tc.index
-                        if idx not in current_tool_calls:
-                            current_tool_calls[idx] = {
-                                "id": tc.id or "",
-                                "name": tc.function.name if tc.function else "",
-                                "arguments": ""
-                            }
-                        if tc.id:
-                            current_tool_calls[idx]["id"] = tc.id
-                        if tc.function:
-                            if tc.function.name:
-                                current_tool_calls[idx]["name"] = tc.function.name
-                            if tc.function.arguments:
-                                current_tool_calls[idx]["arguments"] += tc.function.arguments
+        openai_messages = _with_system(self._conversation.build(messages), system)
+        kwargs = self._request_kwargs(openai_messages, tools, stream=True)
 
-            if collected_content:
-                print()
+        try:
+            return await self._astream(kwargs)
 
-            for idx in sorted(current_tool_calls.keys()):
-                tc_data = current_tool_calls[idx]
-                try:
-                    args = json_module.loads(tc_data["arguments"]) if tc_data["arguments"] else {}
-                except json_module.JSONDecodeError:
-                    args = {}
-                tool_calls.append(ToolCall(
-                    id=tc_data["id"],
-                    name=tc_data["name"],
-                    arguments=args
-                ))
+        except LLMError as e:
+            return LLMResponse(
+                content=f"[API Error] {e.format_message()}",
+                stop_reason="error",
+                error=e
+            )
+        except Exception as e:
+            return LLMResponse(
+                content=f"[Error] {str(e)}",
+                stop_reason="error",
+                error=e
+            )
 
+    @measured
+    async def acontinue_with_tool_results(
+        self,
+        messages: list[Message],
+        tool_rounds: list[dict],
+        tools: list[dict] = None,
+        system: str = None,
+    ) -> LLMResponse:
+        """Async version of continue_with_tool_results()."""
+        if not self.is_available():
             return LLMResponse(
-                content="".join(collected_content),
-                tool_calls=tool_calls,
-                stop_reason="stop"
+                content="[Error] OpenAI API not available.",
+                stop_reason="error"
             )
 
+        openai_messages = _with_system(self._conversation.build(messages, tool_rounds), system)
+        kwargs = self._request_kwargs(openai_messages, tools, stream=False)
+
+        try:
+            response = await self._aretry_with_backoff(self.async_client.chat.completions.create, **kwargs)
+            return self._parse_response(response)
+
         except Exception as e:
             return LLMResponse(
                 content=f"[Error] {str(e)}",
+                stop_reason="error",
+                error=e
+            )
+
+    @measured
+    async def acontinue_with_tool_results_stream(
+        self,
+        messages: list[Message],
+        tool_rounds: list[dict],
+        tools: list[dict] = None,
+        system: str = None,
+    ) -> LLMResponse:
+        """Async version of continue_with_tool_results_stream()."""
+        if not self.is_available():
+            return LLMResponse(
+                content="[Error] OpenAI API not available.",
                 stop_reason="error"
             )
 
+        openai_messages = _with_system(self._conversation.build(messages, tool_rounds), system)
+        kwargs = self._request_kwargs(openai_messages, tools, stream=True)
+
+        try:
+            return await self._astream(kwargs)
+
+        except Exception as e:
+            return LLMResponse(
+                content=f"[Error] {str(e)}",
+                stop_reason="error",
+                error=e
+            )
+
+    async def _astream(self, kwargs: dict) -> LLMResponse:
+        """Async version of _stream()."""
+        collector = _StreamCollector()
+
+        async def attempt():
+            collector.restart()
+            stream = await self.async_client.chat.completions.create(**kwargs)
+            async with stream:
+                async for chunk in stream:
+                    collector.feed(chunk)
+
+        await self._aretry_with_backoff(attempt)
+        return collector.response()
+
 
 def _parse_text_tool_calls(content: str, available_tools: list[str] = None) -> tuple[str, list]:
     """Parse tool calls from text output for models without native function calling.
@@ -575,7 +722,7 @@ def _parse_text_tool_calls(content: str, available_tools: list[str] = None) -> t
         available_tools = [
             "read", "write", "edit", "bash", "glob", "grep",
             "tree", "outline", "find_definition", "find_references",
-            "find_symbols", "rename_symbol"
+            "find_symbols", "rename_symbol", "profile_data"
         ]
 
     # Pattern to match tool calls: [tool(...)] or tool(...)
@@ -699,6 +846,8 @@ class CustomLLMProvider(LLMProvider):
     (e.g., Gemma, LLaMA, Mistral via Ollama).
     """
 
+    provider_name = "Custom"
+
     def __init__(
         self,
         base_url: str,
@@ -722,14 +871,19 @@ class CustomLLMProvider(LLMProvider):
         self.debug = debug
         self.parse_text_tools = parse_text_tools
         self._client = None
+        self._conversation = ConversationBuffer(_openai_message, _openai_round)
 
     @property
     def client(self):
         """Lazy-load the OpenAI client with custom base URL."""
         if self._client is None and HAS_OPENAI:
+            import openai
+
+            # Retries are done by _retry_with_backoff, not the SDK
             self._client = openai.OpenAI(
                 api_key=self.api_key,
                 base_url=self.base_url,
+                max_retries=0,
             )
         return self._client
 
@@ -737,6 +891,13 @@ class CustomLLMProvider(LLMProvider):
         """Check if the custom provider is available."""
         return HAS_OPENAI and bool(self.base_url)
 
+    def _convert_error(self, e: Exception) -> LLMError:
+        """Map OpenAI SDK errors for the retry loop."""
+        if isinstance(e, LLMError):
+            return e
+        return _parse_openai_error(e, self.model, self.provider_name)
+
+    @measured
     def chat(
         self,
         messages: list[Message],
@@ -759,19 +920,7 @@ class CustomLLMProvider(LLMProvider):
                 stop_reason="error"
             )
 
-        # Build messages list
-        openai_messages = []
-
-        if system:
-            openai_messages.append({"role": "system", "content": system})
-
-        for msg in messages:
-            if msg.role == "system":
-                continue
-            openai_messages.append({
-                "role": msg.role,
-                "content": msg.content
-            })
+        openai_messages = _with_system(self._conversation.build(messages), system)
 
         kwargs = {
             "model": self.model,
@@ -789,24 +938,26 @@ class CustomLLMProvider(LLMProvider):
                 pass  # Skip tools if conversion fails
 
         try:
-            response = self.client.chat.completions.create(**kwargs)
+            response = self._retry_with_backoff(self.client.chat.completions.create, **kwargs)
             return self._parse_response(response)
 
         except Exception as e:
             # Try without tools if it failed
-            if "tools" in kwargs:
+            if "tools" in kwargs and not getattr(e, "retryable", False):
                 del kwargs["tools"]
                 try:
-                    response = self.client.chat.completions.create(**kwargs)
+                    response = self._retry_with_backoff(self.client.chat.completions.create, **kwargs)
                     return self._parse_response(response)
                 except Exception as e2:
                     return LLMResponse(
                         content=f"[Error] {str(e2)}",
-                        stop_reason="error"
+                        stop_reason="error",
+                        error=e2
                     )
             return LLMResponse(
                 content=f"[Error] {str(e)}",
-                stop_reason="error"
+                stop_reason="error",
+                error=e
             )
 
     def _convert_tools(self, anthropic_tools: list[dict]) -> list[dict]:
@@ -862,9 +1013,11 @@ class CustomLLMProvider(LLMProvider):
         return LLMResponse(
             content=content,
             tool_calls=tool_calls,
-            stop_reason=getattr(choice, 'finish_reason', 'stop') or 'stop'
+            stop_reason=getattr(choice, 'finish_reason', 'stop') or 'stop',
+            **_token_usage(getattr(response, "usage", None))
         )
 
+    @measured
     def continue_with_tool_results(
         self,
         messages: list[Message],
@@ -879,51 +1032,8 @@ class CustomLLMProvider(LLMProvider):
                 stop_reason="error"
             )
 
-        import json
-
-        openai_messages = []
-
-        if system:
-            openai_messages.append({"role": "system", "content": system})
-
-        for msg in messages:
-            if msg.role == "system":
-                continue
-            openai_messages.append({
-                "role": msg.role,
-                "content": msg.content
-            })
-
-        # Add ALL tool rounds (accumulated history)
-        for rnd in tool_rounds:
-            assistant_content = rnd.get("content", "")
-            tool_calls = rnd.get("tool_calls", [])
-            tool_results = rnd.get("results", [])
-
-            # Add assistant message with tool calls
-            assistant_tool_calls = []
-            for tc in tool_calls:
-                assistant_tool_calls.append({
-                    "id": tc.id,
-                    "type": "function",
-                    "function": {
-                        "name": tc.name,
-                        "arguments": json.dumps(tc.arguments)
-                    }
-                })
-            openai_messages.append({
-                "role": "assistant",
-                "content": assistant_content or None,
-                "tool_calls": assistant_tool_calls
-            })
-
-            # Add tool result messages
-            for result in tool_results:
-                openai_messages.append({
-                    "role": "tool",
-                    "tool_call_id": result.tool_id,
-                    "content": result.content
-                })
+        # Only rounds added since the previous call are serialized
+        openai_messages = _with_system(self._conversation.build(messages, tool_rounds), system)
 
         kwargs = {
             "model": self.model,
@@ -939,26 +1049,29 @@ class CustomLLMProvider(LLMProvider):
                 pass
 
         try:
-            response = self.client.chat.completions.create(**kwargs)
+            response = self._retry_with_backoff(self.client.chat.completions.create, **kwargs)
             return self._parse_response(response)
 
         except Exception as e:
             # Try without tools if it failed
-            if "tools" in kwargs:
+            if "tools" in kwargs and not getattr(e, "retryable", False):
                 del kwargs["tools"]
                 try:
-                    response = self.client.chat.completions.create(**kwargs)
+                    response = self._retry_with_backoff(self.client.chat.completions.create, **kwargs)
                     return self._parse_response(response)
                 except Exception as e2:
                     return LLMResponse(
                         content=f"[Error] {str(e2)}",
-                        stop_reason="error"
+                        stop_reason="error",
+                        error=e2
                     )
             return LLMResponse(
                 content=f"[Error] {str(e)}",
-                stop_reason="error"
+                stop_reason="error",
+                error=e
             )
 
+    @measured
     def chat_stream(
         self,
         messages: list[Message],
@@ -974,17 +1087,7 @@ class CustomLLMProvider(LLMProvider):
 
         import json as json_module
 
-        openai_messages = []
-        if system:
-            openai_messages.append({"role": "system", "content": system})
-
-        for msg in messages:
-            if msg.role == "system":
-                continue
-            openai_messages.append({
-                "role": msg.role,
-                "content": msg.content
-            })
+        openai_messages = _with_system(self._conversation.build(messages), system)
 
         kwargs = {
             "model": self.model,
@@ -1005,13 +1108,15 @@ class CustomLLMProvider(LLMProvider):
             tool_calls_result = []
             current_tool_calls = {}
 
-            stream = self.client.chat.completions.create(**kwargs)
+            stream = self._retry_with_backoff(self.client.chat.completions.create, **kwargs)
 
             for chunk in stream:
                 if not chunk.choices:
                     continue
 
                 delta = chunk.choices[0].delta
+                if delta.content or delta.tool_calls:
+                    mark_first_token()
 
                 if hasattr(delta, 'content') and delta.content:
                     sys.stdout.write(delta.content)
@@ -1068,18 +1173,20 @@ class CustomLLMProvider(LLMProvider):
 
         except Exception as e:
             # Fall back to non-streaming if streaming fails
-            if "stream" in kwargs:
+            if "stream" in kwargs and not getattr(e, "retryable", False):
                 del kwargs["stream"]
                 try:
-                    response = self.client.chat.completions.create(**kwargs)
+                    response = self._retry_with_backoff(self.client.chat.completions.create, **kwargs)
                     return self._parse_response(response)
                 except:
                     pass
             return LLMResponse(
                 content=f"[Error] {str(e)}",
-                stop_reason="error"
+                stop_reason="error",
+                error=e
             )
 
+    @measured
     def continue_with_tool_results_stream(
         self,
         messages: list[Message],
@@ -1096,45 +1203,8 @@ class CustomLLMProvider(LLMProvider):
 
         import json as json_module
 
-        openai_messages = []
-        if system:
-            openai_messages.append({"role": "system", "content": system})
-
-        for msg in messages:
-            if msg.role == "system":
-                continue
-            openai_messages.append({
-                "role": msg.role,
-                "content": msg.content
-            })
-
-        for rnd in tool_rounds:
-            assistant_content = rnd.get("content", "")
-            tool_calls_list = rnd.get("tool_calls", [])
-            tool_results = rnd.get("results", [])
-
-            assistant_tool_calls = []
-            for tc in tool_calls_list:
-                assistant_tool_calls.append({
-                    "id": tc.id,
-                    "type": "function",
-                    "function": {
-                        "name": tc.name,
-                        "arguments": json_module.dumps(tc.arguments)
-                    }
-                })
-            openai_messages.append({
-                "role": "assistant",
-                "content": assistant_content or None,
-                "tool_calls": assistant_tool_calls
-            })
-
-            for result in tool_results:
-                openai_messages.append({
-                    "role": "tool",
-                    "tool_call_id": result.tool_id,
-                    "content": result.content
-                })
+        # Only rounds added since the previous call are serialized
+        openai_messages = _with_system(self._conversation.build(messages, tool_rounds), system)
 
         kwargs = {
             "model": self.model,
@@ -1155,13 +1225,15 @@ class CustomLLMProvider(LLMProvider):
             tool_calls_result = []
             current_tool_calls = {}
 
-            stream = self.client.chat.completions.create(**kwargs)
+            stream = self._retry_with_backoff(self.client.chat.completions.create, **kwargs)
 
             for chunk in stream:
                 if not chunk.choices:
                     continue
 
                 delta = chunk.choices[0].delta
+                if delta.content or delta.tool_calls:
+                    mark_first_token()
 
                 if hasattr(delta, 'content') and delta.content:
                     sys.stdout.write(delta.content)
@@ -1218,14 +1290,15 @@ class CustomLLMProvider(LLMProvider):
 
         except Exception as e:
             # Fall back to non-streaming
-            if "stream" in kwargs:
+            if "stream" in kwargs and not getattr(e, "retryable", False):
                 del kwargs["stream"]
                 try:
-                    response = self.client.chat.completions.create(**kwargs)
+                    response = self._retry_with_backoff(self.client.chat.completions.create, **kwargs)
                     return self._parse_response(response)
                 except:
                     pass
             return LLMResponse(
                 content=f"[Error] {str(e)}",
-                stop_reason="error"
+                stop_reason="error",
+                error=e
             )
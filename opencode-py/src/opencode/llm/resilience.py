@@ -0,0 +1,163 @@
+"""Resilience for LLM requests - backoff timing and a circuit breaker.
+
+Providers retry transient failures (rate limits, overloaded servers,
+dropped connections) in LLMProvider._retry_with_backoff. This module holds
+the policy: how long to wait before each retry, and when to stop sending
+requests to a provider that keeps failing.
+
+Waits use "full jitter" exponential backoff: a random time between zero
+and base * 2**attempt. Clients that were rate limited together then come
+back spread out instead of all at once. A retry-after from the server is
+a lower bound on the wait.
+"""
+
+import random
+import threading
+import time
+from typing import Optional
+
+
+# Longest wait between two attempts, unless the server asks for longer
+MAX_RETRY_DELAY = 30.0
+
+# The circuit opens after this many consecutive failed requests ...
+FAILURE_THRESHOLD = 3
+# ... and lets a trial request through again after this many seconds
+RESET_TIMEOUT = 30.0
+
+
+def backoff_delay(
+    attempt: int,
+    base_delay: float,
+    retry_after: float = 0,
+    max_delay: float = MAX_RETRY_DELAY,
+) -> float:
+    """Seconds to wait before retry number `attempt` (0-based).
+
+    Args:
+        attempt: Retries made so far.
+        base_delay: Upper bound of the first wait.
+        retry_after: Minimum wait requested by the server (0 if none).
+        max_delay: Cap on the backoff (retry_after may exceed it).
+    """
+    delay = random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+    return max(delay, retry_after)
+
+
+def retry_after_seconds(response) -> float:
+    """Read the wait requested by a 429/529 response's headers (0 if none).
+
+    Understands retry-after-ms and retry-after in seconds; an HTTP date is
+    ignored and the backoff used instead.
+    """
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return 0
+    for header, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+        value = headers.get(header)
+        if value is None:
+            continue
+        try:
+            seconds = float(value) * scale
+        except (TypeError, ValueError):
+            continue
+        if seconds >= 0:
+            return seconds
+    return 0
+
+
+def is_transport_error(e: Exception) -> bool:
+    """Check whether an exception is a network failure (connection reset, timeout).
+
+    Streams raise these directly when a connection drops mid-response.
+    """
+    if isinstance(e, (ConnectionError, TimeoutError)):
+        return True
+    try:
+        import httpx
+    except ImportError:
+        return False
+    return isinstance(e, httpx.TransportError)
+
+
+class CircuitBreaker:
+    """Fails requests fast while a provider is down.
+
+    Closed: requests go through. After `failure_threshold` consecutive
+    failed requests the circuit opens and requests are refused for
+    `reset_timeout` seconds. Then it is half-open: one trial request goes
+    through, and its outcome closes the circuit or opens it again.
+
+    Args:
+        failure_threshold: Consecutive failures that open the circuit.
+        reset_timeout: Seconds the circuit stays open.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, failure_threshold: int = FAILURE_THRESHOLD, reset_timeout: float = RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self._opened_at < self.reset_timeout:
+            return self.OPEN
+        return self.HALF_OPEN
+
+    def retry_in(self) -> float:
+        """Seconds until the open circuit lets a trial request through."""
+        if self._opened_at is None:
+            return 0
+        return max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+
+    def allow(self) -> bool:
+        """Check whether a request may be sent now."""
+        return self.admit() is not None
+
+    def admit(self) -> Optional[bool]:
+        """Let a request through if the circuit allows it.
+
+        Returns:
+            None if the request is refused, else whether it is the
+            half-open trial (which the caller must end with
+            record_success(), record_failure() or release()).
+        """
+        with self._lock:
+            state = self.state
+            if state == self.CLOSED:
+                return False
+            if state == self.HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return True
+            return None
+
+    def release(self) -> None:
+        """Give back the trial of a request that ended without an outcome.
+
+        A cancelled or interrupted trial says nothing about the provider;
+        the next request becomes the trial instead.
+        """
+        with self._lock:
+            self._trial_running = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self._trial_running or self.failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._trial_running = False
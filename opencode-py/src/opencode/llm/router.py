@@ -0,0 +1,345 @@
+"""Router provider - spreads requests over several configured LLM backends.
+
+Each backend is an ordinary LLMProvider (Anthropic, OpenAI, a local
+CustomLLMProvider) plus the task classes it serves. The REPL sets the
+router's task_class before each request: simple chats and review phases
+can go to a cheap or local model, everything else to the main one.
+
+Among the backends that serve a task, the router prefers them in config
+order but skips ahead past backends that are currently slow or whose
+circuit breaker is open. Speed is judged by time to first token and output
+tokens per second rather than whole-response latency, so a backend that
+happened to get long generations doesn't look slow. Samples expire after
+SAMPLE_MAX_AGE seconds: a backend demoted as slow gets no traffic, so once
+its samples are gone it is tried (and measured) again. When a request
+fails with a transient error (rate limit, dropped connection, overloaded
+server, open circuit) it is sent to the next backend instead.
+"""
+
+import math
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from opencode.llm.base import (
+    CircuitOpenError,
+    LLMProvider,
+    LLMResponse,
+    Message,
+    ToolCall,
+)
+from opencode.llm.resilience import CircuitBreaker
+
+
+# Task classes set by the REPL
+TASK_SIMPLE = "simple"    # Short chats that scored low for complexity
+TASK_COMPLEX = "complex"  # Everything else (planning, editing, long tasks)
+TASK_REVIEW = "review"    # Chats in REVIEW mode, including /review all phases
+TASK_CLASSES = (TASK_SIMPLE, TASK_COMPLEX, TASK_REVIEW)
+
+# Complexity score below which a chat counts as simple
+SIMPLE_SCORE = 0.2
+
+# Responses kept per backend for the rolling percentiles
+LATENCY_WINDOW = 50
+
+# Seconds a response counts towards a backend's percentiles
+SAMPLE_MAX_AGE = 300.0
+
+# A backend is slow when its p95 time to first token exceeds the fastest
+# backend's, or its median tokens per second falls short of the best one's,
+# by this factor
+SLOW_FACTOR = 2.0
+
+
+def _percentile(values, pct: float) -> float:
+    """Nearest-rank percentile (0 if empty)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+@dataclass
+class Sample:
+    """Timings of one successful response."""
+
+    at: float  # Clock time when the response arrived
+    latency: float
+    ttft: float  # 0 if not streamed
+    rate: float  # Output tokens per second (0 if unknown)
+
+
+@dataclass
+class Backend:
+    """One provider the router can send requests to.
+
+    Args:
+        name: Label shown in /stats and debug output.
+        provider: The provider that makes the requests.
+        tasks: Task classes this backend serves (empty = all).
+    """
+
+    name: str
+    provider: LLMProvider
+    tasks: frozenset[str] = frozenset()
+    samples: deque = field(default_factory=lambda: deque(maxlen=LATENCY_WINDOW))
+    requests: int = 0
+    failures: int = 0
+
+    def serves(self, task: str) -> bool:
+        return not self.tasks or task in self.tasks
+
+    def record(self, response: LLMResponse, now: float) -> None:
+        """Add a successful response's timings."""
+        self.samples.append(Sample(now, response.latency, response.ttft, response.tokens_per_second))
+
+    def expire(self, now: float) -> None:
+        """Forget samples older than SAMPLE_MAX_AGE."""
+        while self.samples and now - self.samples[0].at > SAMPLE_MAX_AGE:
+            self.samples.popleft()
+
+    @property
+    def latencies(self) -> list[float]:
+        return [sample.latency for sample in self.samples]
+
+    @property
+    def p50(self) -> float:
+        return _percentile(self.latencies, 50)
+
+    @property
+    def p95(self) -> float:
+        return _percentile(self.latencies, 95)
+
+    @property
+    def ttft_p95(self) -> float:
+        return _percentile([sample.ttft for sample in self.samples if sample.ttft > 0], 95)
+
+    @property
+    def rate_p50(self) -> float:
+        return _percentile([sample.rate for sample in self.samples if sample.rate > 0], 50)
+
+    @property
+    def circuit_open(self) -> bool:
+        return self.provider.circuit.state == CircuitBreaker.OPEN
+
+
+class RouterProvider(LLMProvider):
+    """Routes each request to one of several backends.
+
+    Args:
+        backends: Backends in order of preference.
+        debug: Log routing decisions.
+
+    Attributes:
+        task_class: Task class of the next requests (one of TASK_CLASSES).
+        clock: Time source for sample ages (seconds).
+    """
+
+    native_async = True
+    provider_name = "Router"
+
+    def __init__(self, backends: list[Backend], debug: bool = False):
+        self.backends = list(backends)
+        self.debug = debug
+        self.task_class = TASK_COMPLEX
+        self.clock: Callable[[], float] = time.monotonic
+        self._last: Optional[Backend] = None
+
+    # Settings that belong to the backends doing the requests
+
+    @property
+    def max_retries(self) -> int:
+        return self.backends[0].provider.max_retries if self.backends else 0
+
+    @max_retries.setter
+    def max_retries(self, value: int) -> None:
+        for backend in self.backends:
+            backend.provider.max_retries = value
+
+    @property
+    def metrics_listener(self) -> Optional[Callable[[LLMProvider, str, LLMResponse], None]]:
+        return self.backends[0].provider.metrics_listener if self.backends else None
+
+    @metrics_listener.setter
+    def metrics_listener(self, listener) -> None:
+        for backend in self.backends:
+            backend.provider.metrics_listener = listener
+
+    @property
+    def tool_call_listener(self) -> Optional[Callable[[ToolCall, int], None]]:
+        return self.backends[0].provider.tool_call_listener if self.backends else None
+
+    @tool_call_listener.setter
+    def tool_call_listener(self, listener) -> None:
+        for backend in self.backends:
+            backend.provider.tool_call_listener = listener
+
+    @property
+    def model(self) -> str:
+        """Model of the first configured backend for the current task class.
+
+        Depends only on config and task class (not on latency or failures),
+        so it can be part of a stable cache key.
+        """
+        backend = next((b for b in self.backends if b.serves(self.task_class)), None)
+        backend = backend or (self.backends[0] if self.backends else None)
+        return getattr(backend.provider, "model", "") if backend else ""
+
+    def is_available(self) -> bool:
+        return any(b.provider.is_available() for b in self.backends)
+
+    # =========================================================================
+    # Routing
+    # =========================================================================
+
+    def candidates(self, sticky: bool = False) -> list[Backend]:
+        """Backends to try for the next request, best first.
+
+        Args:
+            sticky: Put the backend that answered last first (tool-loop
+                continuations stay on one model while it keeps working).
+        """
+        available = [b for b in self.backends if b.provider.is_available()]
+        # No backend configured for this task: any available one will do
+        eligible = [b for b in available if b.serves(self.task_class)] or available
+
+        now = self.clock()
+        for backend in eligible:
+            backend.expire(now)
+        fastest_ttft = min((b.ttft_p95 for b in eligible if b.ttft_p95), default=0.0)
+        best_rate = max((b.rate_p50 for b in eligible), default=0.0)
+
+        def rank(backend: Backend) -> int:
+            if backend.circuit_open:
+                return 2
+            if fastest_ttft and backend.ttft_p95 > SLOW_FACTOR * fastest_ttft:
+                return 1
+            if backend.rate_p50 and backend.rate_p50 * SLOW_FACTOR < best_rate:
+                return 1
+            return 0
+
+        ordered = sorted(eligible, key=rank)  # Stable: config order within a rank
+        if sticky and self._last in ordered and not self._last.circuit_open:
+            ordered.remove(self._last)
+            ordered.insert(0, self._last)
+        return ordered
+
+    def _should_fail_over(self, backend: Backend, response: LLMResponse) -> bool:
+        """Record a backend's response and decide whether to try the next one."""
+        backend.requests += 1
+        if response.stop_reason == "error":
+            backend.failures += 1
+            error = response.error
+            if getattr(error, "retryable", False) or isinstance(error, CircuitOpenError):
+                self._log_debug("FAILOVER", f"{backend.name}: {error}")
+                return True
+        else:
+            backend.record(response, self.clock())
+        self._last = backend
+        return False
+
+    def _no_backend(self) -> LLMResponse:
+        return LLMResponse(
+            content=f"[Error] No LLM backend available for {self.task_class} tasks.",
+            stop_reason="error",
+        )
+
+    def _route(self, call: str, sticky: bool, *args) -> LLMResponse:
+        response = None
+        for backend in self.candidates(sticky):
+            # Backends that can't stream answer the non-streaming call
+            method = getattr(backend.provider, call, None) or getattr(
+                backend.provider, call.removesuffix("_stream")
+            )
+            self._log_debug("ROUTE", f"{call} [{self.task_class}] -> {backend.name}")
+            response = method(*args)
+            if not self._should_fail_over(backend, response):
+                return response
+        return response or self._no_backend()
+
+    async def _aroute(self, call: str, sticky: bool, *args) -> LLMResponse:
+        response = None
+        for backend in self.candidates(sticky):
+            self._log_debug("ROUTE", f"{call} [{self.task_class}] -> {backend.name}")
+            response = await getattr(backend.provider, call)(*args)
+            if not self._should_fail_over(backend, response):
+                return response
+        return response or self._no_backend()
+
+    # =========================================================================
+    # Provider API. Not @measured: each backend measures its own requests
+    # and reports them to the shared metrics_listener.
+    # =========================================================================
+
+    def chat(self, messages: list[Message], tools: list[dict] = None, system: str = None) -> LLMResponse:
+        return self._route("chat", False, messages, tools, system)
+
+    def chat_stream(self, messages: list[Message], tools: list[dict] = None, system: str = None) -> LLMResponse:
+        return self._route("chat_stream", False, messages, tools, system)
+
+    def continue_with_tool_results(
+        self,
+        messages: list[Message],
+        tool_rounds: list[dict],
+        tools: list[dict] = None,
+        system: str = None,
+    ) -> LLMResponse:
+        return self._route("continue_with_tool_results", True, messages, tool_rounds, tools, system)
+
+    def continue_with_tool_results_stream(
+        self,
+        messages: list[Message],
+        tool_rounds: list[dict],
+        tools: list[dict] = None,
+        system: str = None,
+    ) -> LLMResponse:
+        return self._route("continue_with_tool_results_stream", True, messages, tool_rounds, tools, system)
+
+    async def achat(self, messages: list[Message], tools: list[dict] = None, system: str = None) -> LLMResponse:
+        return await self._aroute("achat", False, messages, tools, system)
+
+    async def achat_stream(self, messages: list[Message], tools: list[dict] = None, system: str = None) -> LLMResponse:
+        return await self._aroute("achat_stream", False, messages, tools, system)
+
+    async def acontinue_with_tool_results(
+        self,
+        messages: list[Message],
+        tool_rounds: list[dict],
+        tools: list[dict] = None,
+        system: str = None,
+    ) -> LLMResponse:
+        return await self._aroute("acontinue_with_tool_results", True, messages, tool_rounds, tools, system)
+
+    async def acontinue_with_tool_results_stream(
+        self,
+        messages: list[Message],
+        tool_rounds: list[dict],
+        tools: list[dict] = None,
+        system: str = None,
+    ) -> LLMResponse:
+        return await self._aroute(
+            "acontinue_with_tool_results_stream", True, messages, tool_rounds, tools, system
+        )
+
+    def describe(self) -> str:
+        """Per-backend summary for /stats."""
+        lines = ["Backends:"]
+        for backend in self.backends:
+            tasks = ", ".join(sorted(backend.tasks)) or "all tasks"
+            line = f"  {backend.name} ({tasks}): {backend.requests} requests"
+            if backend.failures:
+                line += f", {backend.failures} failed"
+            if backend.samples:
+                line += f", p50 {backend.p50:.2f}s, p95 {backend.p95:.2f}s"
+            if backend.ttft_p95:
+                line += f", first token p95 {backend.ttft_p95:.2f}s"
+            if backend.rate_p50:
+                line += f", {backend.rate_p50:.0f} tok/s"
+            if not backend.provider.is_available():
+                line += " [unavailable]"
+            elif backend.circuit_open:
+                line += " [circuit open]"
+            lines.append(line)
+        return "\n".join(lines)
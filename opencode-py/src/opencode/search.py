@@ -0,0 +1,389 @@
+"""Search engine shared by the content search tools.
+
+Two layers:
+
+- Scanning: a file is read as raw bytes, rejected without decoding if it
+  cannot contain a required literal, and otherwise searched with a single
+  regex pass over the whole buffer. Lines (and their context) are only
+  materialized around actual hits.
+- Parallelism: Python's `re` holds the GIL while matching, so multi-core
+  search needs processes. Files are sent to a shared, long-lived pool in
+  batches; results come back in input order, and a consumer that stops
+  iterating (e.g. once max_results is reached) cancels every batch that
+  has not started yet.
+"""
+
+import mmap
+import os
+import re
+import threading
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Iterator, Optional, Sequence
+
+if TYPE_CHECKING:
+    # Imports multiprocessing; deferred to the first parallel search
+    from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from re import _constants as sre_constants, _parser as sre_parse  # Python 3.11+
+except ImportError:
+    import sre_constants
+    import sre_parse
+
+
+# Below this many files a pool costs more than it saves
+PARALLEL_MIN_FILES = 256
+
+# Files per task sent to a worker
+BATCH_SIZE = 64
+
+# Batches in flight per worker (bounds wasted work after early cancellation)
+BATCHES_PER_WORKER = 2
+
+# Files at least this large are probed through mmap instead of read()
+MMAP_MIN_BYTES = 1024 * 1024
+
+# Regex syntax whose meaning depends on seeing exactly one line: anchors to
+# the whole string, and negative lookarounds (which can fail on the line
+# break next to a line that matches on its own, e.g. 'foo(?!\s)')
+_LINE_ONLY_SYNTAX = re.compile(r"\\[AZ]|\(\?<?!")
+
+# Line boundaries str.splitlines() honours besides '\n'
+_OTHER_LINE_BREAKS = re.compile("[\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]")
+
+_REGEX_META = set(".^$*+?{}[]\\|()")
+
+# ASCII letters that also match non-ASCII characters when ignoring case
+# (e.g. 'k' matches KELVIN SIGN), so they can't be folded at the byte level
+_UNSAFE_FOLD = set("iks")
+
+_pool: "ProcessPoolExecutor" = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+# -----------------------------------------------------------------------------
+# Scanning
+# -----------------------------------------------------------------------------
+
+def read_text(path: Path, literal: Optional[bytes] = None) -> Optional[str]:
+    """Read a file the way Path.read_text(errors="ignore") would.
+
+    Args:
+        path: File to read.
+        literal: Bytes every match must contain. Files without it are
+            rejected before decoding.
+
+    Returns:
+        The decoded text with universal newlines, or None if the file
+        cannot contain `literal`.
+    """
+    with open(path, "rb") as f:
+        if literal and os.fstat(f.fileno()).st_size >= MMAP_MIN_BYTES:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if mm.find(literal) == -1:
+                    return None
+                text = str(mm, "utf-8", "ignore")
+        else:
+            data = f.read()
+            if literal and literal not in data:
+                return None
+            text = data.decode("utf-8", errors="ignore")
+
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
+def required_literal(regex: re.Pattern) -> Optional[bytes]:
+    """Get the UTF-8 bytes every match of a plain-literal pattern contains.
+
+    Returns:
+        The literal, or None if the pattern uses regex syntax or ignores case.
+    """
+    if regex.flags & re.IGNORECASE or any(c in _REGEX_META for c in regex.pattern):
+        return None
+    return regex.pattern.encode("utf-8") or None
+
+
+def regex_literals(regex: re.Pattern) -> list[list[str]]:
+    """Extract literal strings that every match of a regex must contain.
+
+    The result is a conjunction of clauses: each clause lists alternatives,
+    one of which appears in any match (e.g. `TODO|FIXME` gives one clause
+    with two literals). Parts of the pattern that ignore case only contribute
+    ASCII characters whose case folding stays ASCII, so literals can be
+    checked against ASCII-lowercased bytes. Patterns that can't be parsed
+    yield no clauses.
+
+    Returns:
+        List of clauses, each a list of literals.
+    """
+    try:
+        parsed = sre_parse.parse(regex.pattern, regex.flags)
+    except Exception:
+        return []
+    clauses: list[list[str]] = []
+    _collect_literals(list(parsed), clauses, bool(regex.flags & re.IGNORECASE))
+    return clauses
+
+
+def _collect_literals(items: list, clauses: list[list[str]], ignore_case: bool) -> None:
+    """Walk a parsed regex, appending required literal clauses."""
+    run: list[str] = []
+
+    def flush() -> None:
+        if run:
+            clauses.append(["".join(run)])
+            run.clear()
+
+    for op, av in items:
+        if op is sre_constants.LITERAL:
+            char = chr(av)
+            if ignore_case and (not char.isascii() or char.lower() in _UNSAFE_FOLD):
+                flush()
+            else:
+                run.append(char)
+        elif op is sre_constants.SUBPATTERN:
+            flush()
+            _, add_flags, del_flags, sub = av
+            group_ignore_case = (ignore_case or bool(add_flags & re.IGNORECASE)) \
+                and not del_flags & re.IGNORECASE
+            _collect_literals(list(sub), clauses, group_ignore_case)
+        elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT,
+                    getattr(sre_constants, "POSSESSIVE_REPEAT", None)):
+            flush()
+            low, _, sub = av
+            if low >= 1:
+                _collect_literals(list(sub), clauses, ignore_case)
+        elif op is sre_constants.BRANCH:
+            flush()
+            # Each alternative contributes its longest required literal
+            alternatives = []
+            for alternative in av[1]:
+                sub_clauses: list[list[str]] = []
+                _collect_literals(list(alternative), sub_clauses, ignore_case)
+                singles = [c[0] for c in sub_clauses if len(c) == 1]
+                if not singles:
+                    alternatives = []
+                    break
+                alternatives.append(max(singles, key=len))
+            if alternatives:
+                clauses.append(alternatives)
+        else:
+            flush()
+    flush()
+
+
+def buffer_scanner(regex: re.Pattern) -> Optional[re.Pattern]:
+    """Compile a whole-buffer scanner for a per-line regex.
+
+    Returns:
+        The pattern with MULTILINE added, or None if the pattern can only be
+        applied one line at a time (\\A, \\Z, negative lookarounds).
+    """
+    if _LINE_ONLY_SYNTAX.search(regex.pattern):
+        return None
+    return re.compile(regex.pattern, regex.flags | re.MULTILINE)
+
+
+@dataclass
+class LineMatch:
+    """A line containing a match, with lazy access to surrounding lines."""
+    line_num: int
+    line: str
+    _text: str = ""
+    _start: int = 0
+    _end: int = 0
+    _lines: Optional[list[str]] = None
+
+    def before(self, count: int) -> list[tuple[int, str]]:
+        """Get up to `count` (line_num, line) pairs preceding this line."""
+        if self._lines is not None:
+            first = max(0, self.line_num - 1 - count)
+            return [(i + 1, self._lines[i]) for i in range(first, self.line_num - 1)]
+
+        result = []
+        end = self._start - 1  # The '\n' that ends the previous line
+        line_num = self.line_num
+        while count > 0 and end >= 0:
+            start = self._text.rfind("\n", 0, end) + 1
+            line_num -= 1
+            result.append((line_num, self._text[start:end]))
+            end = start - 1
+            count -= 1
+        result.reverse()
+        return result
+
+    def after(self, count: int) -> list[tuple[int, str]]:
+        """Get up to `count` (line_num, line) pairs following this line."""
+        if self._lines is not None:
+            last = min(len(self._lines), self.line_num + count)
+            return [(i + 1, self._lines[i]) for i in range(self.line_num, last)]
+
+        result = []
+        start = self._end + 1
+        line_num = self.line_num
+        while count > 0 and start < len(self._text):
+            end = self._text.find("\n", start)
+            if end == -1:
+                end = len(self._text)
+            line_num += 1
+            result.append((line_num, self._text[start:end]))
+            start = end + 1
+            count -= 1
+        return result
+
+
+def matching_lines(
+    text: str,
+    regex: re.Pattern,
+    scanner: Optional[re.Pattern] = None,
+) -> Iterator[LineMatch]:
+    """Yield every line of text.splitlines() that regex.search() matches.
+
+    With a scanner (see buffer_scanner) the whole buffer is searched in one
+    pass and only lines around hits are sliced out; each candidate line is
+    confirmed with `regex` itself, so results are identical to a per-line
+    scan. Without one, falls back to splitting the text into lines.
+    """
+    if scanner is None or _OTHER_LINE_BREAKS.search(text):
+        lines = text.splitlines()
+        for i, line in enumerate(lines):
+            if regex.search(line):
+                yield LineMatch(i + 1, line, _lines=lines)
+        return
+
+    size = len(text)
+    pos = 0          # Always the start of a line
+    line_num = 1     # Line number at `pos`
+    while pos < size:
+        m = scanner.search(text, pos)
+        if m is None:
+            return
+        start = text.rfind("\n", pos, m.start()) + 1 or pos
+        if start >= size:
+            return  # Empty match after the final newline
+        line_num += text.count("\n", pos, start)
+        end = text.find("\n", start)
+        if end == -1:
+            end = size
+
+        line = text[start:end]
+        if regex.search(line):
+            yield LineMatch(line_num, line, text, start, end)
+
+        # Resume at the next line so hits spanning lines can't hide later ones
+        pos = end + 1
+        line_num += 1
+
+
+# -----------------------------------------------------------------------------
+# Parallel execution
+# -----------------------------------------------------------------------------
+
+def default_workers() -> int:
+    """Number of worker processes to use when not configured."""
+    return max(1, os.cpu_count() or 1)
+
+
+def _get_pool(workers: int) -> "ProcessPoolExecutor":
+    """Get the shared process pool, (re)creating it for a new worker count."""
+    global _pool, _pool_workers
+    from concurrent.futures import ProcessPoolExecutor
+
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = ProcessPoolExecutor(max_workers=workers)
+            _pool_workers = workers
+        return _pool
+
+
+def shutdown_pool() -> None:
+    """Shut down the shared pool (it is recreated on next use)."""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+        _pool_workers = 0
+
+
+def _run_batch(fn: Callable, batch: Sequence, args: tuple) -> list:
+    """Worker entry point: apply fn to every item of a batch."""
+    return [fn(item, *args) for item in batch]
+
+
+def map_ordered(
+    fn: Callable,
+    items: Sequence,
+    args: tuple = (),
+    workers: int = 0,
+) -> Iterator[tuple[Any, Any]]:
+    """Apply fn(item, *args) to every item, yielding (item, result) in order.
+
+    Runs in the shared process pool when there are enough items to pay for
+    it, sequentially otherwise (or if the pool cannot be used). fn and args
+    must be picklable, so fn has to be a module-level function.
+
+    Closing the iterator early cancels all batches that are still queued.
+
+    Args:
+        fn: Per-item function.
+        items: Items to process.
+        args: Extra positional arguments passed to fn.
+        workers: Worker processes (0 = one per CPU, 1 = sequential).
+
+    Yields:
+        (item, fn(item, *args)) tuples in the order of `items`.
+    """
+    workers = workers or default_workers()
+    if workers <= 1 or len(items) < PARALLEL_MIN_FILES:
+        for item in items:
+            yield item, fn(item, *args)
+        return
+
+    try:
+        pool = _get_pool(workers)
+        from concurrent.futures.process import BrokenProcessPool
+    except (OSError, NotImplementedError, ImportError):
+        # No multiprocessing support here (e.g. restricted sandbox)
+        for item in items:
+            yield item, fn(item, *args)
+        return
+
+    batches = iter([items[i:i + BATCH_SIZE] for i in range(0, len(items), BATCH_SIZE)])
+    pending: deque[tuple[Sequence, Future]] = deque()
+
+    def submit_next() -> None:
+        batch = next(batches, None)
+        if batch is not None:
+            pending.append((batch, pool.submit(_run_batch, fn, batch, args)))
+
+    try:
+        for _ in range(workers * BATCHES_PER_WORKER):
+            submit_next()
+
+        while pending:
+            batch, future = pending.popleft()
+            try:
+                results = future.result()
+            except BrokenProcessPool:
+                # A worker died - finish the rest in this process
+                shutdown_pool()
+                remaining = [batch] + [b for b, _ in pending] + list(batches)
+                pending.clear()
+                for b in remaining:
+                    for item in b:
+                        yield item, fn(item, *args)
+                return
+            submit_next()
+            yield from zip(batch, results)
+    finally:
+        for _, future in pending:
+            future.cancel()
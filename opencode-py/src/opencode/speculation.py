@@ -0,0 +1,70 @@
+"""Speculative tool execution - start read-only tool calls while a response streams.
+
+A streaming provider parses each tool call as soon as its block ends, but
+the tool loop only sees the calls once the whole response has arrived.
+ToolSpeculator listens for parsed calls (LLMProvider.tool_call_listener)
+and starts read-only ones right away on the registry's thread pool, so
+their latency overlaps with the rest of the generation. The tool loop
+then claims the finished (or running) call instead of starting it again.
+
+A read-only call that follows a call needing BUILD mode is never started
+early: it has to see that call's effects, and that call still needs the
+user's permission.
+"""
+
+import threading
+from concurrent.futures import Future
+from typing import TYPE_CHECKING, Optional
+
+from opencode.llm.base import ToolCall
+
+if TYPE_CHECKING:
+    from opencode.tools.registry import ToolRegistry
+
+
+class ToolSpeculator:
+    """Starts read-only tool calls early and hands them to the tool loop."""
+
+    def __init__(self, registry: "ToolRegistry"):
+        self.registry = registry
+        self.started = 0
+        self.claimed = 0
+        self._pending: dict[str, tuple[ToolCall, Future]] = {}
+        self._blocked = False
+        self._lock = threading.Lock()
+
+    def on_tool_call(self, tool_call: ToolCall, position: int) -> None:
+        """Listener for LLMProvider.tool_call_listener."""
+        with self._lock:
+            if position == 0:
+                # New response: calls left over from the last one were never used
+                self._pending.clear()
+                self._blocked = False
+            if self._blocked:
+                return
+            if not self.registry.is_read_only(tool_call.name):
+                self._blocked = True  # Later calls must run after this one
+                return
+
+        [future] = self.registry.submit([(tool_call.name, dict(tool_call.arguments))])
+        with self._lock:
+            self._pending[tool_call.id] = (tool_call, future)
+            self.started += 1
+
+    def claim(self, tool_call: ToolCall) -> Optional[Future]:
+        """Take the early-started run of a call, if there is one.
+
+        Returns:
+            The future of the run, or None if the call was not started
+            early (or was started with different arguments).
+        """
+        with self._lock:
+            started = self._pending.pop(tool_call.id, None)
+        if started is None:
+            return None
+        early_call, future = started
+        if early_call.name != tool_call.name or early_call.arguments != tool_call.arguments:
+            return None
+        with self._lock:
+            self.claimed += 1
+        return future
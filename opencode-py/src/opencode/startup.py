@@ -0,0 +1,160 @@
+"""Startup profiling - where the time before the first prompt goes.
+
+`opencode --startup-profile` runs this module in a fresh interpreter, so
+the measurement is a real cold start rather than the already-imported
+state of the process that was asked. It times every module import (own
+time and including the modules it imports) and the REPL setup, and
+prints the slowest modules and packages.
+
+Run directly with `python -m opencode.startup`.
+"""
+
+import contextlib
+import io
+import os
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+
+# Rows shown per table
+TOP_MODULES = 15
+TOP_PACKAGES = 10
+
+
+@dataclass
+class ImportTiming:
+    """Time spent importing one module."""
+    name: str
+    total: float  # Seconds including the modules it imported
+    own: float  # Seconds in the module's own code
+
+
+class _TimedLoader:
+    """Wraps a module loader to time exec_module()."""
+
+    def __init__(self, loader, profiler: "ImportProfiler"):
+        self._loader = loader
+        self._profiler = profiler
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        profiler = self._profiler
+        profiler._stack.append(0.0)  # Time of nested imports
+        start = time.perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            total = time.perf_counter() - start
+            nested = profiler._stack.pop()
+            if profiler._stack:
+                profiler._stack[-1] += total
+            profiler.timings.append(ImportTiming(module.__name__, total, total - nested))
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+
+class ImportProfiler:
+    """Meta path finder that times the imports made while installed.
+
+    Wraps the loader found by the other finders; modules imported before
+    install() (or already in sys.modules) are not measured.
+    """
+
+    def __init__(self):
+        self.timings: list[ImportTiming] = []
+        self._stack: list[float] = []
+
+    def find_spec(self, name, path=None, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(name, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                    spec.loader = _TimedLoader(spec.loader, self)
+                return spec
+        return None
+
+    def install(self) -> None:
+        sys.meta_path.insert(0, self)
+
+    def uninstall(self) -> None:
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def by_package(self) -> list[tuple[str, float]]:
+        """Own import time summed per top-level package, slowest first."""
+        totals: dict[str, float] = {}
+        for timing in self.timings:
+            package = timing.name.partition(".")[0]
+            totals[package] = totals.get(package, 0.0) + timing.own
+        return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+    def slowest(self, count: int = TOP_MODULES) -> list[ImportTiming]:
+        """Modules with the most own import time."""
+        return sorted(self.timings, key=lambda t: t.own, reverse=True)[:count]
+
+
+def _ms(seconds: float) -> str:
+    return f"{seconds * 1000:8.1f} ms"
+
+
+def render(profiler: ImportProfiler, phases: list[tuple[str, float]]) -> str:
+    """The startup profile report."""
+    lines = ["Startup profile", "=" * 60]
+    for phase, seconds in phases:
+        lines.append(f"{phase:<40} {_ms(seconds)}")
+    lines.append(f"{'Total':<40} {_ms(sum(s for _, s in phases))}")
+
+    lines += ["", f"Imports by package ({len(profiler.timings)} modules)", "-" * 60]
+    for package, seconds in profiler.by_package()[:TOP_PACKAGES]:
+        lines.append(f"{package:<40} {_ms(seconds)}")
+
+    lines += ["", "Slowest modules (own time / with imports)", "-" * 60]
+    for timing in profiler.slowest():
+        lines.append(f"{timing.name:<40} {_ms(timing.own)} / {_ms(timing.total).strip()}")
+    return "\n".join(lines)
+
+
+def profile_startup() -> str:
+    """Import the CLI and set up a REPL the way `opencode` does, timing each step."""
+    profiler = ImportProfiler()
+    phases = []
+    profiler.install()
+    try:
+        start = time.perf_counter()
+        from opencode.cli import OpenCodeREPL
+        phases.append(("Import opencode.cli", time.perf_counter() - start))
+
+        # Setup messages (config, workspace) are not part of the report
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            OpenCodeREPL()
+        phases.append(("Create REPL (config, workspace, tools)", time.perf_counter() - start))
+    finally:
+        profiler.uninstall()
+    return render(profiler, phases)
+
+
+def run_profile(python: Optional[str] = None) -> int:
+    """Profile startup in a new interpreter and print the report.
+
+    Returns:
+        The child process's exit code.
+    """
+    # The child must import this same copy of opencode
+    source_root = str(Path(__file__).resolve().parent.parent)
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(p for p in (source_root, env.get("PYTHONPATH")) if p)
+    return subprocess.call([python or sys.executable, "-m", "opencode.startup"], env=env)
+
+
+if __name__ == "__main__":
+    print(profile_startup())
@@ -0,0 +1,411 @@
+"""Symbol table - definitions extracted once per file, queried from memory.
+
+One regex table per language feeds every symbol-aware tool. Each pattern
+is tagged with the queries it answers:
+
+- DEFINITION: find_definition (where is X defined?)
+- SEARCH: find_symbols (which symbols match a query?)
+- OUTLINE: outline and ReadTool's large-file structure view
+
+Files are parsed on first use and cached by (path, mtime, size), so repeat
+queries only stat files; changed files are re-parsed transparently. A
+workspace's table is persisted under .opencode/index/ so a restart doesn't
+re-parse the repository.
+"""
+
+import atexit
+import gzip
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from opencode.file_index import detect_language
+from opencode.search import map_ordered
+
+
+DEFINITION = "definition"
+SEARCH = "search"
+OUTLINE = "outline"
+
+_ALL = (DEFINITION, SEARCH, OUTLINE)
+_DEF_OUTLINE = (DEFINITION, OUTLINE)
+
+# Files whose symbols are kept in memory at once
+MAX_CACHED_FILES = 50_000
+
+SYMBOLS_FILE = "symbols.json.gz"
+SYMBOLS_VERSION = 1
+
+# Newly parsed files before the table is written back to disk
+SAVE_MIN_CHANGES = 64
+
+# Control-flow keywords that look like calls followed by a block
+_NOT_KEYWORD = r"(?!(?:if|for|while|switch|catch|with|return|function)\b)"
+
+# Patterns use named groups: 'name' (required) and 'indent' (optional).
+# Order matters: outline takes the first OUTLINE pattern matching a line.
+SYMBOL_PATTERNS = {
+    "python": [
+        (r"^(?P<indent>\s*)class\s+(?P<name>\w+)\s*[\(:]", "class", _ALL),
+        (r"^(?P<indent>\s*)def\s+(?P<name>\w+)\s*\(", "function", _ALL),
+        (r"^(?P<indent>\s*)async\s+def\s+(?P<name>\w+)\s*\(", "async function", _ALL),
+        (r"^(?P<name>\w+)\s*=", "variable", (DEFINITION, SEARCH)),
+        (r"^\s+(?P<name>\w+)\s*=\s*", "attribute", (DEFINITION,)),
+    ],
+    "javascript": [
+        (r"^(?P<indent>\s*)class\s+(?P<name>\w+)\s*[{\s]", "class", _ALL),
+        (r"^(?P<indent>\s*)function\s+(?P<name>\w+)\s*\(", "function", _ALL),
+        (r"^(?P<indent>\s*)async\s+function\s+(?P<name>\w+)\s*\(", "async function", _ALL),
+        (r"^(?P<indent>\s*)" + _NOT_KEYWORD + r"(?P<name>\w+)\s*\([^)]*\)\s*{", "method", _DEF_OUTLINE),
+        (r"^(?P<indent>\s*)(?P<name>\w+)\s*:\s*function", "method", _DEF_OUTLINE),
+        (r"^(?P<indent>\s*)const\s+(?P<name>\w+)\s*=\s*(?:async\s*)?\([^)]*\)\s*=>", "arrow function", (OUTLINE,)),
+        (r"^\s*const\s+(?P<name>\w+)\s*=", "const", (DEFINITION, SEARCH)),
+        (r"^\s*let\s+(?P<name>\w+)\s*=", "let", (DEFINITION, SEARCH)),
+        (r"^\s*var\s+(?P<name>\w+)\s*=", "var", (DEFINITION, SEARCH)),
+        (r"^\s*export\s+(?:default\s+)?function\s+(?P<name>\w+)", "exported function", (DEFINITION, SEARCH)),
+        (r"^\s*export\s+(?:default\s+)?class\s+(?P<name>\w+)", "exported class", (DEFINITION, SEARCH)),
+        (r"^\s*export\s+(?:const|let|var)\s+(?P<name>\w+)", "exported variable", (DEFINITION,)),
+    ],
+    "typescript": [
+        (r"^(?P<indent>\s*)class\s+(?P<name>\w+)\s*[{\s<]", "class", _ALL),
+        (r"^(?P<indent>\s*)interface\s+(?P<name>\w+)\s*[{\s<]", "interface", _ALL),
+        (r"^(?P<indent>\s*)type\s+(?P<name>\w+)\s*[<=]", "type", _ALL),
+        (r"^(?P<indent>\s*)enum\s+(?P<name>\w+)\s*{", "enum", _ALL),
+        (r"^(?P<indent>\s*)function\s+(?P<name>\w+)\s*[<\(]", "function", _ALL),
+        (r"^(?P<indent>\s*)async\s+function\s+(?P<name>\w+)\s*[<\(]", "async function", _ALL),
+        (r"^(?P<indent>\s*)(?:public|private|protected)?\s*" + _NOT_KEYWORD
+         + r"(?P<name>\w+)\s*\([^)]*\)\s*[{:]", "method", (OUTLINE,)),
+        (r"^\s*const\s+(?P<name>\w+)\s*[=:]", "const", (DEFINITION, SEARCH)),
+        (r"^\s*let\s+(?P<name>\w+)\s*[=:]", "let", (DEFINITION,)),
+        (r"^\s*export\s+(?:default\s+)?function\s+(?P<name>\w+)", "exported function", (DEFINITION, SEARCH)),
+        (r"^\s*export\s+(?:default\s+)?class\s+(?P<name>\w+)", "exported class", (DEFINITION, SEARCH)),
+        (r"^\s*export\s+interface\s+(?P<name>\w+)", "exported interface", (DEFINITION, SEARCH)),
+        (r"^\s*export\s+type\s+(?P<name>\w+)", "exported type", (DEFINITION, SEARCH)),
+    ],
+    "rust": [
+        (r"^(?P<indent>\s*)(?:pub\s+)?struct\s+(?P<name>\w+)\s*[{\s<]", "struct", _ALL),
+        (r"^(?P<indent>\s*)(?:pub\s+)?enum\s+(?P<name>\w+)\s*[{\s<]", "enum", _ALL),
+        (r"^(?P<indent>\s*)(?:pub\s+)?trait\s+(?P<name>\w+)\s*[{\s<:]", "trait", _ALL),
+        (r"^(?P<indent>\s*)impl(?:\s+\w+)?\s+(?:for\s+)?(?P<name>\w+)\s*[{\s<]", "impl", _DEF_OUTLINE),
+        (r"^(?P<indent>\s*)(?:pub\s+)?(?:async\s+)?fn\s+(?P<name>\w+)\s*[<\(]", "function", _ALL),
+        (r"^(?P<indent>\s*)(?:pub\s+)?mod\s+(?P<name>\w+)\s*[{;]", "module", _ALL),
+        (r"^\s*(?:pub\s+)?type\s+(?P<name>\w+)\s*=", "type alias", (DEFINITION, SEARCH)),
+        (r"^\s*(?:pub\s+)?const\s+(?P<name>\w+)\s*:", "const", (DEFINITION,)),
+        (r"^\s*(?:pub\s+)?static\s+(?P<name>\w+)\s*:", "static", (DEFINITION,)),
+    ],
+    "go": [
+        (r"^(?P<indent>\s*)type\s+(?P<name>\w+)\s+struct\b", "struct", _ALL),
+        (r"^(?P<indent>\s*)type\s+(?P<name>\w+)\s+interface\b", "interface", _ALL),
+        (r"^(?P<indent>\s*)func\s+(?P<name>\w+)\s*\(", "function", _ALL),
+        (r"^(?P<indent>\s*)func\s+\([^)]+\)\s+(?P<name>\w+)\s*\(", "method", _ALL),
+        (r"^\s*type\s+(?P<name>\w+)\s+", "type", (DEFINITION,)),
+        (r"^\s*var\s+(?P<name>\w+)\s+", "var", (DEFINITION,)),
+        (r"^\s*const\s+(?P<name>\w+)\s+", "const", (DEFINITION,)),
+    ],
+    "java": [
+        (r"^(?P<indent>\s*)(?:public|private|protected)?\s*(?:static)?\s*class\s+(?P<name>\w+)", "class", _ALL),
+        (r"^(?P<indent>\s*)(?:public|private|protected)?\s*(?:static)?\s*interface\s+(?P<name>\w+)", "interface", _ALL),
+        (r"^(?P<indent>\s*)(?:public|private|protected)?\s*(?:static)?\s*enum\s+(?P<name>\w+)", "enum", _ALL),
+        (r"^(?P<indent>\s*)(?:public|private|protected)?\s*(?:static)?\s*\w+\s+(?P<name>\w+)\s*\(", "method", _DEF_OUTLINE),
+    ],
+    "c": [
+        (r"^(?P<indent>\s*)struct\s+(?P<name>\w+)\s*{", "struct", _DEF_OUTLINE),
+        (r"^(?P<indent>\s*)enum\s+(?P<name>\w+)\s*{", "enum", _DEF_OUTLINE),
+        (r"^(?P<indent>\s*)typedef\s+.*\s+(?P<name>\w+)\s*;", "typedef", _DEF_OUTLINE),
+        (r"^(?P<indent>\s*)(?:static\s+)?(?:inline\s+)?\w+\s*\*?\s*(?P<name>\w+)\s*\([^;]*$", "function", _DEF_OUTLINE),
+    ],
+    "cpp": [
+        (r"^(?P<indent>\s*)class\s+(?P<name>\w+)\s*[{:]", "class", _DEF_OUTLINE),
+        (r"^(?P<indent>\s*)struct\s+(?P<name>\w+)\s*[{:]", "struct", _DEF_OUTLINE),
+        (r"^(?P<indent>\s*)namespace\s+(?P<name>\w+)\s*{", "namespace", _DEF_OUTLINE),
+        (r"^(?P<indent>\s*)enum\s+(?:class\s+)?(?P<name>\w+)\s*{", "enum", _DEF_OUTLINE),
+        (r"^(?P<indent>\s*)(?:virtual\s+)?(?:static\s+)?(?:inline\s+)?\w+\s*\*?\s*(?P<name>\w+)\s*\([^;]*$", "function", _DEF_OUTLINE),
+    ],
+    "ruby": [
+        (r"^(?P<indent>\s*)class\s+(?P<name>\w+)", "class", _DEF_OUTLINE),
+        (r"^(?P<indent>\s*)module\s+(?P<name>\w+)", "module", _DEF_OUTLINE),
+        (r"^(?P<indent>\s*)def\s+(?P<name>\w+)", "method", _DEF_OUTLINE),
+    ],
+}
+
+_compiled: dict[str, list[tuple[re.Pattern, str, tuple[str, ...]]]] = {}
+
+
+@dataclass(frozen=True)
+class SymbolInfo:
+    """A symbol found in a source file."""
+    name: str
+    kind: str
+    line: int
+    indent: int = 0  # Leading whitespace width (tabs count as 4)
+    text: str = ""   # The stripped source line
+
+
+@dataclass(frozen=True)
+class FileSymbols:
+    """Symbols of one file, grouped by the query they answer."""
+    language: str
+    definitions: tuple[SymbolInfo, ...] = ()
+    search: tuple[SymbolInfo, ...] = ()
+    outline: tuple[SymbolInfo, ...] = ()
+
+
+def supports(language: Optional[str], role: str) -> bool:
+    """Check if a language has patterns for a query role."""
+    return any(role in roles for _, _, roles in SYMBOL_PATTERNS.get(language, ()))
+
+
+def _patterns(language: str) -> list[tuple[re.Pattern, str, tuple[str, ...]]]:
+    patterns = _compiled.get(language)
+    if patterns is None:
+        patterns = [(re.compile(p), kind, roles) for p, kind, roles in SYMBOL_PATTERNS[language]]
+        _compiled[language] = patterns
+    return patterns
+
+
+def extract_symbols(content: str, language: str) -> FileSymbols:
+    """Extract symbols from source text in one pass.
+
+    Definitions and search results include every pattern that matches a
+    line; the outline keeps only the first.
+    """
+    if language not in SYMBOL_PATTERNS:
+        return FileSymbols(language)
+
+    patterns = _patterns(language)
+    definitions, search, outline = [], [], []
+
+    # Lines split on "\n" only, numbered like search and lexer matches
+    # (splitlines() would also break at form feeds and Unicode separators)
+    for line_num, line in enumerate(content.split("\n"), 1):
+        in_outline = False
+        for pattern, kind, roles in patterns:
+            match = pattern.match(line)
+            if not match:
+                continue
+
+            indent = match.groupdict().get("indent") or ""
+            symbol = SymbolInfo(
+                name=match.group("name"),
+                kind=kind,
+                line=line_num,
+                indent=len(indent.replace("\t", "    ")),
+                text=line.strip()[:150],
+            )
+            if DEFINITION in roles:
+                definitions.append(symbol)
+            if SEARCH in roles:
+                search.append(symbol)
+            if OUTLINE in roles and not in_outline:
+                outline.append(symbol)
+                in_outline = True
+
+    return FileSymbols(language, tuple(definitions), tuple(search), tuple(outline))
+
+
+def _parse_file(path: Path) -> Optional[tuple[int, int, FileSymbols]]:
+    """Read and parse one file (module-level so worker processes can run it).
+
+    Returns:
+        (mtime_ns, size, symbols), or None if the file can't be read.
+    """
+    language = detect_language(str(path))
+    try:
+        if language not in SYMBOL_PATTERNS:
+            # Nothing to extract: don't read (possibly huge) data or log files
+            st = os.stat(path)
+            return st.st_mtime_ns, st.st_size, FileSymbols(language or "")
+        with open(path, "rb") as f:
+            st = os.fstat(f.fileno())
+            data = f.read()
+    except OSError:
+        return None
+
+    content = data.decode("utf-8", errors="ignore")
+    if "\r" in content:
+        content = content.replace("\r\n", "\n").replace("\r", "\n")
+    return st.st_mtime_ns, st.st_size, extract_symbols(content, language)
+
+
+class SymbolTable:
+    """Cache of per-file symbols keyed by (path, mtime, size)."""
+
+    def __init__(self, path: Optional[Path] = None, max_files: int = MAX_CACHED_FILES):
+        """Initialize the table.
+
+        Args:
+            path: File to persist symbols to (None = memory only).
+            max_files: Files whose symbols are kept at once.
+        """
+        self.path = Path(path) if path else None
+        self.max_files = max_files
+        self._files: OrderedDict[str, tuple[int, int, FileSymbols]] = OrderedDict()
+        self._unsaved = 0
+        self._loaded = False
+        self._lock = threading.Lock()
+
+        if self.path:
+            atexit.register(self.save)
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    def get(self, path: Path) -> Optional[FileSymbols]:
+        """Get the symbols of one file, parsing it if new or changed.
+
+        Returns:
+            The file's symbols, or None if it can't be read.
+        """
+        for _, symbols in self.get_many([path]):
+            return symbols
+        return None
+
+    def get_many(self, paths: Iterable[Path], workers: int = 1) -> Iterator[tuple[Path, FileSymbols]]:
+        """Get symbols for many files, parsing stale ones in parallel.
+
+        Args:
+            paths: Files to look up.
+            workers: Worker processes for parsing (0 = one per CPU).
+
+        Yields:
+            (path, symbols) in the order of `paths`, skipping unreadable files.
+        """
+        paths = list(paths)
+        found: dict[str, FileSymbols] = {}
+        stale = []
+
+        with self._lock:
+            self._load()
+            for path in paths:
+                key = str(path)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    self._files.pop(key, None)
+                    continue
+                cached = self._files.get(key)
+                if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+                    self._files.move_to_end(key)
+                    found[key] = cached[2]
+                else:
+                    stale.append(path)
+
+        if stale:
+            parsed = list(map_ordered(_parse_file, stale, workers=workers))
+            with self._lock:
+                for path, result in parsed:
+                    if result is None:
+                        continue
+                    key = str(path)
+                    self._files[key] = result
+                    self._files.move_to_end(key)
+                    found[key] = result[2]
+                    self._unsaved += 1
+                while len(self._files) > self.max_files:
+                    self._files.popitem(last=False)
+                if self._unsaved >= SAVE_MIN_CHANGES:
+                    self._save()
+
+        for path in paths:
+            symbols = found.get(str(path))
+            if symbols is not None:
+                yield path, symbols
+
+    def definitions(
+        self, name: str, paths: Iterable[Path], workers: int = 1
+    ) -> list[tuple[Path, SymbolInfo]]:
+        """Find definitions of a name (case-insensitive), one per line.
+
+        Returns:
+            (path, symbol) pairs in file order.
+        """
+        wanted = name.lower()
+        results = []
+        for path, symbols in self.get_many(paths, workers):
+            last_line = 0
+            for symbol in symbols.definitions:
+                if symbol.line != last_line and symbol.name.lower() == wanted:
+                    results.append((path, symbol))
+                    last_line = symbol.line  # One match per line is enough
+        return results
+
+    def clear(self) -> None:
+        """Forget all cached symbols."""
+        with self._lock:
+            self._files.clear()
+
+    # -------------------------------------------------------------------------
+    # Persistence
+    # -------------------------------------------------------------------------
+
+    def save(self) -> None:
+        """Write unsaved symbols to disk."""
+        with self._lock:
+            if self._unsaved:
+                self._save()
+
+    def _save(self) -> None:
+        self._unsaved = 0
+        if not self.path:
+            return
+
+        files = {}
+        for key, (mtime_ns, size, symbols) in self._files.items():
+            # Each symbol once; the roles refer to it by position
+            unique = list(dict.fromkeys(symbols.definitions + symbols.search + symbols.outline))
+            position = {symbol: i for i, symbol in enumerate(unique)}
+            files[key] = [
+                mtime_ns, size, symbols.language,
+                [[s.name, s.kind, s.line, s.indent, s.text] for s in unique],
+                [position[s] for s in symbols.definitions],
+                [position[s] for s in symbols.search],
+                [position[s] for s in symbols.outline],
+            ]
+        data = {"version": SYMBOLS_VERSION, "files": files}
+
+        try:
+            self.path.parent.mkdir(exist_ok=True)  # Only inside an existing .opencode
+            tmp = self.path.with_suffix(".tmp")
+            with gzip.open(tmp, "wt", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp, self.path)
+        except OSError:
+            pass  # The table is only a cache
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        if not self.path or not self.path.exists():
+            return
+
+        try:
+            with gzip.open(self.path, "rt", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != SYMBOLS_VERSION:
+                return
+            for key, (mtime_ns, size, language, unique, defs, search, outline) in data["files"].items():
+                unique = [SymbolInfo(*fields) for fields in unique]
+                self._files[key] = (mtime_ns, size, FileSymbols(
+                    language,
+                    tuple(unique[i] for i in defs),
+                    tuple(unique[i] for i in search),
+                    tuple(unique[i] for i in outline),
+                ))
+            while len(self._files) > self.max_files:
+                self._files.popitem(last=False)
+        except (OSError, ValueError, KeyError, TypeError, IndexError, EOFError):
+            self._files.clear()  # Corrupt table - rebuild on demand
+
+
+_table = SymbolTable()
+
+
+def symbol_table() -> SymbolTable:
+    """Get the in-memory symbol table for files outside any workspace."""
+    return _table
@@ -0,0 +1,144 @@
+"""Telemetry - token usage, latency and throughput of LLM calls.
+
+Providers fill in the metrics of every LLMResponse (tokens, time to first
+token, latency, retries) and report each call to their metrics_listener.
+SessionStats is that listener in the REPL: it keeps running totals for
+/stats and, if enabled, appends one JSON line per call to
+.opencode/metrics/<date>.jsonl for later analysis.
+"""
+
+import json
+import math
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from opencode.llm.base import LLMProvider, LLMResponse
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of a list (0 if empty)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+class MetricsSink:
+    """Appends call records as JSON lines, one file per day.
+
+    Args:
+        directory: Where the .jsonl files go (created on first write).
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+
+    def write(self, record: dict) -> None:
+        """Append a record; a failed write is dropped rather than raised."""
+        path = self.directory / f"{datetime.now():%Y-%m-%d}.jsonl"
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+        except OSError:
+            pass
+
+
+class SessionStats:
+    """Totals over the LLM calls of a session.
+
+    Args:
+        sink: Optional sink that receives a record for every call.
+        session_id: Written into sink records to group calls by session.
+    """
+
+    def __init__(self, sink: Optional[MetricsSink] = None, session_id: str = ""):
+        self.sink = sink
+        self.session_id = session_id
+        self.calls = 0
+        self.errors = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.cache_read_tokens = 0
+        self.cache_write_tokens = 0
+        self.retries = 0
+        self.latencies: list[float] = []
+        self.ttfts: list[float] = []
+        self.generation_time = 0.0  # Seconds spent generating output tokens
+
+    def record(self, provider: LLMProvider, call: str, response: LLMResponse) -> None:
+        """Add a call (signature of LLMProvider.metrics_listener)."""
+        self.calls += 1
+        if response.stop_reason == "error":
+            self.errors += 1
+        self.input_tokens += response.input_tokens
+        self.output_tokens += response.output_tokens
+        self.cache_read_tokens += response.cache_read_tokens
+        self.cache_write_tokens += response.cache_write_tokens
+        self.retries += response.retries
+        self.latencies.append(response.latency)
+        if response.ttft:
+            self.ttfts.append(response.ttft)
+        if response.output_tokens:
+            self.generation_time += max(0.0, response.latency - response.ttft)
+
+        if self.sink is not None:
+            self.sink.write({
+                "ts": time.time(),
+                "session": self.session_id,
+                "provider": provider.provider_name,
+                "model": getattr(provider, "model", ""),
+                "call": call,
+                "stop_reason": response.stop_reason,
+                "input_tokens": response.input_tokens,
+                "output_tokens": response.output_tokens,
+                "cache_read_tokens": response.cache_read_tokens,
+                "cache_write_tokens": response.cache_write_tokens,
+                "ttft": round(response.ttft, 4),
+                "latency": round(response.latency, 4),
+                "retries": response.retries,
+                "tool_calls": len(response.tool_calls),
+            })
+
+    @property
+    def prompt_tokens(self) -> int:
+        """All prompt tokens, whether billed in full or served from the cache."""
+        return self.input_tokens + self.cache_read_tokens + self.cache_write_tokens
+
+    @property
+    def cache_hit_rate(self) -> float:
+        """Fraction of prompt tokens read from the prompt cache."""
+        return self.cache_read_tokens / self.prompt_tokens if self.prompt_tokens else 0.0
+
+    @property
+    def tokens_per_second(self) -> float:
+        """Output tokens per second of generation."""
+        return self.output_tokens / self.generation_time if self.generation_time > 0 else 0.0
+
+    def render(self) -> str:
+        """Summary for the /stats command."""
+        if not self.calls:
+            return "No LLM calls yet this session."
+
+        lines = [
+            f"LLM calls:      {self.calls}" + (f" ({self.errors} failed)" if self.errors else ""),
+            f"Input tokens:   {self.input_tokens:,}",
+            f"Output tokens:  {self.output_tokens:,}",
+            f"Cache:          {self.cache_read_tokens:,} read, {self.cache_write_tokens:,} written"
+            f" ({self.cache_hit_rate:.0%} of prompt tokens from cache)",
+            f"Latency:        p50 {_percentile(self.latencies, 50):.2f}s,"
+            f" p95 {_percentile(self.latencies, 95):.2f}s",
+        ]
+        if self.ttfts:
+            lines.append(
+                f"First token:    p50 {_percentile(self.ttfts, 50):.2f}s,"
+                f" p95 {_percentile(self.ttfts, 95):.2f}s"
+            )
+        if self.tokens_per_second:
+            lines.append(f"Throughput:     {self.tokens_per_second:.1f} tokens/s")
+        lines.append(f"Retries:        {self.retries}")
+        if self.sink is not None:
+            lines.append(f"Metrics log:    {self.sink.directory}")
+        return "\n".join(lines)
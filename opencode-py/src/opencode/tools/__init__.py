@@ -11,12 +11,26 @@ Adding a new tool:
 3. Tool is auto-discovered on startup
 """
 
+import importlib
+
 from opencode.tools.base import Tool, ToolResult
 from opencode.tools.registry import ToolRegistry
-from opencode.tools.read import ReadTool
-from opencode.tools.edit import EditTool
-from opencode.tools.write import WriteTool
-from opencode.tools.bash import BashTool
+
+# Built-in tool classes, imported on first access so that importing the
+# package (and discovering tools from the manifest) loads no tool module
+_LAZY_TOOLS = {
+    "ReadTool": "opencode.tools.read",
+    "EditTool": "opencode.tools.edit",
+    "WriteTool": "opencode.tools.write",
+    "BashTool": "opencode.tools.bash",
+}
+
+
+def __getattr__(name: str):
+    if name in _LAZY_TOOLS:
+        return getattr(importlib.import_module(_LAZY_TOOLS[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     "Tool",
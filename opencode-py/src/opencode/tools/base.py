@@ -1,14 +1,17 @@
 """Tool base class with LLM schema support."""
 
+import os
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, TYPE_CHECKING
+from typing import Any, Hashable, Optional, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from opencode.mode import ModeManager
     from opencode.config import Config
     from opencode.workspace import Workspace
+    from opencode.file_index import FileEntry, FileIndex
+    from opencode.symbols import SymbolTable
 
 
 @dataclass
@@ -56,6 +59,7 @@ class Tool(ABC):
     name: str = "base"
     description: str = "Base tool"
     requires_build_mode: bool = False
+    cacheable: bool = False  # Output depends only on arguments and file contents
 
     def __init__(
         self,
@@ -94,6 +98,115 @@ class Tool(ABC):
             p = Path.cwd() / p
         return p.resolve()
 
+    def _search_root(self) -> Path:
+        """Default root for repository-wide searches."""
+        if self.workspace and self.workspace.is_initialized:
+            return self.workspace.root
+        return Path.cwd()
+
+    def _file_index(self, root: Path) -> "FileIndex":
+        """Get the file index that covers a directory.
+
+        Uses the workspace's index when the directory is inside the workspace,
+        otherwise a shared index rooted at the directory itself.
+        """
+        from opencode.file_index import shared_index
+
+        if self.workspace:
+            index = self.workspace.file_index
+            try:
+                Path(root).resolve().relative_to(index.root)
+                return index
+            except ValueError:
+                pass
+        return shared_index(root)
+
+    def _narrow_by_content(
+        self, root: Path, entries: list["FileEntry"], clauses: list[list[str]]
+    ) -> list["FileEntry"]:
+        """Drop files that can't contain the required literals.
+
+        Uses the trigram index belonging to the file index that covers root.
+
+        Args:
+            root: Directory the entries were listed from.
+            entries: Candidate files.
+            clauses: Required literals (see search.regex_literals).
+
+        Returns:
+            The entries that may match, in their original order.
+        """
+        from opencode.trigram_index import shared_trigram_index
+
+        if not clauses:
+            return entries
+        file_index = self._file_index(root)
+        if self.workspace and self.workspace.file_index is file_index:
+            trigrams = self.workspace.trigram_index
+        else:
+            trigrams = shared_trigram_index(file_index)
+        return trigrams.candidates(entries, clauses, self._search_workers())
+
+    def _symbol_table(self, path: Path) -> "SymbolTable":
+        """Get the symbol table for files under a path.
+
+        Uses the workspace's (persisted) table inside an initialized
+        workspace, otherwise the in-memory one shared by the process.
+        """
+        from opencode.symbols import symbol_table
+
+        if self.workspace and self.workspace.is_initialized:
+            try:
+                Path(path).resolve().relative_to(self.workspace.root)
+                return self.workspace.symbol_table
+            except ValueError:
+                pass
+        return symbol_table()
+
+    def _search_workers(self) -> int:
+        """Worker processes for repository-wide scans (0 = one per CPU)."""
+        return self.config.search_workers if self.config else 0
+
+    def cache_fingerprint(self, **kwargs) -> Optional[Hashable]:
+        """Fingerprint of the workspace state a result depends on.
+
+        ToolRegistry reuses a cached result of a cacheable tool only while
+        the fingerprint is unchanged. The default covers the file index
+        around `path` (or the search root), whose generation changes
+        whenever a file is created, deleted or modified.
+
+        Returns:
+            A hashable fingerprint, or None if the result must not be cached.
+        """
+        try:
+            root = self._resolve_path(kwargs["path"]) if kwargs.get("path") else self._search_root()
+        except ValueError:
+            return None
+        if root.is_file():
+            root = root.parent
+        if not root.is_dir():
+            return None
+        index = self._file_index(root)
+        index.refresh()
+        return str(root), id(index), index.generation
+
+    def _file_fingerprint(self, path: str) -> Optional[Hashable]:
+        """Fingerprint for tools whose result depends on a single file."""
+        try:
+            file_path = self._resolve_path(path)
+            st = os.stat(file_path)
+        except (ValueError, OSError):
+            return None
+        return str(file_path), st.st_mtime_ns, st.st_size
+
+    def _notify_file_changed(self, path: Path) -> None:
+        """Tell the file indexes that a file was created or modified."""
+        from opencode.file_index import file_changed
+
+        if self.workspace:
+            self.workspace.file_index.update(path)
+        file_changed(path)
+
     @abstractmethod
     def execute(self, **kwargs) -> ToolResult:
         """Execute the tool with given arguments.
@@ -55,6 +55,10 @@ class BashTool(Tool):
         # Show command being executed
         print(f"\033[36m$ {command}\033[0m")
 
+        # The command may edit files in place; re-stat them on the next search
+        if self.workspace:
+            self.workspace.file_index.invalidate()
+
         try:
             # Use Popen for real-time output streaming
             process = subprocess.Popen(
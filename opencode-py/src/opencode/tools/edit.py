@@ -92,6 +92,7 @@ class EditTool(Tool):
             # Perform replacement
             new_content = content.replace(old_string, new_string, 1)
             file_path.write_text(new_content, encoding='utf-8')
+            self._notify_file_changed(file_path)
 
             # Display output shows diff, LLM output includes full new content
             display_output = f"Edited {path}\n\n{diff}"
@@ -3,8 +3,11 @@
 import re
 import os
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional
 
+from opencode.file_index import detect_language
+from opencode.lexer import code_occurrences, group_by_line
+from opencode.search import buffer_scanner, matching_lines, read_text
 from opencode.tools.base import Tool, ToolResult
 
 
@@ -14,6 +17,7 @@ class FindReferencesTool(Tool):
     name = "find_references"
     description = "Find all locations where a symbol (function, class, variable) is used in the codebase"
     requires_build_mode = False
+    cacheable = True
 
     # File extensions to search by language
     LANGUAGE_EXTENSIONS = {
@@ -29,36 +33,8 @@ class FindReferencesTool(Tool):
         "php": [".php"],
     }
 
-    # Patterns that indicate a definition (not a reference)
-    DEFINITION_PATTERNS = {
-        "python": [
-            r"^\s*def\s+{symbol}\s*\(",        # function def
-            r"^\s*class\s+{symbol}\s*[\(:]",   # class def
-            r"^\s*{symbol}\s*=",               # variable assignment at start
-            r"^\s*async\s+def\s+{symbol}\s*\(",  # async function
-        ],
-        "javascript": [
-            r"^\s*function\s+{symbol}\s*\(",
-            r"^\s*class\s+{symbol}\s*[{{\s]",
-            r"^\s*const\s+{symbol}\s*=",
-            r"^\s*let\s+{symbol}\s*=",
-            r"^\s*var\s+{symbol}\s*=",
-            r"^\s*{symbol}\s*:\s*function",
-            r"^\s*{symbol}\s*\([^)]*\)\s*{{",  # method shorthand
-        ],
-        "typescript": [
-            r"^\s*function\s+{symbol}\s*[<\(]",
-            r"^\s*class\s+{symbol}\s*[{{\s<]",
-            r"^\s*const\s+{symbol}\s*[=:]",
-            r"^\s*let\s+{symbol}\s*[=:]",
-            r"^\s*interface\s+{symbol}\s*[{{\s<]",
-            r"^\s*type\s+{symbol}\s*=",
-        ],
-    }
-
     # Common extensions to skip
     SKIP_EXTENSIONS = {".pyc", ".pyo", ".so", ".dll", ".exe", ".bin", ".lock"}
-    SKIP_DIRS = {"node_modules", ".git", "__pycache__", ".venv", "venv", "dist", "build", ".tox"}
 
     def execute(
         self,
@@ -94,11 +70,8 @@ class FindReferencesTool(Tool):
                     f"Supported: {', '.join(self.LANGUAGE_EXTENSIONS.keys())}"
                 )
 
-        # Get definition patterns for filtering
-        def_patterns = []
-        if not include_definitions and language:
-            patterns = self.DEFINITION_PATTERNS.get(language, [])
-            def_patterns = [re.compile(p.format(symbol=re.escape(symbol))) for p in patterns]
+        # Definition sites come from the symbol table
+        skip_definitions = not include_definitions and language
 
         # Build regex for symbol usage
         # Match symbol as a whole word (not part of another word)
@@ -106,36 +79,38 @@ class FindReferencesTool(Tool):
 
         # Search files
         results = []
-        workspace_root = Path(self.workspace.root if self.workspace else ".")
+        workspace_root = self._search_root()
 
-        for file_path in self._find_files(workspace_root, extensions):
-            try:
-                content = file_path.read_text(encoding='utf-8', errors='ignore')
-                lines = content.splitlines()
-
-                for line_num, line in enumerate(lines, 1):
-                    if symbol_pattern.search(line):
-                        # Check if this is a definition (skip if not including definitions)
-                        if def_patterns and any(p.match(line) for p in def_patterns):
-                            continue
-
-                        # Skip comments (basic heuristic)
-                        stripped = line.lstrip()
-                        if stripped.startswith('#') or stripped.startswith('//'):
-                            continue
-
-                        rel_path = file_path.relative_to(workspace_root)
-                        results.append({
-                            "file": str(rel_path),
-                            "line": line_num,
-                            "content": line.strip()[:120],  # Truncate long lines
-                        })
-
-                        if len(results) >= max_results:
-                            break
+        # Files that don't contain the raw symbol are skipped before decoding
+        literal = symbol.encode("utf-8")
+        scanner = buffer_scanner(symbol_pattern)
 
+        for file_path in self._find_files(workspace_root, extensions, symbol):
+            try:
+                content = read_text(file_path, literal)
             except Exception:
                 continue
+            if content is None:
+                continue
+
+            def_lines = None
+            for line_num, line in self._code_lines(content, symbol, symbol_pattern, scanner, file_path):
+                # Check if this is a definition (skip if not including definitions)
+                if skip_definitions:
+                    if def_lines is None:
+                        def_lines = self._definition_lines(file_path, symbol)
+                    if line_num in def_lines:
+                        continue
+
+                rel_path = file_path.relative_to(workspace_root)
+                results.append({
+                    "file": str(rel_path),
+                    "line": line_num,
+                    "content": line.strip()[:120],  # Truncate long lines
+                })
+
+                if len(results) >= max_results:
+                    break
 
             if len(results) >= max_results:
                 break
@@ -156,22 +131,52 @@ class FindReferencesTool(Tool):
         output = "\n".join(output_lines)
         return ToolResult.ok(output)
 
-    def _find_files(self, root: Path, extensions: Optional[list] = None):
-        """Recursively find files to search."""
-        for item in root.iterdir():
-            if item.name.startswith('.') and item.name != '.':
-                continue
-            if item.name in self.SKIP_DIRS:
+    def _code_lines(
+        self,
+        content: str,
+        symbol: str,
+        symbol_pattern: re.Pattern,
+        scanner: Optional[re.Pattern],
+        file_path: Path,
+    ) -> Iterator[tuple[int, str]]:
+        """Yield (line_num, line) for lines where the symbol is used as code.
+
+        Languages with a lexer skip comments and strings exactly; others fall
+        back to skipping lines that start with a comment marker.
+        """
+        offsets = code_occurrences(content, symbol, detect_language(file_path.name))
+        if offsets is not None:
+            for line_num, start, end, _ in group_by_line(content, offsets):
+                yield line_num, content[start:end]
+            return
+
+        for hit in matching_lines(content, symbol_pattern, scanner):
+            # Skip comments (basic heuristic)
+            stripped = hit.line.lstrip()
+            if stripped.startswith('#') or stripped.startswith('//'):
                 continue
+            yield hit.line_num, hit.line
 
-            if item.is_dir():
-                yield from self._find_files(item, extensions)
-            elif item.is_file():
-                if item.suffix in self.SKIP_EXTENSIONS:
-                    continue
-                if extensions and item.suffix not in extensions:
-                    continue
-                yield item
+    def _definition_lines(self, file_path: Path, symbol: str) -> set[int]:
+        """Get the lines of a file where a symbol is defined."""
+        symbols = self._symbol_table(file_path).get(file_path)
+        if symbols is None:
+            return set()
+        return {sym.line for sym in symbols.definitions if sym.name == symbol}
+
+    def _find_files(self, root: Path, extensions: Optional[list] = None, symbol: str = None):
+        """Find files to search via the workspace file index.
+
+        If a symbol is given, files the trigram index rules out are skipped.
+        """
+        entries = [
+            entry for entry in self._file_index(root).files(under=root, extensions=extensions)
+            if not entry.hidden and entry.suffix not in self.SKIP_EXTENSIONS
+        ]
+        if symbol:
+            entries = self._narrow_by_content(root, entries, [[symbol]])
+        for entry in entries:
+            yield entry.path
 
     def get_schema(self) -> dict:
         """Return JSON schema for LLM function calling."""
@@ -13,58 +13,7 @@ class FindSymbolsTool(Tool):
     name = "find_symbols"
     description = "Search for symbol names (functions, classes, types) in the codebase"
     requires_build_mode = False
-
-    # Symbol extraction patterns by language
-    SYMBOL_PATTERNS = {
-        "python": [
-            (r"^\s*def\s+(\w+)\s*\(", "function"),
-            (r"^\s*async\s+def\s+(\w+)\s*\(", "async function"),
-            (r"^\s*class\s+(\w+)\s*[\(:]", "class"),
-            (r"^(\w+)\s*=", "variable"),
-        ],
-        "javascript": [
-            (r"^\s*function\s+(\w+)\s*\(", "function"),
-            (r"^\s*async\s+function\s+(\w+)\s*\(", "async function"),
-            (r"^\s*class\s+(\w+)\s*[{{\s]", "class"),
-            (r"^\s*const\s+(\w+)\s*=", "const"),
-            (r"^\s*let\s+(\w+)\s*=", "let"),
-            (r"^\s*var\s+(\w+)\s*=", "var"),
-            (r"^\s*export\s+(?:default\s+)?function\s+(\w+)", "exported function"),
-            (r"^\s*export\s+(?:default\s+)?class\s+(\w+)", "exported class"),
-        ],
-        "typescript": [
-            (r"^\s*function\s+(\w+)\s*[<\(]", "function"),
-            (r"^\s*async\s+function\s+(\w+)\s*[<\(]", "async function"),
-            (r"^\s*class\s+(\w+)\s*[{{\s<]", "class"),
-            (r"^\s*interface\s+(\w+)\s*[{{\s<]", "interface"),
-            (r"^\s*type\s+(\w+)\s*[<=]", "type"),
-            (r"^\s*enum\s+(\w+)\s*{{", "enum"),
-            (r"^\s*const\s+(\w+)\s*[=:]", "const"),
-            (r"^\s*export\s+(?:default\s+)?function\s+(\w+)", "exported function"),
-            (r"^\s*export\s+(?:default\s+)?class\s+(\w+)", "exported class"),
-            (r"^\s*export\s+interface\s+(\w+)", "exported interface"),
-            (r"^\s*export\s+type\s+(\w+)", "exported type"),
-        ],
-        "rust": [
-            (r"^\s*(?:pub\s+)?fn\s+(\w+)\s*[<\(]", "function"),
-            (r"^\s*(?:pub\s+)?struct\s+(\w+)\s*[{{\s<]", "struct"),
-            (r"^\s*(?:pub\s+)?enum\s+(\w+)\s*[{{\s<]", "enum"),
-            (r"^\s*(?:pub\s+)?trait\s+(\w+)\s*[{{\s<:]", "trait"),
-            (r"^\s*type\s+(\w+)\s*=", "type alias"),
-            (r"^\s*(?:pub\s+)?mod\s+(\w+)\s*[{{;]", "module"),
-        ],
-        "go": [
-            (r"^\s*func\s+(\w+)\s*\(", "function"),
-            (r"^\s*func\s+\([^)]+\)\s+(\w+)\s*\(", "method"),
-            (r"^\s*type\s+(\w+)\s+struct", "struct"),
-            (r"^\s*type\s+(\w+)\s+interface", "interface"),
-        ],
-        "java": [
-            (r"^\s*(?:public|private|protected)?\s*(?:static)?\s*class\s+(\w+)", "class"),
-            (r"^\s*(?:public|private|protected)?\s*interface\s+(\w+)", "interface"),
-            (r"^\s*(?:public|private|protected)?\s*enum\s+(\w+)", "enum"),
-        ],
-    }
+    cacheable = True
 
     LANGUAGE_EXTENSIONS = {
         "python": [".py"],
@@ -75,7 +24,6 @@ class FindSymbolsTool(Tool):
         "java": [".java"],
     }
 
-    SKIP_DIRS = {"node_modules", ".git", "__pycache__", ".venv", "venv", "dist", "build", ".tox", "target"}
 
     def execute(
         self,
@@ -105,66 +53,38 @@ class FindSymbolsTool(Tool):
         # Determine which languages to search
         if language:
             language = language.lower()
-            if language not in self.SYMBOL_PATTERNS:
+            if language not in self.LANGUAGE_EXTENSIONS:
                 return ToolResult.fail(f"Unknown language: {language}")
             languages = [language]
         else:
-            languages = list(self.SYMBOL_PATTERNS.keys())
-
-        # Compile patterns
-        compiled_patterns = {}
-        for lang in languages:
-            compiled_patterns[lang] = [
-                (re.compile(p), k) for p, k in self.SYMBOL_PATTERNS[lang]
-            ]
+            languages = list(self.LANGUAGE_EXTENSIONS.keys())
+        extensions = [ext for lang in languages for ext in self.LANGUAGE_EXTENSIONS[lang]]
 
-        # Search files
+        # Search the symbol table
         results = []
-        workspace_root = Path(self.workspace.root if self.workspace else ".")
-
-        for file_path in self._find_files(workspace_root):
-            suffix = file_path.suffix
-
-            # Find matching language
-            for lang in languages:
-                if suffix not in self.LANGUAGE_EXTENSIONS.get(lang, []):
+        workspace_root = self._search_root()
+        files = list(self._find_files(workspace_root, extensions))
+
+        table = self._symbol_table(workspace_root)
+        for file_path, symbols in table.get_many(files, self._search_workers()):
+            for sym in symbols.search:
+                # Apply query filter
+                if query_pattern and not query_pattern.search(sym.name):
                     continue
 
-                try:
-                    content = file_path.read_text(encoding='utf-8', errors='ignore')
-                    lines = content.splitlines()
-
-                    for line_num, line in enumerate(lines, 1):
-                        for pattern, symbol_kind in compiled_patterns[lang]:
-                            match = pattern.search(line)
-                            if match:
-                                symbol_name = match.group(1)
-
-                                # Apply query filter
-                                if query_pattern and not query_pattern.search(symbol_name):
-                                    continue
-
-                                # Apply kind filter
-                                if kind and kind.lower() not in symbol_kind.lower():
-                                    continue
-
-                                rel_path = file_path.relative_to(workspace_root)
-                                results.append({
-                                    "name": symbol_name,
-                                    "kind": symbol_kind,
-                                    "file": str(rel_path),
-                                    "line": line_num,
-                                    "language": lang,
-                                })
-
-                                if len(results) >= max_results:
-                                    break
-                        if len(results) >= max_results:
-                            break
-
-                except Exception:
+                # Apply kind filter
+                if kind and kind.lower() not in sym.kind.lower():
                     continue
 
+                rel_path = file_path.relative_to(workspace_root)
+                results.append({
+                    "name": sym.name,
+                    "kind": sym.kind,
+                    "file": str(rel_path),
+                    "line": sym.line,
+                    "language": symbols.language,
+                })
+
                 if len(results) >= max_results:
                     break
             if len(results) >= max_results:
@@ -202,24 +122,11 @@ class FindSymbolsTool(Tool):
         output = "\n".join(output_lines)
         return ToolResult.ok(output)
 
-    def _find_files(self, root: Path):
-        """Recursively find source files."""
-        try:
-            for item in root.iterdir():
-                if item.name.startswith('.'):
-                    continue
-                if item.name in self.SKIP_DIRS:
-                    continue
-
-                if item.is_dir():
-                    yield from self._find_files(item)
-                elif item.is_file():
-                    for exts in self.LANGUAGE_EXTENSIONS.values():
-                        if item.suffix in exts:
-                            yield item
-                            break
-        except PermissionError:
-            pass
+    def _find_files(self, root: Path, extensions: list):
+        """Find source files via the workspace file index."""
+        for entry in self._file_index(root).files(under=root, extensions=extensions):
+            if not entry.hidden:
+                yield entry.path
 
     def get_schema(self) -> dict:
         """Return JSON schema for LLM function calling."""
@@ -236,7 +143,7 @@ class FindSymbolsTool(Tool):
                 "language": {
                     "type": "string",
                     "description": "Optional language filter",
-                    "enum": list(self.SYMBOL_PATTERNS.keys())
+                    "enum": list(self.LANGUAGE_EXTENSIONS.keys())
                 },
                 "max_results": {
                     "type": "integer",
@@ -1,27 +1,88 @@
 """Glob tool for finding files by pattern."""
 
+import heapq
+from itertools import islice
 from pathlib import Path
+from typing import Hashable, Iterable, Iterator, Optional
 
+from opencode.file_index import FileEntry
 from opencode.tools.base import Tool, ToolResult
 
 
+class _Counter:
+    """Iterator wrapper that counts the items passing through."""
+
+    def __init__(self, items: Iterable):
+        self._items = iter(items)
+        self.count = 0
+
+    def __iter__(self) -> Iterator:
+        for item in self._items:
+            self.count += 1
+            yield item
+
+
+def _walk_glob(root: Path, pattern: str) -> Iterator[FileEntry]:
+    """Match a glob by walking the tree (for directories the index leaves out)."""
+    found = []
+    for path in root.glob(pattern):
+        if ".git" in path.parts or not path.is_file():
+            continue
+        st = path.stat()
+        found.append(FileEntry(path, path.relative_to(root).as_posix(), st.st_size, st.st_mtime))
+    found.sort(key=lambda entry: entry.rel_path)
+    return iter(found)
+
+
 class GlobTool(Tool):
     """Find files matching a glob pattern."""
 
     name = "glob"
-    description = "Find files matching a glob pattern (e.g., '**/*.py', 'src/**/*.ts')"
+    description = (
+        "Find files matching a glob pattern (e.g., '**/*.py', 'src/**/*.ts'). Dependency and "
+        "build directories (node_modules, dist, build, .venv, ...) and .gitignore'd paths are "
+        "skipped unless the pattern starts inside them (e.g., 'dist/*.js')"
+    )
     requires_build_mode = False  # Safe read-only operation
-
-    def execute(self, pattern: str, path: str = None) -> ToolResult:
+    cacheable = True
+
+    # Ways to order results
+    SORT_ORDERS = ("path", "mtime")
+
+    def cache_fingerprint(self, pattern: str = "", **kwargs) -> Optional[Hashable]:
+        """Don't cache walks of unindexed directories (their changes aren't tracked)."""
+        fingerprint = super().cache_fingerprint(**kwargs)
+        if fingerprint is None:
+            return None
+        root = Path(fingerprint[0])
+        if self._file_index(root).unindexed_dir(root, pattern) is not None:
+            return None
+        return fingerprint
+
+    def execute(
+        self,
+        pattern: str,
+        path: str = None,
+        max_results: int = 50,
+        sort: str = "path",
+    ) -> ToolResult:
         """Find files matching a glob pattern.
 
         Args:
             pattern: Glob pattern to match (e.g., '**/*.py', 'src/*.ts').
             path: Optional directory to search in (defaults to workspace root).
+            max_results: Maximum number of files to list.
+            sort: 'path' (alphabetical) or 'mtime' (most recently modified first).
 
         Returns:
             ToolResult with list of matching files.
         """
+        if sort not in self.SORT_ORDERS:
+            return ToolResult.fail(
+                f"Invalid sort: {sort}. Must be one of: {', '.join(self.SORT_ORDERS)}"
+            )
+        max_results = max(1, max_results)
+
         try:
             # Determine search root
             if path:
@@ -34,45 +95,46 @@ class GlobTool(Tool):
             if not search_root.is_dir():
                 return ToolResult.fail(f"Not a directory: {search_root}")
 
-            # Find matching files
-            matches = list(search_root.glob(pattern))
-
-            # Filter to only files (not directories) and exclude .git
-            files = [
-                f for f in matches
-                if f.is_file() and '.git' not in f.parts
-            ]
-
-            # Sort by path
-            files.sort()
-
-            # Limit results to prevent overwhelming output
-            max_results = 50
-            truncated = len(files) > max_results
-
-            if truncated:
-                files = files[:max_results]
+            # Stream matches from the index (which only holds files, never .git).
+            # Only the entries that are shown are kept; the rest are just counted.
+            # Patterns that name a pruned or ignored directory walk it instead.
+            index = self._file_index(search_root)
+            if index.unindexed_dir(search_root, pattern) is not None:
+                matches = _walk_glob(search_root, pattern)
+            else:
+                matches = index.iter_files(under=search_root, pattern=pattern)
+            if sort == "mtime":
+                counted = _Counter(matches)
+                entries = heapq.nlargest(max_results, counted, key=lambda e: e.mtime)
+                total = counted.count
+            else:
+                entries = list(islice(matches, max_results))
+                total = len(entries) + sum(1 for _ in matches)
 
             # Format output
-            if not files:
+            if not entries:
                 return ToolResult.ok(f"No files found matching '{pattern}'")
 
             # Show relative paths
             output_lines = []
-            for f in files:
+            for entry in entries:
                 try:
-                    rel_path = f.relative_to(search_root)
+                    rel_path = entry.path.relative_to(search_root)
                 except ValueError:
-                    rel_path = f
+                    rel_path = entry.path
                 output_lines.append(str(rel_path))
 
             output = "\n".join(output_lines)
 
-            if truncated:
-                output += f"\n\n... and more (showing first {max_results} results)"
+            if total > len(entries):
+                order = "most recent" if sort == "mtime" else "first"
+                output += (
+                    f"\n\n... and {total - len(entries)} more "
+                    f"(showing {order} {len(entries)} results)"
+                )
 
             # Show colored header
-            header = f"\033[34mFound {len(files)} file(s) matching '{pattern}':\033[0m\n"
+            header = f"\033[34mFound {total} file(s) matching '{pattern}':\033[0m\n"
             return ToolResult.ok(header + output)
 
         except Exception as e:
@@ -89,6 +151,17 @@ class GlobTool(Tool):
                 "path": {
                     "type": "string",
                     "description": "Optional directory to search in (defaults to workspace root)"
+                },
+                "max_results": {
+                    "type": "integer",
+                    "description": "Maximum number of files to list (default: 50)",
+                    "default": 50
+                },
+                "sort": {
+                    "type": "string",
+                    "enum": list(self.SORT_ORDERS),
+                    "description": "Order of results: 'path' (default) or 'mtime' (most recently modified first)",
+                    "default": "path"
                 }
             },
             "required": ["pattern"]
@@ -1,19 +1,113 @@
 """Grep tool for searching file contents."""
 
 import re
+from contextlib import closing
 from pathlib import Path
-from typing import Literal
+from typing import Literal, Optional
 
+from opencode.search import (
+    buffer_scanner, map_ordered, matching_lines, read_text, regex_literals,
+    required_literal,
+)
 from opencode.tools.base import Tool, ToolResult
 from opencode.style import bold, dim, yellow, blue
 
 
+# Per-file search functions live at module level so worker processes can run them
+
+def _search_file_lines(
+    file_path: Path,
+    regex: re.Pattern,
+    scanner: Optional[re.Pattern],
+    literal: Optional[bytes],
+    output_mode: str,
+    context_before: int,
+    context_after: int,
+    limit: Optional[int],
+) -> Optional[tuple[int, list]]:
+    """Search one file line by line.
+
+    Returns:
+        (match_count, match contexts) stopping after `limit` matches, or
+        None if the file has no matches or cannot be read.
+    """
+    try:
+        content = read_text(file_path, literal)
+    except Exception:
+        return None
+    if content is None:
+        return None
+
+    file_matches = []
+    match_count = 0
+
+    for hit in matching_lines(content, regex, scanner):
+        match_count += 1
+
+        if output_mode == "content":
+            # The matching line with its context
+            context_lines = [(num, line, False) for num, line in hit.before(context_before)]
+            context_lines.append((hit.line_num, hit.line, True))
+            context_lines.extend((num, line, False) for num, line in hit.after(context_after))
+            file_matches.append(context_lines)
+
+        if limit is not None and match_count >= limit:
+            break
+
+    return (match_count, file_matches) if match_count else None
+
+
+def _search_file_multiline(
+    file_path: Path,
+    regex: re.Pattern,
+    literal: Optional[bytes],
+    output_mode: str,
+    limit: int,
+) -> Optional[tuple[int, list]]:
+    """Search one file with a multiline pattern.
+
+    Returns:
+        (match_count, first `limit` match records), or None if the file has
+        no matches or cannot be read.
+    """
+    try:
+        content = read_text(file_path, literal)
+    except Exception:
+        return None
+    if content is None:
+        return None
+    matches = list(regex.finditer(content))
+    if not matches:
+        return None
+
+    file_matches = []
+    if output_mode == "content":
+        for match in matches[:limit]:
+            # Find line number of match start
+            start_line = content.count('\n', 0, match.start()) + 1
+            end_line = content.count('\n', 0, match.end()) + 1
+
+            # Get the matched text (truncated if too long)
+            matched_text = match.group(0)
+            if len(matched_text) > 200:
+                matched_text = matched_text[:200] + "..."
+
+            file_matches.append({
+                "start_line": start_line,
+                "end_line": end_line,
+                "text": matched_text,
+            })
+
+    return len(matches), file_matches
+
+
 class GrepTool(Tool):
     """Search for patterns in file contents."""
 
     name = "grep"
     description = "Search for a pattern in files (like grep). Returns matching files and lines."
     requires_build_mode = False  # Safe read-only operation
+    cacheable = True
 
     # File extensions to search (text files)
     SEARCHABLE_EXTENSIONS = {
@@ -101,24 +195,20 @@ class GrepTool(Tool):
             if search_root.is_file():
                 files = [search_root]
             else:
-                if file_pattern:
-                    files = list(search_root.glob(f"**/{file_pattern}"))
-                else:
-                    files = list(search_root.glob("**/*"))
+                glob_pattern = f"**/{file_pattern}" if file_pattern else None
+                entries = self._file_index(search_root).files(
+                    under=search_root, pattern=glob_pattern
+                )
+                entries = [
+                    e for e in entries
+                    if not self._is_hidden(e.rel_path) and self._is_searchable(e.path)
+                ]
+                # Skip files the trigram index rules out
+                entries = self._narrow_by_content(search_root, entries, regex_literals(regex))
+                files = [e.path for e in entries]
 
             # Filter to searchable files
-            searchable_files = []
-            for f in files:
-                if not f.is_file():
-                    continue
-                # Skip hidden directories
-                if any(part.startswith('.') and part not in {'.env', '.gitignore', '.dockerignore'}
-                       for part in f.parts):
-                    if '.opencode' not in str(f):  # Allow .opencode
-                        continue
-                # Check extension or name
-                if f.suffix.lower() in self.SEARCHABLE_EXTENSIONS or f.name in self.SEARCHABLE_NAMES:
-                    searchable_files.append(f)
+            searchable_files = [f for f in files if self._is_searchable(f)]
 
             # Search files based on mode
             if multiline:
@@ -134,6 +224,20 @@ class GrepTool(Tool):
         except Exception as e:
             return ToolResult.fail(str(e))
 
+    def _is_searchable(self, path: Path) -> bool:
+        """Check if a file is a text file worth searching."""
+        return path.suffix.lower() in self.SEARCHABLE_EXTENSIONS or path.name in self.SEARCHABLE_NAMES
+
+    def _is_hidden(self, rel_path: str) -> bool:
+        """Check if a path is inside a hidden directory (.opencode is allowed)."""
+        parts = rel_path.split("/")
+        if ".opencode" in parts:
+            return False
+        return any(
+            part.startswith('.') and part not in {'.env', '.gitignore', '.dockerignore'}
+            for part in parts
+        )
+
     def _search_lines(
         self,
         files: list,
@@ -149,59 +253,35 @@ class GrepTool(Tool):
         total_matches = 0
         total_files = 0
 
-        for file_path in files:
-            if output_mode == "files_with_matches" and total_files >= max_results:
-                break
-            if output_mode != "files_with_matches" and total_matches >= max_results:
-                break
-
-            try:
-                content = file_path.read_text(encoding="utf-8", errors="ignore")
-                lines = content.splitlines()
-
-                file_matches = []
-                match_count = 0
-
-                for line_num, line in enumerate(lines, 1):
-                    if regex.search(line):
-                        match_count += 1
-                        total_matches += 1
-
-                        if output_mode == "content":
-                            # Collect context lines
-                            context_lines = []
-
-                            # Lines before
-                            for i in range(max(0, line_num - 1 - context_before), line_num - 1):
-                                context_lines.append((i + 1, lines[i], False))
-
-                            # The matching line
-                            context_lines.append((line_num, line, True))
-
-                            # Lines after
-                            for i in range(line_num, min(len(lines), line_num + context_after)):
-                                context_lines.append((i + 1, lines[i], False))
-
-                            file_matches.append(context_lines)
-
-                        if output_mode != "files_with_matches" and total_matches >= max_results:
-                            break
+        # Each file stops after max_results matches; the global cap is applied here
+        limit = None if output_mode == "files_with_matches" else max_results
+        args = (
+            regex, buffer_scanner(regex), required_literal(regex),
+            output_mode, context_before, context_after, limit,
+        )
 
-                if match_count > 0:
-                    total_files += 1
-                    try:
-                        rel_path = file_path.relative_to(search_root)
-                    except ValueError:
-                        rel_path = file_path
+        with closing(map_ordered(_search_file_lines, files, args, self._search_workers())) as found:
+            for file_path, file_result in found:
+                if output_mode == "files_with_matches" and total_files >= max_results:
+                    break
+                if output_mode != "files_with_matches" and total_matches >= max_results:
+                    break
+                if not file_result:
+                    continue
 
-                    results.append({
-                        "path": rel_path,
-                        "matches": file_matches,
-                        "count": match_count,
-                    })
+                match_count, file_matches = file_result
+                if limit is not None:
+                    # Stop at the global cap, exactly like a sequential scan
+                    match_count = min(match_count, max_results - total_matches)
+                    file_matches = file_matches[:match_count]
+                total_matches += match_count
+                total_files += 1
 
-            except Exception:
-                continue  # Skip files that can't be read
+                results.append({
+                    "path": self._relative(file_path, search_root),
+                    "matches": file_matches,
+                    "count": match_count,
+                })
 
         # Format output based on mode
         return self._format_output(
@@ -221,58 +301,39 @@ class GrepTool(Tool):
         total_matches = 0
         total_files = 0
 
-        for file_path in files:
-            if output_mode == "files_with_matches" and total_files >= max_results:
-                break
-            if output_mode != "files_with_matches" and total_matches >= max_results:
-                break
+        args = (regex, required_literal(regex), output_mode, max_results)
 
-            try:
-                content = file_path.read_text(encoding="utf-8", errors="ignore")
-                matches = list(regex.finditer(content))
-
-                if matches:
-                    total_files += 1
-                    match_count = len(matches)
-                    total_matches += match_count
-
-                    try:
-                        rel_path = file_path.relative_to(search_root)
-                    except ValueError:
-                        rel_path = file_path
-
-                    file_matches = []
-                    if output_mode == "content":
-                        lines = content.splitlines()
-                        for match in matches[:max_results - total_matches + match_count]:
-                            # Find line number of match start
-                            start_line = content[:match.start()].count('\n') + 1
-                            end_line = content[:match.end()].count('\n') + 1
-
-                            # Get the matched text (truncated if too long)
-                            matched_text = match.group(0)
-                            if len(matched_text) > 200:
-                                matched_text = matched_text[:200] + "..."
-
-                            file_matches.append({
-                                "start_line": start_line,
-                                "end_line": end_line,
-                                "text": matched_text,
-                            })
-
-                    results.append({
-                        "path": rel_path,
-                        "matches": file_matches,
-                        "count": match_count,
-                    })
-
-            except Exception:
-                continue
+        with closing(map_ordered(_search_file_multiline, files, args, self._search_workers())) as found:
+            for file_path, file_result in found:
+                if output_mode == "files_with_matches" and total_files >= max_results:
+                    break
+                if output_mode != "files_with_matches" and total_matches >= max_results:
+                    break
+                if not file_result:
+                    continue
+
+                match_count, file_matches = file_result
+                total_files += 1
+                total_matches += match_count
+
+                results.append({
+                    "path": self._relative(file_path, search_root),
+                    "matches": file_matches[:max_results - total_matches + match_count],
+                    "count": match_count,
+                })
 
         return self._format_multiline_output(
             results, regex.pattern, output_mode, total_matches, total_files, max_results
         )
 
+    @staticmethod
+    def _relative(file_path: Path, search_root: Path) -> Path:
+        """Get a file's path relative to the search root, if possible."""
+        try:
+            return file_path.relative_to(search_root)
+        except ValueError:
+            return file_path
+
     def _format_output(
         self,
         results: list,
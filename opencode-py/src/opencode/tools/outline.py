@@ -1,10 +1,10 @@
 """Outline tool - show structure of a file (classes, functions, etc.)."""
 
-import re
-from pathlib import Path
-from typing import Optional
 from dataclasses import dataclass
+from typing import Hashable, Optional
 
+from opencode.file_index import detect_language
+from opencode.symbols import OUTLINE, supports
 from opencode.tools.base import Tool, ToolResult
 
 
@@ -28,87 +28,11 @@ class OutlineTool(Tool):
     name = "outline"
     description = "Show the structure of a file (classes, functions, methods)"
     requires_build_mode = False
+    cacheable = True
 
-    # Language detection by extension
-    LANGUAGE_MAP = {
-        ".py": "python",
-        ".js": "javascript",
-        ".jsx": "javascript",
-        ".ts": "typescript",
-        ".tsx": "typescript",
-        ".rs": "rust",
-        ".go": "go",
-        ".java": "java",
-        ".c": "c",
-        ".h": "c",
-        ".cpp": "cpp",
-        ".hpp": "cpp",
-        ".rb": "ruby",
-    }
-
-    # Patterns for extracting symbols
-    PATTERNS = {
-        "python": [
-            (r"^(\s*)class\s+(\w+)\s*[\(:]", "class"),
-            (r"^(\s*)def\s+(\w+)\s*\(", "function"),
-            (r"^(\s*)async\s+def\s+(\w+)\s*\(", "async function"),
-        ],
-        "javascript": [
-            (r"^(\s*)class\s+(\w+)\s*[{{\s]", "class"),
-            (r"^(\s*)function\s+(\w+)\s*\(", "function"),
-            (r"^(\s*)async\s+function\s+(\w+)\s*\(", "async function"),
-            (r"^(\s*)(\w+)\s*\([^)]*\)\s*{{", "method"),
-            (r"^(\s*)(\w+)\s*:\s*function", "method"),
-            (r"^(\s*)const\s+(\w+)\s*=\s*(?:async\s*)?\([^)]*\)\s*=>", "arrow function"),
-        ],
-        "typescript": [
-            (r"^(\s*)class\s+(\w+)\s*[{{\s<]", "class"),
-            (r"^(\s*)interface\s+(\w+)\s*[{{\s<]", "interface"),
-            (r"^(\s*)type\s+(\w+)\s*=", "type"),
-            (r"^(\s*)enum\s+(\w+)\s*{{", "enum"),
-            (r"^(\s*)function\s+(\w+)\s*[<\(]", "function"),
-            (r"^(\s*)async\s+function\s+(\w+)\s*[<\(]", "async function"),
-            (r"^(\s*)(?:public|private|protected)?\s*(\w+)\s*\([^)]*\)\s*[{{:]", "method"),
-        ],
-        "rust": [
-            (r"^(\s*)(?:pub\s+)?struct\s+(\w+)\s*[{{\s<]", "struct"),
-            (r"^(\s*)(?:pub\s+)?enum\s+(\w+)\s*[{{\s<]", "enum"),
-            (r"^(\s*)(?:pub\s+)?trait\s+(\w+)\s*[{{\s<:]", "trait"),
-            (r"^(\s*)impl(?:\s+\w+)?\s+(?:for\s+)?(\w+)\s*[{{\s<]", "impl"),
-            (r"^(\s*)(?:pub\s+)?(?:async\s+)?fn\s+(\w+)\s*[<\(]", "function"),
-            (r"^(\s*)mod\s+(\w+)\s*[{{;]", "module"),
-        ],
-        "go": [
-            (r"^(\s*)type\s+(\w+)\s+struct\s*{{", "struct"),
-            (r"^(\s*)type\s+(\w+)\s+interface\s*{{", "interface"),
-            (r"^(\s*)func\s+(\w+)\s*\(", "function"),
-            (r"^(\s*)func\s+\([^)]+\)\s+(\w+)\s*\(", "method"),
-        ],
-        "java": [
-            (r"^(\s*)(?:public|private|protected)?\s*(?:static)?\s*class\s+(\w+)", "class"),
-            (r"^(\s*)(?:public|private|protected)?\s*interface\s+(\w+)", "interface"),
-            (r"^(\s*)(?:public|private|protected)?\s*enum\s+(\w+)", "enum"),
-            (r"^(\s*)(?:public|private|protected)?\s*(?:static)?\s*\w+\s+(\w+)\s*\(", "method"),
-        ],
-        "c": [
-            (r"^(\s*)struct\s+(\w+)\s*{{", "struct"),
-            (r"^(\s*)enum\s+(\w+)\s*{{", "enum"),
-            (r"^(\s*)typedef\s+.*\s+(\w+)\s*;", "typedef"),
-            (r"^(\s*)(?:static\s+)?(?:inline\s+)?\w+\s*\*?\s*(\w+)\s*\([^;]*$", "function"),
-        ],
-        "cpp": [
-            (r"^(\s*)class\s+(\w+)\s*[{{:]", "class"),
-            (r"^(\s*)struct\s+(\w+)\s*[{{:]", "struct"),
-            (r"^(\s*)namespace\s+(\w+)\s*{{", "namespace"),
-            (r"^(\s*)enum\s+(?:class\s+)?(\w+)\s*{{", "enum"),
-            (r"^(\s*)(?:virtual\s+)?(?:static\s+)?(?:inline\s+)?\w+\s*\*?\s*(\w+)\s*\([^;]*$", "function"),
-        ],
-        "ruby": [
-            (r"^(\s*)class\s+(\w+)", "class"),
-            (r"^(\s*)module\s+(\w+)", "module"),
-            (r"^(\s*)def\s+(\w+)", "method"),
-        ],
-    }
+    def cache_fingerprint(self, path: str = "", **kwargs) -> Optional[Hashable]:
+        """Results depend only on the file being read."""
+        return self._file_fingerprint(path)
 
     def execute(self, path: str) -> ToolResult:
         """Show the outline of a file.
@@ -129,43 +53,19 @@ class OutlineTool(Tool):
 
         # Detect language
         suffix = file_path.suffix
-        language = self.LANGUAGE_MAP.get(suffix)
-        if not language:
+        language = detect_language(file_path.name)
+        if not supports(language, OUTLINE):
             return ToolResult.fail(f"Unsupported file type: {suffix}")
 
-        patterns = self.PATTERNS.get(language, [])
-        if not patterns:
-            return ToolResult.fail(f"No outline patterns for: {language}")
+        # Parse file (cached until it changes)
+        file_symbols = self._symbol_table(file_path).get(file_path)
+        if file_symbols is None:
+            return ToolResult.fail(f"Could not read file: {path}")
 
-        # Compile patterns
-        compiled = [(re.compile(p), k) for p, k in patterns]
-
-        # Parse file
-        try:
-            content = file_path.read_text(encoding='utf-8', errors='ignore')
-        except Exception as e:
-            return ToolResult.fail(f"Could not read file: {e}")
-
-        lines = content.splitlines()
-        symbols = []
-
-        for line_num, line in enumerate(lines, 1):
-            for pattern, kind in compiled:
-                match = pattern.match(line)
-                if match:
-                    indent_str = match.group(1)
-                    name = match.group(2)
-
-                    # Calculate indent level
-                    indent = len(indent_str.replace('\t', '    '))
-
-                    symbols.append(Symbol(
-                        name=name,
-                        kind=kind,
-                        line=line_num,
-                        indent=indent,
-                    ))
-                    break
+        symbols = [
+            Symbol(name=sym.name, kind=sym.kind, line=sym.line, indent=sym.indent)
+            for sym in file_symbols.outline
+        ]
 
         if not symbols:
             return ToolResult.ok(f"No symbols found in {path}")
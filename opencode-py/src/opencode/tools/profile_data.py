@@ -0,0 +1,507 @@
+"""Profile data tool - per-column statistics of CSV and Excel files.
+
+Instead of rows, the agent gets a few lines per column: inferred type,
+null count, distinct count, min/max/mean and the most common values. The
+file is read in chunks of CHUNK_ROWS rows and each column of a chunk is
+reduced to its distinct values and their counts, so memory stays bounded
+and low-cardinality columns are classified once per distinct value.
+
+With NumPy installed, chunks are counted with np.unique and numeric
+columns parsed and summarized in vectorized passes; without it the same
+statistics come from pure Python. Distinct counts are exact up to
+TRACKED_VALUES values per column and estimated beyond that.
+"""
+
+import csv
+import heapq
+import importlib.util
+import re
+import zlib
+from collections import Counter
+from datetime import date, datetime
+from itertools import islice, zip_longest
+from pathlib import Path
+from typing import Hashable, Iterator, Optional
+
+from opencode.tools.base import Tool, ToolResult
+from opencode.tools.read import HAS_OPENPYXL, HAS_XLRD, select_columns
+
+
+# Optional dependency, imported on first profile
+HAS_NUMPY = importlib.util.find_spec("numpy") is not None
+
+# Rows read and summarized at a time
+CHUNK_ROWS = 50_000
+
+# Distinct values counted exactly per column; beyond this the distinct
+# count is estimated and only the most common values are kept
+TRACKED_VALUES = 10_000
+
+# Hashes kept by the distinct count estimate (error about 3%)
+SKETCH_SIZE = 1024
+
+# Most common values shown per column
+TOP_VALUES = 5
+
+# Cell texts counted as missing (compared lower-case)
+NULL_TOKENS = frozenset({"", "na", "n/a", "nan", "null", "none", "-"})
+
+# Characters only float() accepts: "1.5", "1e3", "inf", "nan"
+_FLOAT_SYNTAX = re.compile(r"[.eEiInN]")
+
+_DATE = re.compile(r"\d{4}-\d{2}-\d{2}(?:[ T]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?)?$")
+
+
+def _classify(text: str) -> tuple[str, Optional[float]]:
+    """Type of a non-null cell text, and its value if numeric."""
+    lowered = text.lower()
+    if lowered in ("true", "false"):
+        return "boolean", None
+    try:
+        return "integer", int(text)
+    except ValueError:
+        pass
+    try:
+        return "float", float(text)
+    except ValueError:
+        pass
+    if _DATE.match(text):
+        return "date", None
+    return "string", None
+
+
+def _cell_text(cell) -> str:
+    """Text of a spreadsheet cell, written the way a CSV file would have it."""
+    if cell is None:
+        return ""
+    if isinstance(cell, bool):
+        return "true" if cell else "false"
+    if isinstance(cell, float) and cell.is_integer():
+        return str(int(cell))
+    if isinstance(cell, (datetime, date)):
+        return cell.isoformat(sep=" ") if isinstance(cell, datetime) else cell.isoformat()
+    return str(cell).strip()
+
+
+class DistinctSketch:
+    """K-minimum-values estimate of the number of distinct values."""
+
+    def __init__(self, size: int = SKETCH_SIZE):
+        self.size = size
+        self._heap: list[int] = []  # Negated smallest hashes
+        self._members: set[int] = set()
+
+    def add(self, value: str) -> None:
+        h = zlib.crc32(value.encode("utf-8", "surrogatepass"))
+        if h in self._members:
+            return
+        if len(self._heap) < self.size:
+            heapq.heappush(self._heap, -h)
+            self._members.add(h)
+        elif h < -self._heap[0]:
+            self._members.discard(-heapq.heapreplace(self._heap, -h))
+            self._members.add(h)
+
+    def estimate(self) -> int:
+        if len(self._heap) < self.size:
+            return len(self._heap)
+        return round((self.size - 1) * 2**32 / (-self._heap[0] + 1))
+
+
+def _number_key(value) -> str:
+    """Counting key of a number, the same however it was written or parsed.
+
+    '007', '7' and '7.0' are all '7'; '1.50' is '1.5'.
+    """
+    if isinstance(value, float) and not value.is_integer():
+        return repr(value)
+    return str(int(value))
+
+
+class ChunkStats:
+    """Statistics of one column in one chunk."""
+
+    def __init__(self):
+        self.nulls = 0
+        self.counts: dict[str, int] = {}  # Non-null value -> occurrences
+        self.kinds: Counter = Counter()  # Type -> non-null values of that type
+        self.numbers: Optional[tuple[int, float, float, float]] = None  # count, min, max, sum
+        self.dates: Optional[tuple[str, str]] = None  # earliest, latest
+        self.lengths: Optional[tuple[int, int]] = None  # Shortest, longest string
+
+    def classify(self) -> None:
+        """Fill kinds, numbers, dates and lengths from the distinct values.
+
+        Numbers are re-keyed by value (see _number_key), as the NumPy
+        engine counts them.
+        """
+        count, low, high, total = 0, None, None, 0.0
+        dates, lengths = [], []
+        counts = Counter()
+        for text, occurrences in self.counts.items():
+            kind, number = _classify(text)
+            self.kinds[kind] += occurrences
+            counts[text if number is None else _number_key(number)] += occurrences
+            if number is not None:
+                count += occurrences
+                total += number * occurrences
+                low = number if low is None or number < low else low
+                high = number if high is None or number > high else high
+            elif kind == "date":
+                dates.append(text)
+            elif kind == "string":
+                lengths.append(len(text))
+        if count:
+            self.numbers = (count, low, high, total)
+        if dates:
+            self.dates = (min(dates), max(dates))
+        if lengths:
+            self.lengths = (min(lengths), max(lengths))
+        self.counts = counts
+
+
+def chunk_stats_python(cells: list[str]) -> ChunkStats:
+    """Statistics of one column chunk, classifying each distinct value once."""
+    stats = ChunkStats()
+    counts = Counter()
+    for text, occurrences in Counter(cells).items():
+        text = text.strip()
+        if text.lower() in NULL_TOKENS:
+            stats.nulls += occurrences
+        else:
+            counts[text] += occurrences
+    stats.counts = counts
+    stats.classify()
+    return stats
+
+
+def chunk_stats_numpy(cells: list[str]) -> ChunkStats:
+    """Statistics of one column chunk, with vectorized passes for numbers.
+
+    Numeric chunks (blank cells allowed) are parsed into one array; counting
+    distinct values and min/max/sum are then single NumPy passes instead of
+    a Python loop over every distinct value. Parsing stays with int() and
+    float(), which are faster than NumPy's own text conversion. Other
+    chunks are handled by chunk_stats_python.
+    """
+    import numpy as np
+
+    values = [cell for cell in cells if cell] if "" in cells else cells
+    for parse, dtype, kind in ((int, np.int64, "integer"), (float, np.float64, "float")):
+        if not values:
+            break
+        try:
+            numbers = np.fromiter(map(parse, values), dtype=dtype, count=len(values))
+        except (ValueError, OverflowError):
+            continue
+
+        stats = ChunkStats()
+        if kind == "float":
+            # "nan" (any case) parses but is a null token
+            numbers = numbers[~np.isnan(numbers)]
+            if not numbers.size:
+                break
+            # Texts without float syntax ("2" among "2.5") are integers, as
+            # chunk_stats_python counts them
+            integers = sum(1 for value in values if not _FLOAT_SYNTAX.search(value))
+            if integers:
+                stats.kinds["integer"] = integers
+            if numbers.size > integers:
+                stats.kinds["float"] = int(numbers.size) - integers
+        else:
+            stats.kinds[kind] = int(numbers.size)
+        stats.nulls = len(cells) - numbers.size
+        uniques, counts = np.unique(numbers, return_counts=True)
+        # Keyed by value, so "1.50" and "1.5" are one distinct value
+        stats.counts = dict(zip(map(_number_key, uniques.tolist()), counts.tolist()))
+        stats.numbers = (
+            int(numbers.size),
+            uniques[0].item(),
+            uniques[-1].item(),
+            float(numbers.sum(dtype=np.float64)),
+        )
+        return stats
+
+    return chunk_stats_python(cells)
+
+
+class ColumnProfile:
+    """Running statistics of one column across chunks."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.nulls = 0
+        self.kinds: Counter = Counter()
+        self.values: Counter = Counter()  # Exact until `sketch` is set
+        self.sketch: Optional[DistinctSketch] = None
+        self.number_count = 0
+        self.number_sum = 0.0
+        self.minimum = None
+        self.maximum = None
+        self.dates: Optional[tuple[str, str]] = None
+        self.lengths: Optional[tuple[int, int]] = None
+
+    @property
+    def count(self) -> int:
+        """Non-null values."""
+        return sum(self.kinds.values())
+
+    @property
+    def distinct(self) -> int:
+        return self.sketch.estimate() if self.sketch else len(self.values)
+
+    @property
+    def inferred_type(self) -> str:
+        kinds = set(self.kinds)
+        if not kinds:
+            return "empty"
+        if kinds == {"integer"}:
+            return "integer"
+        if kinds <= {"integer", "float"}:
+            return "float"
+        if len(kinds) == 1:
+            return kinds.pop()
+        return "mixed"
+
+    def add(self, stats: ChunkStats) -> None:
+        """Merge a chunk's statistics."""
+        self.nulls += stats.nulls
+        self.kinds.update(stats.kinds)
+
+        if self.sketch is not None:
+            for text in stats.counts:
+                self.sketch.add(text)
+        self.values.update(stats.counts)
+        if len(self.values) > TRACKED_VALUES:
+            if self.sketch is None:
+                self.sketch = DistinctSketch()
+                for text in self.values:
+                    self.sketch.add(text)
+            self.values = Counter(dict(self.values.most_common(TRACKED_VALUES // 2)))
+
+        if stats.numbers:
+            count, low, high, total = stats.numbers
+            self.number_count += count
+            self.number_sum += total
+            self.minimum = low if self.minimum is None else min(self.minimum, low)
+            self.maximum = high if self.maximum is None else max(self.maximum, high)
+        if stats.dates:
+            self.dates = stats.dates if self.dates is None else (
+                min(self.dates[0], stats.dates[0]), max(self.dates[1], stats.dates[1])
+            )
+        if stats.lengths:
+            self.lengths = stats.lengths if self.lengths is None else (
+                min(self.lengths[0], stats.lengths[0]), max(self.lengths[1], stats.lengths[1])
+            )
+
+    def top_values(self) -> list[tuple[str, int]]:
+        """Most common values that occur more than once.
+
+        Empty for columns with too many distinct values to track, where
+        the kept counts no longer tell the common values apart.
+        """
+        if self.sketch is not None:
+            return []
+        return [(v, n) for v, n in self.values.most_common(TOP_VALUES) if n > 1]
+
+    def render(self, rows: int) -> list[str]:
+        """A few lines describing the column."""
+        null_share = f" ({self.nulls / rows:.1%})" if rows and self.nulls else ""
+        approx = "~" if self.sketch else ""
+        lines = [
+            f"{self.name} [{self.inferred_type}]: {self.count:,} values, "
+            f"{self.nulls:,} null{null_share}, {approx}{self.distinct:,} distinct"
+        ]
+        if self.inferred_type == "mixed":
+            lines.append("  types: " + ", ".join(f"{k} {n:,}" for k, n in self.kinds.most_common()))
+        if self.number_count:
+            mean = self.number_sum / self.number_count
+            lines.append(f"  min {_number(self.minimum)}, max {_number(self.maximum)}, mean {_number(mean)}")
+        if self.dates:
+            lines.append(f"  from {self.dates[0]} to {self.dates[1]}")
+        if self.lengths:
+            lines.append(f"  length {self.lengths[0]}-{self.lengths[1]}")
+        top = self.top_values()
+        if top:
+            shares = ", ".join(f"{_quote(v)} {n / rows:.1%}" for v, n in top)
+            lines.append(f"  top: {shares}")
+        return lines
+
+
+def _number(value) -> str:
+    if isinstance(value, float) and not value.is_integer():
+        return f"{value:.6g}"
+    return f"{int(value):,}" if abs(value) < 1e15 else f"{value:.6g}"
+
+
+def _quote(text: str, limit: int = 40) -> str:
+    if len(text) > limit:
+        text = text[:limit - 3] + "..."
+    return repr(text)
+
+
+def table_rows(file_path: Path, sheet: Optional[str] = None) -> Iterator[list[str]]:
+    """Stream the rows of a CSV file or Excel sheet as cell texts.
+
+    Raises:
+        ValueError: For unsupported formats or missing optional dependencies.
+    """
+    suffix = file_path.suffix.lower()
+    if suffix in (".csv", ".tsv"):
+        with open(file_path, "r", encoding="utf-8", errors="replace", newline="") as f:
+            yield from csv.reader(f, delimiter="\t" if suffix == ".tsv" else ",")
+
+    elif suffix in (".xlsx", ".xlsm"):
+        if not HAS_OPENPYXL:
+            raise ValueError("Excel support requires: pip install openpyxl")
+        import openpyxl
+
+        wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            ws = wb[sheet] if sheet and sheet in wb.sheetnames else wb.active
+            for row in ws.iter_rows(values_only=True):
+                yield [_cell_text(cell) for cell in row]
+        finally:
+            wb.close()
+
+    elif suffix == ".xls":
+        if not HAS_XLRD:
+            raise ValueError("Legacy Excel (.xls) support requires: pip install xlrd")
+        import xlrd
+
+        wb = xlrd.open_workbook(str(file_path))
+        ws = wb.sheet_by_name(sheet) if sheet and sheet in wb.sheet_names() else wb.sheet_by_index(0)
+        for row_idx in range(ws.nrows):
+            yield [_cell_text(cell) for cell in ws.row_values(row_idx)]
+
+    else:
+        raise ValueError(f"Unsupported file type: {suffix} (use CSV or Excel)")
+
+
+def profile_rows(
+    rows: Iterator[list[str]],
+    columns: Optional[str] = None,
+    max_rows: Optional[int] = None,
+    use_numpy: bool = HAS_NUMPY,
+) -> tuple[list[ColumnProfile], int]:
+    """Profile a table whose first row holds the column names.
+
+    Args:
+        rows: The table's rows.
+        columns: Comma-separated columns to profile (names, numbers or letters).
+        max_rows: Profile only this many data rows.
+        use_numpy: Use the vectorized NumPy passes.
+
+    Returns:
+        (column profiles, number of data rows)
+
+    Raises:
+        ValueError: If a requested column doesn't exist.
+    """
+    header = next(rows, None)
+    if header is None:
+        return [], 0
+    names = [name.strip() or f"column {i + 1}" for i, name in enumerate(header)]
+    indexes = select_columns(header, columns) if columns else list(range(len(names)))
+    profiles = [ColumnProfile(names[i] if i < len(names) else f"column {i + 1}") for i in indexes]
+    chunk_stats = chunk_stats_numpy if use_numpy else chunk_stats_python
+
+    if max_rows is not None:
+        rows = islice(rows, max_rows)
+    total = 0
+    while True:
+        chunk = list(islice(rows, CHUNK_ROWS))
+        if not chunk:
+            break
+        total += len(chunk)
+        # Short rows are missing values at the end
+        chunk_columns = list(zip_longest(*chunk, fillvalue=""))
+        for profile, index in zip(profiles, indexes):
+            cells = chunk_columns[index] if index < len(chunk_columns) else ("",) * len(chunk)
+            profile.add(chunk_stats(list(cells)))
+    return profiles, total
+
+
+class ProfileDataTool(Tool):
+    """Summarize the columns of a CSV or Excel file."""
+
+    name = "profile_data"
+    description = (
+        "Profile the columns of a CSV or Excel file: type, nulls, distinct count, "
+        "min/max/mean and most common values. Use this to understand a large "
+        "dataset before (or instead of) reading its rows."
+    )
+    requires_build_mode = False
+    cacheable = True
+
+    def cache_fingerprint(self, path: str = "", **kwargs) -> Optional[Hashable]:
+        """Results depend only on the file being profiled."""
+        return self._file_fingerprint(path)
+
+    def execute(
+        self,
+        path: str,
+        sheet: str = None,
+        columns: str = None,
+        max_rows: int = None
+    ) -> ToolResult:
+        """Profile a table's columns.
+
+        Args:
+            path: Path to the CSV or Excel file.
+            sheet: Sheet name for Excel files (default: first sheet).
+            columns: Comma-separated columns to profile (default: all).
+            max_rows: Profile only the first N data rows.
+
+        Returns:
+            ToolResult with one short summary per column.
+        """
+        try:
+            file_path = self._resolve_path(path)
+        except ValueError as e:
+            return ToolResult.fail(str(e))
+
+        if not file_path.is_file():
+            return ToolResult.fail(f"Not a file: {path}")
+
+        try:
+            profiles, rows = profile_rows(table_rows(file_path, sheet), columns, max_rows)
+        except (ValueError, OSError) as e:
+            return ToolResult.fail(str(e))
+
+        engine = "numpy" if HAS_NUMPY else "python"
+        lines = [
+            f"[DATA PROFILE: {file_path.name}]",
+            f"Rows: {rows:,} (excluding header), columns: {len(profiles)}, engine: {engine}",
+            "",
+        ]
+        for profile in profiles:
+            lines.extend(profile.render(rows))
+        output = "\n".join(lines)
+
+        display = f"\033[34m> Profiling {path} ({rows:,} rows, {len(profiles)} columns)\033[0m"
+        return ToolResult(success=True, output=display, _llm_output=output)
+
+    def get_schema(self) -> dict:
+        """Return JSON schema for LLM function calling."""
+        return {
+            "properties": {
+                "path": {
+                    "type": "string",
+                    "description": "Path to the CSV (.csv, .tsv) or Excel (.xlsx, .xls) file"
+                },
+                "sheet": {
+                    "type": "string",
+                    "description": "Sheet name for Excel files (default: first/active sheet)"
+                },
+                "columns": {
+                    "type": "string",
+                    "description": "Comma-separated columns to profile, by header name, number (1-based) or letter"
+                },
+                "max_rows": {
+                    "type": "integer",
+                    "description": "Profile only the first N data rows (default: all)"
+                }
+            },
+            "required": ["path"]
+        }
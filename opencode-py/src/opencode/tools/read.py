@@ -1,8 +1,14 @@
 """Read file tool with support for various file formats."""
 
+import importlib
+import importlib.util
+import random
+from collections import deque
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
+from typing import Hashable, Iterable, Optional
 
+from opencode.line_index import line_index
 from opencode.tools.base import Tool, ToolResult
 
 
@@ -15,6 +21,13 @@ LARGE_FILE_THRESHOLD = 500
 # Lines to show as preview for large files
 LARGE_FILE_PREVIEW_LINES = 50
 
+# Files of at least this many bytes are read in windows through the line
+# index (range, tail and preview reads) instead of being loaded whole
+WINDOWED_READ_BYTES = 4 * 1024 * 1024
+
+# Bytes checked for binary content before a windowed read
+BINARY_SAMPLE_BYTES = 8192
+
 # File type categories
 OFFICE_EXTENSIONS = {
     # Excel
@@ -28,42 +41,243 @@ OFFICE_EXTENSIONS = {
 # XML/structured data extensions
 XML_EXTENSIONS = {".xml", ".xhtml", ".svg", ".plist", ".rss", ".atom"}
 
-# Check for optional dependencies
-try:
-    import openpyxl
-    HAS_OPENPYXL = True
-except ImportError:
-    HAS_OPENPYXL = False
-
-try:
-    import xlrd
-    HAS_XLRD = True
-except ImportError:
-    HAS_XLRD = False
-
-try:
-    from docx import Document as DocxDocument
-    HAS_DOCX = True
-except ImportError:
-    HAS_DOCX = False
-
-try:
-    import pypdf
-    HAS_PYPDF = True
-except ImportError:
-    try:
-        import PyPDF2 as pypdf
-        HAS_PYPDF = True
-    except ImportError:
-        HAS_PYPDF = False
+# Rows of a CSV file or Excel sheet returned per read unless max_rows says otherwise
+DEFAULT_MAX_ROWS = 200
+
+# Which rows to return when a table has more than max_rows
+SAMPLE_MODES = ("head", "tail", "random")
+
+# Seed for random samples, so repeating a read returns the same rows
+SAMPLE_SEED = 0
+
+# Optional dependencies. Only checked for here; each is imported when a
+# file of its format is first read, not when the tool is loaded.
+HAS_OPENPYXL = importlib.util.find_spec("openpyxl") is not None
+HAS_XLRD = importlib.util.find_spec("xlrd") is not None
+HAS_DOCX = importlib.util.find_spec("docx") is not None
+_PDF_MODULE = next((m for m in ("pypdf", "PyPDF2") if importlib.util.find_spec(m)), None)
+HAS_PYPDF = _PDF_MODULE is not None
 
 
-def read_excel_file(file_path: Path, sheet: Optional[str] = None) -> tuple[str, str]:
+@dataclass
+class RowWindow:
+    """Rows of a table (CSV file or sheet) picked for one read.
+
+    Attributes:
+        rows: (1-based row number, cells) in table order.
+        header: The table's first row when it is not among `rows`.
+        total: Number of rows in the table, or None if reading stopped early.
+    """
+    rows: list
+    header: Optional[list] = None
+    total: Optional[int] = None
+
+    @property
+    def complete(self) -> bool:
+        """Every row of the table was returned."""
+        shown = len(self.rows) + (self.header is not None)
+        return self.total is not None and shown >= self.total
+
+    @property
+    def first_row(self) -> Optional[list]:
+        """The table's first row (column names), if read."""
+        if self.header is not None:
+            return self.header
+        if self.rows and self.rows[0][0] == 1:
+            return self.rows[0][1]
+        return None
+
+
+def _parse_row_range(row_range: str) -> tuple[int, int]:
+    """Parse a 1-based inclusive row range like '100-200' or '100'."""
+    start, _, end = row_range.partition("-")
+    start = max(1, int(start))
+    return start, int(end) if end else start
+
+
+def select_rows(
+    rows: Iterable[list],
+    row_range: Optional[str] = None,
+    sample: Optional[str] = None,
+    max_rows: int = DEFAULT_MAX_ROWS,
+) -> RowWindow:
+    """Pick the rows a read asks for, streaming `rows` only as far as needed.
+
+    Head and range reads stop as soon as their rows are in; tail and
+    random samples read every row but keep only max_rows of them.
+
+    Args:
+        rows: The table's rows, first row first.
+        row_range: 1-based inclusive range ("100-200" or "100").
+        sample: "head" (default), "tail" or "random" - which rows to return
+            when the table has more than max_rows.
+        max_rows: Most rows returned.
+
+    Raises:
+        ValueError: For an unknown sample mode or a malformed range.
+    """
+    if sample not in (None, *SAMPLE_MODES):
+        raise ValueError(f"Unknown sample mode: {sample} (use {', '.join(SAMPLE_MODES)})")
+    max_rows = max(1, max_rows)
+    header = None
+    count = 0
+
+    if row_range:
+        start, end = _parse_row_range(row_range)
+        end = min(end, start + max_rows - 1)
+        picked = []
+        for count, row in enumerate(rows, 1):
+            if count > end:
+                return RowWindow(picked, header)
+            if count >= start:
+                picked.append((count, row))
+            elif count == 1:
+                header = row
+        return RowWindow(picked, header, count)
+
+    if sample == "tail":
+        kept = deque(maxlen=max_rows)
+        for count, row in enumerate(rows, 1):
+            if count == 1:
+                header = row
+            kept.append((count, row))
+        if kept and kept[0][0] == 1:
+            header = None
+        return RowWindow(list(kept), header, count)
+
+    if sample == "random":
+        # Reservoir sample of the rows after the first (the column names)
+        rng = random.Random(SAMPLE_SEED)
+        kept = []
+        for count, row in enumerate(rows, 1):
+            if count == 1:
+                header = row
+            elif len(kept) < max_rows:
+                kept.append((count, row))
+            else:
+                slot = rng.randrange(count - 1)
+                if slot < max_rows:
+                    kept[slot] = (count, row)
+        kept.sort(key=lambda item: item[0])
+        return RowWindow(kept, header, count)
+
+    picked = []
+    for count, row in enumerate(rows, 1):
+        if count > max_rows:
+            return RowWindow(picked)
+        picked.append((count, row))
+    return RowWindow(picked, total=count)
+
+
+def _column_letters_index(name: str) -> Optional[int]:
+    """0-based index of an Excel column name like 'A' or 'AB' (at most 'XFD')."""
+    if not name.isalpha() or not name.isascii() or len(name) > 3:
+        return None
+    index = 0
+    for char in name.upper():
+        index = index * 26 + ord(char) - ord("A") + 1
+    return index - 1
+
+
+def select_columns(first_row: Optional[list], columns: str) -> list[int]:
+    """0-based indexes of the columns in a comma-separated list.
+
+    Each column is matched against the first row's names (case-insensitive),
+    then read as a 1-based number or an Excel column letter.
+
+    Raises:
+        ValueError: If a column matches nothing.
+    """
+    names = [str(cell).strip().lower() for cell in first_row or []]
+    indexes = []
+    for column in (c.strip() for c in columns.split(",")):
+        if not column:
+            continue
+        if column.lower() in names:
+            indexes.append(names.index(column.lower()))
+        elif column.isdigit() and int(column) >= 1:
+            indexes.append(int(column) - 1)
+        elif _column_letters_index(column) is not None:
+            indexes.append(_column_letters_index(column))
+        else:
+            raise ValueError(f"Unknown column: {column}")
+    return indexes
+
+
+def format_rows(window: RowWindow, columns: Optional[str] = None) -> list[str]:
+    """Numbered text lines of a row window, restricted to some columns."""
+    indexes = select_columns(window.first_row, columns) if columns else None
+
+    def line(number: int, cells: list) -> str:
+        if indexes is not None:
+            cells = [cells[i] if i < len(cells) else "" for i in indexes]
+        return f"{number:4d} | " + " | ".join(cells)
+
+    lines = []
+    if window.header is not None:
+        lines.append(line(1, window.header))
+    previous = 1 if window.header is not None else 0
+    for number, cells in window.rows:
+        if previous and number > previous + 1:
+            lines.append("     ...")
+        lines.append(line(number, cells))
+        previous = number
+    return lines
+
+
+def describe_rows(kind: str, window: RowWindow, estimate: Optional[int] = None, exact: bool = False) -> str:
+    """Short description of what a table read returned, e.g. 'CSV (3 rows)'.
+
+    Args:
+        kind: Format name.
+        window: The rows read.
+        estimate: Row count known without reading every row (sheet
+            dimensions, line count), used when reading stopped early.
+        exact: The estimate is exact rather than approximate.
+    """
+    if window.total is not None:
+        total = f"{window.total:,}"
+    elif estimate is not None:
+        total = f"{estimate:,}" if exact else f"~{estimate:,}"
+    else:
+        total = "more"
+    if window.complete:
+        return f"{kind} ({window.total} rows)"
+    return f"{kind} ({len(window.rows)} of {total} rows)"
+
+
+def _window_tip(window: RowWindow, description: str) -> list[str]:
+    """Paging hint appended when a read returned only part of a table."""
+    if window.complete:
+        return []
+    return [
+        "",
+        f"[PARTIAL: {description}. Use rows=\"START-END\", sample=\"tail\"/\"random\", "
+        f"columns=\"A,B\" or max_rows=N to see other parts]",
+    ]
+
+
+def read_excel_file(
+    file_path: Path,
+    sheet: Optional[str] = None,
+    rows: Optional[str] = None,
+    sample: Optional[str] = None,
+    columns: Optional[str] = None,
+    max_rows: int = DEFAULT_MAX_ROWS,
+) -> tuple[str, str]:
     """Read Excel file and return content as text.
 
+    Rows are streamed and reading stops once the requested window is
+    filled (see select_rows).
+
     Args:
         file_path: Path to Excel file.
         sheet: Optional sheet name (default: first sheet).
+        rows: Row range like "100-200" (1-based, inclusive).
+        sample: "head", "tail" or "random" rows when the sheet is bigger
+            than max_rows.
+        columns: Comma-separated column names, numbers or letters.
+        max_rows: Most rows returned.
 
     Returns:
         Tuple of (content, format_description)
@@ -75,6 +289,8 @@ def read_excel_file(file_path: Path, sheet: Optional[str] = None) -> tuple[str,
         if not HAS_OPENPYXL:
             return "", "Excel support requires: pip install openpyxl"
 
+        import openpyxl
+
         wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
         sheet_names = wb.sheetnames
 
@@ -89,22 +305,27 @@ def read_excel_file(file_path: Path, sheet: Optional[str] = None) -> tuple[str,
         lines.append(f"Active sheet: {ws.title}")
         lines.append("")
 
-        # Read all rows
-        row_count = 0
-        for row in ws.iter_rows(values_only=True):
-            row_count += 1
+        try:
             # Convert cells to strings, handle None
-            cells = [str(cell) if cell is not None else "" for cell in row]
-            lines.append(f"{row_count:4d} | " + " | ".join(cells))
-
-        wb.close()
-        return "\n".join(lines), f"Excel ({row_count} rows)"
+            window = select_rows(
+                ([str(cell) if cell is not None else "" for cell in row]
+                 for row in ws.iter_rows(values_only=True)),
+                rows, sample, max_rows,
+            )
+            # Read-only sheets know their size from the sheet's dimensions
+            description = describe_rows("Excel", window, ws.max_row)
+            lines.extend(format_rows(window, columns))
+        finally:
+            wb.close()
+        return "\n".join(lines + _window_tip(window, description)), description
 
     # Legacy Excel (.xls)
     elif suffix == ".xls":
         if not HAS_XLRD:
             return "", "Legacy Excel (.xls) support requires: pip install xlrd"
 
+        import xlrd
+
         wb = xlrd.open_workbook(str(file_path))
         sheet_names = wb.sheet_names()
 
@@ -119,12 +340,14 @@ def read_excel_file(file_path: Path, sheet: Optional[str] = None) -> tuple[str,
         lines.append(f"Active sheet: {ws.name}")
         lines.append("")
 
-        for row_idx in range(ws.nrows):
-            row = ws.row_values(row_idx)
-            cells = [str(cell) if cell else "" for cell in row]
-            lines.append(f"{row_idx + 1:4d} | " + " | ".join(cells))
-
-        return "\n".join(lines), f"Excel ({ws.nrows} rows)"
+        window = select_rows(
+            ([str(cell) if cell else "" for cell in ws.row_values(row_idx)]
+             for row_idx in range(ws.nrows)),
+            rows, sample, max_rows,
+        )
+        description = describe_rows("Excel", window, ws.nrows, exact=True)
+        lines.extend(format_rows(window, columns))
+        return "\n".join(lines + _window_tip(window, description)), description
 
     return "", f"Unsupported Excel format: {suffix}"
 
@@ -144,6 +367,8 @@ def read_word_file(file_path: Path) -> tuple[str, str]:
         if not HAS_DOCX:
             return "", "Word support requires: pip install python-docx"
 
+        from docx import Document as DocxDocument
+
         doc = DocxDocument(file_path)
 
         lines = []
@@ -244,11 +469,25 @@ def read_xml_file(file_path: Path) -> tuple[str, str]:
         return "", f"Failed to read XML: {e}"
 
 
-def read_csv_file(file_path: Path) -> tuple[str, str]:
+def read_csv_file(
+    file_path: Path,
+    rows: Optional[str] = None,
+    sample: Optional[str] = None,
+    columns: Optional[str] = None,
+    max_rows: int = DEFAULT_MAX_ROWS,
+) -> tuple[str, str]:
     """Read CSV file and return content as text.
 
+    Rows are streamed and reading stops once the requested window is
+    filled (see select_rows).
+
     Args:
         file_path: Path to CSV file.
+        rows: Row range like "100-200" (1-based, inclusive).
+        sample: "head", "tail" or "random" rows when the file is bigger
+            than max_rows.
+        columns: Comma-separated column names, numbers or letters.
+        max_rows: Most rows returned.
 
     Returns:
         Tuple of (content, format_description)
@@ -259,14 +498,16 @@ def read_csv_file(file_path: Path) -> tuple[str, str]:
     lines.append(f"[CSV FILE: {file_path.name}]")
     lines.append("")
 
-    row_count = 0
-    with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
-        reader = csv.reader(f)
-        for row in reader:
-            row_count += 1
-            lines.append(f"{row_count:4d} | " + " | ".join(row))
+    with open(file_path, 'r', encoding='utf-8', errors='replace', newline='') as f:
+        window = select_rows(csv.reader(f), rows, sample, max_rows)
 
-    return "\n".join(lines), f"CSV ({row_count} rows)"
+    estimate = None
+    if window.total is None:
+        # One row per line unless quoted fields span lines
+        estimate = line_index().get(file_path).line_count
+    description = describe_rows("CSV", window, estimate)
+    lines.extend(format_rows(window, columns))
+    return "\n".join(lines + _window_tip(window, description)), description
 
 
 def read_pdf_file(file_path: Path) -> tuple[str, str]:
@@ -285,6 +526,7 @@ def read_pdf_file(file_path: Path) -> tuple[str, str]:
     lines.append(f"[PDF FILE: {file_path.name}]")
 
     try:
+        pypdf = importlib.import_module(_PDF_MODULE)
         reader = pypdf.PdfReader(str(file_path))
         num_pages = len(reader.pages)
         lines.append(f"Pages: {num_pages}")
@@ -317,6 +559,14 @@ def read_pdf_file(file_path: Path) -> tuple[str, str]:
         return "", f"Failed to read PDF: {e}"
 
 
+def _preview(title: str, lines: list) -> str:
+    """User-facing view of a read: a title and the first MAX_DISPLAY_LINES lines."""
+    display = [f"\033[34m> {title}\033[0m", *lines[:MAX_DISPLAY_LINES]]
+    if len(lines) > MAX_DISPLAY_LINES:
+        display.append(f"\033[90m   ... ({len(lines) - MAX_DISPLAY_LINES} more lines)\033[0m")
+    return "\n".join(display)
+
+
 class ReadTool(Tool):
     """Read file contents with support for various formats."""
 
@@ -325,16 +575,28 @@ class ReadTool(Tool):
         "Read the contents of a file. Supports: "
         "text files, code files, Excel (.xlsx, .xls), Word (.docx), PDF, CSV, XML, and more. "
         "For large files (>500 lines), returns outline + preview by default. "
-        "Use full=true to read entire file. Use sheet parameter for Excel files."
+        "Use full=true to read entire file, tail=N for its last N lines. "
+        "CSV and Excel files return up to max_rows rows: page with rows, "
+        "sample head/tail/random, pick columns. Use sheet parameter for Excel files."
     )
     requires_build_mode = False
+    cacheable = True
+
+    def cache_fingerprint(self, path: str = "", **kwargs) -> Optional[Hashable]:
+        """Results depend only on the file being read."""
+        return self._file_fingerprint(path)
 
     def execute(
         self,
         path: str,
         lines: str = None,
         full: bool = False,
-        sheet: str = None
+        sheet: str = None,
+        tail: int = None,
+        rows: str = None,
+        sample: str = None,
+        columns: str = None,
+        max_rows: int = DEFAULT_MAX_ROWS
     ) -> ToolResult:
         """Read a file's contents.
 
@@ -343,6 +605,13 @@ class ReadTool(Tool):
             lines: Optional line range (e.g., "10-20" or "10") for text files.
             full: If True, read entire file even if large.
             sheet: Sheet name for Excel files (default: first sheet).
+            tail: Read only the last N lines of a text file.
+            rows: Row range (e.g., "100-200") for CSV and Excel files.
+            sample: Rows of a big CSV/Excel table to return: "head",
+                "tail" or "random".
+            columns: Comma-separated CSV/Excel columns (names, numbers
+                or letters).
+            max_rows: Most CSV/Excel rows to return.
 
         Returns:
             ToolResult with file contents.
@@ -365,7 +634,7 @@ class ReadTool(Tool):
 
         # Handle Excel files
         if suffix in (".xlsx", ".xls", ".xlsm", ".xlsb"):
-            return self._read_excel(file_path, sheet)
+            return self._read_excel(file_path, sheet, rows, sample, columns, max_rows)
 
         # Handle Word files
         if suffix in (".docx", ".doc"):
@@ -377,12 +646,19 @@ class ReadTool(Tool):
 
         # Handle CSV files
         if suffix == ".csv":
-            return self._read_csv(file_path)
+            return self._read_csv(file_path, rows, sample, columns, max_rows)
 
         # Handle XML files
         if suffix in XML_EXTENSIONS:
             return self._read_xml(file_path)
 
+        if lines and tail:
+            return ToolResult.fail("Use either lines or tail, not both")
+
+        # Big text files: read only the requested window
+        if not full and file_path.stat().st_size >= WINDOWED_READ_BYTES:
+            return self._read_windowed(path, file_path, lines, tail)
+
         # Handle regular text files
         try:
             content = file_path.read_text(encoding='utf-8')
@@ -395,46 +671,89 @@ class ReadTool(Tool):
         if lines:
             # Specific line range requested - return those lines
             start, end = self._parse_line_range(lines, total_lines)
-            selected_lines = file_lines[start:end]
-            numbered = [
-                f"{i + start + 1:4d} | {line}"
-                for i, line in enumerate(selected_lines)
-            ]
-            full_output = "\n".join(numbered)
-            display_lines = numbered
+            numbered = self._number_lines(file_lines[start:end], start)
+
+        elif tail:
+            start = max(0, total_lines - tail)
+            numbered = self._number_lines(file_lines[start:], start)
 
         elif total_lines > LARGE_FILE_THRESHOLD and not full:
             # Large file - provide outline + preview for LLM (unless full read requested)
-            return self._handle_large_file(path, file_path, file_lines, total_lines)
+            return self._handle_large_file(
+                path, file_path, file_lines[:LARGE_FILE_PREVIEW_LINES], total_lines
+            )
 
         else:
             # Small file - return everything
-            numbered = [
-                f"{i + 1:4d} | {line}"
-                for i, line in enumerate(file_lines)
-            ]
-            full_output = "\n".join(numbered)
-            display_lines = numbered
-
-        # Truncated display for user
-        if len(display_lines) > MAX_DISPLAY_LINES:
-            preview = "\n".join(display_lines[:MAX_DISPLAY_LINES])
-            remaining = len(display_lines) - MAX_DISPLAY_LINES
-            print(f"\033[34m> Reading {path} ({total_lines} lines)\033[0m")
-            print(preview)
-            print(f"\033[90m   ... ({remaining} more lines)\033[0m")
+            numbered = self._number_lines(file_lines, 0)
+
+        return self._show_lines(path, numbered, total_lines)
+
+    def _read_windowed(
+        self,
+        path: str,
+        file_path: Path,
+        lines: Optional[str],
+        tail: Optional[int]
+    ) -> ToolResult:
+        """Read part of a big file through the line index.
+
+        Range reads seek to the requested lines, tail reads scan back from
+        the end and the default view reads just the preview, so memory
+        and time depend on the window, not the file size.
+        """
+        if self._looks_binary(file_path):
+            return self._handle_binary_file(file_path)
+
+        index = line_index()
+        if tail:
+            window, total_lines = index.tail(file_path, tail)
+            if total_lines is None:
+                # Line numbers would need a count of the whole file
+                display = _preview(f"Reading {path} (last {len(window)} lines)", window)
+                return ToolResult(success=True, output=display, _llm_output="\n".join(window))
+            start = total_lines - len(window)
         else:
-            print(f"\033[34m> Reading {path} ({total_lines} lines)\033[0m")
-            print("\n".join(display_lines))
+            total_lines = index.get(file_path).line_count
+            if lines:
+                start, end = self._parse_line_range(lines, total_lines)
+            elif total_lines > LARGE_FILE_THRESHOLD:
+                preview, _ = index.read_lines(file_path, 0, LARGE_FILE_PREVIEW_LINES)
+                return self._handle_large_file(path, file_path, preview, total_lines)
+            else:
+                # Few but very long lines: the whole file is the window
+                start, end = 0, total_lines
+            window, total_lines = index.read_lines(file_path, start, end)
+
+        return self._show_lines(path, self._number_lines(window, start), total_lines)
+
+    def _looks_binary(self, file_path: Path) -> bool:
+        """Check the start of a file for NUL bytes or invalid UTF-8."""
+        with open(file_path, "rb") as f:
+            sample = f.read(BINARY_SAMPLE_BYTES)
+        if b"\0" in sample:
+            return True
+        try:
+            sample.decode("utf-8")
+        except UnicodeDecodeError as e:
+            # A character cut off at the end of the sample is fine
+            return e.start < len(sample) - 3
+        return False
+
+    def _number_lines(self, file_lines: list, start: int) -> list:
+        """Prefix lines with their line numbers, the first being start + 1."""
+        return [f"{i + start + 1:4d} | {line}" for i, line in enumerate(file_lines)]
 
-        # Return full content to LLM
-        return ToolResult(success=True, output="", _llm_output=full_output)
+    def _show_lines(self, path: str, numbered: list, total_lines: int) -> ToolResult:
+        """Return a truncated view for the user and all lines for the LLM."""
+        display = _preview(f"Reading {path} ({total_lines} lines)", numbered)
+        return ToolResult(success=True, output=display, _llm_output="\n".join(numbered))
 
     def _handle_large_file(
         self,
         path: str,
         file_path: Path,
-        file_lines: list,
+        preview_lines: list,
         total_lines: int
     ) -> ToolResult:
         """Handle large files by providing outline + preview.
@@ -448,12 +767,7 @@ class ReadTool(Tool):
         outline_text = self._get_outline(path, file_path)
 
         # Build preview of first N lines
-        preview_lines = file_lines[:LARGE_FILE_PREVIEW_LINES]
-        numbered_preview = [
-            f"{i + 1:4d} | {line}"
-            for i, line in enumerate(preview_lines)
-        ]
-        preview_text = "\n".join(numbered_preview)
+        preview_text = "\n".join(self._number_lines(preview_lines, 0))
 
         # Build LLM output
         llm_parts = [
@@ -473,109 +787,35 @@ class ReadTool(Tool):
             f"[PREVIEW: First {LARGE_FILE_PREVIEW_LINES} lines]",
             preview_text,
             "",
-            f"[TIP: Use read(path=\"{path}\", lines=\"START-END\") to view specific sections]",
+            f"[TIP: Use read(path=\"{path}\", lines=\"START-END\") to view specific sections, "
+            f"or tail=N for the last N lines]",
         ])
 
         llm_output = "\n".join(llm_parts)
 
         # Display output for user
-        print(f"\033[34m> Reading {path} ({total_lines} lines - large file)\033[0m")
+        display = [f"\033[34m> Reading {path} ({total_lines} lines - large file)\033[0m"]
         if outline_text:
             # Show abbreviated outline
             outline_lines = outline_text.splitlines()
+            display.extend(outline_lines[:10])
             if len(outline_lines) > 10:
-                print("\n".join(outline_lines[:10]))
-                print(f"\033[90m   ... ({len(outline_lines) - 10} more symbols)\033[0m")
-            else:
-                print(outline_text)
-        print(f"\033[90m   [Showing structure + first {LARGE_FILE_PREVIEW_LINES} lines to LLM]\033[0m")
+                display.append(f"\033[90m   ... ({len(outline_lines) - 10} more symbols)\033[0m")
+        display.append(f"\033[90m   [Showing structure + first {LARGE_FILE_PREVIEW_LINES} lines to LLM]\033[0m")
 
-        return ToolResult(success=True, output="", _llm_output=llm_output)
+        return ToolResult(success=True, output="\n".join(display), _llm_output=llm_output)
 
     def _get_outline(self, path: str, file_path: Path) -> str:
-        """Try to get file outline using OutlineTool patterns."""
-        import re
-
-        # Language detection
-        LANGUAGE_MAP = {
-            ".py": "python",
-            ".js": "javascript",
-            ".jsx": "javascript",
-            ".ts": "typescript",
-            ".tsx": "typescript",
-            ".rs": "rust",
-            ".go": "go",
-            ".java": "java",
-            ".c": "c",
-            ".h": "c",
-            ".cpp": "cpp",
-            ".hpp": "cpp",
-            ".rb": "ruby",
-        }
-
-        # Symbol patterns (simplified from OutlineTool)
-        PATTERNS = {
-            "python": [
-                (r"^(\s*)class\s+(\w+)", "class"),
-                (r"^(\s*)def\s+(\w+)", "function"),
-            ],
-            "javascript": [
-                (r"^(\s*)class\s+(\w+)", "class"),
-                (r"^(\s*)function\s+(\w+)", "function"),
-                (r"^(\s*)const\s+(\w+)\s*=.*=>", "arrow"),
-            ],
-            "typescript": [
-                (r"^(\s*)class\s+(\w+)", "class"),
-                (r"^(\s*)interface\s+(\w+)", "interface"),
-                (r"^(\s*)function\s+(\w+)", "function"),
-                (r"^(\s*)type\s+(\w+)", "type"),
-            ],
-            "rust": [
-                (r"^(\s*)(?:pub\s+)?struct\s+(\w+)", "struct"),
-                (r"^(\s*)(?:pub\s+)?enum\s+(\w+)", "enum"),
-                (r"^(\s*)(?:pub\s+)?fn\s+(\w+)", "fn"),
-                (r"^(\s*)impl.*?(\w+)\s*\{", "impl"),
-            ],
-            "go": [
-                (r"^type\s+(\w+)\s+struct", "struct"),
-                (r"^func\s+(\w+)", "func"),
-                (r"^func\s+\([^)]+\)\s+(\w+)", "method"),
-            ],
-        }
-
-        suffix = file_path.suffix
-        language = LANGUAGE_MAP.get(suffix)
-        if not language or language not in PATTERNS:
-            return ""
-
-        patterns = [(re.compile(p), k) for p, k in PATTERNS.get(language, [])]
-        if not patterns:
-            return ""
-
-        try:
-            content = file_path.read_text(encoding='utf-8', errors='ignore')
-        except Exception:
-            return ""
-
-        symbols = []
-        for line_num, line in enumerate(content.splitlines(), 1):
-            for pattern, kind in patterns:
-                match = pattern.match(line)
-                if match:
-                    # Get name from last group
-                    name = match.group(match.lastindex)
-                    indent = len(match.group(1)) if match.lastindex > 1 else 0
-                    symbols.append((indent, kind, name, line_num))
-                    break
-
-        if not symbols:
+        """Get a compact file outline from the symbol table."""
+        file_symbols = self._symbol_table(file_path).get(file_path)
+        if not file_symbols or not file_symbols.outline:
             return ""
 
         # Format as simple tree
         lines = []
-        for indent, kind, name, line_num in symbols:
-            prefix = "  " * (indent // 4)
-            lines.append(f"{prefix}[{kind[0].upper()}] {name} ::{line_num}")
+        for sym in file_symbols.outline:
+            prefix = "  " * (sym.indent // 4)
+            lines.append(f"{prefix}[{sym.kind[0].upper()}] {sym.name} ::{sym.line}")
 
         return "\n".join(lines)
 
@@ -590,23 +830,23 @@ class ReadTool(Tool):
             end = start + 1
         return max(0, start), min(total, end)
 
-    def _read_excel(self, file_path: Path, sheet: str = None) -> ToolResult:
+    def _read_excel(
+        self,
+        file_path: Path,
+        sheet: str = None,
+        rows: str = None,
+        sample: str = None,
+        columns: str = None,
+        max_rows: int = DEFAULT_MAX_ROWS
+    ) -> ToolResult:
         """Read Excel file."""
         try:
-            content, description = read_excel_file(file_path, sheet)
+            content, description = read_excel_file(file_path, sheet, rows, sample, columns, max_rows)
             if not content:
                 return ToolResult.fail(description)
 
-            # Display preview
-            lines = content.splitlines()
-            print(f"\033[34m> Reading {file_path.name} ({description})\033[0m")
-            if len(lines) > MAX_DISPLAY_LINES:
-                print("\n".join(lines[:MAX_DISPLAY_LINES]))
-                print(f"\033[90m   ... ({len(lines) - MAX_DISPLAY_LINES} more lines)\033[0m")
-            else:
-                print(content)
-
-            return ToolResult(success=True, output="", _llm_output=content)
+            display = _preview(f"Reading {file_path.name} ({description})", content.splitlines())
+            return ToolResult(success=True, output=display, _llm_output=content)
         except Exception as e:
             return ToolResult.fail(f"Failed to read Excel file: {e}")
 
@@ -617,34 +857,25 @@ class ReadTool(Tool):
             if not content:
                 return ToolResult.fail(description)
 
-            # Display preview
-            lines = content.splitlines()
-            print(f"\033[34m> Reading {file_path.name} ({description})\033[0m")
-            if len(lines) > MAX_DISPLAY_LINES:
-                print("\n".join(lines[:MAX_DISPLAY_LINES]))
-                print(f"\033[90m   ... ({len(lines) - MAX_DISPLAY_LINES} more lines)\033[0m")
-            else:
-                print(content)
-
-            return ToolResult(success=True, output="", _llm_output=content)
+            display = _preview(f"Reading {file_path.name} ({description})", content.splitlines())
+            return ToolResult(success=True, output=display, _llm_output=content)
         except Exception as e:
             return ToolResult.fail(f"Failed to read Word document: {e}")
 
-    def _read_csv(self, file_path: Path) -> ToolResult:
+    def _read_csv(
+        self,
+        file_path: Path,
+        rows: str = None,
+        sample: str = None,
+        columns: str = None,
+        max_rows: int = DEFAULT_MAX_ROWS
+    ) -> ToolResult:
         """Read CSV file."""
         try:
-            content, description = read_csv_file(file_path)
-
-            # Display preview
-            lines = content.splitlines()
-            print(f"\033[34m> Reading {file_path.name} ({description})\033[0m")
-            if len(lines) > MAX_DISPLAY_LINES:
-                print("\n".join(lines[:MAX_DISPLAY_LINES]))
-                print(f"\033[90m   ... ({len(lines) - MAX_DISPLAY_LINES} more lines)\033[0m")
-            else:
-                print(content)
+            content, description = read_csv_file(file_path, rows, sample, columns, max_rows)
 
-            return ToolResult(success=True, output="", _llm_output=content)
+            display = _preview(f"Reading {file_path.name} ({description})", content.splitlines())
+            return ToolResult(success=True, output=display, _llm_output=content)
         except Exception as e:
             return ToolResult.fail(f"Failed to read CSV file: {e}")
 
@@ -655,16 +886,8 @@ class ReadTool(Tool):
             if not content:
                 return ToolResult.fail(description)
 
-            # Display preview
-            lines = content.splitlines()
-            print(f"\033[34m> Reading {file_path.name} ({description})\033[0m")
-            if len(lines) > MAX_DISPLAY_LINES:
-                print("\n".join(lines[:MAX_DISPLAY_LINES]))
-                print(f"\033[90m   ... ({len(lines) - MAX_DISPLAY_LINES} more lines)\033[0m")
-            else:
-                print(content)
-
-            return ToolResult(success=True, output="", _llm_output=content)
+            display = _preview(f"Reading {file_path.name} ({description})", content.splitlines())
+            return ToolResult(success=True, output=display, _llm_output=content)
         except Exception as e:
             return ToolResult.fail(f"Failed to read PDF file: {e}")
 
@@ -675,16 +898,8 @@ class ReadTool(Tool):
             if not content:
                 return ToolResult.fail(description)
 
-            # Display preview
-            lines = content.splitlines()
-            print(f"\033[34m> Reading {file_path.name} ({description})\033[0m")
-            if len(lines) > MAX_DISPLAY_LINES:
-                print("\n".join(lines[:MAX_DISPLAY_LINES]))
-                print(f"\033[90m   ... ({len(lines) - MAX_DISPLAY_LINES} more lines)\033[0m")
-            else:
-                print(content)
-
-            return ToolResult(success=True, output="", _llm_output=content)
+            display = _preview(f"Reading {file_path.name} ({description})", content.splitlines())
+            return ToolResult(success=True, output=display, _llm_output=content)
         except Exception as e:
             return ToolResult.fail(f"Failed to read XML file: {e}")
 
@@ -705,8 +920,8 @@ For specific file types, install optional dependencies:
   - Word (.docx): pip install python-docx
   - PDF (.pdf): pip install pypdf
 """
-        print(f"\033[33m> Binary file: {file_path.name} ({size:,} bytes)\033[0m")
-        return ToolResult(success=True, output="", _llm_output=content)
+        display = f"\033[33m> Binary file: {file_path.name} ({size:,} bytes)\033[0m"
+        return ToolResult(success=True, output=display, _llm_output=content)
 
     def get_schema(self) -> dict:
         """Return JSON schema for LLM function calling."""
@@ -727,6 +942,27 @@ For specific file types, install optional dependencies:
                 "sheet": {
                     "type": "string",
                     "description": "Sheet name for Excel files (default: first/active sheet)"
+                },
+                "tail": {
+                    "type": "integer",
+                    "description": "Read only the last N lines of a text file (e.g., recent log entries)"
+                },
+                "rows": {
+                    "type": "string",
+                    "description": "Row range for CSV/Excel files (e.g., '100-200'); the first row is always shown as the header"
+                },
+                "sample": {
+                    "type": "string",
+                    "enum": list(SAMPLE_MODES),
+                    "description": "Which rows of a CSV/Excel table larger than max_rows to return (default: head)"
+                },
+                "columns": {
+                    "type": "string",
+                    "description": "Comma-separated CSV/Excel columns to return, by header name, number (1-based) or letter"
+                },
+                "max_rows": {
+                    "type": "integer",
+                    "description": f"Most CSV/Excel rows to return (default: {DEFAULT_MAX_ROWS})"
                 }
             },
             "required": ["path"]
@@ -1,11 +1,27 @@
-"""Tool registry with auto-discovery."""
-
+"""Tool registry with auto-discovery, result caching and concurrent read-only calls.
+
+Discovery reads a manifest of the tools in a package (name, description,
+schemas) instead of importing every tool module at startup. The manifest
+is built by importing the modules once and cached in the package's
+__pycache__ directory, keyed by the modification times and sizes of the
+module files (and of base.py and this module, which shape the schemas),
+so it is rebuilt whenever a tool changes. Tools register as
+LazyTool placeholders that import their module on first use.
+"""
+
+import copy
 import importlib
+import inspect
+import json
+import os
 import pkgutil
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import TYPE_CHECKING, Type
+from typing import TYPE_CHECKING, Hashable, Optional, Type
 
-from opencode.tools.base import Tool
+from opencode.tools.base import Tool, ToolResult
 
 if TYPE_CHECKING:
     from opencode.mode import ModeManager
@@ -13,6 +29,215 @@ if TYPE_CHECKING:
     from opencode.workspace import Workspace
 
 
+# Cached results kept when no config says otherwise
+DEFAULT_CACHE_SIZE = 256
+
+# Threads for concurrent read-only calls when no config says otherwise
+DEFAULT_WORKERS = 8
+
+# Bump when the manifest format changes
+MANIFEST_VERSION = 1
+
+# Modules of a tools package that hold no tools
+NON_TOOL_MODULES = ("__init__", "base", "registry")
+
+
+class ToolResultCache:
+    """LRU cache of tool results with hit/miss counters."""
+
+    def __init__(self, max_entries: int = DEFAULT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, ToolResult] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[ToolResult]:
+        """Look up a result, counting the hit or miss."""
+        with self._lock:
+            result = self._entries.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def put(self, key: Hashable, result: ToolResult) -> None:
+        """Store a result, evicting the least recently used ones."""
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all cached results (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+
+
+def _package_modules(package) -> list[tuple[str, Optional[Path]]]:
+    """(module name, source file) of the tool modules in a package."""
+    modules = []
+    for module_info in pkgutil.iter_modules(package.__path__):
+        if module_info.name in NON_TOOL_MODULES:
+            continue
+        path = None
+        directory = getattr(module_info.module_finder, "path", None)
+        if directory is not None:
+            path = Path(directory) / module_info.name
+            path = path / "__init__.py" if module_info.ispkg else path.with_suffix(".py")
+        modules.append((module_info.name, path))
+    return modules
+
+
+def _framework_modules() -> list[tuple[str, Optional[Path]]]:
+    """Modules that shape every manifest entry: Tool's schema methods and the builder."""
+    from opencode.tools import base
+
+    return [(base.__name__, Path(base.__file__)), (__name__, Path(__file__))]
+
+
+def _modules_stamp(modules: list[tuple[str, Optional[Path]]]) -> Optional[list]:
+    """Modification times and sizes of the module files (None if unknown)."""
+    stamp = []
+    for name, path in modules:
+        try:
+            stat = path.stat()
+        except (AttributeError, OSError):
+            return None  # Not plain source files: can't tell when they change
+        stamp.append([name, stat.st_mtime_ns, stat.st_size])
+    return stamp
+
+
+def build_manifest(package_name: str) -> list[dict]:
+    """Import a package's tool modules and describe every tool in them.
+
+    Returns:
+        One entry per tool: name, module, class, description,
+        requires_build_mode, cacheable and the Anthropic/OpenAI schemas.
+    """
+    package = importlib.import_module(package_name)
+    entries = {}
+    for modname, _ in _package_modules(package):
+        try:
+            module = importlib.import_module(f"{package_name}.{modname}")
+        except Exception:
+            continue
+        for attr in vars(module).values():
+            if (
+                isinstance(attr, type)
+                and issubclass(attr, Tool)
+                and attr is not Tool
+                and getattr(attr, "name", "base") != "base"
+                and not inspect.isabstract(attr)
+                and attr.name not in entries
+            ):
+                try:
+                    tool = attr()
+                    entries[attr.name] = {
+                        "name": attr.name,
+                        "module": attr.__module__,
+                        "class": attr.__qualname__,
+                        "description": tool.description,
+                        "requires_build_mode": tool.requires_build_mode,
+                        "cacheable": tool.cacheable,
+                        "anthropic": tool.to_anthropic_tool(),
+                        "openai": tool.to_openai_tool(),
+                    }
+                except Exception:
+                    continue
+    return list(entries.values())
+
+
+def load_manifest(package_name: str) -> list[dict]:
+    """The tool manifest of a package, rebuilt only when a module changed.
+
+    Cached as tool_manifest.json in the package's __pycache__ directory;
+    if that can't be written, the manifest is rebuilt on every start.
+    """
+    package = importlib.import_module(package_name)
+    if not hasattr(package, "__path__"):
+        return []
+    stamp = _modules_stamp(_framework_modules() + _package_modules(package))
+    cache_path = Path(list(package.__path__)[0]) / "__pycache__" / "tool_manifest.json"
+
+    if stamp is not None:
+        try:
+            with open(cache_path, encoding="utf-8") as f:
+                cached = json.load(f)
+            if cached.get("version") == MANIFEST_VERSION and cached.get("modules") == stamp:
+                return cached["tools"]
+        except (OSError, ValueError, AttributeError):
+            pass
+
+    tools = build_manifest(package_name)
+    if stamp is not None:
+        try:
+            cache_path.parent.mkdir(exist_ok=True)
+            tmp = cache_path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps({"version": MANIFEST_VERSION, "modules": stamp, "tools": tools}))
+            os.replace(tmp, cache_path)
+        except OSError:
+            pass
+    return tools
+
+
+class LazyTool:
+    """Placeholder for a manifest tool; imports and creates the tool on first use.
+
+    Name, description, mode flags and schemas come from the manifest, so
+    listing tools for a request imports nothing. Any other attribute
+    (execute, cache_fingerprint, ...) is looked up on the real tool.
+
+    Args:
+        entry: The tool's manifest entry.
+        **kwargs: Constructor arguments of the tool.
+    """
+
+    def __init__(self, entry: dict, **kwargs):
+        self.name = entry["name"]
+        self.description = entry["description"]
+        self.requires_build_mode = entry["requires_build_mode"]
+        self.cacheable = entry["cacheable"]
+        self._entry = entry
+        self._kwargs = kwargs
+        self._tool: Optional[Tool] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._tool is not None
+
+    @property
+    def tool(self) -> Tool:
+        """The real tool instance."""
+        if self._tool is None:
+            with self._lock:
+                if self._tool is None:
+                    module = importlib.import_module(self._entry["module"])
+                    self._tool = getattr(module, self._entry["class"])(**self._kwargs)
+        return self._tool
+
+    def to_anthropic_tool(self) -> dict:
+        return copy.deepcopy(self._entry["anthropic"])
+
+    def to_openai_tool(self) -> dict:
+        return copy.deepcopy(self._entry["openai"])
+
+    def __getattr__(self, name: str):
+        # Only called for attributes not set in __init__
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return getattr(self.tool, name)
+
+
 class ToolRegistry:
     """Registry of available tools with auto-discovery."""
 
@@ -24,10 +249,17 @@ class ToolRegistry:
         workspace: "Workspace" = None,
     ):
         self._tools: dict[str, Tool] = {}
+        self.version = 0  # Bumped whenever the set of tools changes
         self._mode_manager = mode_manager
         self._config = config
         self._checkpoint_fn = checkpoint_fn
         self._workspace = workspace
+        self.cache = ToolResultCache(
+            config.tool_cache_size if config is not None else DEFAULT_CACHE_SIZE
+        )
+        self.workers = config.tool_workers if config is not None else DEFAULT_WORKERS
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
 
     def register(self, tool_class: Type[Tool]) -> Tool:
         """Register a tool class and instantiate it.
@@ -45,11 +277,13 @@ class ToolRegistry:
             workspace=self._workspace,
         )
         self._tools[tool.name] = tool
+        self.version += 1
         return tool
 
     def register_instance(self, tool: Tool) -> None:
         """Register an already instantiated tool."""
         self._tools[tool.name] = tool
+        self.version += 1
 
     def get(self, name: str) -> Tool:
         """Get a tool by name.
@@ -79,11 +313,87 @@ class ToolRegistry:
         """Get all registered tools."""
         return list(self._tools.values())
 
+    def execute(self, name: str, args: dict) -> ToolResult:
+        """Execute a tool, reusing the cached result of an identical call.
+
+        Only cacheable (read-only) tools are cached. A result is reused when
+        the tool name, the arguments (with defaults filled in) and the tool's
+        cache_fingerprint() all match a previous successful call.
+
+        Raises:
+            KeyError: If tool not found.
+        """
+        tool = self.get(name)
+        key = self._cache_key(tool, args)
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        result = tool.execute(**args)
+        if key is not None and result.success:
+            self.cache.put(key, result)
+        return result
+
+    def submit(self, calls: list[tuple[str, dict]]) -> list[Future]:
+        """Start several tool calls at once.
+
+        The calls run in the background on a shared thread pool (or one
+        after another, here, if `workers` is 1 or less), so they must not
+        depend on each other - only pass read-only tools. Results are
+        collected with Future.result(), which raises whatever execute() raised.
+        Read-only tools return their display text in ToolResult.output
+        rather than printing it, so the caller shows it in call order.
+
+        Args:
+            calls: (tool name, arguments) pairs.
+
+        Returns:
+            One future per call, in call order.
+        """
+        if self.workers <= 1:
+            futures = []
+            for name, args in calls:
+                future = Future()
+                try:
+                    future.set_result(self.execute(name, args))
+                except Exception as e:
+                    future.set_exception(e)
+                futures.append(future)
+            return futures
+
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="opencode-tool"
+                )
+        return [self._executor.submit(self.execute, name, args) for name, args in calls]
+
+    def is_read_only(self, name: str) -> bool:
+        """Check whether a tool exists and can run without BUILD mode."""
+        return name in self._tools and not self._tools[name].requires_build_mode
+
+    def _cache_key(self, tool: Tool, args: dict) -> Optional[Hashable]:
+        """Build the cache key for a call, or None if it can't be cached."""
+        if not tool.cacheable or self.cache.max_entries <= 0:
+            return None
+        try:
+            bound = inspect.signature(tool.execute).bind(**args)
+        except TypeError:
+            return None  # Let execute() report the bad arguments
+        bound.apply_defaults()
+        fingerprint = tool.cache_fingerprint(**bound.arguments)
+        if fingerprint is None:
+            return None
+        normalized = json.dumps(bound.arguments, sort_keys=True, default=str)
+        return tool.name, normalized, fingerprint
+
     def discover(self, package_name: str = "opencode.tools") -> int:
         """Auto-discover and register tools from a package.
 
-        Scans all modules in the package for Tool subclasses
-        and registers them automatically.
+        Tools are listed from the package's manifest (see load_manifest)
+        and registered as LazyTool placeholders, so their modules are only
+        imported when a tool is first executed.
 
         Args:
             package_name: The package to scan for tools.
@@ -91,43 +401,25 @@ class ToolRegistry:
         Returns:
             Number of tools discovered.
         """
-        count = 0
-
         try:
-            package = importlib.import_module(package_name)
+            manifest = load_manifest(package_name)
         except ImportError:
             return 0
 
-        # Get package path
-        if not hasattr(package, "__path__"):
-            return 0
-
-        # Iterate through all modules in the package
-        for importer, modname, ispkg in pkgutil.iter_modules(package.__path__):
-            if modname in ("__init__", "base", "registry"):
-                continue
-
-            try:
-                module = importlib.import_module(f"{package_name}.{modname}")
-
-                # Find all Tool subclasses in the module
-                for attr_name in dir(module):
-                    attr = getattr(module, attr_name)
-
-                    if (
-                        isinstance(attr, type)
-                        and issubclass(attr, Tool)
-                        and attr is not Tool
-                        and hasattr(attr, "name")
-                        and attr.name != "base"
-                    ):
-                        # Don't re-register
-                        if attr.name not in self._tools:
-                            self.register(attr)
-                            count += 1
-
-            except Exception:
+        count = 0
+        for entry in manifest:
+            # Don't re-register
+            if entry["name"] in self._tools:
                 continue
+            self._tools[entry["name"]] = LazyTool(
+                entry,
+                mode_manager=self._mode_manager,
+                config=self._config,
+                checkpoint_fn=self._checkpoint_fn,
+                workspace=self._workspace,
+            )
+            self.version += 1
+            count += 1
 
         return count
 
@@ -1,12 +1,105 @@
 """Rename symbol tool - rename a symbol across multiple files."""
 
+import os
 import re
+import time
+from contextlib import closing
 from pathlib import Path
 from typing import Optional
 
+from opencode.file_index import detect_language
+from opencode.file_transaction import FileTransaction, TransactionError
+from opencode.lexer import code_occurrences, group_by_line
+from opencode.search import map_ordered
 from opencode.tools.base import Tool, ToolResult
 
 
+def _plan_rename(
+    file_path: Path, old_name: str, new_name: str, rewrite: bool
+) -> Optional[tuple[list[dict], Optional[bytes], tuple[int, int], float]]:
+    """Work out the edits a rename makes to one file.
+
+    Module-level so it can run in search worker processes. Line endings
+    are preserved (the file is decoded without newline translation).
+
+    Returns:
+        (per-line changes, new contents if `rewrite` else None,
+        (st_mtime_ns, st_size) the edits are based on, seconds spent), or
+        None if the file is unreadable or has nothing to rename.
+    """
+    start = time.perf_counter()
+    try:
+        with open(file_path, "rb") as f:
+            st = os.fstat(f.fileno())
+            data = f.read()
+        content = data.decode("utf-8")
+    except (OSError, UnicodeDecodeError):
+        return None
+
+    # Only rename code identifiers when the language has a lexer
+    offsets = code_occurrences(content, old_name, detect_language(file_path.name))
+    if offsets is not None:
+        if not offsets:
+            return None
+        file_changes = []
+        for line_num, line_start, line_end, on_line in group_by_line(content, offsets):
+            line = content[line_start:line_end]
+            new_line = _replace_at(
+                line, [o - line_start for o in on_line], len(old_name), new_name
+            )
+            file_changes.append({
+                "line": line_num,
+                "old": line.strip()[:80],
+                "new": new_line.strip()[:80],
+                "count": len(on_line),
+            })
+        new_data = None
+        if rewrite:
+            new_data = _replace_at(content, offsets, len(old_name), new_name).encode("utf-8")
+        return file_changes, new_data, (st.st_mtime_ns, st.st_size), time.perf_counter() - start
+
+    # Build regex for whole-word match
+    pattern = re.compile(r'\b' + re.escape(old_name) + r'\b')
+    if not pattern.search(content):
+        return None
+
+    # Count occurrences per line
+    file_changes = []
+    for line_num, line in enumerate(content.splitlines(), 1):
+        matches = list(pattern.finditer(line))
+        if matches:
+            # Skip if in comment or string (basic heuristic)
+            stripped = line.lstrip()
+            if stripped.startswith('#') or stripped.startswith('//'):
+                continue
+
+            new_line = pattern.sub(new_name, line)
+            file_changes.append({
+                "line": line_num,
+                "old": line.strip()[:80],
+                "new": new_line.strip()[:80],
+                "count": len(matches),
+            })
+
+    if not file_changes:
+        return None
+
+    new_data = pattern.sub(new_name, content).encode("utf-8") if rewrite else None
+    return file_changes, new_data, (st.st_mtime_ns, st.st_size), time.perf_counter() - start
+
+
+def _replace_at(text: str, offsets: list[int], length: int, replacement: str) -> str:
+    """Replace `length` characters at each of the sorted offsets."""
+    parts = []
+    pos = 0
+    for offset in offsets:
+        parts.append(text[pos:offset])
+        parts.append(replacement)
+        pos = offset + length
+    parts.append(text[pos:])
+    return "".join(parts)
+
+
 class RenameSymbolTool(Tool):
     """Rename a symbol across multiple files in the codebase."""
 
@@ -27,7 +120,6 @@ class RenameSymbolTool(Tool):
         "php": [".php"],
     }
 
-    SKIP_DIRS = {"node_modules", ".git", "__pycache__", ".venv", "venv", "dist", "build", ".tox", "target"}
 
     def execute(
         self,
@@ -74,60 +166,48 @@ class RenameSymbolTool(Tool):
             if not extensions:
                 return ToolResult.fail(f"Unknown language: {language}")
 
-        # Build regex for whole-word match
-        pattern = re.compile(r'\b' + re.escape(old_name) + r'\b')
-
         # Create checkpoint before making changes
         if not dry_run:
             self._checkpoint(f"Before rename: {old_name} -> {new_name}")
 
-        # Search and replace
-        workspace_root = Path(self.workspace.root if self.workspace else ".")
+        # Compute edits in parallel; stage new contents beside each file and
+        # only move them into place once every file is ready
+        workspace_root = self._search_root()
+        files = list(self._find_files(workspace_root, extensions, old_name))
         changes = []
-
-        for file_path in self._find_files(workspace_root, extensions):
-            try:
-                content = file_path.read_text(encoding='utf-8')
-
-                # Check if file contains the symbol
-                if not pattern.search(content):
-                    continue
-
-                # Count occurrences per line
-                lines = content.splitlines()
-                file_changes = []
-
-                for line_num, line in enumerate(lines, 1):
-                    matches = list(pattern.finditer(line))
-                    if matches:
-                        # Skip if in comment or string (basic heuristic)
-                        stripped = line.lstrip()
-                        if stripped.startswith('#') or stripped.startswith('//'):
-                            continue
-
-                        new_line = pattern.sub(new_name, line)
-                        file_changes.append({
-                            "line": line_num,
-                            "old": line.strip()[:80],
-                            "new": new_line.strip()[:80],
-                            "count": len(matches),
-                        })
-
-                if file_changes:
-                    rel_path = file_path.relative_to(workspace_root)
+        start = time.perf_counter()
+
+        with FileTransaction() as txn:
+            results = map_ordered(
+                _plan_rename, files, args=(old_name, new_name, not dry_run),
+                workers=self._search_workers(),
+            )
+            with closing(results):
+                for file_path, planned in results:
+                    if planned is None:
+                        continue
+                    file_changes, new_data, expected, seconds = planned
+                    if new_data is not None:
+                        seconds += txn.stage(file_path, new_data, expected)
                     changes.append({
-                        "file": str(rel_path),
+                        "file": str(file_path.relative_to(workspace_root)),
                         "changes": file_changes,
                         "path": file_path,
+                        "seconds": seconds,
                     })
-
-                    # Actually make changes if not dry run
-                    if not dry_run:
-                        new_content = pattern.sub(new_name, content)
-                        file_path.write_text(new_content, encoding='utf-8')
-
-            except Exception as e:
-                continue
+            plan_seconds = time.perf_counter() - start
+
+            commit_seconds = 0.0
+            if not dry_run and changes:
+                commit_start = time.perf_counter()
+                try:
+                    timings = txn.commit()
+                except TransactionError as e:
+                    return ToolResult.fail(f"Rename aborted, no files were changed: {e}")
+                commit_seconds = time.perf_counter() - commit_start
+                for file_info in changes:
+                    file_info["seconds"] += timings.get(file_info["path"], 0.0)
+                    self._notify_file_changed(file_info["path"])
 
         if not changes:
             return ToolResult.ok(f"No occurrences of '{old_name}' found")
@@ -143,7 +223,7 @@ class RenameSymbolTool(Tool):
         ]
 
         for file_info in changes:
-            output_lines.append(f"  {file_info['file']}:")
+            output_lines.append(f"  {file_info['file']}: ({file_info['seconds'] * 1000:.1f} ms)")
             for change in file_info["changes"][:5]:  # Limit shown per file
                 output_lines.append(f"    Line {change['line']}: {change['old']}")
                 output_lines.append(f"           -> {change['new']}")
@@ -151,35 +231,32 @@ class RenameSymbolTool(Tool):
                 output_lines.append(f"    ... and {len(file_info['changes']) - 5} more changes")
             output_lines.append("")
 
+        timing = f"Planned {len(files)} file(s) in {plan_seconds * 1000:.0f} ms"
+        if not dry_run:
+            timing += f", committed in {commit_seconds * 1000:.0f} ms"
+        output_lines.append(timing)
+
         if dry_run:
             output_lines.append("[DRY RUN] No changes made. Set dry_run=false to apply changes.")
 
         output = "\n".join(output_lines)
         return ToolResult.ok(output)
 
-    def _find_files(self, root: Path, extensions: Optional[list] = None):
-        """Recursively find source files."""
-        try:
-            for item in root.iterdir():
-                if item.name.startswith('.'):
-                    continue
-                if item.name in self.SKIP_DIRS:
-                    continue
-
-                if item.is_dir():
-                    yield from self._find_files(item, extensions)
-                elif item.is_file():
-                    if extensions:
-                        if item.suffix in extensions:
-                            yield item
-                    else:
-                        # Check all known extensions
-                        for exts in self.LANGUAGE_EXTENSIONS.values():
-                            if item.suffix in exts:
-                                yield item
-                                break
-        except PermissionError:
-            pass
+    def _find_files(self, root: Path, extensions: Optional[list] = None, symbol: str = None):
+        """Find source files via the workspace file index.
+
+        If a symbol is given, files the trigram index rules out are skipped.
+        """
+        if extensions is None:
+            extensions = {ext for exts in self.LANGUAGE_EXTENSIONS.values() for ext in exts}
+        entries = [
+            entry for entry in self._file_index(root).files(under=root, extensions=extensions)
+            if not entry.hidden
+        ]
+        if symbol:
+            entries = self._narrow_by_content(root, entries, [[symbol]])
+        for entry in entries:
+            yield entry.path
 
     def get_schema(self) -> dict:
         """Return JSON schema for LLM function calling."""
@@ -3,6 +3,7 @@
 from pathlib import Path
 from typing import Optional
 
+from opencode.ignore import IGNORE_FILES, IgnoreFile, IgnoreRules
 from opencode.tools.base import Tool, ToolResult
 
 
@@ -12,6 +13,7 @@ class TreeTool(Tool):
     name = "tree"
     description = "Display the directory structure as a tree view"
     requires_build_mode = False
+    cacheable = True
 
     SKIP_DIRS = {
         "node_modules", ".git", "__pycache__", ".venv", "venv",
@@ -62,6 +64,7 @@ class TreeTool(Tool):
             current_depth=0,
             show_hidden=show_hidden,
             dirs_only=dirs_only,
+            rules=IgnoreRules.for_root(root_path),
         )
 
         if not lines:
@@ -80,8 +83,13 @@ class TreeTool(Tool):
         current_depth: int,
         show_hidden: bool,
         dirs_only: bool,
+        rules: IgnoreRules,
+        rel_dir: str = "",
     ) -> None:
-        """Recursively build tree structure."""
+        """Recursively build tree structure.
+
+        Entries excluded by .gitignore/.ignore files are left out.
+        """
         if current_depth >= depth:
             return
 
@@ -91,11 +99,17 @@ class TreeTool(Tool):
             lines.append(f"{prefix}[permission denied]")
             return
 
+        rules = rules.child(rel_dir, IgnoreFile.load(dir_path / name for name in IGNORE_FILES))
+        prefix_path = f"{rel_dir}/" if rel_dir else ""
+
         # Filter entries
         filtered = []
         for entry in entries:
             name = entry.name
 
+            if rules.ignored(prefix_path + name, entry.is_dir()):
+                continue
+
             # Skip hidden unless requested
             if not show_hidden and name.startswith('.'):
                 continue
@@ -140,6 +154,8 @@ class TreeTool(Tool):
                     current_depth + 1,
                     show_hidden,
                     dirs_only,
+                    rules,
+                    prefix_path + entry.name,
                 )
             else:
                 # Show file with size
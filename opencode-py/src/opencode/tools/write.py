@@ -88,6 +88,7 @@ class WriteTool(Tool):
 
             # Write file (UTF-8 for cross-platform Unicode support)
             file_path.write_text(content, encoding='utf-8')
+            self._notify_file_changed(file_path)
 
             # Build numbered file content for LLM (with truncation for large files)
             lines = content.splitlines()
@@ -0,0 +1,266 @@
+"""Trigram index - narrow content searches to files that can possibly match.
+
+Each file gets a signature: a bitset with one (hashed) bit per distinct
+byte trigram of its content, with ASCII letters lowercased. A query is the set of literals a
+regex requires (see search.regex_literals); a file is a candidate only if
+every trigram of a required literal has its bit set. Signatures are small
+(4 bits per distinct trigram), so checking thousands of files is a handful
+of integer operations, and only candidates are ever read.
+
+Signatures are computed on demand, keyed by (mtime, size), and persisted
+under .opencode/index/ so they survive restarts.
+"""
+
+import atexit
+import base64
+import gzip
+import json
+import os
+import re
+import threading
+import weakref
+from pathlib import Path
+from typing import Optional
+
+from opencode.file_index import FileEntry, FileIndex
+from opencode.search import map_ordered
+
+
+INDEX_FILE = "trigrams.json.gz"
+INDEX_VERSION = 1
+
+# Files larger than this are not indexed (always treated as candidates)
+MAX_INDEXED_BYTES = 4 * 1024 * 1024
+
+# Signature size bounds, in bits (powers of two)
+MIN_SIGNATURE_BITS = 256
+MAX_SIGNATURE_BITS = 1 << 16
+
+# Newly signed files before the index is written back to disk
+SAVE_MIN_CHANGES = 64
+
+_TRIGRAM = re.compile(rb"(?s)...")
+
+
+def _trigrams(data: bytes) -> set[bytes]:
+    """All distinct 3-byte sequences in data."""
+    grams = set(_TRIGRAM.findall(data))
+    grams.update(_TRIGRAM.findall(data, 1))
+    grams.update(_TRIGRAM.findall(data, 2))
+    return grams
+
+
+def _bucket(gram: bytes, bits: int) -> int:
+    """Stable hash of a trigram into [0, bits)."""
+    value = int.from_bytes(gram, "little") * 0x9E3779B1 & 0xFFFFFFFF
+    return value >> (33 - bits.bit_length())
+
+
+def file_signature(path: Path) -> Optional[tuple[float, int, bytes]]:
+    """Compute a file's trigram signature.
+
+    Module-level so it can run in search worker processes.
+
+    Returns:
+        (mtime, size, signature bytes), or None if the file can't be read
+        or is too large to index.
+    """
+    try:
+        with open(path, "rb") as f:
+            st = os.fstat(f.fileno())
+            if st.st_size > MAX_INDEXED_BYTES:
+                return None
+            data = f.read().lower()
+    except OSError:
+        return None
+
+    # Index text the way search.read_text sees it (universal newlines)
+    if b"\r" in data:
+        data = data.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+    grams = _trigrams(data)
+
+    bits = MIN_SIGNATURE_BITS
+    while bits < len(grams) * 4 and bits < MAX_SIGNATURE_BITS:
+        bits <<= 1
+
+    signature = bytearray(bits // 8)
+    for gram in grams:
+        bucket = _bucket(gram, bits)
+        signature[bucket >> 3] |= 1 << (bucket & 7)
+    return st.st_mtime, st.st_size, bytes(signature)
+
+
+class TrigramIndex:
+    """Per-file trigram signatures for the files of a FileIndex."""
+
+    def __init__(self, file_index: FileIndex, path: Optional[Path] = None):
+        """Initialize the index.
+
+        Args:
+            file_index: Index of the files to cover.
+            path: File to persist signatures to (None = memory only).
+        """
+        self.file_index = file_index
+        self.path = Path(path) if path else None
+
+        # rel_path -> (mtime, size, bits, signature as int)
+        self._signatures: dict[str, tuple[float, int, int, int]] = {}
+        self._masks: dict[tuple[bytes, int], int] = {}  # (literal, bits) -> mask
+        self._unsaved = 0
+        self._loaded = False
+        self._lock = threading.Lock()
+
+        if self.path:
+            atexit.register(self.save)
+
+    # -------------------------------------------------------------------------
+    # Queries
+    # -------------------------------------------------------------------------
+
+    def candidates(
+        self,
+        entries: list[FileEntry],
+        clauses: list[list[str]],
+        workers: int = 0,
+    ) -> list[FileEntry]:
+        """Filter files down to those that may contain the required literals.
+
+        Args:
+            entries: Files to filter.
+            clauses: Required literals (see search.regex_literals). Every
+                clause needs at least one of its literals present.
+            workers: Worker processes for signing new or changed files.
+
+        Returns:
+            The entries that may match, in their original order.
+        """
+        clauses = [
+            [lit.encode("utf-8").lower() for lit in clause]
+            for clause in clauses
+            if all(len(lit.encode("utf-8")) >= 3 for lit in clause)
+        ]
+        if not clauses or not entries:
+            return entries
+
+        with self._lock:
+            self._load()
+            self._sign_stale(entries, workers)
+
+            result = []
+            for entry in entries:
+                signature = self._signatures.get(entry.rel_path)
+                if signature is None or all(
+                    any(self._contains(signature, lit) for lit in clause)
+                    for clause in clauses
+                ):
+                    result.append(entry)
+
+            if self._unsaved >= SAVE_MIN_CHANGES:
+                self._save()
+            return result
+
+    def _contains(self, signature: tuple[float, int, int, int], literal: bytes) -> bool:
+        """Check whether a signature has every trigram of a literal."""
+        _, _, bits, value = signature
+        key = (literal, bits)
+        mask = self._masks.get(key)
+        if mask is None:
+            if len(self._masks) > 1024:
+                self._masks.clear()
+            mask = 0
+            for gram in _trigrams(literal):
+                mask |= 1 << _bucket(gram, bits)
+            self._masks[key] = mask
+        return value & mask == mask
+
+    def _sign_stale(self, entries: list[FileEntry], workers: int) -> None:
+        """(Re)compute signatures for files that are new or changed.
+
+        Entries carry the mtime and size the file index last saw, so this
+        costs no stat calls; the index keeps them current.
+        """
+        stale = []
+        for entry in entries:
+            current = self._signatures.get(entry.rel_path)
+            if current is None or current[0] != entry.mtime or current[1] != entry.size:
+                stale.append(entry)
+
+        if not stale:
+            return
+
+        paths = [entry.path for entry in stale]
+        for entry, (_, result) in zip(stale, map_ordered(file_signature, paths, workers=workers)):
+            if result is None:
+                self._signatures.pop(entry.rel_path, None)
+                continue
+            # Keyed by the entry rather than the file's stat: if the file
+            # changed since it was indexed, the index's next look re-signs it
+            _, _, signature = result
+            self._signatures[entry.rel_path] = (
+                entry.mtime, entry.size, len(signature) * 8, int.from_bytes(signature, "little")
+            )
+        self._unsaved += len(stale)
+
+    # -------------------------------------------------------------------------
+    # Persistence
+    # -------------------------------------------------------------------------
+
+    def save(self) -> None:
+        """Write unsaved signatures to disk."""
+        with self._lock:
+            if self._unsaved:
+                self._save()
+
+    def _save(self) -> None:
+        self._unsaved = 0
+        if not self.path:
+            return
+
+        files = {}
+        for rel_path, (mtime, size, bits, value) in self._signatures.items():
+            raw = value.to_bytes(bits // 8, "little")
+            files[rel_path] = [mtime, size, base64.b64encode(raw).decode("ascii")]
+        data = {"version": INDEX_VERSION, "root": str(self.file_index.root), "files": files}
+
+        try:
+            self.path.parent.mkdir(exist_ok=True)  # Only inside an existing .opencode
+            tmp = self.path.with_suffix(".tmp")
+            with gzip.open(tmp, "wt", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp, self.path)
+        except OSError:
+            pass  # The index is only a cache
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        if not self.path or not self.path.exists():
+            return
+
+        try:
+            with gzip.open(self.path, "rt", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != INDEX_VERSION or data.get("root") != str(self.file_index.root):
+                return
+            for rel_path, (mtime, size, encoded) in data["files"].items():
+                raw = base64.b64decode(encoded)
+                self._signatures[rel_path] = (
+                    mtime, size, len(raw) * 8, int.from_bytes(raw, "little")
+                )
+        except (OSError, ValueError, KeyError, TypeError, EOFError):
+            self._signatures.clear()  # Corrupt index - rebuild on demand
+
+
+_shared_indexes: "weakref.WeakKeyDictionary[FileIndex, TrigramIndex]" = weakref.WeakKeyDictionary()
+_shared_lock = threading.Lock()
+
+
+def shared_trigram_index(file_index: FileIndex) -> TrigramIndex:
+    """Get an in-memory TrigramIndex for a file index outside any workspace."""
+    with _shared_lock:
+        index = _shared_indexes.get(file_index)
+        if index is None:
+            index = TrigramIndex(file_index)
+            _shared_indexes[file_index] = index
+        return index
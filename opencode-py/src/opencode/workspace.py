@@ -6,9 +6,14 @@ from pathlib import Path
 from typing import Optional
 from datetime import datetime
 
+from opencode.file_index import FileIndex
+from opencode.symbols import SYMBOLS_FILE, SymbolTable
+from opencode.trigram_index import INDEX_FILE, TrigramIndex
+
 
 WORKSPACE_DIR = ".opencode"
 WORKSPACE_FILE = "workspace.json"
+INDEX_DIR = "index"
 
 
 class WorkspaceError(Exception):
@@ -27,6 +32,9 @@ class Workspace:
         """
         self.root: Optional[Path] = None
         self.config_dir: Optional[Path] = None
+        self._file_index: Optional[FileIndex] = None
+        self._trigram_index: Optional[TrigramIndex] = None
+        self._symbol_table: Optional[SymbolTable] = None
 
         if root:
             self.root = Path(root).resolve()
@@ -58,6 +66,45 @@ class Workspace:
         """Check if workspace is initialized."""
         return self.root is not None and self.config_dir is not None
 
+    @property
+    def file_index(self) -> FileIndex:
+        """Shared index of files under the workspace root.
+
+        Falls back to the current directory when the workspace is not
+        initialized. The index is built lazily on first query.
+        """
+        root = (self.root or Path.cwd()).resolve()
+        if self._file_index is None or self._file_index.root != root:
+            self._file_index = FileIndex(root)
+        return self._file_index
+
+    @property
+    def trigram_index(self) -> TrigramIndex:
+        """Trigram signatures for the files in file_index.
+
+        Persisted under .opencode/index/ once the workspace is initialized.
+        """
+        file_index = self.file_index
+        if self._trigram_index is None or self._trigram_index.file_index is not file_index:
+            path = None
+            if self.is_initialized and self.config_dir.is_dir():
+                path = self.config_dir / INDEX_DIR / INDEX_FILE
+            self._trigram_index = TrigramIndex(file_index, path)
+        return self._trigram_index
+
+    @property
+    def symbol_table(self) -> SymbolTable:
+        """Parsed symbols of the files under the workspace root.
+
+        Persisted under .opencode/index/ once the workspace is initialized.
+        """
+        path = None
+        if self.is_initialized and self.config_dir.is_dir():
+            path = self.config_dir / INDEX_DIR / SYMBOLS_FILE
+        if self._symbol_table is None or self._symbol_table.path != path:
+            self._symbol_table = SymbolTable(path)
+        return self._symbol_table
+
     @property
     def local_config_path(self) -> Optional[Path]:
         """Path to local config file."""
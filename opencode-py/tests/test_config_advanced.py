@@ -392,6 +392,33 @@ class TestConfigSave:
         # Should have commented SSL section
         assert "# [ssl]" in content or "SSL/TLS settings" in content
 
+    def test_save_router_backends_round_trip(self, tmp_path):
+        """Test that router backends are written and read back."""
+        backends = [
+            {"name": "local", "provider": "custom", "model": "llama3",
+             "base_url": "http://localhost:11434/v1", "tasks": ["simple", "review"]},
+            {"provider": "anthropic", "model": "claude-sonnet-4-20250514"},
+        ]
+        config_path = tmp_path / "config.toml"
+        Config(router_backends=backends).save(config_path)
+
+        loaded = Config()
+        success, error = loaded._load_from_file(config_path)
+
+        assert success, error
+        assert loaded.router_backends == backends
+
+    def test_save_comments_router_when_default(self, tmp_path):
+        """Test that the router example is commented out without backends."""
+        config_path = tmp_path / "config.toml"
+        Config().save(config_path)
+
+        loaded = Config()
+        loaded._load_from_file(config_path)
+
+        assert "# [[router.backends]]" in config_path.read_text()
+        assert loaded.router_backends == []
+
 
 # ============================================================================
 # Config Debug Mode Tests
@@ -0,0 +1,230 @@
+"""Tests for the context budget and compaction of old tool output."""
+
+import pytest
+
+from opencode.context_budget import (
+    ContextBudget,
+    ELIDED_PREFIX,
+    estimate_tokens,
+    round_tokens,
+)
+from opencode.llm.base import ConversationBuffer, Message, ToolCall, ToolResult
+
+
+def _round(name: str, call_id: str, output: str = "", **arguments) -> dict:
+    """A tool round with a single call and its result."""
+    return {
+        "content": "",
+        "tool_calls": [ToolCall(id=call_id, name=name, arguments=arguments)],
+        "results": [ToolResult(tool_id=call_id, content=output)],
+    }
+
+
+def _dump(lines: int) -> str:
+    return "\n".join(f"line {i}: " + "x" * 60 for i in range(lines))
+
+
+# =============================================================================
+# Estimates
+# =============================================================================
+
+class TestEstimates:
+    """Tests for token estimates."""
+
+    def test_estimate_tokens(self):
+        """Test roughly four characters per token."""
+        assert estimate_tokens("") == 0
+        assert estimate_tokens("abcd") == 1
+        assert estimate_tokens("a" * 400) == 100
+
+    def test_round_counts_arguments_and_results(self):
+        """Test a round's estimate grows with its arguments and output."""
+        small = round_tokens(_round("write", "1", "ok", path="a.py", content="x"))
+        large = round_tokens(_round("write", "1", "ok", path="a.py", content="x" * 4000))
+        assert large - small >= 999
+
+    def test_estimate_includes_prompts(self):
+        """Test system prompt and tool schemas count towards the total."""
+        budget = ContextBudget()
+        messages = [Message(role="user", content="hi")]
+        base = budget.estimate(messages)
+        assert budget.estimate(messages, system="s" * 400) == base + 100
+        assert budget.estimate(messages, tools=[{"name": "read"}]) > base
+
+
+# =============================================================================
+# Compaction
+# =============================================================================
+
+class TestCompaction:
+    """Tests for fitting a request into the budget."""
+
+    def test_under_budget_untouched(self):
+        """Test nothing changes while the request fits."""
+        budget = ContextBudget(max_tokens=100_000)
+        messages = [Message(role="user", content="go")]
+        rounds = [_round("read", "1", _dump(100), path="a.py")]
+        original = list(rounds)
+
+        assert budget.fit(messages, rounds) is True
+        assert rounds == original
+        assert budget.compactions == 0
+
+    def test_disabled(self):
+        """Test a zero budget never compacts."""
+        budget = ContextBudget(max_tokens=0)
+        rounds = [_round("read", "1", _dump(1000), path="a.py")]
+        assert budget.fit([], rounds) is True
+        assert rounds[0]["results"][0].content == _dump(1000)
+
+    def test_superseded_read_elided_first(self):
+        """Test an older read of a file that was read again is dropped before anything else."""
+        rounds = [
+            _round("read", "1", _dump(200), path="src/a.py"),
+            _round("grep", "2", _dump(200), pattern="x"),
+            _round("read", "3", _dump(200), path="./src/a.py"),
+            _round("glob", "4", "a.py", pattern="*"),
+            _round("glob", "5", "a.py", pattern="*"),
+        ]
+        budget = ContextBudget()
+        budget.max_tokens = budget.estimate([], rounds) - 100
+
+        assert budget.fit([], rounds) is True
+        assert rounds[0]["results"][0].content.startswith(ELIDED_PREFIX)
+        assert "src/a.py" in rounds[0]["results"][0].content
+        # Enough was freed by the superseded read alone
+        assert rounds[1]["results"][0].content == _dump(200)
+        assert rounds[2]["results"][0].content == _dump(200)
+
+    def test_superseded_write_content_elided(self):
+        """Test the contents sent by a write are dropped once the file is read back."""
+        rounds = [
+            _round("write", "1", "Wrote a.py", path="a.py", content=_dump(300)),
+            _round("read", "2", "short", path="a.py"),
+        ]
+        budget = ContextBudget()
+        budget.max_tokens = budget.estimate([], rounds) - 100
+
+        budget.fit([], rounds)
+        arguments = rounds[0]["tool_calls"][0].arguments
+        assert arguments["path"] == "a.py"
+        assert arguments["content"].startswith(ELIDED_PREFIX)
+        assert rounds[0]["tool_calls"][0].id == "1"
+
+    def test_disjoint_windows_not_superseded(self):
+        """Test reads of different windows of a file don't elide each other."""
+        rounds = [
+            _round("read", "1", _dump(200), path="big.py", lines="1-100"),
+            _round("read", "2", _dump(200), path="big.py", lines="900-950"),
+            _round("read", "3", _dump(200), path="big.py", tail=50),
+            _round("read", "4", _dump(200), path="data.csv", rows="1-100"),
+            _round("read", "5", _dump(200), path="data.csv", rows="101-200"),
+            _round("glob", "6", "x", pattern="*"),
+            _round("glob", "7", "x", pattern="*"),
+        ]
+        budget = ContextBudget()
+        budget.max_tokens = budget.estimate([], rounds) - 100
+
+        budget.fit([], rounds)
+        for rnd in rounds[:5]:
+            assert "read or written again" not in rnd["results"][0].content
+
+    def test_same_window_or_full_read_supersedes(self):
+        """Test a window is elided by a later read of the same window or the whole file."""
+        rounds = [
+            _round("read", "1", _dump(200), path="big.py", lines="1-100"),
+            _round("read", "2", _dump(200), path="big.py", lines="1-100"),
+            _round("read", "3", _dump(200), path="other.py", tail=20),
+            _round("read", "4", _dump(200), path="other.py"),
+            _round("glob", "5", "x", pattern="*"),
+            _round("glob", "6", "x", pattern="*"),
+        ]
+        budget = ContextBudget()
+        budget.max_tokens = budget.estimate([], rounds) - 1000
+
+        budget.fit([], rounds)
+        assert "read or written again" in rounds[0]["results"][0].content
+        assert "read or written again" in rounds[2]["results"][0].content
+        assert rounds[1]["results"][0].content == _dump(200)
+
+    def test_edit_does_not_supersede_read(self):
+        """Test an edit does not count as superseding an earlier read of the file."""
+        rounds = [
+            _round("read", "1", _dump(200), path="a.py"),
+            _round("edit", "2", "ok", path="a.py", old_string="a", new_string="b"),
+            _round("glob", "3", "x", pattern="*"),
+            _round("glob", "4", "x", pattern="*"),
+        ]
+        budget = ContextBudget()
+        budget.max_tokens = budget.estimate([], rounds) - 10
+
+        budget.fit([], rounds)
+        # Cut down as old output, not elided as superseded
+        content = rounds[0]["results"][0].content
+        assert content.startswith("line 0:")
+        assert ELIDED_PREFIX in content
+
+    def test_recent_rounds_kept(self):
+        """Test the latest rounds are never trimmed."""
+        rounds = [_round("grep", str(i), _dump(200), pattern="x") for i in range(4)]
+        budget = ContextBudget(max_tokens=100)
+
+        assert budget.fit([], rounds) is False
+        assert ELIDED_PREFIX in rounds[0]["results"][0].content
+        assert ELIDED_PREFIX in rounds[1]["results"][0].content
+        assert rounds[2]["results"][0].content == _dump(200)
+        assert rounds[3]["results"][0].content == _dump(200)
+
+    def test_old_history_trimmed_last(self):
+        """Test old history messages are cut down once tool output is exhausted."""
+        messages = [Message(role="assistant", content=_dump(200)) for _ in range(6)]
+        budget = ContextBudget()
+        budget.max_tokens = budget.estimate(messages) - 100
+
+        assert budget.fit(messages) is True
+        assert ELIDED_PREFIX in messages[0].content
+        assert messages[-1].content == _dump(200)
+        assert budget.tokens_saved > 0
+
+    def test_errors_and_short_output_kept(self):
+        """Test error results and short output are never cut."""
+        rounds = [
+            {
+                "content": "",
+                "tool_calls": [ToolCall(id="1", name="bash", arguments={"command": "make"})],
+                "results": [ToolResult(tool_id="1", content=_dump(200), is_error=True)],
+            },
+            _round("glob", "2", "a.py", pattern="*"),
+            _round("glob", "3", "a.py", pattern="*"),
+            _round("glob", "4", "a.py", pattern="*"),
+        ]
+        budget = ContextBudget(max_tokens=10)
+        budget.fit([], rounds)
+        assert rounds[0]["results"][0].content == _dump(200)
+        assert rounds[1]["results"][0].content == "a.py"
+
+    def test_compaction_replaces_objects(self):
+        """Test compacted rounds are new objects, so the conversation buffer rebuilds."""
+        rounds = [_round("grep", str(i), _dump(200), pattern="x") for i in range(3)]
+        first = rounds[0]
+        first_result = first["results"][0]
+        buffer = ConversationBuffer(lambda m: [m], lambda r: [r["results"][0].content])
+        buffer.build([], rounds)
+
+        ContextBudget(max_tokens=100).fit([], rounds)
+
+        assert rounds[0] is not first
+        assert first_result.content == _dump(200)
+        wire = buffer.build([], rounds)
+        assert buffer.rebuilds == 1
+        assert ELIDED_PREFIX in wire[0]
+
+    def test_compacts_below_trigger(self):
+        """Test compaction leaves headroom so the next round does not compact again."""
+        rounds = [_round("grep", str(i), _dump(100), pattern="x") for i in range(10)]
+        budget = ContextBudget()
+        budget.max_tokens = budget.estimate([], rounds) - 10
+
+        budget.fit([], rounds)
+        assert budget.estimate([], rounds) <= budget.max_tokens * 0.75
+        assert budget.compactions == 1
@@ -12,6 +12,7 @@ from opencode.tools.read import (
     read_word_file,
     read_csv_file,
     read_pdf_file,
+    select_rows,
     HAS_OPENPYXL,
     HAS_XLRD,
     HAS_DOCX,
@@ -68,6 +69,120 @@ class TestCSVReading:
         assert "val1" in result.llm_output
 
 
+class TestTableWindows:
+    """Test paging, sampling and column selection for CSV/Excel tables."""
+
+    @pytest.fixture
+    def big_csv(self, tmp_path):
+        """A CSV file with a header and 1000 data rows."""
+        csv_file = tmp_path / "big.csv"
+        rows = ["id,name,score"] + [f"{i},user{i},{i % 7}" for i in range(1, 1001)]
+        csv_file.write_text("\n".join(rows) + "\n")
+        return csv_file
+
+    def test_head_stops_reading(self):
+        """Test a head read consumes only the rows it needs."""
+        consumed = []
+
+        def rows():
+            for i in range(1, 10_000):
+                consumed.append(i)
+                yield [str(i)]
+
+        window = select_rows(rows(), max_rows=5)
+
+        assert [number for number, _ in window.rows] == [1, 2, 3, 4, 5]
+        assert window.total is None
+        assert len(consumed) == 6
+
+    def test_random_sample_is_repeatable(self):
+        """Test random samples are sorted, skip the header and repeat exactly."""
+        table = [[str(i)] for i in range(1, 1001)]
+        first = select_rows(iter(table), sample="random", max_rows=10)
+        second = select_rows(iter(table), sample="random", max_rows=10)
+
+        numbers = [number for number, _ in first.rows]
+        assert numbers == sorted(numbers) and len(numbers) == 10
+        assert 1 not in numbers and first.header == ["1"]
+        assert first.rows == second.rows
+        assert first.total == 1000
+
+    def test_unknown_sample_mode(self):
+        """Test a misspelled sample mode is rejected."""
+        with pytest.raises(ValueError):
+            select_rows(iter([]), sample="middle")
+
+    def test_default_is_bounded(self, big_csv):
+        """Test big files return max_rows rows plus an estimated total."""
+        content, description = read_csv_file(big_csv)
+
+        assert "200 of ~1,001 rows" in description
+        assert " 200 | 199 | user199 | 3" in content
+        assert "user200" not in content
+        assert "[PARTIAL:" in content
+
+    def test_row_range_keeps_header(self, big_csv):
+        """Test a row range is shown under the column names."""
+        content, _ = read_csv_file(big_csv, rows="501-503")
+
+        lines = content.splitlines()[2:]
+        assert lines[0] == "   1 | id | name | score"
+        assert lines[1] == "     ..."
+        assert lines[2:5] == [
+            " 501 | 500 | user500 | 3", " 502 | 501 | user501 | 4", " 503 | 502 | user502 | 5",
+        ]
+
+    def test_tail(self, big_csv):
+        """Test the last rows and the exact total."""
+        content, description = read_csv_file(big_csv, sample="tail", max_rows=2)
+
+        assert description == "CSV (2 of 1,001 rows)"
+        assert content.splitlines()[-4:-2] == ["1000 | 999 | user999 | 5", "1001 | 1000 | user1000 | 6"]
+
+    @pytest.mark.parametrize("columns", ["name,score", "2,3", "B,C", "NAME, Score"])
+    def test_columns(self, big_csv, columns):
+        """Test columns are picked by name, number or letter."""
+        content, _ = read_csv_file(big_csv, rows="2", columns=columns)
+
+        assert "   2 | user1 | 1" in content
+        assert "   1 | name | score" in content
+
+    def test_unknown_column_fails(self, big_csv):
+        """Test a column that matches nothing is an error, not an empty table."""
+        result = ReadTool().execute(path=str(big_csv), columns="email")
+
+        assert not result.success
+        assert "email" in result.error
+
+    def test_paging_via_tool(self, big_csv):
+        """Test ReadTool passes the table options through."""
+        result = ReadTool().execute(path=str(big_csv), rows="900-1001", max_rows=3)
+
+        assert result.success
+        assert " 902 | 901 | user901 | 5" in result.llm_output
+        assert "user902" not in result.llm_output
+
+    @pytest.mark.skipif(not HAS_OPENPYXL, reason="openpyxl not installed")
+    def test_xlsx_window(self, tmp_path):
+        """Test Excel sheets are paged like CSV files."""
+        import openpyxl
+
+        xlsx_file = tmp_path / "big.xlsx"
+        wb = openpyxl.Workbook()
+        ws = wb.active
+        ws.append(["id", "name"])
+        for i in range(1, 501):
+            ws.append([i, f"user{i}"])
+        wb.save(xlsx_file)
+
+        content, description = read_excel_file(xlsx_file, rows="101-102", columns="name")
+
+        assert "   1 | name" in content
+        assert " 101 | user100" in content
+        assert "user101" in content and "user102" not in content
+        assert "2 of ~501 rows" in description
+
+
 class TestExcelReading:
     """Test Excel file reading."""
 
@@ -464,6 +579,17 @@ class TestLineRangeReading:
         assert result.success
         assert "Line 2" in result.llm_output
 
+    def test_read_tail(self, tmp_path):
+        """Test reading the last lines of a file."""
+        file = tmp_path / "app.log"
+        file.write_text("".join(f"Line {i}\n" for i in range(1, 21)))
+
+        tool = ReadTool()
+        result = tool.execute(path=str(file), tail=3)
+
+        assert result.success
+        assert result.llm_output.splitlines() == ["  18 | Line 18", "  19 | Line 19", "  20 | Line 20"]
+
 
 class TestDependencyChecks:
     """Test handling of missing dependencies."""
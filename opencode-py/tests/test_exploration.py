@@ -510,7 +510,8 @@ class TestExplorationToolSet:
     def test_exploration_tools_defined(self):
         """Test that exploration tools are properly defined."""
         expected_exploration = {"read", "glob", "grep", "tree", "outline",
-                                "find_definition", "find_references", "find_symbols"}
+                                "find_definition", "find_references", "find_symbols",
+                                "profile_data"}
 
         assert ExplorationGuard.EXPLORATION_TOOLS == expected_exploration
 
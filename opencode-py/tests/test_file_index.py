@@ -0,0 +1,284 @@
+"""Tests for the shared workspace file index."""
+
+import os
+
+import pytest
+from pathlib import Path
+
+from opencode.file_index import FileIndex, compile_glob, detect_language
+from opencode.tools.find_definition import FindDefinitionTool
+from opencode.tools.glob import GlobTool
+from opencode.tools.grep import GrepTool
+from opencode.tools.write import WriteTool
+from opencode.mode import ModeManager, Mode
+
+
+def _bump_mtime(path: Path) -> None:
+    """Move a path's mtime forward so directory changes are always visible."""
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10_000_000))
+
+
+# ============================================================================
+# Glob Compilation Tests
+# ============================================================================
+
+class TestCompileGlob:
+    """Tests for glob-to-regex translation."""
+
+    def test_star_matches_single_level(self):
+        """Test that '*' does not cross directories."""
+        regex = compile_glob("*.py")
+        assert regex.match("main.py")
+        assert not regex.match("src/main.py")
+
+    def test_double_star_matches_any_depth(self):
+        """Test that '**/' matches zero or more directories."""
+        regex = compile_glob("**/*.py")
+        assert regex.match("main.py")
+        assert regex.match("src/pkg/main.py")
+        assert not regex.match("main.pyc")
+
+    def test_nested_pattern(self):
+        """Test patterns with a directory prefix."""
+        regex = compile_glob("src/**/*.ts")
+        assert regex.match("src/a.ts")
+        assert regex.match("src/x/y/a.ts")
+        assert not regex.match("lib/a.ts")
+
+    def test_question_mark_and_class(self):
+        """Test '?' and character classes."""
+        assert compile_glob("file?.txt").match("file1.txt")
+        assert compile_glob("[ab].py").match("a.py")
+        assert not compile_glob("[!ab].py").match("a.py")
+
+
+class TestDetectLanguage:
+    """Tests for extension-based language detection."""
+
+    def test_known_extensions(self):
+        """Test common languages are detected."""
+        assert detect_language("a/b.py") == "python"
+        assert detect_language("x.TSX") == "typescript"
+        assert detect_language("lib.rs") == "rust"
+
+    def test_unknown_extension(self):
+        """Test unknown extensions return None."""
+        assert detect_language("README.md") is None
+
+
+# ============================================================================
+# FileIndex Tests
+# ============================================================================
+
+class TestFileIndex:
+    """Tests for FileIndex build and incremental refresh."""
+
+    def test_lists_files_with_metadata(self, temp_dir):
+        """Test entries carry size, mtime and language."""
+        (temp_dir / "main.py").write_text("print('hi')\n")
+        index = FileIndex(temp_dir)
+
+        entries = index.files()
+        assert [e.rel_path for e in entries] == ["main.py"]
+        assert entries[0].size == len("print('hi')\n")
+        assert entries[0].language == "python"
+        assert entries[0].mtime > 0
+
+    def test_skips_dependency_dirs(self, temp_dir):
+        """Test node_modules and .git are pruned."""
+        (temp_dir / "node_modules" / "pkg").mkdir(parents=True)
+        (temp_dir / "node_modules" / "pkg" / "index.js").write_text("x")
+        (temp_dir / ".git").mkdir()
+        (temp_dir / ".git" / "HEAD").write_text("ref")
+        (temp_dir / "app.js").write_text("x")
+
+        index = FileIndex(temp_dir)
+        assert [e.rel_path for e in index.files()] == ["app.js"]
+
+    def test_skips_generated_workspace_dirs(self, temp_dir):
+        """Test the LLM cache, index and metrics under .opencode are pruned."""
+        for sub in ["llm_cache/ab", "index", "metrics"]:
+            (temp_dir / ".opencode" / sub).mkdir(parents=True)
+        (temp_dir / ".opencode" / "llm_cache" / "ab" / "abcd.json").write_text("{}")
+        (temp_dir / ".opencode" / "metrics" / "2026-10-18.jsonl").write_text("{}")
+        (temp_dir / ".opencode" / "config.toml").write_text("")
+        index = FileIndex(temp_dir)
+
+        assert [e.rel_path for e in index.files()] == [".opencode/config.toml"]
+        generation = index.generation
+
+        (temp_dir / ".opencode" / "llm_cache" / "cd").mkdir()
+        (temp_dir / ".opencode" / "llm_cache" / "cd" / "cdef.json").write_text("{}")
+        _bump_mtime(temp_dir / ".opencode" / "llm_cache")
+        index.refresh()
+        assert index.generation == generation
+
+    def test_results_sorted_by_path(self, temp_dir):
+        """Test files are returned in deterministic path order."""
+        for name in ["c.py", "a.py", "b.py"]:
+            (temp_dir / name).write_text("")
+        index = FileIndex(temp_dir)
+        assert [e.rel_path for e in index.files()] == ["a.py", "b.py", "c.py"]
+
+    def test_filters(self, temp_dir):
+        """Test under/extensions/pattern filters."""
+        (temp_dir / "src").mkdir()
+        (temp_dir / "src" / "a.py").write_text("")
+        (temp_dir / "src" / "b.ts").write_text("")
+        (temp_dir / "top.py").write_text("")
+        index = FileIndex(temp_dir)
+
+        assert [e.rel_path for e in index.files(under=temp_dir / "src")] == ["src/a.py", "src/b.ts"]
+        assert [e.rel_path for e in index.files(extensions=[".py"])] == ["src/a.py", "top.py"]
+        assert [e.rel_path for e in index.files(pattern="*.py")] == ["top.py"]
+        assert [e.rel_path for e in index.files(under=temp_dir / "src", pattern="*.ts")] == ["src/b.ts"]
+
+    def test_iter_files_is_lazy_and_narrowed(self, temp_dir):
+        """Test iter_files yields in order and honours literal pattern prefixes."""
+        for rel in ["a/x.ts", "src/app/b.ts", "src/app/deep/c.ts", "src/lib/d.ts", "z.ts"]:
+            (temp_dir / rel).parent.mkdir(parents=True, exist_ok=True)
+            (temp_dir / rel).write_text("")
+        index = FileIndex(temp_dir)
+
+        found = [e.rel_path for e in index.iter_files(pattern="src/app/**/*.ts")]
+        assert found == ["src/app/b.ts", "src/app/deep/c.ts"]
+
+        it = index.iter_files(pattern="**/*.ts")
+        assert next(it).rel_path == "a/x.ts"
+
+    def test_refresh_picks_up_new_and_deleted_files(self, temp_dir):
+        """Test incremental refresh via directory mtimes."""
+        (temp_dir / "sub").mkdir()
+        (temp_dir / "sub" / "old.py").write_text("")
+        index = FileIndex(temp_dir)
+        assert len(index) == 1
+        generation = index.generation
+
+        (temp_dir / "sub" / "new.py").write_text("")
+        (temp_dir / "sub" / "old.py").unlink()
+        _bump_mtime(temp_dir / "sub")
+
+        assert [e.rel_path for e in index.files()] == ["sub/new.py"]
+        assert index.generation > generation
+
+    def test_refresh_picks_up_new_directories(self, temp_dir):
+        """Test a new directory tree is scanned on refresh."""
+        index = FileIndex(temp_dir)
+        assert len(index) == 0
+
+        (temp_dir / "a" / "b").mkdir(parents=True)
+        (temp_dir / "a" / "b" / "deep.py").write_text("")
+        _bump_mtime(temp_dir)
+
+        assert [e.rel_path for e in index.files()] == ["a/b/deep.py"]
+
+    def test_unchanged_tree_keeps_generation(self, temp_dir):
+        """Test refresh without changes does not bump the generation."""
+        (temp_dir / "a.py").write_text("")
+        index = FileIndex(temp_dir)
+        index.refresh()
+        generation = index.generation
+        index.refresh()
+        assert index.generation == generation
+
+    def test_update_records_in_place_edit(self, temp_dir):
+        """Test update() re-stats a modified file."""
+        target = temp_dir / "a.py"
+        target.write_text("x")
+        index = FileIndex(temp_dir)
+        assert index.get(target).size == 1
+
+        target.write_text("longer content")
+        index.update(target)
+        assert index.get(target).size == len("longer content")
+
+    def test_invalidate_restats_all_files(self, temp_dir):
+        """Test invalidate() makes the next refresh notice in-place edits."""
+        target = temp_dir / "a.py"
+        target.write_text("x")
+        index = FileIndex(temp_dir)
+        index.refresh()
+
+        target.write_text("changed")
+        index.invalidate()
+        assert index.get(target).size == len("changed")
+
+
+# ============================================================================
+# Tool Integration Tests
+# ============================================================================
+
+class TestToolsUseIndex:
+    """Tests that search tools query the workspace index."""
+
+    def test_workspace_owns_single_index(self, temp_workspace):
+        """Test the workspace hands out the same index instance."""
+        assert temp_workspace.file_index is temp_workspace.file_index
+        assert temp_workspace.file_index.root == temp_workspace.root
+
+    def test_grep_sees_file_written_by_tool(self, temp_workspace, capsys):
+        """Test files written through WriteTool are searchable immediately."""
+        grep = GrepTool(workspace=temp_workspace)
+        grep.execute(pattern="anything")  # Build the index
+
+        mode = ModeManager(initial_mode=Mode.BUILD)
+        WriteTool(mode_manager=mode, workspace=temp_workspace).execute(
+            path="fresh.py", content="needle = 1\n"
+        )
+
+        result = grep.execute(pattern="needle")
+        assert "fresh.py" in result.output
+
+    def test_grep_skips_llm_cache(self, temp_workspace):
+        """Test recorded LLM responses are not search hits."""
+        entry = temp_workspace.config_dir / "llm_cache" / "ab" / "abcd.json"
+        entry.parent.mkdir(parents=True)
+        entry.write_text('{"content": "needle"}')
+        (temp_workspace.root / "app.py").write_text("needle = 1\n")
+
+        result = GrepTool(workspace=temp_workspace).execute(pattern="needle")
+        assert "app.py" in result.output
+        assert "llm_cache" not in result.output
+
+    def test_glob_skips_node_modules(self, temp_workspace):
+        """Test glob no longer descends into dependency directories."""
+        nm = temp_workspace.root / "node_modules" / "lib"
+        nm.mkdir(parents=True)
+        (nm / "index.js").write_text("")
+        (temp_workspace.root / "app.js").write_text("")
+
+        result = GlobTool(workspace=temp_workspace).execute(pattern="**/*.js")
+        assert "app.js" in result.output
+        assert "node_modules" not in result.output
+
+    def test_glob_reaches_named_pruned_dirs(self, temp_workspace):
+        """Test a pattern that starts inside a skipped or ignored directory still matches."""
+        root = temp_workspace.root
+        for rel in ["dist/app.js", "dist/sub/chunk.js", "out/log.txt", "src/main.js"]:
+            (root / rel).parent.mkdir(parents=True, exist_ok=True)
+            (root / rel).write_text("")
+        (root / ".gitignore").write_text("out/\n")
+        glob = GlobTool(workspace=temp_workspace)
+
+        assert "dist" not in glob.execute(pattern="**/*.js").output
+        result = glob.execute(pattern="dist/**/*.js")
+        assert "dist/app.js" in result.output and "dist/sub/chunk.js" in result.output
+        assert "out/log.txt" in glob.execute(pattern="out/*.txt").output
+        assert "log.txt" in glob.execute(pattern="*.txt", path="out").output
+
+    def test_glob_of_pruned_dir_not_cached(self, temp_workspace):
+        """Test walks of unindexed directories are not served from the result cache."""
+        (temp_workspace.root / "dist").mkdir()
+        glob = GlobTool(workspace=temp_workspace)
+
+        assert glob.cache_fingerprint(pattern="dist/*.js") is None
+        assert glob.cache_fingerprint(pattern="src/*.js") is not None
+
+    def test_find_definition_without_initialized_workspace(self, temp_dir, monkeypatch):
+        """Test symbol tools work relative to cwd when no workspace is set up."""
+        (temp_dir / "mod.py").write_text("def target():\n    pass\n")
+        monkeypatch.chdir(temp_dir)
+
+        result = FindDefinitionTool().execute(symbol="target")
+        assert "mod.py:1" in result.output
@@ -0,0 +1,181 @@
+"""Tests for all-or-none file transactions and the rename engine."""
+
+import os
+
+import pytest
+
+from opencode.config import Config
+from opencode.file_transaction import FileTransaction, TransactionError
+from opencode.mode import ModeManager, Mode
+from opencode.search import PARALLEL_MIN_FILES
+from opencode.tools.rename_symbol import RenameSymbolTool
+
+
+def _leftovers(directory) -> list[str]:
+    """Temp or backup files a transaction left behind."""
+    return sorted(p.name for p in directory.iterdir() if p.suffix in (".tmp", ".bak"))
+
+
+# ============================================================================
+# FileTransaction Tests
+# ============================================================================
+
+class TestFileTransaction:
+    """Tests for staging and committing file replacements."""
+
+    def test_commit_replaces_all(self, temp_dir):
+        """Test committed files get their staged contents."""
+        a, b = temp_dir / "a.txt", temp_dir / "b.txt"
+        a.write_text("old a")
+        b.write_text("old b")
+
+        with FileTransaction() as txn:
+            txn.stage(a, b"new a")
+            txn.stage(b, b"new b")
+            assert a.read_text() == "old a"  # Nothing changes before commit
+            txn.commit()
+
+        assert a.read_text() == "new a"
+        assert b.read_text() == "new b"
+        assert _leftovers(temp_dir) == []
+
+    def test_no_commit_discards(self, temp_dir):
+        """Test leaving the block without commit() changes nothing."""
+        a = temp_dir / "a.txt"
+        a.write_text("old")
+        with FileTransaction() as txn:
+            txn.stage(a, b"new")
+        assert a.read_text() == "old"
+        assert _leftovers(temp_dir) == []
+
+    def test_changed_file_aborts_commit(self, temp_dir):
+        """Test a file edited after staging fails the whole commit."""
+        a, b = temp_dir / "a.txt", temp_dir / "b.txt"
+        a.write_text("old a")
+        b.write_text("old b")
+        st = os.stat(b)
+
+        with FileTransaction() as txn:
+            txn.stage(a, b"new a")
+            txn.stage(b, b"new b", expected=(st.st_mtime_ns, st.st_size))
+            b.write_text("edited meanwhile")
+            with pytest.raises(TransactionError):
+                txn.commit()
+
+        assert a.read_text() == "old a"
+        assert b.read_text() == "edited meanwhile"
+
+    def test_failure_mid_commit_rolls_back(self, temp_dir, monkeypatch):
+        """Test files already replaced are restored when a later one fails."""
+        paths = [temp_dir / f"f{i}.txt" for i in range(3)]
+        for path in paths:
+            path.write_text(f"old {path.name}")
+
+        real_replace = os.replace
+        calls = []
+
+        def flaky_replace(src, dst):
+            calls.append(dst)
+            if len(calls) == 3:
+                raise PermissionError(13, "Permission denied", str(dst))
+            real_replace(src, dst)
+
+        with FileTransaction() as txn:
+            for path in paths:
+                txn.stage(path, b"new")
+            monkeypatch.setattr(os, "replace", flaky_replace)
+            with pytest.raises(TransactionError):
+                txn.commit()
+            monkeypatch.setattr(os, "replace", real_replace)
+
+        assert [p.read_text() for p in paths] == [f"old {p.name}" for p in paths]
+        assert _leftovers(temp_dir) == []
+
+    def test_preserves_permissions(self, temp_dir):
+        """Test the replaced file keeps its mode bits."""
+        script = temp_dir / "run.sh"
+        script.write_text("echo old")
+        script.chmod(0o755)
+        with FileTransaction() as txn:
+            txn.stage(script, b"echo new")
+            txn.commit()
+        assert script.stat().st_mode & 0o777 == 0o755
+
+
+# ============================================================================
+# RenameSymbolTool Tests
+# ============================================================================
+
+class TestRenameSymbol:
+    """Tests for the parallel, transactional rename."""
+
+    def _tool(self, workspace, **config):
+        return RenameSymbolTool(
+            mode_manager=ModeManager(initial_mode=Mode.BUILD),
+            workspace=workspace,
+            config=Config(**config),
+        )
+
+    def test_dry_run_changes_nothing(self, temp_workspace):
+        """Test the preview leaves files untouched."""
+        path = temp_workspace.root / "mod.py"
+        path.write_text("def old_fn():\n    pass\n\nold_fn()\n")
+
+        result = self._tool(temp_workspace).execute(old_name="old_fn", new_name="new_fn")
+
+        assert "Would rename" in result.output
+        assert "mod.py: (" in result.output  # Per-file timing
+        assert "old_fn()" in path.read_text()
+
+    def test_apply_preserves_line_endings(self, temp_workspace):
+        """Test CRLF files keep their line endings."""
+        path = temp_workspace.root / "mod.py"
+        path.write_bytes(b"old_fn = 1\r\nprint(old_fn)\r\n")
+
+        result = self._tool(temp_workspace).execute(
+            old_name="old_fn", new_name="new_fn", dry_run=False
+        )
+
+        assert result.success
+        assert "committed in" in result.output
+        assert path.read_bytes() == b"new_fn = 1\r\nprint(new_fn)\r\n"
+
+    def test_conflict_leaves_tree_untouched(self, temp_workspace, monkeypatch):
+        """Test a failed commit reports that nothing was renamed."""
+        a = temp_workspace.root / "a.py"
+        b = temp_workspace.root / "b.py"
+        a.write_text("old_fn()\n")
+        b.write_text("old_fn()\n")
+
+        def fail_commit(self):
+            raise TransactionError("File changed while editing: b.py")
+
+        monkeypatch.setattr(FileTransaction, "commit", fail_commit)
+        result = self._tool(temp_workspace).execute(
+            old_name="old_fn", new_name="new_fn", dry_run=False
+        )
+
+        assert result.success is False
+        assert "no files were changed" in result.error
+        assert a.read_text() == b.read_text() == "old_fn()\n"
+        assert [p for p in temp_workspace.root.iterdir() if p.suffix == ".tmp"] == []
+
+    def test_parallel_matches_sequential(self, temp_workspace):
+        """Test a pool-sized rename produces the same result as one process."""
+        root = temp_workspace.root
+        for i in range(PARALLEL_MIN_FILES + 10):
+            (root / f"m{i:04d}.py").write_text(f"value_{i} = old_fn({i})\n")
+
+        preview = self._tool(temp_workspace, search_workers=1).execute(
+            old_name="old_fn", new_name="new_fn"
+        )
+        result = self._tool(temp_workspace, search_workers=2).execute(
+            old_name="old_fn", new_name="new_fn", dry_run=False
+        )
+
+        assert result.success
+        assert f"in {PARALLEL_MIN_FILES + 10} file(s)" in preview.output
+        assert all(
+            (root / f"m{i:04d}.py").read_text() == f"value_{i} = new_fn({i})\n"
+            for i in range(PARALLEL_MIN_FILES + 10)
+        )
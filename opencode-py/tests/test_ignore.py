@@ -0,0 +1,190 @@
+"""Tests for .gitignore/.ignore handling in directory walkers."""
+
+import os
+from pathlib import Path
+
+from opencode.file_index import FileIndex
+from opencode.ignore import IgnoreFile, IgnoreRules
+from opencode.tools.glob import GlobTool
+from opencode.tools.tree import TreeTool
+
+
+def _bump_mtime(path: Path) -> None:
+    """Move a path's mtime forward so changes are always visible."""
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10_000_000))
+
+
+def _rel_paths(index: FileIndex) -> list[str]:
+    return [entry.rel_path for entry in index.files()]
+
+
+# ============================================================================
+# Pattern Tests
+# ============================================================================
+
+class TestIgnoreFile:
+    """Tests for gitignore pattern semantics."""
+
+    def test_name_matches_at_any_depth(self):
+        """Test patterns without a slash match basenames anywhere."""
+        rules = IgnoreFile(["*.log"])
+        assert rules.match("debug.log", False)
+        assert rules.match("a/b/debug.log", False)
+        assert rules.match("debug.txt", False) is None
+
+    def test_slash_anchors_pattern(self):
+        """Test patterns with a slash are relative to the file's directory."""
+        rules = IgnoreFile(["/build", "docs/*.md"])
+        assert rules.match("build", True)
+        assert rules.match("src/build", True) is None
+        assert rules.match("docs/a.md", False)
+        assert rules.match("x/docs/a.md", False) is None
+
+    def test_trailing_slash_matches_directories_only(self):
+        """Test 'name/' leaves files with that name alone."""
+        rules = IgnoreFile(["out/"])
+        assert rules.match("out", True)
+        assert rules.match("out", False) is None
+
+    def test_negation_last_match_wins(self):
+        """Test '!' re-includes a previously ignored path."""
+        rules = IgnoreFile(["*.log", "!keep.log"])
+        assert rules.match("x.log", False) is True
+        assert rules.match("keep.log", False) is False
+
+    def test_double_star(self):
+        """Test leading, middle and trailing '**'."""
+        rules = IgnoreFile(["**/cache", "a/**/b", "logs/**"])
+        assert rules.match("x/y/cache", True)
+        assert rules.match("a/b", True)
+        assert rules.match("a/x/y/b", True)
+        assert rules.match("logs/x/y.txt", False)
+
+    def test_comments_blank_and_escapes(self):
+        """Test comments are skipped and escapes are literal."""
+        rules = IgnoreFile(["# comment", "", r"\#hash", r"\!bang", "space\\ "])
+        assert rules.match("#hash", False)
+        assert rules.match("!bang", False)
+        assert rules.match("space ", False)
+        assert rules.match("comment", False) is None
+
+    def test_deeper_file_overrides_parent(self):
+        """Test a nested ignore file can re-include a parent's pattern."""
+        rules = IgnoreRules().child("", IgnoreFile(["*.gen"]))
+        nested = rules.child("src", IgnoreFile(["!*.gen"]))
+        assert rules.ignored("src/a.gen", False)
+        assert not nested.ignored("src/a.gen", False)
+
+    def test_rules_inherited_from_repository_top(self, temp_dir):
+        """Test a walk rooted below the repository top sees parent ignore files."""
+        (temp_dir / ".git").mkdir()
+        (temp_dir / ".gitignore").write_text("pkg/generated/\n*.tmp\n")
+        (temp_dir / "pkg").mkdir()
+
+        rules = IgnoreRules.for_root(temp_dir / "pkg")
+        assert rules.ignored("generated", True)
+        assert rules.ignored("x.tmp", False)
+        assert not rules.ignored("main.py", False)
+
+
+# ============================================================================
+# FileIndex Tests
+# ============================================================================
+
+class TestFileIndexIgnores:
+    """Tests that the file index prunes ignored paths."""
+
+    def test_ignored_directories_are_not_listed(self, temp_dir, monkeypatch):
+        """Test an ignored directory is never scanned."""
+        (temp_dir / ".gitignore").write_text("vendor/\n*.min.js\n")
+        (temp_dir / "vendor" / "lib").mkdir(parents=True)
+        (temp_dir / "vendor" / "lib" / "dep.js").write_text("x")
+        (temp_dir / "app.js").write_text("x")
+        (temp_dir / "app.min.js").write_text("x")
+
+        scanned = []
+        original = os.scandir
+
+        def scandir(path):
+            scanned.append(path)
+            return original(path)
+
+        monkeypatch.setattr(os, "scandir", scandir)
+
+        index = FileIndex(temp_dir)
+        assert _rel_paths(index) == [".gitignore", "app.js"]
+        assert scanned
+        assert all(Path(p).name != "vendor" for p in scanned if not isinstance(p, int))
+
+    def test_dot_ignore_overrides_gitignore(self, temp_dir):
+        """Test .ignore takes precedence in the same directory."""
+        (temp_dir / ".gitignore").write_text("*.txt\n")
+        (temp_dir / ".ignore").write_text("!notes.txt\n")
+        (temp_dir / "notes.txt").write_text("x")
+        (temp_dir / "other.txt").write_text("x")
+
+        assert "notes.txt" in _rel_paths(FileIndex(temp_dir))
+        assert "other.txt" not in _rel_paths(FileIndex(temp_dir))
+
+    def test_disabled(self, temp_dir):
+        """Test ignore files can be turned off."""
+        (temp_dir / ".gitignore").write_text("*.txt\n")
+        (temp_dir / "a.txt").write_text("x")
+        assert "a.txt" in _rel_paths(FileIndex(temp_dir, use_ignore_files=False))
+
+    def test_edited_gitignore_rescans_subtree(self, temp_dir):
+        """Test changing an ignore file in place updates the index."""
+        (temp_dir / "src").mkdir()
+        (temp_dir / "src" / "a.gen").write_text("x")
+        gitignore = temp_dir / ".gitignore"
+        gitignore.write_text("# nothing yet\n")
+
+        index = FileIndex(temp_dir)
+        assert "src/a.gen" in _rel_paths(index)
+
+        gitignore.write_text("*.gen\n")
+        _bump_mtime(gitignore)
+        assert "src/a.gen" not in _rel_paths(index)
+
+    def test_update_skips_ignored_file(self, temp_dir):
+        """Test files reported by tools still honour ignore rules."""
+        (temp_dir / ".gitignore").write_text("*.log\n")
+        index = FileIndex(temp_dir)
+        index.refresh()
+
+        path = temp_dir / "run.log"
+        path.write_text("x")
+        index.update(path)
+        assert "run.log" not in [e.rel_path for e in index._files.values()]
+
+
+# ============================================================================
+# Tool Tests
+# ============================================================================
+
+class TestToolsRespectIgnores:
+    """Tests that walking tools leave out ignored paths."""
+
+    def test_glob(self, temp_workspace):
+        """Test glob results exclude gitignored files."""
+        root = temp_workspace.root
+        (root / ".gitignore").write_text("generated/\n")
+        (root / "generated").mkdir()
+        (root / "generated" / "out.py").write_text("x")
+        (root / "main.py").write_text("x")
+
+        result = GlobTool(workspace=temp_workspace).execute(pattern="**/*.py")
+        assert "main.py" in result.output
+        assert "out.py" not in result.output
+
+    def test_tree(self, temp_dir, monkeypatch):
+        """Test tree hides gitignored entries."""
+        monkeypatch.chdir(temp_dir)
+        (temp_dir / ".gitignore").write_text("coverage/\n")
+        (temp_dir / "coverage").mkdir()
+        (temp_dir / "src").mkdir()
+
+        result = TreeTool().execute(path=".")
+        assert "src/" in result.output
+        assert "coverage" not in result.output
@@ -0,0 +1,138 @@
+"""Tests for the identifier lexer used by find_references and rename_symbol."""
+
+import re
+import time
+from textwrap import dedent
+
+import pytest
+
+from opencode.lexer import code_occurrences, group_by_line, supports
+from opencode.mode import ModeManager, Mode
+from opencode.tools.find_references import FindReferencesTool
+from opencode.tools.rename_symbol import RenameSymbolTool
+
+
+def _hit_lines(content: str, name: str, language: str) -> list[int]:
+    offsets = code_occurrences(content, name, language)
+    return [line_num for line_num, _, _, _ in group_by_line(content, offsets)]
+
+
+# ============================================================================
+# Lexer Tests
+# ============================================================================
+
+class TestPythonLexer:
+    """Tests for tokenize-based Python lexing."""
+
+    SOURCE = dedent('''\
+        def target():
+            """Docstring mentioning target."""
+            # comment about target
+            msg = "target in a string"
+            return target() + f"{target}" + f"target"
+        ''')
+
+    def test_skips_comments_strings_and_docstrings(self):
+        """Test only code names are found."""
+        assert _hit_lines(self.SOURCE, "target", "python") == [1, 5]
+
+    def test_fstring_fields_are_code(self):
+        """Test names inside f-string braces count, literal text does not."""
+        offsets = code_occurrences(self.SOURCE, "target", "python")
+        line5 = self.SOURCE.splitlines()[4]
+        assert len([o for o in offsets if o > self.SOURCE.index(line5)]) == 2
+
+    def test_partial_words_ignored(self):
+        """Test longer identifiers containing the name don't match."""
+        assert code_occurrences("target_x = my_target\n", "target", "python") == []
+
+    def test_broken_source_falls_back(self):
+        """Test unterminated code still lexes via the regex fallback."""
+        source = "x = target(\n# target\n'target'"
+        assert _hit_lines(source, "target", "python") == [1]
+
+
+class TestCFamilyLexer:
+    """Tests for the regex state-machine lexers."""
+
+    @pytest.mark.parametrize("language", ["c", "cpp", "java", "javascript", "typescript", "go", "php"])
+    def test_comments_and_strings(self, language):
+        """Test line/block comments and string literals are skipped."""
+        source = dedent('''\
+            call(target);
+            // target
+            /* multi
+               target */
+            s = "has target \\" target";
+            x = target;
+            ''')
+        assert _hit_lines(source, "target", language) == [1, 6]
+
+    def test_template_literal_fields(self):
+        """Test ${...} in template literals is code, the text around is not."""
+        source = "const s = `target ${target} ${other}`;\n"
+        offsets = code_occurrences(source, "target", "javascript")
+        assert offsets == [source.index("${target}") + 2]
+
+    def test_rust_lifetimes_are_not_chars(self):
+        """Test a lifetime does not start a char literal."""
+        source = "fn f<'a>(x: &'a str) -> Target { Target::new('t') }\n"
+        assert len(code_occurrences(source, "Target", "rust")) == 2
+
+    def test_ruby_comments(self):
+        """Test Ruby comments and =begin blocks are skipped."""
+        source = "target = 1\n# target\n=begin\ntarget\n=end\nputs target\n"
+        assert _hit_lines(source, "target", "ruby") == [1, 6]
+
+    def test_unknown_language(self):
+        """Test unsupported languages return None so callers can fall back."""
+        assert code_occurrences("target", "target", None) is None
+        assert not supports("markdown")
+
+
+# ============================================================================
+# Tool Integration Tests
+# ============================================================================
+
+class TestToolsUseLexer:
+    """Tests that the tools ignore non-code occurrences."""
+
+    def test_find_references_skips_strings(self, temp_workspace):
+        """Test references inside strings and block comments are not reported."""
+        (temp_workspace.root / "app.js").write_text(
+            "/*\n helper here\n*/\nconst s = 'helper';\nhelper();\n"
+        )
+        result = FindReferencesTool(workspace=temp_workspace).execute(symbol="helper")
+        assert "app.js:5" in result.output
+        assert "app.js:2" not in result.output
+        assert "app.js:4" not in result.output
+
+    def test_rename_leaves_docstrings_alone(self, temp_workspace):
+        """Test rename only edits code occurrences."""
+        path = temp_workspace.root / "mod.py"
+        path.write_text('def load():\n    """Call load() once."""\n    return load\n')
+
+        tool = RenameSymbolTool(
+            mode_manager=ModeManager(initial_mode=Mode.BUILD), workspace=temp_workspace
+        )
+        result = tool.execute(old_name="load", new_name="fetch", dry_run=False)
+
+        assert result.success
+        assert "Found 2 occurrence(s)" in result.output
+        assert path.read_text() == 'def fetch():\n    """Call load() once."""\n    return fetch\n'
+
+    def test_rename_file_timings_plausible(self, temp_workspace):
+        """Test each file's reported time fits within the whole rename."""
+        for i in range(3):
+            (temp_workspace.root / f"mod{i}.py").write_text("x = 1\n" * 50 + "load = 2\nload()\n")
+
+        tool = RenameSymbolTool(
+            mode_manager=ModeManager(initial_mode=Mode.BUILD), workspace=temp_workspace
+        )
+        start = time.perf_counter()
+        result = tool.execute(old_name="load", new_name="fetch")
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        timings = [float(ms) for ms in re.findall(r"\.py: \((\d+\.\d) ms\)", result.output)]
+        assert len(timings) == 3
+        assert all(0 <= ms <= elapsed_ms for ms in timings)
@@ -0,0 +1,240 @@
+"""Tests for the line-offset index and windowed reads of big files."""
+
+import os
+
+import pytest
+
+from opencode import line_index as line_index_module
+from opencode.line_index import LineIndexCache, build_index
+from opencode.tools import read as read_module
+from opencode.tools.read import ReadTool
+
+
+@pytest.fixture(autouse=True)
+def small_blocks(monkeypatch):
+    """Blocks of a few lines, so test files span many checkpoints."""
+    monkeypatch.setattr(line_index_module, "BLOCK_SIZE", 64)
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    """A 1000-line file, 'line 1' to 'line 1000'."""
+    path = tmp_path / "app.log"
+    path.write_text("".join(f"line {i}\n" for i in range(1, 1001)))
+    return path
+
+
+def _expected(path, start, end):
+    return path.read_text().splitlines()[start:end]
+
+
+# =============================================================================
+# Index
+# =============================================================================
+
+class TestBuildIndex:
+    """Tests for indexing a file's lines."""
+
+    @pytest.mark.parametrize("data, count", [
+        (b"", 0),
+        (b"\n", 1),
+        (b"a", 1),
+        (b"a\nb", 2),
+        (b"a\nb\n", 2),
+        (b"\n\n\n", 3),
+    ])
+    def test_line_count_matches_splitlines(self, data, count):
+        """Test trailing newlines and unterminated last lines count like splitlines."""
+        assert build_index(data).line_count == count == len(data.decode().splitlines())
+
+    def test_checkpoints_point_at_line_starts(self, log_file):
+        """Test every recorded offset is the start of the recorded line."""
+        data = log_file.read_bytes()
+        index = build_index(data)
+
+        assert len(index.lines) > 10
+        for line, offset in zip(index.lines, index.offsets):
+            assert offset == 0 or data[offset - 1:offset] == b"\n"
+            assert data[:offset].count(b"\n") == line
+
+
+class TestReadLines:
+    """Tests for reading a window of lines."""
+
+    @pytest.mark.parametrize("start, end", [(0, 5), (99, 100), (500, 530), (990, 1000), (995, 2000)])
+    def test_window_matches_file(self, log_file, start, end):
+        """Test windows anywhere in the file equal the same slice of all lines."""
+        lines, total = LineIndexCache().read_lines(log_file, start, end)
+
+        assert lines == _expected(log_file, start, end)
+        assert total == 1000
+
+    def test_unterminated_last_line(self, tmp_path):
+        """Test the last line is read when the file doesn't end in a newline."""
+        path = tmp_path / "no_newline.txt"
+        path.write_text("\n".join(f"row {i}" for i in range(100)))
+
+        lines, total = LineIndexCache().read_lines(path, 98, 100)
+
+        assert lines == ["row 98", "row 99"]
+        assert total == 100
+
+    def test_crlf_and_empty_lines(self, tmp_path):
+        """Test Windows line endings are stripped and empty lines kept."""
+        path = tmp_path / "crlf.txt"
+        path.write_bytes(b"a\r\n\r\nb\r\n" * 20)
+
+        lines, _ = LineIndexCache().read_lines(path, 0, 3)
+
+        assert lines == ["a", "", "b"]
+
+    def test_empty_file(self, tmp_path):
+        """Test an empty file has no lines."""
+        path = tmp_path / "empty.txt"
+        path.write_bytes(b"")
+
+        assert LineIndexCache().read_lines(path, 0, 10) == ([], 0)
+
+    def test_index_reused(self, log_file, monkeypatch):
+        """Test an unchanged file is not indexed again."""
+        cache = LineIndexCache()
+        cache.read_lines(log_file, 0, 1)
+        monkeypatch.setattr(line_index_module, "build_index", None)
+
+        assert cache.read_lines(log_file, 10, 11)[0] == ["line 11"]
+
+    def test_changed_file_reindexed(self, log_file):
+        """Test a modified file is indexed again before reading."""
+        cache = LineIndexCache()
+        cache.read_lines(log_file, 0, 1)
+
+        log_file.write_text("first\nsecond\n")
+        st = log_file.stat()
+        os.utime(log_file, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+        assert cache.read_lines(log_file, 0, 5) == (["first", "second"], 2)
+
+    def test_cache_bounded(self, tmp_path):
+        """Test the least recently used index is dropped past max_files."""
+        cache = LineIndexCache(max_files=2)
+        for name in "abc":
+            path = tmp_path / name
+            path.write_text("x\n")
+            cache.get(path)
+
+        assert len(cache) == 2
+
+
+class TestTail:
+    """Tests for reading the end of a file."""
+
+    @pytest.mark.parametrize("count", [1, 7, 1000, 5000])
+    def test_tail(self, log_file, count):
+        """Test the last lines are returned, without a total if unindexed."""
+        lines, total = LineIndexCache().tail(log_file, count)
+
+        assert lines == _expected(log_file, -count, None)
+        assert total is None
+
+    def test_tail_total_from_cached_index(self, log_file):
+        """Test the total comes from a current cached index."""
+        cache = LineIndexCache()
+        cache.get(log_file)
+
+        assert cache.tail(log_file, 2) == (["line 999", "line 1000"], 1000)
+
+    def test_tail_unterminated(self, tmp_path):
+        """Test a last line without a newline is part of the tail."""
+        path = tmp_path / "partial.log"
+        path.write_text("a\nb\nc")
+
+        assert LineIndexCache().tail(path, 2) == (["b", "c"], None)
+
+    def test_tail_of_empty_file(self, tmp_path):
+        """Test an empty file has no lines and a known total."""
+        path = tmp_path / "empty.log"
+        path.write_text("")
+
+        assert LineIndexCache().tail(path, 5) == ([], 0)
+
+    def test_tail_builds_no_index(self, log_file):
+        """Test tail reads don't index (or cache) the file."""
+        cache = LineIndexCache()
+        cache.tail(log_file, 3)
+        cache.tail(log_file, 0)
+
+        assert len(cache) == 0
+
+    def test_tail_reads_only_the_end(self, log_file, monkeypatch):
+        """Test a tail read never scans the file forwards."""
+        def no_build(*args, **kwargs):
+            raise AssertionError("unexpected full scan")
+
+        monkeypatch.setattr(line_index_module, "build_index", no_build)
+        assert LineIndexCache().tail(log_file, 3)[0] == ["line 998", "line 999", "line 1000"]
+
+
+# =============================================================================
+# ReadTool
+# =============================================================================
+
+class TestWindowedReadTool:
+    """Tests for ReadTool reading big files through the line index."""
+
+    @pytest.fixture(autouse=True)
+    def windowed(self, monkeypatch):
+        """Treat every file as big."""
+        monkeypatch.setattr(read_module, "WINDOWED_READ_BYTES", 0)
+
+    def test_line_range(self, log_file, capsys):
+        """Test a range read returns just those lines, numbered."""
+        result = ReadTool().execute(path=str(log_file), lines="500-502")
+
+        assert result.llm_output.splitlines() == [
+            " 500 | line 500", " 501 | line 501", " 502 | line 502",
+        ]
+
+    def test_preview_of_large_file(self, log_file, capsys):
+        """Test the default view shows the line count and first lines."""
+        result = ReadTool().execute(path=str(log_file))
+
+        assert "[LARGE FILE: 1000 lines]" in result.llm_output
+        assert "  50 | line 50" in result.llm_output
+        assert "line 51" not in result.llm_output
+
+    def test_tail(self, log_file, capsys):
+        """Test tail=N returns the last lines, unnumbered if the file isn't indexed."""
+        line_index_module.line_index().clear()
+        result = ReadTool().execute(path=str(log_file), tail=2)
+
+        assert result.llm_output.splitlines() == ["line 999", "line 1000"]
+        assert "(last 2 lines)" in result.output
+
+    def test_tail_of_indexed_file_is_numbered(self, log_file, capsys):
+        """Test tail=N numbers the lines when the file's index is cached."""
+        line_index_module.line_index().get(log_file)
+        result = ReadTool().execute(path=str(log_file), tail=2)
+
+        assert result.llm_output.splitlines() == [" 999 | line 999", "1000 | line 1000"]
+        assert "(1000 lines)" in result.output
+
+    def test_full_reads_whole_file(self, log_file, capsys):
+        """Test full=True still returns every line."""
+        result = ReadTool().execute(path=str(log_file), full=True)
+
+        assert len(result.llm_output.splitlines()) == 1000
+
+    def test_binary_detected(self, tmp_path, capsys):
+        """Test binary files are reported instead of decoded."""
+        path = tmp_path / "blob.dat"
+        path.write_bytes(b"\x00\x01\x02" * 100)
+
+        result = ReadTool().execute(path=str(path))
+
+        assert "BINARY FILE" in result.llm_output
+
+    def test_lines_and_tail_conflict(self, log_file):
+        """Test asking for both a range and a tail is an error."""
+        result = ReadTool().execute(path=str(log_file), lines="1-2", tail=2)
+
+        assert not result.success
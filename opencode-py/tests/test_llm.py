@@ -14,6 +14,7 @@ from opencode.llm.base import (
     ModelError,
     ContextLengthError,
     ResponseParseError,
+    ConversationBuffer,
     MockLLMProvider,
     SmartMockProvider,
 )
@@ -115,6 +116,85 @@ class TestLLMResponse:
         assert response.stop_reason == "tool_use"
 
 
+# ============================================================================
+# ConversationBuffer Tests
+# ============================================================================
+
+class TestConversationBuffer:
+    """Tests for incremental wire-format message building."""
+
+    @pytest.fixture
+    def buffer(self):
+        self.serialized = []
+
+        def message(msg):
+            self.serialized.append(msg)
+            return [] if msg.role == "system" else [{"role": msg.role, "content": msg.content}]
+
+        def round_(rnd):
+            self.serialized.append(rnd)
+            return [{"role": "assistant", "content": rnd["content"]}, {"role": "user", "content": "r"}]
+
+        return ConversationBuffer(message, round_)
+
+    def test_appended_rounds_serialized_once(self, buffer):
+        """Test each message and round is converted only once across a tool loop."""
+        history = [Message(role="system", content="s"), Message(role="user", content="go")]
+        rounds = []
+        for i in range(5):
+            rounds.append({"content": f"round {i}"})
+            wire = buffer.build(history, rounds)
+
+        assert len(self.serialized) == 2 + 5
+        assert len(wire) == 1 + 2 * 5
+        assert wire[-2] == {"role": "assistant", "content": "round 4"}
+        assert buffer.rebuilds == 0
+
+    def test_appended_messages_reuse_prefix(self, buffer):
+        """Test a history that only grew is extended in place."""
+        history = [Message(role="user", content="a")]
+        buffer.build(history)
+        history.append(Message(role="assistant", content="b"))
+        history.append(Message(role="user", content="c"))
+        wire = buffer.build(history)
+
+        assert [m["content"] for m in wire] == ["a", "b", "c"]
+        assert len(self.serialized) == 3
+        assert buffer.rebuilds == 0
+
+    def test_changed_history_rebuilds(self, buffer):
+        """Test a replaced message or dropped round starts over."""
+        history = [Message(role="user", content="a")]
+        rounds = [{"content": "x"}, {"content": "y"}]
+        buffer.build(history, rounds)
+
+        wire = buffer.build(history, rounds[:1])
+        assert buffer.rebuilds == 1
+        assert len(wire) == 3
+
+        history[0] = Message(role="user", content="edited")
+        wire = buffer.build(history, rounds[:1])
+        assert buffer.rebuilds == 2
+        assert wire[0]["content"] == "edited"
+
+    def test_message_after_rounds_rebuilds(self, buffer):
+        """Test a message added after tool rounds keeps wire order correct."""
+        history = [Message(role="user", content="a")]
+        buffer.build(history, [{"content": "x"}])
+        history.append(Message(role="assistant", content="done"))
+        wire = buffer.build(history)
+
+        assert [m["content"] for m in wire] == ["a", "done"]
+        assert buffer.rebuilds == 1
+
+    def test_returned_list_survives_reset(self, buffer):
+        """Test a wire list handed out earlier is not cleared by a rebuild."""
+        first = buffer.build([Message(role="user", content="a")])
+        buffer.build([Message(role="user", content="b")])
+
+        assert first == [{"role": "user", "content": "a"}]
+
+
 # ============================================================================
 # LLMError Tests
 # ============================================================================
@@ -505,6 +585,140 @@ class TestAnthropicProviderUnit:
             pytest.skip("anthropic library not installed")
 
 
+class _FakeMessages:
+    """Stand-in for client.messages that records request kwargs."""
+
+    def __init__(self, usage):
+        self.requests = []
+        self.usage = usage
+
+    def create(self, **kwargs):
+        from types import SimpleNamespace
+        self.requests.append(kwargs)
+        return SimpleNamespace(
+            content=[SimpleNamespace(type="text", text="done")],
+            stop_reason="end_turn",
+            usage=self.usage,
+        )
+
+
+class TestAnthropicPromptCaching:
+    """Tests for cache_control breakpoints and cache usage reporting."""
+
+    @pytest.fixture
+    def provider(self):
+        pytest.importorskip("anthropic")
+        from types import SimpleNamespace
+        from opencode.llm.anthropic import AnthropicProvider
+
+        provider = AnthropicProvider(api_key="test-key")
+        usage = SimpleNamespace(
+            input_tokens=12, output_tokens=3,
+            cache_read_input_tokens=2048, cache_creation_input_tokens=300,
+        )
+        provider._client = SimpleNamespace(messages=_FakeMessages(usage))
+        return provider
+
+    TOOLS = [
+        {"name": "read", "description": "Read", "input_schema": {"type": "object"}},
+        {"name": "grep", "description": "Grep", "input_schema": {"type": "object"}},
+    ]
+
+    def test_system_and_tools_marked(self, provider):
+        """Test the system prompt and last tool definition get breakpoints."""
+        tools = [dict(t) for t in self.TOOLS]
+        provider.chat([Message(role="user", content="hi")], tools=tools, system="Be brief.")
+        kwargs = provider.client.messages.requests[0]
+
+        assert kwargs["system"] == [
+            {"type": "text", "text": "Be brief.", "cache_control": {"type": "ephemeral"}}
+        ]
+        assert "cache_control" not in kwargs["tools"][0]
+        assert kwargs["tools"][1]["cache_control"] == {"type": "ephemeral"}
+        # The caller's tool schemas are not modified
+        assert all("cache_control" not in t for t in tools)
+
+    def test_rolling_history_breakpoints(self, provider):
+        """Test the two latest user turns are marked, nothing else."""
+        from opencode.llm.base import ToolCall, ToolResult as LLMToolResult
+
+        rounds = [
+            {
+                "content": "",
+                "tool_calls": [ToolCall(id=f"t{i}", name="read", arguments={})],
+                "results": [LLMToolResult(tool_id=f"t{i}", content=f"out {i}")],
+            }
+            for i in range(3)
+        ]
+        provider.continue_with_tool_results(
+            [Message(role="user", content="go")], rounds, tools=self.TOOLS, system="S"
+        )
+        messages = provider.client.messages.requests[0]["messages"]
+
+        marked = [
+            i for i, msg in enumerate(messages)
+            if isinstance(msg["content"], list) and "cache_control" in msg["content"][-1]
+        ]
+        assert marked == [len(messages) - 3, len(messages) - 1]
+        assert messages[0]["content"] == "go"
+        # 1 tools + 1 system + 2 history stays within the API's limit of 4
+        breakpoints = sum(
+            1 for msg in messages for block in msg["content"]
+            if isinstance(block, dict) and "cache_control" in block
+        )
+        assert breakpoints == 2
+        # Round inputs are left untouched
+        assert "cache_control" not in rounds[-1]["results"][0].__dict__
+
+    def test_string_user_message_converted(self, provider):
+        """Test a plain-text user turn becomes a marked text block."""
+        provider.chat([Message(role="user", content="hello")])
+        messages = provider.client.messages.requests[0]["messages"]
+
+        assert messages == [{
+            "role": "user",
+            "content": [{"type": "text", "text": "hello", "cache_control": {"type": "ephemeral"}}],
+        }]
+
+    def test_continuations_reuse_serialized_rounds(self, provider):
+        """Test a growing tool loop matches a from-scratch build without rebuilding."""
+        from opencode.llm.anthropic import AnthropicProvider
+        from opencode.llm.base import ToolCall, ToolResult as LLMToolResult
+
+        provider.prompt_caching = False
+        history = [Message(role="user", content="go")]
+        rounds = []
+        for i in range(4):
+            rounds.append({
+                "content": f"step {i}",
+                "tool_calls": [ToolCall(id=f"t{i}", name="read", arguments={"n": i})],
+                "results": [LLMToolResult(tool_id=f"t{i}", content=f"out {i}")],
+            })
+            provider.continue_with_tool_results(history, rounds)
+
+        fresh = AnthropicProvider(api_key="test-key")
+        assert provider.client.messages.requests[-1]["messages"] == fresh._conversation.build(history, rounds)
+        assert provider._conversation.rebuilds == 0
+
+    def test_cache_usage_reported(self, provider):
+        """Test cache read/write token counts are surfaced on the response."""
+        response = provider.chat([Message(role="user", content="hi")])
+
+        assert response.content == "done"
+        assert response.cache_read_tokens == 2048
+        assert response.cache_write_tokens == 300
+
+    def test_caching_disabled(self, provider):
+        """Test no breakpoints are sent when prompt caching is off."""
+        provider.prompt_caching = False
+        provider.chat([Message(role="user", content="hi")], tools=self.TOOLS, system="S")
+        kwargs = provider.client.messages.requests[0]
+
+        assert kwargs["system"] == "S"
+        assert kwargs["tools"] == self.TOOLS
+        assert kwargs["messages"] == [{"role": "user", "content": "hi"}]
+
+
 class TestOpenAIProviderUnit:
     """Unit tests for OpenAI/Custom provider (without API calls)."""
 
@@ -599,3 +813,529 @@ class TestOpenAIProviderUnit:
             assert provider3.ssl_verify is True
         except ImportError:
             pytest.skip("openai library not installed")
+
+    def test_continuation_wire_format(self):
+        """Test tool rounds are sent after the system prompt and history."""
+        pytest.importorskip("openai")
+        from types import SimpleNamespace
+        from opencode.llm.openai import OpenAIProvider
+
+        requests = []
+
+        def create(**kwargs):
+            requests.append(kwargs)
+            raise RuntimeError("offline")
+
+        provider = OpenAIProvider(api_key="test-key", model="gpt-4")
+        provider._client = SimpleNamespace(
+            chat=SimpleNamespace(completions=SimpleNamespace(create=create))
+        )
+        history = [Message(role="user", content="go")]
+        rounds = []
+        for i in range(2):
+            rounds.append({
+                "content": "",
+                "tool_calls": [ToolCall(id=f"c{i}", name="read", arguments={"path": "a.py"})],
+                "results": [ToolResult(tool_id=f"c{i}", content=f"out {i}")],
+            })
+            provider.continue_with_tool_results(history, rounds, system="S")
+
+        messages = requests[-1]["messages"]
+        assert [m["role"] for m in messages] == ["system", "user", "assistant", "tool", "assistant", "tool"]
+        assert messages[4]["tool_calls"][0]["function"]["arguments"] == '{"path": "a.py"}'
+        assert messages[5] == {"role": "tool", "tool_call_id": "c1", "content": "out 1"}
+        assert provider._conversation.rebuilds == 0
+
+
+# ============================================================================
+# Async API Tests
+# ============================================================================
+
+class _AsyncEvents:
+    """Async iterable/context manager standing in for an SDK stream."""
+
+    def __init__(self, events, final=None):
+        self.events = events
+        self.final = final
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for event in self.events:
+            yield event
+
+    async def get_final_message(self):
+        return self.final
+
+
+async def _on_loop_client(provider, client, method, *args):
+    """Call an async provider method with a fake client for the running loop."""
+    import asyncio
+    provider._async_clients[asyncio.get_running_loop()] = client
+    return await getattr(provider, method)(*args)
+
+
+class TestAsyncProviders:
+    """Tests for achat & co. and cancellable calls."""
+
+    def test_base_fallback_runs_sync_method(self):
+        """Test providers without an async client still offer the async API."""
+        import asyncio
+        provider = MockLLMProvider()
+        provider.add_response("hello")
+
+        response = asyncio.run(provider.achat([Message(role="user", content="hi")]))
+
+        assert response.content == "hello"
+        assert provider.native_async is False
+
+    def test_anthropic_achat(self):
+        """Test achat sends the same request as chat on the async client."""
+        pytest.importorskip("anthropic")
+        import asyncio
+        from types import SimpleNamespace
+        from opencode.llm.anthropic import AnthropicProvider
+
+        requests = []
+
+        async def create(**kwargs):
+            requests.append(kwargs)
+            return SimpleNamespace(
+                content=[SimpleNamespace(type="text", text="async done")],
+                stop_reason="end_turn",
+                usage=SimpleNamespace(cache_read_input_tokens=10, cache_creation_input_tokens=0),
+            )
+
+        provider = AnthropicProvider(api_key="test-key")
+        client = SimpleNamespace(messages=SimpleNamespace(create=create))
+        response = asyncio.run(_on_loop_client(
+            provider, client, "achat", [Message(role="user", content="hi")], None, "S"))
+
+        assert response.content == "async done"
+        assert response.cache_read_tokens == 10
+        assert requests[0]["system"][0]["text"] == "S"
+
+    def test_anthropic_achat_stream(self, capsys):
+        """Test the async stream prints text and reports tool calls like the sync one."""
+        pytest.importorskip("anthropic")
+        import asyncio
+        from types import SimpleNamespace
+        from opencode.llm.anthropic import AnthropicProvider
+
+        events = [
+            SimpleNamespace(type="content_block_start", content_block=SimpleNamespace(type="text")),
+            SimpleNamespace(type="content_block_delta", delta=SimpleNamespace(text="Looking")),
+            SimpleNamespace(type="content_block_stop"),
+            SimpleNamespace(type="content_block_start", content_block=SimpleNamespace(
+                type="tool_use", id="t1", name="read")),
+            SimpleNamespace(type="content_block_delta", delta=SimpleNamespace(partial_json='{"path": "a.py"}')),
+            SimpleNamespace(type="content_block_stop"),
+        ]
+        final = SimpleNamespace(stop_reason="tool_use", usage=None)
+        provider = AnthropicProvider(api_key="test-key")
+        seen = []
+        provider.tool_call_listener = lambda tc, pos: seen.append((tc.id, pos))
+        client = SimpleNamespace(messages=SimpleNamespace(stream=lambda **kw: _AsyncEvents(events, final)))
+
+        response = asyncio.run(_on_loop_client(
+            provider, client, "achat_stream", [Message(role="user", content="hi")]))
+
+        assert response.content == "Looking"
+        assert response.tool_calls[0].arguments == {"path": "a.py"}
+        assert response.stop_reason == "tool_use"
+        assert seen == [("t1", 0)]
+        assert "Looking" in capsys.readouterr().out
+
+    def test_openai_acontinue_stream(self):
+        """Test the OpenAI async stream assembles tool call fragments."""
+        pytest.importorskip("openai")
+        import asyncio
+        from types import SimpleNamespace
+        from opencode.llm.openai import OpenAIProvider
+
+        def chunk(**delta):
+            fields = {"content": None, "tool_calls": None, **delta}
+            return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(**fields))])
+
+        def fragment(call_id, name, arguments):
+            return SimpleNamespace(index=0, id=call_id,
+                                   function=SimpleNamespace(name=name, arguments=arguments))
+
+        chunks = [
+            chunk(tool_calls=[fragment("c1", "grep", '{"pat')]),
+            chunk(tool_calls=[fragment(None, None, 'tern": "x"}')]),
+        ]
+        requests = []
+
+        async def create(**kwargs):
+            requests.append(kwargs)
+            return _AsyncEvents(chunks)
+
+        provider = OpenAIProvider(api_key="test-key")
+        client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+        response = asyncio.run(_on_loop_client(
+            provider, client, "acontinue_with_tool_results_stream",
+            [Message(role="user", content="hi")], [], None, "S"))
+
+        assert response.tool_calls[0].name == "grep"
+        assert response.tool_calls[0].arguments == {"pattern": "x"}
+        assert requests[0]["stream"] is True
+        assert requests[0]["messages"][0] == {"role": "system", "content": "S"}
+
+    def test_ctrl_c_cancels_request(self):
+        """Test Ctrl+C while waiting cancels the coroutine instead of abandoning it."""
+        import asyncio
+        import signal
+        import time
+        from opencode.llm.aio import run_cancellable
+
+        cancelled = []
+
+        async def slow_request():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+
+        def interrupt(signum, frame):
+            raise KeyboardInterrupt
+
+        previous = signal.signal(signal.SIGALRM, interrupt)
+        try:
+            signal.setitimer(signal.ITIMER_REAL, 0.2)
+            start = time.perf_counter()
+            with pytest.raises(KeyboardInterrupt):
+                run_cancellable(slow_request)
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+
+        assert cancelled == [True]
+        assert time.perf_counter() - start < 3
+
+    def test_cancellable_call_uses_async_version(self):
+        """Test CancellableLLMCall picks the async method only for native providers."""
+        pytest.importorskip("anthropic")
+        from opencode.cli import CancellableLLMCall
+        from opencode.llm.anthropic import AnthropicProvider
+
+        provider = AnthropicProvider(api_key="test-key")
+        mock = MockLLMProvider()
+
+        assert CancellableLLMCall._async_version(provider.chat_stream) == provider.achat_stream
+        assert CancellableLLMCall._async_version(mock.chat) is None
+        assert CancellableLLMCall._async_version(len) is None
+
+
+# ============================================================================
+# Retry and Circuit Breaker Tests
+# ============================================================================
+
+class _Flaky:
+    """Callable failing with the given exceptions before returning "ok"."""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def __call__(self, *args, **kwargs):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+
+
+def _no_wait_provider() -> MockLLMProvider:
+    provider = MockLLMProvider()
+    provider.retry_delay = 0
+    return provider
+
+
+class TestBackoff:
+    """Tests for backoff timing."""
+
+    def test_delay_jittered_and_capped(self):
+        """Test waits are random, grow with the attempt and stay under the cap."""
+        from opencode.llm.resilience import backoff_delay
+
+        first = [backoff_delay(0, 1.0) for _ in range(50)]
+        late = [backoff_delay(10, 1.0, max_delay=5.0) for _ in range(50)]
+
+        assert all(0 <= d <= 1.0 for d in first)
+        assert len(set(first)) > 1
+        assert all(0 <= d <= 5.0 for d in late)
+
+    def test_retry_after_is_minimum(self):
+        """Test the server's retry-after wins over a shorter backoff."""
+        from opencode.llm.resilience import backoff_delay
+        assert backoff_delay(0, 0.1, retry_after=7) == 7
+
+    def test_retry_after_headers(self):
+        """Test retry-after headers in seconds and milliseconds are read."""
+        from types import SimpleNamespace
+        from opencode.llm.resilience import retry_after_seconds
+
+        assert retry_after_seconds(SimpleNamespace(headers={"retry-after": "3"})) == 3
+        assert retry_after_seconds(SimpleNamespace(headers={"retry-after-ms": "1500"})) == 1.5
+        assert retry_after_seconds(SimpleNamespace(headers={"retry-after": "Wed, 21 Oct 2026 07:28:00 GMT"})) == 0
+        assert retry_after_seconds(None) == 0
+
+
+class TestCircuitBreaker:
+    """Tests for the per-provider circuit breaker."""
+
+    def test_opens_after_threshold(self):
+        """Test consecutive failures open the circuit."""
+        from opencode.llm.resilience import CircuitBreaker
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+
+        breaker.record_failure()
+        assert breaker.allow() is True
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        assert breaker.allow() is False
+        assert 0 < breaker.retry_in() <= 60
+
+    def test_half_open_allows_one_trial(self):
+        """Test after the timeout one request is let through, and success closes it."""
+        from opencode.llm.resilience import CircuitBreaker
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        breaker.record_failure()
+
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert breaker.allow() is True
+        assert breaker.allow() is False
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_failed_trial_reopens(self):
+        """Test a failing trial request opens the circuit again."""
+        from opencode.llm.resilience import CircuitBreaker
+        breaker = CircuitBreaker(failure_threshold=5, reset_timeout=0)
+        for _ in range(5):
+            breaker.record_failure()
+        assert breaker.allow() is True
+
+        breaker.reset_timeout = 60
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+
+    def test_released_trial_lets_next_request_through(self):
+        """Test a trial given back without an outcome frees the slot."""
+        from opencode.llm.resilience import CircuitBreaker
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        breaker.record_failure()
+
+        assert breaker.admit() is True
+        assert breaker.admit() is None
+        breaker.release()
+        assert breaker.admit() is True
+
+
+class TestRetryWithBackoff:
+    """Tests for LLMProvider._retry_with_backoff."""
+
+    def test_transient_errors_retried(self):
+        """Test rate limits, overload and dropped connections are retried."""
+        from opencode.llm.base import ServerError
+        provider = _no_wait_provider()
+        func = _Flaky(RateLimitError("test"), ServerError("test"), ConnectionResetError("reset"))
+
+        assert provider._retry_with_backoff(func) == "ok"
+        assert func.calls == 4
+
+    def test_gives_up_after_max_retries(self):
+        """Test the last error is raised once retries run out."""
+        provider = _no_wait_provider()
+        provider.max_retries = 2
+        func = _Flaky(*[RateLimitError("test")] * 5)
+
+        with pytest.raises(RateLimitError):
+            provider._retry_with_backoff(func)
+        assert func.calls == 3
+
+    def test_permanent_errors_not_retried(self):
+        """Test errors like a bad API key fail on the first attempt."""
+        provider = _no_wait_provider()
+        func = _Flaky(APIKeyError("test"))
+
+        with pytest.raises(APIKeyError):
+            provider._retry_with_backoff(func)
+        assert func.calls == 1
+
+    def test_waits_honor_retry_after(self, monkeypatch):
+        """Test the wait before a retry is at least the server's retry-after."""
+        import opencode.llm.base as base
+        waits = []
+        monkeypatch.setattr(base.time, "sleep", waits.append)
+        provider = _no_wait_provider()
+
+        provider._retry_with_backoff(_Flaky(RateLimitError("test", retry_after=4)))
+        assert waits == [4]
+
+    def test_open_circuit_fails_fast(self):
+        """Test a provider that keeps failing stops sending requests."""
+        from opencode.llm.base import CircuitOpenError
+        provider = _no_wait_provider()
+        provider.max_retries = 0
+        for _ in range(provider.circuit.failure_threshold):
+            with pytest.raises(ConnectionError):
+                provider._retry_with_backoff(_Flaky(ConnectionError("test")))
+
+        func = _Flaky()
+        with pytest.raises(CircuitOpenError):
+            provider._retry_with_backoff(func)
+        assert func.calls == 0
+
+    def test_async_retry(self):
+        """Test the async loop retries like the sync one."""
+        import asyncio
+        provider = _no_wait_provider()
+        func = _Flaky(RateLimitError("test"))
+
+        async def call():
+            return func()
+
+        assert asyncio.run(provider._aretry_with_backoff(call)) == "ok"
+        assert func.calls == 2
+
+    def test_cancelled_trial_releases_circuit(self):
+        """Test cancelling the half-open trial doesn't leave the circuit stuck."""
+        import asyncio
+        provider = _no_wait_provider()
+        provider.circuit.reset_timeout = 0
+        for _ in range(provider.circuit.failure_threshold):
+            provider.circuit.record_failure()
+
+        async def hang():
+            await asyncio.sleep(10)
+
+        async def cancel_trial():
+            task = asyncio.create_task(provider._aretry_with_backoff(hang))
+            await asyncio.sleep(0)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(cancel_trial())
+        func = _Flaky()
+        assert provider._retry_with_backoff(func) == "ok"
+        assert func.calls == 1
+
+    def test_interrupted_trial_releases_circuit(self):
+        """Test Ctrl+C during the half-open trial doesn't leave the circuit stuck."""
+        provider = _no_wait_provider()
+        provider.circuit.reset_timeout = 0
+        for _ in range(provider.circuit.failure_threshold):
+            provider.circuit.record_failure()
+
+        with pytest.raises(KeyboardInterrupt):
+            provider._retry_with_backoff(_Flaky(KeyboardInterrupt()))
+        assert provider.circuit.allow() is True
+
+
+class _DroppingStream:
+    """Anthropic stream that drops the connection after some text on its first use."""
+
+    def __init__(self, attempts, requests, kwargs):
+        self.attempts = attempts
+        self.requests = requests
+        requests.append(kwargs)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __iter__(self):
+        from types import SimpleNamespace
+        self.attempts.append(True)
+        if len(self.attempts) == 1:
+            yield SimpleNamespace(type="content_block_delta", delta=SimpleNamespace(text="Hello "))
+            raise ConnectionResetError("connection reset by peer")
+        yield SimpleNamespace(type="content_block_delta", delta=SimpleNamespace(text="world"))
+
+    def get_final_message(self):
+        from types import SimpleNamespace
+        return SimpleNamespace(stop_reason="end_turn", usage=None)
+
+
+class TestProviderRetries:
+    """Tests for retries inside the provider call paths."""
+
+    def test_anthropic_retries_dropped_request(self):
+        """Test a connection error is retried instead of returned as the answer."""
+        pytest.importorskip("anthropic")
+        from types import SimpleNamespace
+        from opencode.llm.anthropic import AnthropicProvider
+
+        create = _Flaky(ConnectionResetError("reset"))
+        provider = AnthropicProvider(api_key="test-key")
+        provider.retry_delay = 0
+        provider._client = SimpleNamespace(messages=SimpleNamespace(
+            create=lambda **kw: create() and SimpleNamespace(
+                content=[SimpleNamespace(type="text", text="fine")], stop_reason="end_turn", usage=None)))
+
+        response = provider.chat([Message(role="user", content="hi")])
+
+        assert response.content == "fine"
+        assert create.calls == 2
+
+    def test_anthropic_stream_resumes_after_drop(self, capsys):
+        """Test a dropped stream continues from the text already received."""
+        pytest.importorskip("anthropic")
+        from types import SimpleNamespace
+        from opencode.llm.anthropic import AnthropicProvider
+
+        attempts, requests = [], []
+        provider = AnthropicProvider(api_key="test-key", prompt_caching=False)
+        provider.retry_delay = 0
+        provider._client = SimpleNamespace(messages=SimpleNamespace(
+            stream=lambda **kw: _DroppingStream(attempts, requests, kw)))
+
+        response = provider.chat_stream([Message(role="user", content="hi")])
+
+        assert response.content == "Hello world"
+        assert requests[1]["messages"][-1] == {"role": "assistant", "content": "Hello"}
+        assert len(requests[0]["messages"]) == 1  # The first request was not modified
+        assert "Hello world" in capsys.readouterr().out
+
+    def test_error_response_after_retries(self):
+        """Test exhausted retries still end in an error response, marked as such."""
+        pytest.importorskip("openai")
+        from types import SimpleNamespace
+        from opencode.llm.openai import OpenAIProvider
+
+        def create(**kwargs):
+            raise ConnectionResetError("reset")
+
+        provider = OpenAIProvider(api_key="test-key")
+        provider.retry_delay = 0
+        provider.max_retries = 1
+        provider._client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+        response = provider.chat([Message(role="user", content="hi")])
+
+        assert response.stop_reason == "error"
+        assert "Connection failed" in response.content
+
+    def test_cli_keeps_errors_out_of_history(self, capsys):
+        """Test a failed request is printed as an error and not treated as an answer."""
+        from unittest.mock import MagicMock
+        from opencode.cli import OpenCodeREPL
+
+        repl = MagicMock(spec=OpenCodeREPL)
+        report = OpenCodeREPL._report_llm_error.__get__(repl)
+
+        assert report(LLMResponse(content="[Error] boom", stop_reason="error")) is True
+        assert report(LLMResponse(content="answer")) is False
+        assert "boom" in capsys.readouterr().out
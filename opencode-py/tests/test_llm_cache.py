@@ -0,0 +1,207 @@
+"""Tests for the LLM response cache (record/replay)."""
+
+import asyncio
+import json
+import time
+
+import pytest
+
+from opencode.llm.base import (
+    LLMResponse,
+    Message,
+    MockLLMProvider,
+    ToolCall,
+    ToolResult,
+)
+from opencode.llm.cache import (
+    MODE_RECORD,
+    MODE_REPLAY,
+    CachingProvider,
+    request_key,
+)
+
+
+class CountingProvider(MockLLMProvider):
+    """Mock provider that counts requests and answers with a tool call."""
+
+    def __init__(self):
+        super().__init__()
+        self.model = "test-model"
+        self.requests = 0
+
+    def chat(self, messages, tools=None, system=None):
+        self.requests += 1
+        return LLMResponse(
+            content=f"answer {self.requests}",
+            tool_calls=[ToolCall(id=f"call_{self.requests}", name="read", arguments={"path": "a.py"})],
+        )
+
+    def continue_with_tool_results(self, messages, tool_rounds, tools=None, system=None):
+        self.requests += 1
+        return LLMResponse(content=f"done {self.requests}")
+
+
+MESSAGES = [Message(role="user", content="read a.py")]
+TOOLS = [{"name": "read", "description": "Read a file", "input_schema": {"type": "object"}}]
+
+
+def _rounds(response: LLMResponse) -> list[dict]:
+    return [{
+        "content": response.content,
+        "tool_calls": response.tool_calls,
+        "results": [ToolResult(tool_id=response.tool_calls[0].id, content="print('a')")],
+    }]
+
+
+# =============================================================================
+# Keys
+# =============================================================================
+
+class TestRequestKey:
+    """Tests for hashing requests."""
+
+    def test_identical_requests_same_key(self):
+        """Test equal requests built from fresh objects hash the same."""
+        first = request_key("m", [Message(role="user", content="hi")], tools=TOOLS, system="s")
+        second = request_key("m", [Message(role="user", content="hi")], tools=list(TOOLS), system="s")
+        assert first == second
+
+    @pytest.mark.parametrize("change", [
+        {"model": "other"},
+        {"system": "other"},
+        {"tools": []},
+        {"messages": [Message(role="user", content="bye")]},
+        {"tool_rounds": []},
+    ])
+    def test_any_part_changes_key(self, change):
+        """Test model, system prompt, tools, messages and tool rounds all count."""
+        request = {"model": "m", "messages": MESSAGES, "tools": TOOLS, "system": "s"}
+        assert request_key(**request) != request_key(**{**request, **change})
+
+
+# =============================================================================
+# Record and replay
+# =============================================================================
+
+class TestRecord:
+    """Tests for record mode."""
+
+    def test_repeat_served_from_cache(self, tmp_path):
+        """Test an identical request is answered without calling the provider."""
+        provider = CountingProvider()
+        cache = CachingProvider(provider, tmp_path)
+
+        first = cache.chat(MESSAGES, TOOLS, "system")
+        second = cache.chat(MESSAGES, TOOLS, "system")
+
+        assert provider.requests == 1
+        assert second.content == first.content
+        assert second.tool_calls == first.tool_calls
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_stored_under_llm_cache_dir(self, tmp_path):
+        """Test entries are JSON files named by their key."""
+        cache = CachingProvider(CountingProvider(), tmp_path)
+        cache.chat(MESSAGES)
+
+        [entry] = tmp_path.glob("*/*.json")
+        assert entry.stem == request_key("test-model", MESSAGES)
+        assert json.loads(entry.read_text())["response"]["content"] == "answer 1"
+
+    def test_expired_entry_requested_again(self, tmp_path):
+        """Test entries older than the TTL are refreshed."""
+        provider = CountingProvider()
+        cache = CachingProvider(provider, tmp_path, ttl=60)
+        cache.chat(MESSAGES)
+
+        [entry] = tmp_path.glob("*/*.json")
+        data = json.loads(entry.read_text())
+        data["created"] = time.time() - 120
+        entry.write_text(json.dumps(data))
+
+        assert cache.chat(MESSAGES).content == "answer 2"
+        assert provider.requests == 2
+
+    def test_errors_not_stored(self, tmp_path):
+        """Test failed requests are retried next time rather than replayed."""
+        provider = CountingProvider()
+        provider.chat = lambda *args: LLMResponse(content="[Error] down", stop_reason="error")
+        CachingProvider(provider, tmp_path).chat(MESSAGES)
+
+        assert list(tmp_path.glob("*/*.json")) == []
+
+    def test_stream_hit_prints_content(self, tmp_path, capsys):
+        """Test a cached answer to a streaming call is shown like a stream."""
+        cache = CachingProvider(CountingProvider(), tmp_path)
+        cache.chat_stream(MESSAGES)
+        capsys.readouterr()
+
+        cache.chat_stream(MESSAGES)
+
+        assert capsys.readouterr().out == "answer 1\n"
+
+    def test_stream_hit_reports_tool_calls(self, tmp_path):
+        """Test cached tool calls reach the tool call listener (speculation)."""
+        cache = CachingProvider(CountingProvider(), tmp_path)
+        cache.chat(MESSAGES)
+        seen = []
+        cache.tool_call_listener = lambda call, position: seen.append((call.id, position))
+
+        cache.chat_stream(MESSAGES)
+
+        assert seen == [("call_1", 0)]
+
+    def test_async(self, tmp_path):
+        """Test the async API uses the same entries."""
+        provider = CountingProvider()
+        cache = CachingProvider(provider, tmp_path)
+        cache.chat(MESSAGES)
+
+        assert asyncio.run(cache.achat(MESSAGES)).content == "answer 1"
+        assert provider.requests == 1
+
+
+class TestReplay:
+    """Tests for replay mode."""
+
+    def test_tool_loop_replays_offline(self, tmp_path):
+        """Test a recorded chat and its continuation replay without a provider."""
+        recorder = CachingProvider(CountingProvider(), tmp_path)
+        response = recorder.chat(MESSAGES, TOOLS)
+        recorder.continue_with_tool_results(MESSAGES, _rounds(response), TOOLS)
+
+        replay = CachingProvider(None, tmp_path, mode=MODE_REPLAY, model="test-model")
+        response = replay.chat(MESSAGES, TOOLS)
+        final = replay.continue_with_tool_results(MESSAGES, _rounds(response), TOOLS)
+
+        assert response.tool_calls[0].id == "call_1"
+        assert final.content == "done 2"
+
+    def test_miss_is_an_error(self, tmp_path):
+        """Test an unrecorded request fails instead of going to the network."""
+        provider = CountingProvider()
+        response = CachingProvider(provider, tmp_path, mode=MODE_REPLAY).chat(MESSAGES)
+
+        assert response.stop_reason == "error"
+        assert provider.requests == 0
+
+    def test_replay_ignores_ttl(self, tmp_path):
+        """Test recorded fixtures don't expire in replay mode."""
+        CachingProvider(CountingProvider(), tmp_path).chat(MESSAGES)
+        [entry] = tmp_path.glob("*/*.json")
+        data = json.loads(entry.read_text())
+        data["created"] = 0
+        entry.write_text(json.dumps(data))
+
+        replay = CachingProvider(CountingProvider(), tmp_path, mode=MODE_REPLAY, ttl=60)
+        assert replay.chat(MESSAGES).content == "answer 1"
+
+    def test_available_without_provider(self, tmp_path):
+        """Test replay works with no API key configured."""
+        assert CachingProvider(None, tmp_path, mode=MODE_REPLAY).is_available()
+        assert not CachingProvider(None, tmp_path, mode=MODE_RECORD).is_available()
+
+    def test_unknown_mode(self, tmp_path):
+        """Test a misspelled mode is rejected."""
+        with pytest.raises(ValueError):
+            CachingProvider(CountingProvider(), tmp_path, mode="replya")
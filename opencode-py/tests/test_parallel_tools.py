@@ -0,0 +1,348 @@
+"""Tests for running read-only tool calls concurrently and speculatively."""
+
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from opencode.config import Config
+from opencode.llm.base import LLMResponse, Message, MockLLMProvider, ToolCall
+from opencode.mode import ModeManager, Mode
+from opencode.speculation import ToolSpeculator
+from opencode.tools.base import Tool, ToolResult
+from opencode.tools.profile_data import ProfileDataTool
+from opencode.tools.read import ReadTool
+from opencode.tools.registry import ToolRegistry
+
+
+class SlowReadTool(Tool):
+    """Read-only tool that takes a while and logs when it runs."""
+
+    name = "slow_read"
+    description = "Sleeps, then echoes"
+    requires_build_mode = False
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.log = []
+        self.lock = threading.Lock()
+
+    def execute(self, value: str, delay: float = 0.2) -> ToolResult:
+        with self.lock:
+            self.log.append(("start", value))
+        time.sleep(delay)
+        with self.lock:
+            self.log.append(("end", value))
+        if value == "boom":
+            raise RuntimeError("tool crashed")
+        return ToolResult.ok(value)
+
+    def get_schema(self) -> dict:
+        return {"properties": {}, "required": []}
+
+
+class MutatingTool(Tool):
+    """Tool that needs BUILD mode; writes into the read tool's log."""
+
+    name = "mutate"
+    description = "Logs a mutation"
+    requires_build_mode = True
+    log = None
+
+    def execute(self, value: str) -> ToolResult:
+        self.log.append(("mutate", value))
+        return ToolResult.ok(value)
+
+    def get_schema(self) -> dict:
+        return {"properties": {}, "required": []}
+
+
+def _registry(**config) -> ToolRegistry:
+    registry = ToolRegistry(
+        mode_manager=ModeManager(initial_mode=Mode.BUILD),
+        config=Config(**config),
+    )
+    reader = registry.register(SlowReadTool)
+    registry.register(MutatingTool).log = reader.log
+    return registry
+
+
+def _repl(registry: ToolRegistry):
+    """A REPL stand-in with the real tool-call methods bound to it."""
+    from opencode.cli import OpenCodeREPL
+
+    repl = MagicMock(spec=OpenCodeREPL)
+    repl.registry = registry
+    repl.config = Config()
+    repl.permission_gate = MagicMock()
+    repl.speculator = None
+    repl._execute_tool_call = OpenCodeREPL._execute_tool_call.__get__(repl)
+    repl._execute_tool_calls_with_results = OpenCodeREPL._execute_tool_calls_with_results.__get__(repl)
+    return repl
+
+
+def _calls(*specs) -> LLMResponse:
+    return LLMResponse(content="", tool_calls=[
+        ToolCall(id=f"call_{i}", name=name, arguments={"value": value})
+        for i, (name, value) in enumerate(specs)
+    ])
+
+
+def _call(call_id: str, name: str, value: str, **extra) -> ToolCall:
+    return ToolCall(id=call_id, name=name, arguments={"value": value, **extra})
+
+
+# ============================================================================
+# ToolRegistry.submit Tests
+# ============================================================================
+
+class TestRegistrySubmit:
+    """Tests for starting several tool calls at once."""
+
+    def test_calls_overlap(self):
+        """Test independent calls run at the same time."""
+        registry = _registry()
+        start = time.perf_counter()
+        futures = registry.submit([("slow_read", {"value": str(i)}) for i in range(4)])
+        outputs = [f.result().output for f in futures]
+        elapsed = time.perf_counter() - start
+
+        assert outputs == ["0", "1", "2", "3"]
+        assert elapsed < 0.6  # Four 0.2s calls in sequence would take 0.8s
+
+    def test_single_worker_runs_serially(self):
+        """Test tool_workers=1 turns concurrency off."""
+        registry = _registry(tool_workers=1)
+        futures = registry.submit([("slow_read", {"value": "a", "delay": 0}),
+                                   ("slow_read", {"value": "b", "delay": 0})])
+
+        assert all(f.done() for f in futures)
+        log = registry.get("slow_read").log
+        assert log == [("start", "a"), ("end", "a"), ("start", "b"), ("end", "b")]
+
+    def test_exceptions_surface_from_result(self):
+        """Test a failing call raises from its own future only."""
+        registry = _registry()
+        futures = registry.submit([("slow_read", {"value": "boom", "delay": 0}),
+                                   ("missing", {}),
+                                   ("slow_read", {"value": "ok", "delay": 0})])
+
+        assert isinstance(futures[0].exception(), RuntimeError)
+        assert isinstance(futures[1].exception(), KeyError)
+        assert futures[2].result().output == "ok"
+
+    def test_is_read_only(self):
+        """Test only known tools without BUILD mode count as read-only."""
+        registry = _registry()
+        assert registry.is_read_only("slow_read") is True
+        assert registry.is_read_only("mutate") is False
+        assert registry.is_read_only("missing") is False
+
+
+# ============================================================================
+# Tool call scheduling Tests
+# ============================================================================
+
+class TestToolCallScheduling:
+    """Tests for _execute_tool_calls_with_results ordering."""
+
+    def test_results_in_call_order(self, capsys):
+        """Test results and printed output follow call order, not finish order."""
+        registry = _registry()
+        response = LLMResponse(content="", tool_calls=[
+            ToolCall(id="a", name="slow_read", arguments={"value": "first", "delay": 0.3}),
+            ToolCall(id="b", name="slow_read", arguments={"value": "second", "delay": 0.0}),
+        ])
+        results = _repl(registry)._execute_tool_calls_with_results(response)
+
+        assert [(r.tool_id, r.content) for r in results] == [("a", "first"), ("b", "second")]
+        out = capsys.readouterr().out
+        assert out.index("first") < out.index("second")
+
+    def test_file_reads_printed_in_call_order(self, tmp_path, capsys):
+        """Test concurrent reads print nothing from workers, only the loop's ordered output."""
+        (tmp_path / "big.txt").write_text("".join(f"big {i}\n" for i in range(50_000)))
+        (tmp_path / "small.txt").write_text("small\n")
+        (tmp_path / "data.csv").write_text("a,b\n1,2\n")
+        registry = _registry()
+        registry.register(ReadTool)
+        registry.register(ProfileDataTool)
+        response = LLMResponse(content="", tool_calls=[
+            ToolCall(id="a", name="read", arguments={"path": str(tmp_path / "big.txt"), "full": True}),
+            ToolCall(id="b", name="read", arguments={"path": str(tmp_path / "small.txt")}),
+            ToolCall(id="c", name="profile_data", arguments={"path": str(tmp_path / "data.csv")}),
+        ])
+
+        _repl(registry)._execute_tool_calls_with_results(response)
+
+        out = capsys.readouterr().out
+        assert out.index("big.txt") < out.index("small.txt") < out.index("data.csv")
+        assert out.count("Reading") == 2
+
+    def test_mutating_call_is_a_barrier(self):
+        """Test reads before a mutation finish before it, reads after start after it."""
+        registry = _registry()
+        response = _calls(
+            ("slow_read", "r1"), ("slow_read", "r2"), ("mutate", "w"), ("slow_read", "r3"),
+        )
+        results = _repl(registry)._execute_tool_calls_with_results(response)
+
+        log = registry.get("slow_read").log
+        mutation = log.index(("mutate", "w"))
+        assert log.index(("end", "r1")) < mutation
+        assert log.index(("end", "r2")) < mutation
+        assert log.index(("start", "r3")) > mutation
+        assert [r.tool_id for r in results] == ["call_0", "call_1", "call_2", "call_3"]
+
+    def test_failures_reported_per_call(self):
+        """Test a crashing or unknown tool in a batch doesn't affect the others."""
+        registry = _registry()
+        response = _calls(("slow_read", "boom"), ("unknown_tool", "x"), ("slow_read", "fine"))
+        results = _repl(registry)._execute_tool_calls_with_results(response)
+
+        assert results[0].is_error and "tool crashed" in results[0].content
+        assert results[1].is_error and "Unknown tool" in results[1].content
+        assert not results[2].is_error and results[2].content == "fine"
+
+
+# ============================================================================
+# ToolSpeculator Tests
+# ============================================================================
+
+class TestToolSpeculator:
+    """Tests for which calls are started early and how they are claimed."""
+
+    def test_read_only_call_started_and_claimed(self):
+        """Test a read-only call runs in the background and is handed over once."""
+        registry = _registry()
+        speculator = ToolSpeculator(registry)
+        call = _call("a", "slow_read", "x", delay=0)
+
+        speculator.on_tool_call(call, 0)
+        future = speculator.claim(call)
+
+        assert future.result().output == "x"
+        assert speculator.claim(call) is None
+        assert (speculator.started, speculator.claimed) == (1, 1)
+
+    def test_calls_after_mutation_not_started(self):
+        """Test nothing after a BUILD-mode call starts early, until the next response."""
+        registry = _registry()
+        speculator = ToolSpeculator(registry)
+
+        speculator.on_tool_call(_call("a", "slow_read", "r1", delay=0), 0)
+        speculator.on_tool_call(_call("b", "mutate", "w"), 1)
+        speculator.on_tool_call(_call("c", "slow_read", "r2", delay=0), 2)
+        assert speculator.started == 1
+
+        speculator.on_tool_call(_call("d", "slow_read", "r3", delay=0), 0)
+        assert speculator.started == 2
+        assert registry.get("slow_read").log.count(("start", "r2")) == 0
+
+    def test_started_read_prints_nothing(self, tmp_path, capsys):
+        """Test an early read leaves stdout to the streaming response until claimed."""
+        (tmp_path / "notes.txt").write_text("hello\n")
+        registry = _registry()
+        registry.register(ReadTool)
+        speculator = ToolSpeculator(registry)
+        call = ToolCall(id="a", name="read", arguments={"path": str(tmp_path / "notes.txt")})
+
+        speculator.on_tool_call(call, 0)
+        result = speculator.claim(call).result()
+
+        assert capsys.readouterr().out == ""
+        assert "notes.txt" in result.output
+
+    def test_changed_arguments_not_claimed(self):
+        """Test a call is only claimed with the exact arguments it was started with."""
+        speculator = ToolSpeculator(_registry())
+        speculator.on_tool_call(_call("a", "slow_read", "x", delay=0), 0)
+
+        assert speculator.claim(_call("a", "slow_read", "y", delay=0)) is None
+
+    def test_new_response_drops_unclaimed(self):
+        """Test calls from an earlier response are forgotten."""
+        speculator = ToolSpeculator(_registry())
+        old = _call("a", "slow_read", "x", delay=0)
+        speculator.on_tool_call(old, 0)
+        speculator.on_tool_call(_call("b", "slow_read", "y", delay=0), 0)
+
+        assert speculator.claim(old) is None
+
+
+# ============================================================================
+# Provider and tool loop integration
+# ============================================================================
+
+class _FakeStream:
+    """Stand-in for client.messages.stream() yielding two tool_use blocks."""
+
+    def __init__(self, seen_during_stream):
+        self.seen = seen_during_stream
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __iter__(self):
+        for i, value in enumerate(["one", "two"]):
+            yield SimpleNamespace(type="content_block_start", content_block=SimpleNamespace(
+                type="tool_use", id=f"t{i}", name="slow_read"))
+            yield SimpleNamespace(type="content_block_delta", delta=SimpleNamespace(
+                partial_json=f'{{"value": "{value}", "delay": 0}}'))
+            yield SimpleNamespace(type="content_block_stop")
+            time.sleep(0.05)  # Generation still in progress
+        self.seen.append(True)
+
+    def get_final_message(self):
+        return SimpleNamespace(stop_reason="tool_use", usage=None)
+
+
+class TestSpeculativeStreaming:
+    """Tests for tool calls reported by a streaming provider."""
+
+    def test_anthropic_stream_reports_each_call(self):
+        """Test the listener sees each call, with its position, before the stream ends."""
+        pytest.importorskip("anthropic")
+        from opencode.llm.anthropic import AnthropicProvider
+
+        stream_done = []
+        seen = []
+        provider = AnthropicProvider(api_key="test-key")
+        provider._client = SimpleNamespace(messages=SimpleNamespace(
+            stream=lambda **kwargs: _FakeStream(stream_done)))
+        provider.tool_call_listener = lambda tc, pos: seen.append((tc.id, pos, bool(stream_done)))
+
+        response = provider.chat_stream([Message(role="user", content="go")])
+
+        assert [tc.id for tc in response.tool_calls] == ["t0", "t1"]
+        assert seen == [("t0", 0, False), ("t1", 1, False)]
+
+    def test_listener_errors_ignored(self):
+        """Test a failing listener does not break the provider."""
+        provider = MockLLMProvider()
+
+        def broken(tool_call, position):
+            raise RuntimeError("listener failed")
+
+        provider.tool_call_listener = broken
+        provider._notify_tool_call(_call("a", "slow_read", "x"), 0)
+
+    def test_tool_loop_uses_started_calls(self):
+        """Test the tool loop collects early-started calls instead of running them again."""
+        registry = _registry()
+        repl = _repl(registry)
+        repl.speculator = ToolSpeculator(registry)
+        calls = [_call("a", "slow_read", "one", delay=0), _call("b", "slow_read", "two", delay=0)]
+        for position, call in enumerate(calls):
+            repl.speculator.on_tool_call(call, position)
+
+        results = repl._execute_tool_calls_with_results(LLMResponse(content="", tool_calls=calls))
+
+        assert [r.content for r in results] == ["one", "two"]
+        assert repl.speculator.claimed == 2
+        assert registry.get("slow_read").log.count(("start", "one")) == 1
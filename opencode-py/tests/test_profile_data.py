@@ -0,0 +1,210 @@
+"""Tests for the profile_data tool (column statistics of tabular files)."""
+
+import pytest
+
+from opencode.tools import profile_data
+from opencode.tools.profile_data import (
+    HAS_NUMPY,
+    DistinctSketch,
+    ProfileDataTool,
+    profile_rows,
+)
+from opencode.tools.registry import ToolRegistry
+
+
+ENGINES = [
+    pytest.param(False, id="python"),
+    pytest.param(True, id="numpy", marks=pytest.mark.skipif(not HAS_NUMPY, reason="numpy not installed")),
+]
+
+
+def _profile(table, engine, **kwargs):
+    """Profiles of a table given as a list of rows, by column name."""
+    profiles, rows = profile_rows(iter(table), use_numpy=engine, **kwargs)
+    return {p.name: p for p in profiles}, rows
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    """Chunks of a few rows, so tables span many chunks."""
+    monkeypatch.setattr(profile_data, "CHUNK_ROWS", 7)
+
+
+# =============================================================================
+# Column statistics
+# =============================================================================
+
+@pytest.mark.parametrize("engine", ENGINES)
+class TestColumnProfile:
+    """Tests for per-column statistics, with and without NumPy."""
+
+    @pytest.mark.parametrize("cells, expected", [
+        (["1", "2", "-3"], "integer"),
+        (["1", "2.5", "1e3"], "float"),
+        (["true", "False", "TRUE"], "boolean"),
+        (["2026-01-02", "2025-12-31 08:00"], "date"),
+        (["north", "south"], "string"),
+        (["1", "north"], "mixed"),
+        (["", "NA"], "empty"),
+    ])
+    def test_inferred_type(self, engine, cells, expected):
+        """Test the type covering every non-null value is reported."""
+        profiles, _ = _profile([["col"]] + [[c] for c in cells], engine)
+        assert profiles["col"].inferred_type == expected
+
+    def test_nulls_and_numbers(self, engine, small_chunks):
+        """Test null tokens, blanks and short rows count as nulls, across chunks."""
+        table = [["id", "amount"]] + [[str(i), str(i * 1.5)] for i in range(1, 21)]
+        table += [["21", ""], ["22", "NaN"], ["23", " null "], ["24"]]
+        profiles, rows = _profile(table, engine)
+        amount = profiles["amount"]
+
+        assert rows == 24
+        assert (amount.count, amount.nulls) == (20, 4)
+        assert (amount.minimum, amount.maximum) == (1.5, 30.0)
+        assert amount.number_sum / amount.number_count == pytest.approx(15.75)
+        assert profiles["id"].inferred_type == "integer"
+
+    def test_top_values_and_distinct(self, engine, small_chunks):
+        """Test the most common values and exact distinct counts."""
+        table = [["region"]] + [["north"]] * 12 + [["south"]] * 5 + [["east"]]
+        profiles, _ = _profile(table, engine)
+        region = profiles["region"]
+
+        assert region.distinct == 3
+        assert region.top_values() == [("north", 12), ("south", 5)]
+        assert region.lengths == (4, 5)
+
+    def test_numbers_counted_by_value(self, engine, small_chunks):
+        """Test differently written numbers are one value, in numeric and mixed chunks."""
+        numeric = ["007", "2", "2.0", "7", "2", "7.0", "1.50"]
+        with_text = ["7", "2", "x", "1.5", "2", "7", "007"]
+        profiles, _ = _profile([["v"]] + [[c] for c in numeric + with_text], engine)
+        column = profiles["v"]
+
+        assert column.distinct == 4
+        assert column.top_values() == [("7", 6), ("2", 5), ("1.5", 2)]
+
+    def test_distinct_estimated_past_limit(self, engine, small_chunks, monkeypatch):
+        """Test high-cardinality columns switch to a bounded estimate."""
+        monkeypatch.setattr(profile_data, "TRACKED_VALUES", 100)
+        table = [["key"]] + [[f"key-{i}"] for i in range(5000)]
+        profiles, _ = _profile(table, engine)
+        key = profiles["key"]
+
+        assert key.sketch is not None
+        assert len(key.values) <= 100
+        assert key.distinct == pytest.approx(5000, rel=0.1)
+        assert key.top_values() == []
+
+    def test_dates_range(self, engine):
+        """Test date columns report their earliest and latest value."""
+        table = [["when"], ["2026-03-01"], ["2025-01-15"], ["2026-10-18"]]
+        profiles, _ = _profile(table, engine)
+        assert profiles["when"].dates == ("2025-01-15", "2026-10-18")
+
+    def test_columns_and_max_rows(self, engine):
+        """Test profiling a column subset of the first rows."""
+        table = [["a", "b", "c"]] + [[str(i), str(i), str(i)] for i in range(100)]
+        profiles, rows = _profile(table, engine, columns="c,A", max_rows=10)
+
+        assert list(profiles) == ["c", "a"]
+        assert rows == 10
+        assert profiles["c"].maximum == 9
+
+
+class TestEngines:
+    """Tests that NumPy and pure Python agree."""
+
+    @pytest.mark.skipif(not HAS_NUMPY, reason="numpy not installed")
+    def test_same_report(self, small_chunks):
+        """Test both engines render identical profiles."""
+        table = [["n", "x", "s", "m"]] + [
+            [str(i % 13), "" if i % 5 == 0 else f"{i / 7:.3f}", f"v{i % 4}",
+             "n/a?" if i == 150 else f"{i % 3}.0" if i % 2 else f"{i % 3:03d}"]
+            for i in range(200)
+        ]
+        python, rows = _profile(table, False)
+        vectorized, _ = _profile(table, True)
+
+        for name in python:
+            assert python[name].render(rows) == vectorized[name].render(rows)
+
+
+class TestDistinctSketch:
+    """Tests for the distinct count estimate."""
+
+    def test_exact_while_small(self):
+        """Test counts below the sketch size are exact."""
+        sketch = DistinctSketch(size=64)
+        for i in range(50):
+            sketch.add(str(i))
+            sketch.add(str(i))
+        assert sketch.estimate() == 50
+
+    def test_estimate(self):
+        """Test large counts are estimated within a few percent."""
+        sketch = DistinctSketch()
+        for i in range(100_000):
+            sketch.add(f"user-{i}")
+        assert sketch.estimate() == pytest.approx(100_000, rel=0.1)
+
+
+# =============================================================================
+# Tool
+# =============================================================================
+
+class TestProfileDataTool:
+    """Tests for the profile_data tool."""
+
+    def test_profile_csv(self, tmp_path, capsys):
+        """Test a CSV file is summarized per column."""
+        csv_file = tmp_path / "sales.csv"
+        csv_file.write_text("region,amount\nnorth,10\nsouth,20\nnorth,\n")
+
+        result = ProfileDataTool().execute(path=str(csv_file))
+
+        assert result.success
+        output = result.llm_output
+        assert "Rows: 3 (excluding header), columns: 2" in output
+        assert "region [string]: 3 values, 0 null, 2 distinct" in output
+        assert "amount [integer]: 2 values, 1 null (33.3%), 2 distinct" in output
+        assert "min 10, max 20, mean 15" in output
+        assert "'north' 66.7%" in output
+
+    def test_tsv(self, tmp_path, capsys):
+        """Test tab-separated files are split on tabs."""
+        tsv_file = tmp_path / "data.tsv"
+        tsv_file.write_text("a\tb\n1\tx\n")
+
+        result = ProfileDataTool().execute(path=str(tsv_file))
+
+        assert "columns: 2" in result.llm_output
+
+    def test_unknown_column(self, tmp_path):
+        """Test a column that isn't in the header is an error."""
+        csv_file = tmp_path / "data.csv"
+        csv_file.write_text("a,b\n1,2\n")
+
+        result = ProfileDataTool().execute(path=str(csv_file), columns="email")
+
+        assert not result.success
+        assert "email" in result.error
+
+    def test_unsupported_file(self, tmp_path):
+        """Test non-tabular files are rejected."""
+        text_file = tmp_path / "notes.txt"
+        text_file.write_text("hello")
+
+        result = ProfileDataTool().execute(path=str(text_file))
+
+        assert not result.success
+        assert "Unsupported" in result.error
+
+    def test_discovered(self):
+        """Test the tool is registered by discovery and allowed in read-only modes."""
+        registry = ToolRegistry()
+        registry.discover()
+
+        assert "profile_data" in registry.list_tools()
+        assert registry.is_read_only("profile_data")
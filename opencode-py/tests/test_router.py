@@ -0,0 +1,308 @@
+"""Tests for routing requests over several LLM backends."""
+
+import asyncio
+
+from opencode.llm.base import (
+    CircuitOpenError,
+    ConnectionError,
+    LLMResponse,
+    Message,
+    MockLLMProvider,
+    ModelError,
+    RateLimitError,
+    measured,
+)
+from opencode.llm.router import (
+    Backend,
+    RouterProvider,
+    SAMPLE_MAX_AGE,
+    TASK_COMPLEX,
+    TASK_REVIEW,
+    TASK_SIMPLE,
+)
+
+
+class FakeProvider(MockLLMProvider):
+    """Mock backend that answers with its name, or fails with queued errors."""
+
+    def __init__(self, name: str, errors: list = (), available: bool = True):
+        super().__init__()
+        self.name = name
+        self.model = f"{name}-model"
+        self.errors = list(errors)
+        self.available = available
+        self.calls: list[str] = []
+
+    def _answer(self, call: str) -> LLMResponse:
+        self.calls.append(call)
+        if self.errors:
+            error = self.errors.pop(0)
+            return LLMResponse(content=f"[Error] {error}", stop_reason="error", error=error)
+        return LLMResponse(content=self.name)
+
+    @measured
+    def chat(self, messages, tools=None, system=None):
+        return self._answer("chat")
+
+    @measured
+    def continue_with_tool_results(self, messages, tool_rounds, tools=None, system=None):
+        return self._answer("continue_with_tool_results")
+
+    def is_available(self) -> bool:
+        return self.available
+
+
+def _record(router: RouterProvider, name: str, ttfts: list, latency: float = 0.0, tokens: int = 0) -> None:
+    """Feed a backend streamed responses with the given times to first token."""
+    backend = next(b for b in router.backends if b.name == name)
+    for ttft in ttfts:
+        response = LLMResponse(
+            content="", ttft=ttft, latency=max(latency, ttft + 1), output_tokens=tokens
+        )
+        backend.record(response, router.clock())
+
+
+def _router(*providers: FakeProvider, tasks: dict = None) -> RouterProvider:
+    tasks = tasks or {}
+    return RouterProvider([
+        Backend(name=p.name, provider=p, tasks=frozenset(tasks.get(p.name, ())))
+        for p in providers
+    ])
+
+
+MESSAGES = [Message(role="user", content="hi")]
+
+
+# =============================================================================
+# Task classes
+# =============================================================================
+
+class TestTaskRouting:
+    """Tests for picking backends by task class."""
+
+    def test_routes_by_task(self):
+        """Test simple and review tasks go to the backend configured for them."""
+        local, main = FakeProvider("local"), FakeProvider("main")
+        router = _router(local, main, tasks={"local": ["simple", "review"], "main": ["complex"]})
+
+        router.task_class = TASK_SIMPLE
+        assert router.chat(MESSAGES).content == "local"
+        router.task_class = TASK_REVIEW
+        assert router.chat(MESSAGES).content == "local"
+        router.task_class = TASK_COMPLEX
+        assert router.chat(MESSAGES).content == "main"
+        assert router.model == "main-model"
+
+    def test_unrestricted_backend_serves_all(self):
+        """Test a backend without tasks takes any task class."""
+        router = _router(FakeProvider("any"))
+        router.task_class = TASK_REVIEW
+        assert router.chat(MESSAGES).content == "any"
+
+    def test_falls_back_when_no_backend_serves_task(self):
+        """Test a task nobody is configured for still goes to an available backend."""
+        router = _router(FakeProvider("main"), tasks={"main": ["complex"]})
+        router.task_class = TASK_SIMPLE
+        assert router.chat(MESSAGES).content == "main"
+
+    def test_skips_unavailable_backends(self):
+        """Test backends without a key or URL are not tried."""
+        router = _router(FakeProvider("down", available=False), FakeProvider("up"))
+        assert router.chat(MESSAGES).content == "up"
+
+    def test_no_backend_available(self):
+        """Test an error response when no backend can take the request."""
+        router = _router(FakeProvider("down", available=False))
+        assert not router.is_available()
+        assert router.chat(MESSAGES).stop_reason == "error"
+
+    def test_stream_falls_back_to_chat(self):
+        """Test backends without streaming answer chat_stream with chat."""
+        provider = FakeProvider("main")
+        assert _router(provider).chat_stream(MESSAGES).content == "main"
+        assert provider.calls == ["chat"]
+
+
+# =============================================================================
+# Failover
+# =============================================================================
+
+class TestFailover:
+    """Tests for moving to the next backend when a request fails."""
+
+    def test_rate_limit_fails_over(self):
+        """Test a rate-limited request is answered by the next backend."""
+        first = FakeProvider("first", errors=[RateLimitError("first")])
+        router = _router(first, FakeProvider("second"))
+
+        assert router.chat(MESSAGES).content == "second"
+        assert router.backends[0].failures == 1
+
+    def test_connection_error_fails_over(self):
+        """Test a dropped connection is answered by the next backend."""
+        router = _router(FakeProvider("first", errors=[ConnectionError("first")]), FakeProvider("second"))
+        assert router.chat(MESSAGES).content == "second"
+
+    def test_open_circuit_fails_over(self):
+        """Test a backend refusing requests (open circuit) is passed over."""
+        router = _router(FakeProvider("first", errors=[CircuitOpenError("first", 30)]), FakeProvider("second"))
+        assert router.chat(MESSAGES).content == "second"
+
+    def test_permanent_error_returned(self):
+        """Test errors another backend would not fix are returned as they are."""
+        second = FakeProvider("second")
+        router = _router(FakeProvider("first", errors=[ModelError("first", "nope")]), second)
+
+        assert router.chat(MESSAGES).stop_reason == "error"
+        assert second.calls == []
+
+    def test_all_backends_fail(self):
+        """Test the last error is returned when every backend fails."""
+        router = _router(
+            FakeProvider("first", errors=[RateLimitError("first")]),
+            FakeProvider("second", errors=[RateLimitError("second")]),
+        )
+        response = router.chat(MESSAGES)
+        assert response.stop_reason == "error"
+        assert "second" in response.content
+
+    def test_open_circuit_tried_last(self):
+        """Test a backend whose circuit is open moves behind healthy ones."""
+        first, second = FakeProvider("first"), FakeProvider("second")
+        for _ in range(first.circuit.failure_threshold):
+            first.circuit.record_failure()
+
+        assert [b.name for b in _router(first, second).candidates()] == ["second", "first"]
+
+    def test_async_fails_over(self):
+        """Test the async API fails over the same way."""
+        router = _router(FakeProvider("first", errors=[RateLimitError("first")]), FakeProvider("second"))
+        assert asyncio.run(router.achat(MESSAGES)).content == "second"
+
+
+# =============================================================================
+# Latency steering and stickiness
+# =============================================================================
+
+class TestLatencySteering:
+    """Tests for steering requests by rolling speed samples."""
+
+    def test_slow_first_token_moves_back(self):
+        """Test a backend much slower to start answering than the fastest one is tried later."""
+        router = _router(FakeProvider("slow"), FakeProvider("fast"))
+        _record(router, "slow", [4.0, 5.0, 6.0])
+        _record(router, "fast", [1.0, 1.5, 2.0])
+
+        assert [b.name for b in router.candidates()] == ["fast", "slow"]
+
+    def test_similar_latencies_keep_config_order(self):
+        """Test backends within the slow factor stay in config order."""
+        router = _router(FakeProvider("first"), FakeProvider("second"))
+        _record(router, "first", [1.5, 2.0])
+        _record(router, "second", [1.0, 1.2])
+
+        assert [b.name for b in router.candidates()] == ["first", "second"]
+
+    def test_long_generations_not_slow(self):
+        """Test a backend is judged by first token and token rate, not response length."""
+        router = _router(FakeProvider("long"), FakeProvider("short"))
+        _record(router, "long", [0.5, 0.5], latency=30.0, tokens=3000)
+        _record(router, "short", [0.5, 0.5], latency=1.5, tokens=100)
+
+        assert [b.name for b in router.candidates()] == ["long", "short"]
+
+    def test_low_token_rate_moves_back(self):
+        """Test a backend generating far fewer tokens per second is tried later."""
+        router = _router(FakeProvider("crawl"), FakeProvider("quick"))
+        _record(router, "crawl", [0.5], latency=20.5, tokens=200)
+        _record(router, "quick", [0.5], latency=2.5, tokens=200)
+
+        assert [b.name for b in router.candidates()] == ["quick", "crawl"]
+
+    def test_slow_backend_recovers(self):
+        """Test a demoted backend is tried again once its samples expire."""
+        now = [1000.0]
+        first, second = FakeProvider("first"), FakeProvider("second")
+        router = _router(first, second)
+        router.clock = lambda: now[0]
+        _record(router, "first", [8.0, 9.0])
+        _record(router, "second", [1.0])
+        assert router.candidates()[0].name == "second"
+
+        # The fast backend keeps getting traffic; the slow one's samples age out
+        now[0] += SAMPLE_MAX_AGE / 2
+        _record(router, "second", [1.0])
+        now[0] += SAMPLE_MAX_AGE / 2 + 1
+        assert [b.name for b in router.candidates()] == ["first", "second"]
+
+        # Measured again, and now quick: it stays first
+        _record(router, "first", [1.2])
+        assert router.candidates()[0].name == "first"
+
+    def test_latency_recorded(self):
+        """Test successful requests feed the backend's percentiles."""
+        router = _router(FakeProvider("main"))
+        router.chat(MESSAGES)
+        router.chat(MESSAGES)
+
+        backend = router.backends[0]
+        assert len(backend.latencies) == 2
+        assert backend.p95 >= backend.p50 > 0
+        assert "main (all tasks): 2 requests" in router.describe()
+
+    def test_continuation_sticks_to_backend(self):
+        """Test tool-loop continuations go to the backend that started the chat."""
+        first = FakeProvider("first", errors=[RateLimitError("first")])
+        second = FakeProvider("second")
+        router = _router(first, second)
+
+        router.chat(MESSAGES)
+        router.continue_with_tool_results(MESSAGES, [])
+
+        assert first.calls == ["chat"]
+        assert second.calls == ["chat", "continue_with_tool_results"]
+
+    def test_listeners_reach_backends(self):
+        """Test metrics are reported by the backend that made the request."""
+        calls = []
+        router = _router(FakeProvider("first", errors=[RateLimitError("first")]), FakeProvider("second"))
+        router.metrics_listener = lambda provider, call, response: calls.append((provider.name, call))
+        router.max_retries = 0
+
+        router.chat(MESSAGES)
+
+        assert calls == [("first", "chat"), ("second", "chat")]
+        assert all(b.provider.max_retries == 0 for b in router.backends)
+
+
+# =============================================================================
+# REPL task classification
+# =============================================================================
+
+class TestTaskClass:
+    """Tests for the task class the REPL sets before each chat."""
+
+    def _repl(self):
+        from unittest.mock import MagicMock
+
+        from opencode.cli import OpenCodeREPL
+        from opencode.complexity import ComplexityAnalyzer
+        from opencode.mode import ModeManager
+
+        repl = MagicMock(spec=OpenCodeREPL)
+        repl.mode_manager = ModeManager()
+        repl.complexity = ComplexityAnalyzer()
+        repl._task_class = OpenCodeREPL._task_class.__get__(repl)
+        return repl
+
+    def test_simple_and_complex(self):
+        """Test low-scoring chats are simple and the rest complex."""
+        repl = self._repl()
+        assert repl._task_class("what does this function return?") == TASK_SIMPLE
+        assert repl._task_class("refactor the entire auth module") == TASK_COMPLEX
+
+    def test_review_mode(self):
+        """Test every chat in REVIEW mode (including review phases) is a review task."""
+        repl = self._repl()
+        repl.mode_manager.to_review()
+        assert repl._task_class("refactor the entire auth module") == TASK_REVIEW
@@ -0,0 +1,210 @@
+"""Tests for the search engine (buffer scanning and parallel execution)."""
+
+import re
+
+import pytest
+
+from opencode import search
+from opencode.config import Config
+from opencode.search import (
+    buffer_scanner, map_ordered, matching_lines, read_text, regex_literals,
+    required_literal, PARALLEL_MIN_FILES,
+)
+from opencode.tools.grep import GrepTool
+
+
+def _square(n: int, offset: int = 0) -> int:
+    """Module-level so worker processes can unpickle it."""
+    return n * n + offset
+
+
+@pytest.fixture
+def big_tree(temp_workspace):
+    """Workspace with enough files to take the parallel path."""
+    count = PARALLEL_MIN_FILES + 50
+    for i in range(count):
+        body = "needle\n" * (i % 3) + "hay\n"
+        (temp_workspace.root / f"f{i:04d}.py").write_text(body)
+    return temp_workspace
+
+
+def _naive_lines(text: str, regex: re.Pattern) -> list[tuple[int, str]]:
+    """Reference implementation: regex.search on every line."""
+    return [(i, line) for i, line in enumerate(text.splitlines(), 1) if regex.search(line)]
+
+
+# ============================================================================
+# Buffer Scanning Tests
+# ============================================================================
+
+class TestMatchingLines:
+    """Tests that whole-buffer scanning matches a per-line scan."""
+
+    TEXTS = [
+        "alpha\nbeta\ngamma\n",
+        "no trailing newline\nlast beta",
+        "\n\nbeta\n\n",
+        "a b\nc\n beta end\nbeta",
+        "form\x0cfeed beta\nline\u2028sep beta",
+        "beta\nbar\n",
+        "",
+    ]
+    PATTERNS = [
+        "beta", "^beta", "a$", "^$", r"a\sb", r"\bbeta\b", r"\Abeta", r"(?<!a)beta", "x*",
+        r"beta(?!\s)", r"beta(?![^x])", r"(?=\s)", r"a(?=\s)",
+    ]
+
+    @pytest.mark.parametrize("pattern", PATTERNS)
+    def test_equivalent_to_per_line_search(self, pattern):
+        """Test every pattern/text combination agrees with splitlines()."""
+        regex = re.compile(pattern)
+        scanner = buffer_scanner(regex)
+        for text in self.TEXTS:
+            found = [(h.line_num, h.line) for h in matching_lines(text, regex, scanner)]
+            assert found == _naive_lines(text, regex), (pattern, text)
+
+    def test_line_only_syntax_has_no_scanner(self):
+        """Test patterns that depend on line boundaries fall back to per-line."""
+        assert buffer_scanner(re.compile(r"\Afoo")) is None
+        assert buffer_scanner(re.compile(r"(?<!x)foo")) is None
+        assert buffer_scanner(re.compile(r"foo(?!\s)")) is None
+        assert buffer_scanner(re.compile(r"foo")) is not None
+
+    def test_context_lines(self):
+        """Test lazily computed context around a hit."""
+        text = "l1\nl2\nHIT\nl4\n"
+        regex = re.compile("HIT")
+        hit = next(matching_lines(text, regex, buffer_scanner(regex)))
+
+        assert hit.line_num == 3
+        assert hit.before(5) == [(1, "l1"), (2, "l2")]
+        assert hit.after(5) == [(4, "l4")]
+        assert hit.before(0) == []
+
+
+class TestReadText:
+    """Tests for literal-filtered file reading."""
+
+    def test_rejects_files_without_literal(self, temp_dir):
+        """Test files missing the literal are not decoded."""
+        path = temp_dir / "a.txt"
+        path.write_text("hello world\n")
+        assert read_text(path, b"absent") is None
+        assert read_text(path, b"world") == "hello world\n"
+
+    def test_universal_newlines(self, temp_dir):
+        """Test CRLF and CR are normalized like Path.read_text."""
+        path = temp_dir / "crlf.txt"
+        path.write_bytes(b"one\r\ntwo\rthree\n")
+        assert read_text(path) == "one\ntwo\nthree\n"
+
+    def test_large_files_use_mmap(self, temp_dir, monkeypatch):
+        """Test the mmap probe gives the same answers as read()."""
+        monkeypatch.setattr(search, "MMAP_MIN_BYTES", 1)
+        path = temp_dir / "big.txt"
+        path.write_text("x" * 100 + "needle\n")
+        assert read_text(path, b"needle").endswith("needle\n")
+        assert read_text(path, b"missing") is None
+
+    def test_required_literal(self):
+        """Test only plain, case-sensitive patterns yield a literal."""
+        assert required_literal(re.compile("def main")) == b"def main"
+        assert required_literal(re.compile("def.*main")) is None
+        assert required_literal(re.compile("main", re.IGNORECASE)) is None
+
+
+class TestRegexLiterals:
+    """Tests for extracting required literals from a regex."""
+
+    def test_word_boundaries(self):
+        """Test anchors around an identifier leave the identifier."""
+        assert regex_literals(re.compile(r"\bSymbolName\b")) == [["SymbolName"]]
+
+    def test_sequence_with_gaps(self):
+        """Test each literal run becomes its own clause."""
+        assert regex_literals(re.compile(r"def\s+main\(")) == [["def"], ["main("]]
+
+    def test_alternation(self):
+        """Test alternatives form a single OR clause."""
+        assert regex_literals(re.compile("TODO|FIXME")) == [["TODO", "FIXME"]]
+
+    def test_optional_parts_are_not_required(self):
+        """Test optional repeats contribute nothing, mandatory ones do."""
+        assert regex_literals(re.compile("(?:abc)?def")) == [["def"]]
+        assert regex_literals(re.compile("(?:abc)+def")) == [["abc"], ["def"]]
+
+    def test_alternative_without_literal(self):
+        """Test an alternative with no literal makes the branch useless."""
+        assert regex_literals(re.compile(r"foo|\w+")) == []
+
+    def test_ignore_case_skips_unsafe_letters(self):
+        """Test letters that fold to non-ASCII split literals."""
+        assert regex_literals(re.compile("Config", re.IGNORECASE)) == [["Conf"], ["g"]]
+
+
+# ============================================================================
+# map_ordered Tests
+# ============================================================================
+
+class TestMapOrdered:
+    """Tests for ordered parallel mapping."""
+
+    def test_sequential_for_small_inputs(self):
+        """Test small inputs are processed in order without a pool."""
+        assert list(map_ordered(_square, [3, 1, 2], args=(1,))) == [(3, 10), (1, 2), (2, 5)]
+
+    def test_parallel_preserves_order(self):
+        """Test results from the pool come back in input order."""
+        items = list(range(PARALLEL_MIN_FILES * 2))
+        results = list(map_ordered(_square, items, workers=2))
+        assert results == [(n, n * n) for n in items]
+
+    def test_early_close_cancels_pending(self):
+        """Test stopping iteration early leaves no queued work behind."""
+        items = list(range(PARALLEL_MIN_FILES * 8))
+        it = map_ordered(_square, items, workers=2)
+        first = [next(it) for _ in range(5)]
+        it.close()
+        assert first == [(n, n * n) for n in range(5)]
+
+    def test_single_worker_is_sequential(self, monkeypatch):
+        """Test workers=1 never starts a pool."""
+        monkeypatch.setattr(search, "_get_pool", lambda workers: pytest.fail("pool used"))
+        items = list(range(PARALLEL_MIN_FILES * 2))
+        assert len(list(map_ordered(_square, items, workers=1))) == len(items)
+
+
+# ============================================================================
+# Parallel Grep Tests
+# ============================================================================
+
+class TestParallelGrep:
+    """Tests that parallel grep matches the sequential results."""
+
+    @pytest.mark.parametrize("output_mode", ["content", "files_with_matches", "count"])
+    def test_matches_sequential(self, big_tree, output_mode):
+        """Test parallel and single-process searches produce identical output."""
+        parallel = GrepTool(workspace=big_tree, config=Config(search_workers=2))
+        sequential = GrepTool(workspace=big_tree, config=Config(search_workers=1))
+
+        kwargs = dict(pattern="needle", max_results=1000, output_mode=output_mode)
+        assert parallel.execute(**kwargs).output == sequential.execute(**kwargs).output
+
+    def test_max_results_truncates_in_path_order(self, big_tree):
+        """Test the cap keeps the first matches in path order."""
+        tool = GrepTool(workspace=big_tree, config=Config(search_workers=2))
+        result = tool.execute(pattern="needle", max_results=3)
+
+        # f0001 has one match, f0002 two - f0004 would be next
+        assert "f0001.py" in result.output
+        assert "f0002.py" in result.output
+        assert "f0004.py" not in result.output
+        assert "showing first 3 matches" in result.output
+
+    def test_multiline_matches_sequential(self, big_tree):
+        """Test multiline search is also unchanged by the pool."""
+        parallel = GrepTool(workspace=big_tree, config=Config(search_workers=2))
+        sequential = GrepTool(workspace=big_tree, config=Config(search_workers=1))
+
+        kwargs = dict(pattern="needle\\nhay", multiline=True, max_results=20)
+        assert parallel.execute(**kwargs).output == sequential.execute(**kwargs).output
@@ -0,0 +1,218 @@
+"""Tests for startup cost: the tool manifest, lazy imports and the startup profiler."""
+
+import json
+import os
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+import pytest
+
+from opencode.startup import ImportProfiler, ImportTiming, render
+from opencode.tools import registry as registry_module
+from opencode.tools.registry import LazyTool, ToolRegistry, load_manifest
+
+
+SRC = str(Path(__file__).resolve().parent.parent / "src")
+
+TOOL_SOURCE = textwrap.dedent('''
+    from opencode.tools.base import Tool, ToolResult
+
+    class ShoutTool(Tool):
+        name = "shout"
+        description = "{description}"
+
+        def get_schema(self) -> dict:
+            return {{"type": "object", "properties": {{"text": {{"type": "string"}}}}}}
+
+        def execute(self, text: str = "", **kwargs) -> ToolResult:
+            return ToolResult.ok(text.upper())
+''')
+
+
+@pytest.fixture
+def tool_package(tmp_path, monkeypatch):
+    """An importable package 'shouty' with one tool module."""
+    package = tmp_path / "shouty"
+    package.mkdir()
+    (package / "__init__.py").write_text("")
+    (package / "shout.py").write_text(TOOL_SOURCE.format(description="Upper-case text"))
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield package
+    for name in [m for m in sys.modules if m == "shouty" or m.startswith("shouty.")]:
+        del sys.modules[name]
+
+
+def _forget(package_name: str) -> None:
+    """Drop a package's tool modules so the next use has to import them."""
+    for name in [m for m in sys.modules if m.startswith(f"{package_name}.")]:
+        del sys.modules[name]
+
+
+def _run(code: str) -> str:
+    """Run code in a fresh interpreter and return its output."""
+    env = {**os.environ, "PYTHONPATH": SRC}
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, env=env, check=True
+    )
+    return result.stdout.strip()
+
+
+# =============================================================================
+# Tool manifest
+# =============================================================================
+
+class TestToolManifest:
+    """Tests for discovering tools from the cached manifest."""
+
+    def test_manifest_cached_in_pycache(self, tool_package):
+        """Test the manifest is written next to the package's bytecode."""
+        [entry] = load_manifest("shouty")
+
+        cached = json.loads((tool_package / "__pycache__" / "tool_manifest.json").read_text())
+        assert cached["tools"] == [entry]
+        assert entry["module"] == "shouty.shout"
+        assert entry["anthropic"]["input_schema"]["properties"]["text"] == {"type": "string"}
+
+    def test_discover_imports_no_tool_module(self, tool_package):
+        """Test discovery from a cached manifest leaves the tool module unimported."""
+        load_manifest("shouty")
+        _forget("shouty")
+
+        registry = ToolRegistry()
+        assert registry.discover("shouty") == 1
+
+        tool = registry.get("shout")
+        assert isinstance(tool, LazyTool)
+        assert "shouty.shout" not in sys.modules
+        assert registry.get_anthropic_tools()[0]["name"] == "shout"
+        assert "shouty.shout" not in sys.modules
+
+    def test_execute_loads_tool(self, tool_package):
+        """Test the tool module is imported when the tool first runs."""
+        registry = ToolRegistry()
+        registry.discover("shouty")
+        _forget("shouty")
+
+        result = registry.execute("shout", {"text": "hi"})
+
+        assert result.output == "HI"
+        assert registry.get("shout").loaded
+
+    def test_rebuilt_when_module_changes(self, tool_package):
+        """Test editing a tool module refreshes its manifest entry."""
+        load_manifest("shouty")
+        _forget("shouty")
+        (tool_package / "shout.py").write_text(TOOL_SOURCE.format(description="Shout it out loud"))
+
+        [entry] = load_manifest("shouty")
+
+        assert entry["description"] == "Shout it out loud"
+
+    def test_rebuilt_when_framework_changes(self, tool_package, tmp_path, monkeypatch):
+        """Test a change to the modules that build the schemas refreshes the manifest."""
+        framework = tmp_path / "base.py"
+        framework.write_text("# v1\n")
+        monkeypatch.setattr(registry_module, "_framework_modules", lambda: [("base", framework)])
+        load_manifest("shouty")
+        monkeypatch.setattr(registry_module, "build_manifest", lambda name: [{"name": "rebuilt"}])
+
+        assert load_manifest("shouty")[0]["name"] == "shout"
+        framework.write_text("# version 2\n")
+        assert load_manifest("shouty") == [{"name": "rebuilt"}]
+
+    def test_schema_copies_are_independent(self, tool_package):
+        """Test callers can't modify the manifest through a returned schema."""
+        registry = ToolRegistry()
+        registry.discover("shouty")
+        tool = registry.get("shout")
+
+        tool.to_openai_tool()["function"]["name"] = "changed"
+
+        assert tool.to_openai_tool()["function"]["name"] == "shout"
+
+    def test_builtin_schemas_match_tools(self):
+        """Test manifest schemas of the built-in tools equal the tools' own."""
+        registry = ToolRegistry()
+        registry.discover()
+
+        for name in registry.list_tools():
+            lazy = registry.get(name)
+            assert lazy.to_anthropic_tool() == lazy.tool.to_anthropic_tool()
+            assert lazy.to_openai_tool() == lazy.tool.to_openai_tool()
+
+
+# =============================================================================
+# Deferred imports
+# =============================================================================
+
+class TestDeferredImports:
+    """Tests that heavy dependencies are imported on first use, not at startup."""
+
+    def test_cli_import_skips_sdks(self):
+        """Test importing the CLI doesn't load the provider SDKs or document readers."""
+        loaded = _run(
+            "import sys, opencode.cli; "
+            "print(sorted(m for m in ('anthropic', 'openai', 'openpyxl', 'docx', 'pypdf') "
+            "if m in sys.modules))"
+        )
+        assert loaded == "[]"
+
+    def test_provider_flags_without_import(self):
+        """Test the SDK availability flags don't import the SDKs."""
+        output = _run(
+            "import sys; from opencode.llm.anthropic import HAS_ANTHROPIC; "
+            "from opencode.llm.openai import HAS_OPENAI; "
+            "print('anthropic' in sys.modules, 'openai' in sys.modules)"
+        )
+        assert output == "False False"
+
+
+# =============================================================================
+# Startup profiler
+# =============================================================================
+
+class TestImportProfiler:
+    """Tests for timing imports."""
+
+    def test_times_nested_imports(self, tmp_path, monkeypatch):
+        """Test own time excludes the modules a module imports."""
+        (tmp_path / "prof_outer.py").write_text("import time, prof_inner\ntime.sleep(0.01)\n")
+        (tmp_path / "prof_inner.py").write_text("import time\ntime.sleep(0.05)\n")
+        monkeypatch.syspath_prepend(str(tmp_path))
+
+        profiler = ImportProfiler()
+        profiler.install()
+        try:
+            import prof_outer  # noqa: F401
+        finally:
+            profiler.uninstall()
+            sys.modules.pop("prof_outer", None)
+            sys.modules.pop("prof_inner", None)
+
+        timings = {t.name: t for t in profiler.timings}
+        outer, inner = timings["prof_outer"], timings["prof_inner"]
+        assert inner.own >= 0.05
+        assert outer.total >= outer.own + inner.total * 0.99
+        assert outer.own < inner.own
+        assert profiler.slowest(1)[0].name == "prof_inner"
+
+    def test_uninstall(self):
+        """Test the profiler leaves the import system as it found it."""
+        profiler = ImportProfiler()
+        profiler.install()
+        profiler.uninstall()
+
+        assert profiler not in sys.meta_path
+
+    def test_report(self):
+        """Test the report lists phases, packages and modules."""
+        profiler = ImportProfiler()
+        profiler.timings = [ImportTiming("pkg.a", 0.3, 0.1), ImportTiming("pkg", 0.4, 0.1)]
+
+        report = render(profiler, [("Import", 0.5)])
+
+        assert "Import" in report and "500.0 ms" in report
+        assert "pkg " in report and "200.0 ms" in report
+        assert "pkg.a" in report
@@ -0,0 +1,220 @@
+"""Tests for the shared symbol table."""
+
+import os
+from textwrap import dedent
+
+from opencode import symbols as symbols_module
+from opencode.symbols import SymbolTable, extract_symbols, supports, OUTLINE, SEARCH
+from opencode.tools.find_definition import FindDefinitionTool
+from opencode.tools.find_references import FindReferencesTool
+from opencode.tools.find_symbols import FindSymbolsTool
+from opencode.tools.outline import OutlineTool
+
+
+PYTHON_SOURCE = dedent('''
+    MAX_SIZE = 10
+
+    class Parser:
+        limit = 5
+
+        def parse(self, text):
+            return text
+
+    async def main():
+        pass
+''')
+
+
+def _bump_mtime(path) -> None:
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10_000_000))
+
+
+# ============================================================================
+# Extraction Tests
+# ============================================================================
+
+class TestExtractSymbols:
+    """Tests for one-pass symbol extraction."""
+
+    def test_outline_symbols(self):
+        """Test outline keeps classes and functions with indentation."""
+        result = extract_symbols(PYTHON_SOURCE, "python")
+        outline = [(s.name, s.kind, s.indent) for s in result.outline]
+        assert outline == [
+            ("Parser", "class", 0),
+            ("parse", "function", 4),
+            ("main", "async function", 0),
+        ]
+
+    def test_definitions_include_assignments(self):
+        """Test definitions also cover variables and attributes."""
+        result = extract_symbols(PYTHON_SOURCE, "python")
+        kinds = {s.name: s.kind for s in result.definitions}
+        assert kinds["MAX_SIZE"] == "variable"
+        assert kinds["limit"] == "attribute"
+        assert kinds["Parser"] == "class"
+
+    def test_search_excludes_attributes(self):
+        """Test find_symbols results skip indented assignments."""
+        result = extract_symbols(PYTHON_SOURCE, "python")
+        assert "limit" not in {s.name for s in result.search}
+        assert "MAX_SIZE" in {s.name for s in result.search}
+
+    def test_js_methods_skip_control_flow(self):
+        """Test call-like keywords are not reported as methods."""
+        source = "class Api {\n  fetch(url) {\n    if (url) {\n    }\n  }\n}\n"
+        names = [s.name for s in extract_symbols(source, "javascript").outline]
+        assert names == ["Api", "fetch"]
+
+    def test_line_numbers_ignore_other_line_breaks(self):
+        """Test form feeds and Unicode separators don't shift line numbers."""
+        source = "x = 1  # \x0c\ny = '\u2028'\n\ndef target():\n    pass\n"
+        lines = [s.line for s in extract_symbols(source, "python").definitions if s.name == "target"]
+        assert lines == [4]
+
+    def test_supports(self):
+        """Test role support per language."""
+        assert supports("c", OUTLINE)
+        assert not supports("c", SEARCH)
+        assert not supports(None, OUTLINE)
+
+
+# ============================================================================
+# SymbolTable Tests
+# ============================================================================
+
+class TestSymbolTable:
+    """Tests for caching and invalidation."""
+
+    def test_parses_each_file_once(self, temp_dir, monkeypatch):
+        """Test unchanged files are served from memory."""
+        path = temp_dir / "mod.py"
+        path.write_text(PYTHON_SOURCE)
+
+        calls = []
+        original = symbols_module._parse_file
+        monkeypatch.setattr(symbols_module, "_parse_file", lambda p: calls.append(p) or original(p))
+
+        table = SymbolTable()
+        table.get(path)
+        table.get(path)
+        assert len(calls) == 1
+
+    def test_reparses_changed_file(self, temp_dir):
+        """Test an edit is picked up via mtime/size."""
+        path = temp_dir / "mod.py"
+        path.write_text("def old():\n    pass\n")
+        table = SymbolTable()
+        assert [s.name for s in table.get(path).outline] == ["old"]
+
+        path.write_text("def new_name():\n    pass\n")
+        _bump_mtime(path)
+        assert [s.name for s in table.get(path).outline] == ["new_name"]
+
+    def test_evicts_least_recently_used(self, temp_dir):
+        """Test the cache stays within max_files."""
+        table = SymbolTable(max_files=2)
+        paths = []
+        for name in ["a.py", "b.py", "c.py"]:
+            path = temp_dir / name
+            path.write_text("x = 1\n")
+            paths.append(path)
+            table.get(path)
+        assert len(table) == 2
+
+    def test_definitions_case_insensitive(self, temp_dir):
+        """Test definition lookup ignores case, one result per line."""
+        path = temp_dir / "mod.py"
+        path.write_text(PYTHON_SOURCE)
+        found = SymbolTable().definitions("parser", [path])
+        assert [(s.name, s.line) for _, s in found] == [("Parser", 4)]
+
+    def test_missing_file(self, temp_dir):
+        """Test unreadable files are skipped."""
+        assert SymbolTable().get(temp_dir / "missing.py") is None
+
+    def test_persists_symbols(self, temp_dir, monkeypatch):
+        """Test a saved table is reused by a new instance without re-parsing."""
+        path = temp_dir / "mod.py"
+        path.write_text(PYTHON_SOURCE)
+        (temp_dir / "index").mkdir()
+        table = SymbolTable(temp_dir / "index" / "symbols.json.gz")
+        expected = table.get(path)
+        table.save()
+
+        monkeypatch.setattr(symbols_module, "_parse_file", lambda p: None)
+        reloaded = SymbolTable(table.path)
+        assert reloaded.get(path) == expected
+
+    def test_persisted_symbols_follow_edits(self, temp_dir):
+        """Test a file changed since the table was saved is parsed again."""
+        path = temp_dir / "mod.py"
+        path.write_text("def old():\n    pass\n")
+        table = SymbolTable(temp_dir / "symbols.json.gz")
+        table.get(path)
+        table.save()
+
+        path.write_text("def new_name():\n    pass\n")
+        _bump_mtime(path)
+        assert [s.name for s in SymbolTable(table.path).get(path).outline] == ["new_name"]
+
+    def test_corrupt_file_is_ignored(self, temp_dir):
+        """Test an unreadable saved table is rebuilt on demand."""
+        path = temp_dir / "mod.py"
+        path.write_text("def f():\n    pass\n")
+        saved = temp_dir / "symbols.json.gz"
+        saved.write_bytes(b"not gzip")
+        assert [s.name for s in SymbolTable(saved).get(path).outline] == ["f"]
+
+
+# ============================================================================
+# Tool Integration Tests
+# ============================================================================
+
+class TestToolsUseSymbolTable:
+    """Tests that the symbol tools answer from the shared table."""
+
+    def test_find_definition(self, temp_workspace):
+        """Test find_definition reports kind and location."""
+        (temp_workspace.root / "mod.py").write_text(PYTHON_SOURCE)
+        result = FindDefinitionTool(workspace=temp_workspace).execute(symbol="parse")
+        assert "[function] mod.py:7" in result.output
+
+    def test_find_symbols_kind_filter(self, temp_workspace):
+        """Test find_symbols filters by kind."""
+        (temp_workspace.root / "mod.py").write_text(PYTHON_SOURCE)
+        result = FindSymbolsTool(workspace=temp_workspace).execute(kind="class")
+        assert "Parser - mod.py:4" in result.output
+        assert "main" not in result.output
+
+    def test_outline_sees_edits(self, temp_workspace):
+        """Test outline output follows file changes."""
+        path = temp_workspace.root / "mod.py"
+        path.write_text("def first():\n    pass\n")
+        tool = OutlineTool(workspace=temp_workspace)
+        assert "first" in tool.execute(path="mod.py").output
+
+        path.write_text("def second():\n    pass\n")
+        _bump_mtime(path)
+        output = tool.execute(path="mod.py").output
+        assert "second" in output
+        assert "first" not in output
+
+    def test_table_saved_under_workspace(self, temp_workspace):
+        """Test the workspace's table lives in .opencode/index/."""
+        (temp_workspace.root / "mod.py").write_text(PYTHON_SOURCE)
+        FindSymbolsTool(workspace=temp_workspace).execute(kind="class")
+        temp_workspace.symbol_table.save()
+        assert (temp_workspace.root / ".opencode" / "index" / "symbols.json.gz").exists()
+
+    def test_find_references_skips_definitions(self, temp_workspace):
+        """Test definition sites are excluded when a language is given."""
+        (temp_workspace.root / "mod.py").write_text(
+            "def helper():\n    pass\n\nhelper()\n"
+        )
+        result = FindReferencesTool(workspace=temp_workspace).execute(
+            symbol="helper", language="python"
+        )
+        assert "mod.py:4" in result.output
+        assert "mod.py:1" not in result.output
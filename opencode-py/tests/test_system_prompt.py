@@ -0,0 +1,101 @@
+"""Tests for the memoized system prompt."""
+
+import os
+from unittest.mock import MagicMock
+
+import pytest
+
+from opencode.config import Config
+from opencode.mode import ModeManager
+from opencode.tools.base import Tool, ToolResult
+from opencode.tools.registry import ToolRegistry
+
+
+class EchoTool(Tool):
+    """Tool registered to change the registry."""
+
+    name = "echo"
+    description = "Echo the input"
+    def get_schema(self) -> dict:
+        return {"type": "object", "properties": {}}
+
+    def execute(self, **kwargs) -> ToolResult:
+        return ToolResult.ok("echo")
+
+
+@pytest.fixture
+def repl(tmp_path, monkeypatch):
+    """A REPL stand-in with the real system prompt methods, in an empty directory."""
+    from opencode.cli import OpenCodeREPL
+
+    monkeypatch.chdir(tmp_path)
+    repl = MagicMock(spec=OpenCodeREPL)
+    repl.config = Config()
+    repl.mode_manager = ModeManager()
+    repl.registry = ToolRegistry(mode_manager=repl.mode_manager, config=repl.config)
+    repl.workspace = MagicMock(is_initialized=False, root=None)
+    repl._system_prompt = None
+    repl._system_prompt_key = None
+    for name in ("_get_system_prompt", "_build_system_prompt", "_project_instructions_stamp",
+                 "_load_project_instructions", "_find_iai_file"):
+        setattr(repl, name, getattr(OpenCodeREPL, name).__get__(repl))
+    return repl
+
+
+# =============================================================================
+# Reuse and invalidation
+# =============================================================================
+
+class TestSystemPromptMemo:
+    """Tests for rebuilding the system prompt only when its inputs change."""
+
+    def test_reused_between_calls(self, repl):
+        """Test repeated calls return the identical string without rebuilding."""
+        first = repl._get_system_prompt()
+        repl._build_system_prompt = MagicMock(side_effect=AssertionError("rebuilt"))
+        second = repl._get_system_prompt()
+
+        assert second is first
+
+    def test_mode_change_rebuilds(self, repl):
+        """Test switching mode changes the prompt."""
+        plan = repl._get_system_prompt()
+        repl.mode_manager.to_build()
+        build = repl._get_system_prompt()
+
+        assert "PLAN" in plan and "BUILD" in build
+        assert build != plan
+
+    def test_iai_change_rebuilds(self, repl, tmp_path):
+        """Test editing iai.md shows up in the next prompt."""
+        iai = tmp_path / "iai.md"
+        iai.write_text("Use tabs.")
+        assert "Use tabs." in repl._get_system_prompt()
+
+        iai.write_text("Use four spaces.")
+        stat = iai.stat()
+        os.utime(iai, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        prompt = repl._get_system_prompt()
+
+        assert "Use four spaces." in prompt
+        assert "Use tabs." not in prompt
+
+    def test_iai_not_reread_when_unchanged(self, repl, tmp_path):
+        """Test an unchanged iai.md is only stat'ed, not read again."""
+        (tmp_path / "iai.md").write_text("Use tabs.")
+        repl._get_system_prompt()
+
+        repl._load_project_instructions = MagicMock(side_effect=AssertionError("re-read"))
+        repl._get_system_prompt()
+
+    def test_tool_registration_rebuilds(self, repl):
+        """Test registering a tool adds it to the prompt."""
+        assert "- echo:" not in repl._get_system_prompt()
+        repl.registry.register(EchoTool)
+        assert "- echo: Echo the input" in repl._get_system_prompt()
+
+    def test_system_info_detected_once(self):
+        """Test OS detection (reading /etc/os-release) happens once per process."""
+        from opencode.cli import _detect_system_info
+
+        assert _detect_system_info() is _detect_system_info()
@@ -0,0 +1,193 @@
+"""Tests for LLM call metrics and session telemetry."""
+
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from opencode.llm.base import (
+    LLMResponse,
+    Message,
+    MockLLMProvider,
+    RateLimitError,
+    mark_first_token,
+    measured,
+)
+from opencode.telemetry import MetricsSink, SessionStats
+
+
+class TimedProvider(MockLLMProvider):
+    """Mock provider whose chat streams a token after a delay and may be rate limited."""
+
+    def __init__(self, failures: int = 0):
+        super().__init__()
+        self.retry_delay = 0
+        self.failures = failures
+
+    def _send(self):
+        if self.failures:
+            self.failures -= 1
+            raise RateLimitError("test")
+        time.sleep(0.05)
+        mark_first_token()
+        time.sleep(0.05)
+        return LLMResponse(content="hi", output_tokens=10, input_tokens=100)
+
+    @measured
+    def chat(self, messages, tools=None, system=None):
+        return self._retry_with_backoff(self._send)
+
+
+def _response(**metrics) -> LLMResponse:
+    return LLMResponse(content="x", **metrics)
+
+
+# =============================================================================
+# Per-call metrics
+# =============================================================================
+
+class TestMeasured:
+    """Tests for the timing and retry counts filled in by @measured."""
+
+    def test_latency_and_ttft(self):
+        """Test latency covers the whole call and TTFT the time to the first token."""
+        response = TimedProvider().chat([Message(role="user", content="hi")])
+
+        assert 0.05 <= response.ttft < response.latency
+        assert response.latency >= 0.1
+        assert response.tokens_per_second > 0
+
+    def test_retries_counted(self):
+        """Test retried attempts show up on the response."""
+        response = TimedProvider(failures=2).chat([])
+        assert response.retries == 2
+
+    def test_listener_sees_each_call_once(self):
+        """Test the default achat (which runs chat in a thread) reports one call."""
+        provider = TimedProvider()
+        calls = []
+        provider.metrics_listener = lambda p, call, response: calls.append(call)
+
+        asyncio.run(provider.achat([]))
+        provider.chat([])
+
+        assert calls == ["achat", "chat"]
+
+    def test_not_streamed_has_no_ttft(self):
+        """Test responses without streamed tokens leave TTFT at zero."""
+        provider = MockLLMProvider()
+        response = measured(MockLLMProvider.chat)(provider, [Message(role="user", content="hi")])
+        assert response.ttft == 0.0
+        assert response.latency > 0
+
+    def test_tokens_per_second(self):
+        """Test throughput is measured over generation time only."""
+        response = _response(output_tokens=100, latency=3.0, ttft=1.0)
+        assert response.tokens_per_second == 50.0
+        assert _response(latency=1.0).tokens_per_second == 0.0
+
+
+class TestProviderUsage:
+    """Tests for token usage parsed from provider responses."""
+
+    def test_anthropic_usage(self):
+        """Test input, output and cache tokens come from the usage block."""
+        pytest.importorskip("anthropic")
+        from opencode.llm.anthropic import AnthropicProvider
+
+        usage = SimpleNamespace(input_tokens=12, output_tokens=34,
+                                cache_read_input_tokens=1000, cache_creation_input_tokens=5)
+        provider = AnthropicProvider(api_key="test-key")
+        provider._client = SimpleNamespace(messages=SimpleNamespace(create=lambda **kw: SimpleNamespace(
+            content=[SimpleNamespace(type="text", text="ok")], stop_reason="end_turn", usage=usage)))
+
+        response = provider.chat([Message(role="user", content="hi")])
+
+        assert (response.input_tokens, response.output_tokens) == (12, 34)
+        assert (response.cache_read_tokens, response.cache_write_tokens) == (1000, 5)
+        assert response.latency > 0
+
+    def test_openai_stream_usage(self):
+        """Test a stream requests usage and reads it from the final chunk."""
+        pytest.importorskip("openai")
+        from opencode.llm.openai import OpenAIProvider
+
+        usage = SimpleNamespace(prompt_tokens=50, completion_tokens=7,
+                                prompt_tokens_details=SimpleNamespace(cached_tokens=20))
+        chunks = [
+            SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content="ok", tool_calls=None))]),
+            SimpleNamespace(choices=[], usage=usage),
+        ]
+        requests = []
+
+        def create(**kwargs):
+            requests.append(kwargs)
+            return iter(chunks)
+
+        provider = OpenAIProvider(api_key="test-key")
+        provider._client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+        response = provider.chat_stream([Message(role="user", content="hi")])
+
+        assert requests[0]["stream_options"] == {"include_usage": True}
+        assert (response.input_tokens, response.cache_read_tokens, response.output_tokens) == (30, 20, 7)
+        assert response.ttft > 0
+
+
+# =============================================================================
+# Session totals
+# =============================================================================
+
+class TestSessionStats:
+    """Tests for aggregating calls over a session."""
+
+    def test_totals(self):
+        """Test tokens, retries and errors add up across calls."""
+        stats = SessionStats()
+        provider = MockLLMProvider()
+        stats.record(provider, "chat", _response(input_tokens=100, output_tokens=20,
+                                                 cache_read_tokens=300, latency=2.0, retries=1))
+        stats.record(provider, "chat", LLMResponse(content="[Error]", stop_reason="error", latency=0.5))
+
+        assert (stats.calls, stats.errors, stats.retries) == (2, 1, 1)
+        assert stats.input_tokens == 100
+        assert stats.cache_hit_rate == 0.75
+
+    def test_render(self):
+        """Test the /stats summary shows percentiles and throughput."""
+        stats = SessionStats()
+        provider = MockLLMProvider()
+        for latency in (1.0, 2.0, 3.0, 4.0):
+            stats.record(provider, "chat_stream", _response(output_tokens=30, latency=latency, ttft=1.0))
+
+        text = stats.render()
+        assert "LLM calls:      4" in text
+        assert "p50 2.00s, p95 4.00s" in text
+        assert "First token:    p50 1.00s" in text
+        assert "Throughput:     20.0 tokens/s" in text
+
+    def test_render_empty(self):
+        """Test /stats before any call."""
+        assert "No LLM calls" in SessionStats().render()
+
+    def test_sink_writes_jsonl(self, tmp_path):
+        """Test each call becomes one JSON line in the metrics directory."""
+        stats = SessionStats(MetricsSink(tmp_path / "metrics"), session_id="s1")
+        provider = MockLLMProvider()
+        stats.record(provider, "chat", _response(input_tokens=5, latency=0.25))
+        stats.record(provider, "continue_with_tool_results", _response(output_tokens=3))
+
+        [log] = (tmp_path / "metrics").glob("*.jsonl")
+        records = [json.loads(line) for line in log.read_text().splitlines()]
+        assert [r["call"] for r in records] == ["chat", "continue_with_tool_results"]
+        assert records[0]["session"] == "s1"
+        assert records[0]["input_tokens"] == 5
+        assert records[0]["latency"] == 0.25
+
+    def test_sink_errors_ignored(self, tmp_path):
+        """Test an unwritable metrics directory does not break a call."""
+        blocker = tmp_path / "metrics"
+        blocker.write_text("not a directory")
+        MetricsSink(blocker).write({"call": "chat"})
@@ -0,0 +1,177 @@
+"""Tests for the read-only tool result cache in ToolRegistry."""
+
+import os
+from unittest.mock import MagicMock
+
+from opencode.config import Config
+from opencode.mode import ModeManager, Mode
+from opencode.tools.base import Tool, ToolResult
+from opencode.tools.glob import GlobTool
+from opencode.tools.grep import GrepTool
+from opencode.tools.read import ReadTool
+from opencode.tools.registry import ToolRegistry, ToolResultCache
+from opencode.tools.write import WriteTool
+
+
+class CountingTool(Tool):
+    """Cacheable tool that counts how often it really runs."""
+
+    name = "counting"
+    description = "Counts executions"
+    cacheable = True
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.calls = 0
+
+    def execute(self, value: str, repeat: int = 1) -> ToolResult:
+        self.calls += 1
+        return ToolResult.ok(value * repeat)
+
+    def get_schema(self) -> dict:
+        return {"properties": {}, "required": []}
+
+
+def _registry(workspace, **config) -> ToolRegistry:
+    registry = ToolRegistry(
+        mode_manager=ModeManager(initial_mode=Mode.BUILD),
+        config=Config(**config),
+        workspace=workspace,
+    )
+    for tool_class in (GrepTool, GlobTool, ReadTool, WriteTool, CountingTool):
+        registry.register(tool_class)
+    return registry
+
+
+# ============================================================================
+# ToolResultCache Tests
+# ============================================================================
+
+class TestToolResultCache:
+    """Tests for LRU behaviour and counters."""
+
+    def test_hits_and_misses(self):
+        """Test lookups are counted."""
+        cache = ToolResultCache()
+        assert cache.get("k") is None
+        cache.put("k", ToolResult.ok("v"))
+        assert cache.get("k").output == "v"
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_evicts_least_recently_used(self):
+        """Test the oldest unused entry goes first."""
+        cache = ToolResultCache(max_entries=2)
+        cache.put("a", ToolResult.ok("a"))
+        cache.put("b", ToolResult.ok("b"))
+        cache.get("a")
+        cache.put("c", ToolResult.ok("c"))
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+
+
+# ============================================================================
+# ToolRegistry.execute Tests
+# ============================================================================
+
+class TestRegistryCaching:
+    """Tests for memoized tool execution."""
+
+    def test_defaults_are_normalized(self, temp_workspace):
+        """Test explicit default arguments hit the same entry."""
+        registry = _registry(temp_workspace)
+        registry.execute("counting", {"value": "x"})
+        registry.execute("counting", {"value": "x", "repeat": 1})
+        registry.execute("counting", {"repeat": 1, "value": "x"})
+        assert registry.get("counting").calls == 1
+        assert registry.cache.hits == 2
+
+    def test_grep_reused_until_file_changes(self, temp_workspace, capsys):
+        """Test a repeated grep is free until a tool edits a file."""
+        path = temp_workspace.root / "mod.py"
+        path.write_text("needle = 1\n")
+        registry = _registry(temp_workspace)
+
+        first = registry.execute("grep", {"pattern": "needle"})
+        second = registry.execute("grep", {"pattern": "needle"})
+        assert second is first
+
+        registry.execute("write", {"path": str(path), "content": "needle = 2\nneedle\n"})
+        third = registry.execute("grep", {"pattern": "needle"})
+        assert third is not first
+        assert "needle = 2" in third.output
+
+    def test_invalidate_catches_outside_edits(self, temp_workspace):
+        """Test edits made behind the index's back are seen after invalidate()."""
+        path = temp_workspace.root / "mod.py"
+        path.write_text("old\n")
+        registry = _registry(temp_workspace)
+        registry.execute("grep", {"pattern": "old|new"})
+
+        path.write_text("new\n")
+        st = os.stat(path)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10_000_000))
+        temp_workspace.file_index.invalidate()
+
+        assert "new" in registry.execute("grep", {"pattern": "old|new"}).output
+
+    def test_new_input_clears_results_without_restat(self, temp_workspace):
+        """Test each prompt drops cached results but leaves the index incremental."""
+        from opencode.cli import OpenCodeREPL
+
+        (temp_workspace.root / "mod.py").write_text("needle\n")
+        repl = MagicMock(spec=OpenCodeREPL)
+        repl.registry = _registry(temp_workspace)
+        repl.workspace = temp_workspace
+        repl.classifier = MagicMock()
+        repl.registry.execute("grep", {"pattern": "needle"})
+
+        OpenCodeREPL._handle_input(repl, "hello")
+
+        assert len(repl.registry.cache) == 0
+        assert not temp_workspace.file_index._restat_files
+
+    def test_read_keyed_on_file_stat(self, temp_workspace):
+        """Test read results follow the file's mtime and size."""
+        path = temp_workspace.root / "notes.txt"
+        path.write_text("one\n")
+        registry = _registry(temp_workspace)
+
+        assert "one" in registry.execute("read", {"path": "notes.txt"}).llm_output
+        path.write_text("one two\n")
+        assert "two" in registry.execute("read", {"path": "notes.txt"}).llm_output
+
+    def test_cached_read_still_shown(self, temp_workspace, capsys):
+        """Test a read answered from the cache carries the user's view of the file."""
+        (temp_workspace.root / "notes.txt").write_text("one\n")
+        registry = _registry(temp_workspace)
+
+        first = registry.execute("read", {"path": "notes.txt"})
+        second = registry.execute("read", {"path": "notes.txt"})
+
+        assert registry.cache.hits == 1
+        assert "notes.txt" in second.output and "one" in second.output
+        assert second.output == first.output
+        assert capsys.readouterr().out == ""
+
+    def test_mutating_tools_not_cached(self, temp_workspace):
+        """Test tools that change files always run."""
+        registry = _registry(temp_workspace)
+        args = {"path": "a.txt", "content": "x"}
+        registry.execute("write", args)
+        registry.execute("write", args)
+        assert registry.cache.hits == 0
+        assert len(registry.cache) == 0
+
+    def test_failures_not_cached(self, temp_workspace):
+        """Test failed calls are retried."""
+        registry = _registry(temp_workspace)
+        assert not registry.execute("read", {"path": "missing.txt"}).success
+        (temp_workspace.root / "missing.txt").write_text("here")
+        assert registry.execute("read", {"path": "missing.txt"}).success
+
+    def test_disabled_by_config(self, temp_workspace):
+        """Test tool_cache_size = 0 turns caching off."""
+        registry = _registry(temp_workspace, tool_cache_size=0)
+        registry.execute("counting", {"value": "x"})
+        registry.execute("counting", {"value": "x"})
+        assert registry.get("counting").calls == 2
@@ -1,5 +1,7 @@
 """Tests for the tools module."""
 
+import os
+
 import pytest
 from pathlib import Path
 from unittest.mock import Mock
@@ -369,6 +371,39 @@ class TestGlobTool:
         assert ".git/config" not in result.output
         assert ".git/HEAD" not in result.output
 
+    def test_glob_max_results_reports_total(self, temp_workspace):
+        """Test truncated results still report the full match count."""
+        for i in range(12):
+            (temp_workspace.root / f"f{i:02d}.py").write_text("")
+
+        tool = GlobTool(workspace=temp_workspace)
+        result = tool.execute(pattern="*.py", max_results=5)
+
+        assert "Found 12 file(s)" in result.output
+        assert "f04.py" in result.output
+        assert "f05.py" not in result.output
+        assert "... and 7 more" in result.output
+
+    def test_glob_sort_by_mtime(self, temp_workspace):
+        """Test mtime sort lists the most recently modified files first."""
+        for name, mtime in [("old.py", 1000), ("newest.py", 3000), ("mid.py", 2000)]:
+            path = temp_workspace.root / name
+            path.write_text("")
+            os.utime(path, (mtime, mtime))
+
+        tool = GlobTool(workspace=temp_workspace)
+        result = tool.execute(pattern="*.py", sort="mtime", max_results=2)
+
+        lines = result.output.splitlines()
+        assert lines[1:3] == ["newest.py", "mid.py"]
+        assert "old.py" not in result.output
+        assert "showing most recent 2 results" in result.output
+
+    def test_glob_invalid_sort(self, temp_workspace):
+        """Test an unknown sort order is rejected."""
+        result = GlobTool(workspace=temp_workspace).execute(pattern="*", sort="size")
+        assert result.success is False
+
     def test_get_schema(self):
         """Test tool schema generation."""
         tool = GlobTool()
@@ -0,0 +1,149 @@
+"""Tests for the persistent trigram index."""
+
+import os
+
+from opencode.file_index import FileIndex
+from opencode.tools.find_references import FindReferencesTool
+from opencode.tools.grep import GrepTool
+from opencode.trigram_index import TrigramIndex, file_signature
+
+
+def _names(entries) -> list[str]:
+    return [e.rel_path for e in entries]
+
+
+# ============================================================================
+# TrigramIndex Tests
+# ============================================================================
+
+class TestTrigramIndex:
+    """Tests for candidate narrowing."""
+
+    def _index(self, root, files: dict[str, str], path=None) -> TrigramIndex:
+        for name, content in files.items():
+            (root / name).write_text(content)
+        return TrigramIndex(FileIndex(root), path)
+
+    def test_narrows_to_files_with_literal(self, temp_dir):
+        """Test files without the literal's trigrams are dropped."""
+        index = self._index(temp_dir, {
+            "a.py": "class SymbolName:\n    pass\n",
+            "b.py": "def unrelated():\n    return 1\n",
+        })
+        entries = index.file_index.files()
+        assert _names(index.candidates(entries, [["SymbolName"]], workers=1)) == ["a.py"]
+
+    def test_matching_is_ascii_case_insensitive(self, temp_dir):
+        """Test the index never excludes a file over letter case."""
+        index = self._index(temp_dir, {"a.py": "SYMBOLNAME = 1\n"})
+        entries = index.file_index.files()
+        assert _names(index.candidates(entries, [["symbolname"]], workers=1)) == ["a.py"]
+
+    def test_or_clause(self, temp_dir):
+        """Test a file needs only one literal of a clause."""
+        index = self._index(temp_dir, {
+            "a.py": "# TODO later\n",
+            "b.py": "# FIXME now\n",
+            "c.py": "# fine\n",
+        })
+        entries = index.file_index.files()
+        assert _names(index.candidates(entries, [["TODO", "FIXME"]], workers=1)) == ["a.py", "b.py"]
+
+    def test_short_literals_do_not_filter(self, temp_dir):
+        """Test clauses with literals under three bytes are ignored."""
+        index = self._index(temp_dir, {"a.py": "x\n", "b.py": "y\n"})
+        entries = index.file_index.files()
+        assert index.candidates(entries, [["ab"]], workers=1) == entries
+
+    def test_modified_file_is_resigned(self, temp_dir):
+        """Test signatures are refreshed when a file changes on disk."""
+        index = self._index(temp_dir, {"a.py": "old content\n"})
+        entries = index.file_index.files()
+        assert index.candidates(entries, [["fresh_name"]], workers=1) == []
+
+        target = temp_dir / "a.py"
+        target.write_text("fresh_name = 2\n")
+        st = os.stat(target)
+        os.utime(target, ns=(st.st_atime_ns, st.st_mtime_ns + 10_000_000))
+        index.file_index.update(target)
+        entries = index.file_index.files()
+        assert _names(index.candidates(entries, [["fresh_name"]], workers=1)) == ["a.py"]
+
+    def test_unchanged_entries_are_not_statted(self, temp_dir, monkeypatch):
+        """Test a query over signed files trusts the file index's stat."""
+        import opencode.trigram_index as trigram_index
+        index = self._index(temp_dir, {"a.py": "needle_here\n"})
+        entries = index.file_index.files()
+        index.candidates(entries, [["needle"]], workers=1)
+
+        def no_stat(*args, **kwargs):
+            raise AssertionError("unexpected stat")
+
+        monkeypatch.setattr(trigram_index.os, "stat", no_stat)
+        assert _names(index.candidates(entries, [["needle"]], workers=1)) == ["a.py"]
+
+    def test_deleted_file_is_kept_as_candidate(self, temp_dir):
+        """Test a file gone since it was indexed is not ruled out by the index."""
+        index = self._index(temp_dir, {"a.py": "x = 1\n"})
+        entries = index.file_index.files()
+        (temp_dir / "a.py").unlink()
+        assert _names(index.candidates(entries, [["needle"]], workers=1)) == ["a.py"]
+
+    def test_crlf_files_match_multiline_literals(self, temp_dir):
+        """Test signatures use the same universal newlines as searching."""
+        path = temp_dir / "a.txt"
+        path.write_bytes(b"first\r\nsecond\r\n")
+        index = TrigramIndex(FileIndex(temp_dir))
+        entries = index.file_index.files()
+        assert _names(index.candidates(entries, [["first\nsecond"]], workers=1)) == ["a.txt"]
+
+    def test_persists_signatures(self, temp_dir):
+        """Test a saved index is reused by a new instance."""
+        path = temp_dir / "index" / "trigrams.json.gz"
+        (temp_dir / "index").mkdir()
+        index = self._index(temp_dir, {"a.py": "needle_here\n"}, path)
+        index.candidates(index.file_index.files(), [["needle"]], workers=1)
+        index.save()
+        assert path.exists()
+
+        reloaded = TrigramIndex(FileIndex(temp_dir), path)
+        reloaded._load()
+        assert "a.py" in reloaded._signatures
+
+    def test_unreadable_file_has_no_signature(self, temp_dir):
+        """Test missing files produce no signature."""
+        assert file_signature(temp_dir / "missing.py") is None
+
+
+# ============================================================================
+# Tool Integration Tests
+# ============================================================================
+
+class TestToolsUseTrigramIndex:
+    """Tests that search tools give the same answers with the index."""
+
+    def test_grep_finds_only_real_matches(self, temp_workspace):
+        """Test grep still finds regex matches after narrowing."""
+        (temp_workspace.root / "a.py").write_text("def handle_request(x):\n    pass\n")
+        (temp_workspace.root / "b.py").write_text("def other():\n    pass\n")
+
+        result = GrepTool(workspace=temp_workspace).execute(pattern=r"def\s+handle_\w+")
+        assert "a.py" in result.output
+        assert "b.py" not in result.output
+
+    def test_index_saved_under_workspace(self, temp_workspace):
+        """Test the workspace index lives in .opencode/index/."""
+        (temp_workspace.root / "a.py").write_text("needle = 1\n")
+        GrepTool(workspace=temp_workspace).execute(pattern="needle")
+        temp_workspace.trigram_index.save()
+        assert (temp_workspace.root / ".opencode" / "index" / "trigrams.json.gz").exists()
+
+    def test_find_references_uses_index(self, temp_workspace):
+        """Test find_references results after narrowing."""
+        (temp_workspace.root / "a.py").write_text("from b import helper\nhelper()\n")
+        (temp_workspace.root / "b.py").write_text("def helper():\n    pass\n")
+        (temp_workspace.root / "c.py").write_text("nothing here\n")
+
+        result = FindReferencesTool(workspace=temp_workspace).execute(symbol="helper")
+        assert "a.py:2" in result.output
+        assert "c.py" not in result.output